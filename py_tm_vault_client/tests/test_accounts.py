@@ -0,0 +1,470 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from requests import HTTPError, Response
+
+from tmvault.aio.accounts import AsyncAccountsAPI
+from tmvault.enums import PostingPhase
+from tmvault.rest_api import RestAPIClient, RoutingCache
+from tmvault.rest_api.accounts import AccountsAPI
+
+
+class _FakeClient:
+    """Records the requests made, and answers each path with the JSON,
+    or raises the exception, given for it.
+    """
+
+    def __init__(self, responses=None, log=None) -> None:
+        self.responses = responses or {}
+        self.requests = []
+        # Shared by the fakes of several APIs to record their order
+        self.log = log if log is not None else []
+
+    def _respond(self, method, path, data):
+        self.requests.append((method, path))
+        self.log.append((method, path, data))
+        response = self.responses[path]
+        if isinstance(response, Exception):
+            raise response
+        return response(data) if callable(response) else response
+
+    def get(self, path, params=None, deadline=None):
+        return self._respond('GET', path, params)
+
+    def post(self, path, data, request_id=None, timeout=None):
+        return self._respond('POST', path, data)
+
+    def max_concurrency(self, concurrency):
+        return concurrency
+
+
+class _AsyncFakeClient(_FakeClient):
+
+    async def get(self, path, params=None, deadline=None):
+        return self._respond('GET', path, params)
+
+    async def post(self, path, data, request_id=None, timeout=None):
+        return self._respond('POST', path, data)
+
+
+def _created_account(data):
+    return {
+        'id': 'account',
+        'product_id': data['account']['product_id'],
+        'product_version_id': 'version',
+        'opening_timestamp': '2020-01-01T00:00:00Z',
+        'status': data['account']['status'],
+        'stakeholder_ids': data['account']['stakeholder_ids'],
+    }
+
+
+_PAYMENTS_HUB_RESPONSES = {
+    '/v1/uk-bank-account-numbers': {
+        'id': 'number', 'sort_code': '040511', 'account_number': '12345678'
+    },
+    '/v1/payment-device-links': {'id': 'link'},
+}
+
+
+class CreateAccountTest(unittest.TestCase):
+
+    def test_failed_account_allocates_no_number(self):
+        core = _FakeClient({'/v1/accounts': HTTPError('400 Bad Request')})
+        payments_hub = _FakeClient(_PAYMENTS_HUB_RESPONSES)
+        accounts = AccountsAPI(core, payments_hub)
+        with self.assertRaises(HTTPError):
+            accounts.create_account(
+                product_id='unknown', stakeholder_customer_ids=['customer']
+            )
+        self.assertEqual(payments_hub.requests, [])
+
+    def test_account_is_built_from_the_responses(self):
+        core = _FakeClient({'/v1/accounts': _created_account})
+        payments_hub = _FakeClient(_PAYMENTS_HUB_RESPONSES)
+        cache = RoutingCache()
+        accounts = AccountsAPI(core, payments_hub, cache)
+        account = accounts.create_account(
+            product_id='current_account',
+            stakeholder_customer_ids=['customer']
+        )
+        self.assertEqual(core.requests, [('POST', '/v1/accounts')])
+        self.assertEqual(payments_hub.requests, [
+            ('POST', '/v1/uk-bank-account-numbers'),
+            ('POST', '/v1/payment-device-links'),
+        ])
+        self.assertEqual(account.id_, 'account')
+        self.assertEqual(account.stakeholder_ids, ['customer'])
+        self.assertEqual(
+            (account.uk_sort_code, account.uk_account_number),
+            ('040511', '12345678')
+        )
+        self.assertEqual(cache.get('account'), ('040511', '12345678'))
+
+    def _assert_created_in_order(self, log, account):
+        # Each POST uses the IDs returned by the one before, and nothing is
+        # read back
+        self.assertEqual([(m, p) for m, p, _ in log], [
+            ('POST', '/v1/accounts'),
+            ('POST', '/v1/uk-bank-account-numbers'),
+            ('POST', '/v1/payment-device-links'),
+        ])
+        self.assertEqual(log[2][2], {'payment_device_link': {
+            'uk_bank_account_number_id': 'number',
+            'vault_account_id': 'account',
+        }})
+        self.assertEqual(account.id_, 'account')
+        self.assertEqual(account.product_version_id, 'version')
+        self.assertEqual(
+            account.opening_timestamp,
+            datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(account.uk_account_number, '12345678')
+
+    def test_posts_are_sent_in_order_with_the_returned_ids(self):
+        log = []
+        accounts = AccountsAPI(
+            _FakeClient({'/v1/accounts': _created_account}, log),
+            _FakeClient(_PAYMENTS_HUB_RESPONSES, log)
+        )
+        account = accounts.create_account(
+            product_id='current_account',
+            stakeholder_customer_ids=['customer']
+        )
+        self._assert_created_in_order(log, account)
+
+    def test_async_posts_are_sent_in_order_with_the_returned_ids(self):
+        log = []
+        accounts = AsyncAccountsAPI(
+            _AsyncFakeClient({'/v1/accounts': _created_account}, log),
+            _AsyncFakeClient(_PAYMENTS_HUB_RESPONSES, log)
+        )
+        account = asyncio.run(accounts.create_account(
+            product_id='current_account',
+            stakeholder_customer_ids=['customer']
+        ))
+        self._assert_created_in_order(log, account)
+
+    def test_async_failed_account_allocates_no_number(self):
+        core = _AsyncFakeClient(
+            {'/v1/accounts': HTTPError('400 Bad Request')}
+        )
+        payments_hub = _AsyncFakeClient(_PAYMENTS_HUB_RESPONSES)
+        accounts = AsyncAccountsAPI(core, payments_hub)
+        with self.assertRaises(HTTPError):
+            asyncio.run(accounts.create_account(
+                product_id='unknown', stakeholder_customer_ids=['customer']
+            ))
+        self.assertEqual(payments_hub.requests, [])
+
+
+def _live_balance(amount, phase, asset='COMMERCIAL_BANK_MONEY'):
+    return {
+        'amount': amount,
+        'account_address': 'DEFAULT',
+        'phase': phase,
+        'asset': asset,
+        'denomination': 'GBP',
+    }
+
+
+_ACCOUNT_WITH_BALANCES = {
+    'id': 'account',
+    'account_balance': {'live_balances': [
+        _live_balance('10.10', 'POSTING_PHASE_COMMITTED'),
+        _live_balance('0.000001', 'POSTING_PHASE_COMMITTED', 'CASH'),
+        _live_balance('-0.30', 'POSTING_PHASE_PENDING_OUTGOING'),
+        _live_balance('1.00', 'POSTING_PHASE_NOT_YET_INVENTED'),
+    ]},
+}
+
+
+class GetBalancesTest(unittest.TestCase):
+
+    def test_balances_of_different_assets_are_kept_apart(self):
+        core = _FakeClient({'/v1/accounts/account': _ACCOUNT_WITH_BALANCES})
+        accounts = AccountsAPI(core, _FakeClient())
+        committed = PostingPhase.POSTING_PHASE_COMMITTED
+        self.assertEqual(accounts.get_balances(['account']), {'account': {
+            ('DEFAULT', 'COMMERCIAL_BANK_MONEY', committed, 'GBP'):
+                Decimal('10.10'),
+            ('DEFAULT', 'CASH', committed, 'GBP'): Decimal('0.000001'),
+        }})
+
+    def test_unknown_phases_are_skipped(self):
+        core = _FakeClient({'/v1/accounts/account': _ACCOUNT_WITH_BALANCES})
+        accounts = AccountsAPI(core, _FakeClient())
+        with self.assertLogs('tmvault.rest_api.accounts', 'WARNING'):
+            balances = accounts.get_balances(['account'], phase=None)
+        self.assertEqual(len(balances['account']), 3)
+
+
+class _SlowSession:
+    """Answers every request with the same account after a delay, and
+    records the requests sent."""
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, **kwargs):
+        with self._lock:
+            self.requests.append(params)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"id": "account"}'
+        return response
+
+
+class GetAccountTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.core = RestAPIClient('http://get-account.test', 'token')
+        self.session = self.core._session = _SlowSession()
+        self.accounts = AccountsAPI(self.core, _FakeClient())
+
+    def _get_concurrently(self, **kwargs):
+        threads = [
+            threading.Thread(target=self.accounts.get_account, args=(
+                'account', False
+            ), kwargs=kwargs)
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_reads_of_an_account_send_one_request(self):
+        self._get_concurrently()
+        self.assertEqual(len(self.session.requests), 1)
+        self.assertNotIn(
+            'instance_param_vals_effective_timestamp',
+            self.session.requests[0]
+        )
+        self.assertEqual(self.core.single_flight_stats().coalesced, 7)
+
+    def test_effective_timestamp_is_sent_when_given(self):
+        self._get_concurrently(effective_timestamp=datetime(2020, 1, 1))
+        self.assertEqual(len(self.session.requests), 1)
+        self.assertEqual(
+            self.session.requests[0][
+                'instance_param_vals_effective_timestamp'
+            ],
+            '2020-01-01T00:00:00Z'
+        )
+
+    def test_concurrency_is_capped_at_the_pool_size(self):
+        core = RestAPIClient(
+            'http://get-balances.test', 'token', pool_maxsize=2
+        )
+        session = core._session = _SlowSession()
+        accounts = AccountsAPI(core, _FakeClient())
+        ids = [f'account-{i}' for i in range(6)]
+        balances = accounts.get_balances(ids, concurrency=8)
+        self.assertEqual(list(balances), ids)
+        self.assertEqual(len(session.requests), 6)
+        self.assertEqual(session.max_in_flight, 2)
+
+
+class _RoutingSession:
+    """Answers the account list and routing lookups of an account with two
+    payment device links, and records the paths requested."""
+
+    links = [
+        {'account_id': 'account', 'payment_device_id': 'old-device'},
+        {'account_id': 'account', 'payment_device_id': 'new-device'},
+    ]
+
+    def __init__(self) -> None:
+        self.paths = []
+
+    def request(self, method, url, params=None, **kwargs):
+        path = url.split('.test', 1)[1]
+        self.paths.append(path)
+        if path == '/v1/accounts':
+            body = {'accounts': [{'id': 'account'}]}
+        elif path == '/v1/payment-device-links':
+            body = {'payment_device_links': self.links}
+        else:
+            body = {'payment_devices': {
+                device_id: {'routing_info': {
+                    'sort_code': '040511', 'account_number': device_id
+                }}
+                for device_id in params['ids']
+            }}
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode()
+        return response
+
+
+class ListAccountsForCustomerTest(unittest.TestCase):
+
+    def test_the_last_payment_device_link_is_used(self):
+        core = RestAPIClient('http://list-accounts.test', 'token')
+        session = core._session = _RoutingSession()
+        accounts = AccountsAPI(core, _FakeClient())
+        account, = accounts.list_accounts_for_customer('customer')
+        self.assertEqual(account.uk_account_number, 'new-device')
+        self.assertEqual(session.paths, [
+            '/v1/accounts',
+            '/v1/payment-device-links',
+            '/v1/payment-devices:batchGet',
+        ])
+
+    def test_routing_details_cached_on_disk_are_not_fetched(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'routing.sqlite')
+        core = RestAPIClient('http://list-accounts-cached.test', 'token')
+        session = core._session = _RoutingSession()
+        cache = RoutingCache(path)
+        AccountsAPI(core, _FakeClient(), cache).list_accounts_for_customer(
+            'customer'
+        )
+        cache.close()
+        session.paths.clear()
+        cache = RoutingCache(path)
+        self.addCleanup(cache.close)
+        account, = AccountsAPI(
+            core, _FakeClient(), cache
+        ).list_accounts_for_customer('customer')
+        self.assertEqual(account.uk_account_number, 'new-device')
+        self.assertEqual(session.paths, ['/v1/accounts'])
+
+
+class _AccountsClient:
+    """Answers account reads, each account having one payment device whose
+    account number is its ID, and records the requests made."""
+
+    batch_get_chunk_size = 2
+    batch_get_concurrency = 2
+
+    def __init__(self) -> None:
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _record(self, path, ids=None):
+        with self._lock:
+            self.requests.append((path, ids))
+
+    def get(self, path, params=None, deadline=None):
+        if path == '/v1/payment-device-links':
+            self._record(path, list(params['account_ids']))
+            return {'payment_device_links': [
+                {'account_id': a, 'payment_device_id': f'device-{a}'}
+                for a in params['account_ids']
+            ]}
+        self._record(path)
+        account_id = path.rsplit('/', 1)[1]
+        if account_id == 'unknown':
+            raise HTTPError('404 Not Found')
+        return {'id': account_id, 'status': 'ACCOUNT_STATUS_OPEN'}
+
+    def batch_get(self, path, collection, ids, deadline=None):
+        ids = list(ids)
+        self._record(path, ids)
+        return {
+            id_: {'routing_info': {
+                'sort_code': '040511', 'account_number': id_[len('device-'):]
+            }}
+            for id_ in ids
+        }
+
+    def max_concurrency(self, concurrency):
+        return concurrency
+
+
+class _AsyncAccountsClient(_AccountsClient):
+
+    async def get(self, path, params=None, deadline=None):
+        return _AccountsClient.get(self, path, params, deadline)
+
+    async def batch_get(self, path, collection, ids, deadline=None):
+        return _AccountsClient.batch_get(self, path, collection, ids)
+
+
+class GetAccountsTest(unittest.TestCase):
+
+    def _assert_got_accounts(self, core, accounts):
+        self.assertEqual(list(accounts), ['b', 'a', 'c'])
+        self.assertEqual(
+            [(a.id_, a.uk_sort_code, a.uk_account_number)
+             for a in accounts.values()],
+            [('b', '040511', 'b'), ('a', '040511', 'a'),
+             ('c', '040511', 'c')]
+        )
+        self.assertEqual(
+            sorted(path for path, _ in core.requests if path.startswith(
+                '/v1/accounts/'
+            )),
+            ['/v1/accounts/a', '/v1/accounts/b', '/v1/accounts/c']
+        )
+        # The routing details of every account are looked up together, with
+        # link requests chunked like batchGet
+        self.assertEqual(
+            sorted(ids for path, ids in core.requests
+                   if path == '/v1/payment-device-links'),
+            [['b', 'a'], ['c']]
+        )
+        self.assertEqual(
+            [ids for path, ids in core.requests
+             if path == '/v1/payment-devices:batchGet'],
+            [['device-b', 'device-a', 'device-c']]
+        )
+
+    def test_accounts_are_deduplicated_in_the_order_given(self):
+        core = _AccountsClient()
+        accounts = AccountsAPI(core, _FakeClient()).get_accounts(
+            ['b', 'a', 'b', 'c']
+        )
+        self._assert_got_accounts(core, accounts)
+
+    def test_async_accounts_are_deduplicated_in_the_order_given(self):
+        core = _AsyncAccountsClient()
+        accounts = asyncio.run(
+            AsyncAccountsAPI(core, _AsyncFakeClient()).get_accounts(
+                ['b', 'a', 'b', 'c']
+            )
+        )
+        self._assert_got_accounts(core, accounts)
+
+    def test_routing_details_can_be_left_out(self):
+        core = _AccountsClient()
+        accounts = AccountsAPI(core, _FakeClient()).get_accounts(
+            ['a', 'b'], include_uk_sort_code_and_account_number=False
+        )
+        self.assertFalse(accounts['a'].uk_account_number)
+        self.assertEqual(
+            sorted(core.requests),
+            [('/v1/accounts/a', None), ('/v1/accounts/b', None)]
+        )
+
+    def test_no_ids_send_no_request(self):
+        core = _AccountsClient()
+        self.assertEqual(AccountsAPI(core, _FakeClient()).get_accounts([]), {})
+        self.assertEqual(core.requests, [])
+
+    def test_a_missing_account_fails_the_call(self):
+        core = _AccountsClient()
+        with self.assertRaises(HTTPError):
+            AccountsAPI(core, _FakeClient()).get_accounts(['a', 'unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from importlib.util import find_spec
+
+from tmvault.rest_api.transactions import TransactionsAPI
+
+
+def _transaction(id_, account_id, value, is_credit, value_timestamp,
+                 denomination='GBP'):
+    return {
+        'id': id_, 'account_id': account_id,
+        'charge_amount': {'value': value, 'denomination': denomination},
+        'is_credit': is_credit,
+        'value_timestamp': value_timestamp,
+    }
+
+
+_ROWS = [
+    _transaction('1', 'a', '10.00', True, '2020-01-01T09:00:00Z'),
+    _transaction('2', 'a', '2.50', False, '2020-01-01T23:30:00Z'),
+    _transaction('3', 'a', '0.01', False, '2020-01-02T00:30:00+01:00'),
+    _transaction('4', 'b', '5', True, '2020-02-03T00:00:00Z'),
+    _transaction('5', 'a', '1.25', False, '2020-02-01T12:00:00Z', 'EUR'),
+]
+
+
+class _FakeClient:
+    """Answers /v1/transactions with `_ROWS`, two per page."""
+
+    def get(self, path, params=None, deadline=None):
+        index = int(params.get('page_token') or 0)
+        response = {'transactions': _ROWS[index:index + 2]}
+        if index + 2 < len(_ROWS):
+            response['next_page_token'] = str(index + 2)
+        return response
+
+
+def _aggregate(group_by, **kwargs):
+    groups = TransactionsAPI(_FakeClient()).aggregate(group_by, **kwargs)
+    return sorted(
+        groups.to_dicts(), key=lambda g: [str(g[k]) for k in group_by]
+    )
+
+
+@unittest.skipUnless(find_spec('numpy'), 'NumPy is not installed')
+class AggregateTest(unittest.TestCase):
+
+    def test_net_is_credits_minus_debits(self):
+        self.assertEqual(_aggregate([]), [{
+            'count': 5, 'sum': 1876, 'min': 1, 'max': 1000,
+            'net': 1000 - 250 - 1 + 500 - 125,
+        }])
+
+    def test_groups_by_several_keys(self):
+        self.assertEqual(_aggregate(['account_id', 'denomination']), [
+            {'account_id': 'a', 'denomination': 'EUR',
+             'count': 1, 'sum': 125, 'min': 125, 'max': 125, 'net': -125},
+            {'account_id': 'a', 'denomination': 'GBP',
+             'count': 3, 'sum': 1251, 'min': 1, 'max': 1000, 'net': 749},
+            {'account_id': 'b', 'denomination': 'GBP',
+             'count': 1, 'sum': 500, 'min': 500, 'max': 500, 'net': 500},
+        ])
+
+    def test_groups_by_direction(self):
+        groups = _aggregate(['direction'])
+        self.assertEqual(
+            [(g['direction'], g['count'], g['net']) for g in groups],
+            [
+                ('TRANSACTION_DIRECTION_CREDIT', 2, 1500),
+                ('TRANSACTION_DIRECTION_DEBIT', 3, -376),
+            ]
+        )
+
+    def test_days_and_months_are_in_utc(self):
+        days = _aggregate(['day'])
+        self.assertEqual(
+            [(str(g['day']), g['count'], g['net']) for g in days],
+            [
+                ('2020-01-01', 3, 749),
+                ('2020-02-01', 1, -125),
+                ('2020-02-03', 1, 500),
+            ]
+        )
+        months = _aggregate(['month'])
+        self.assertEqual(
+            [(str(g['month'])[:7], g['count']) for g in months],
+            [('2020-01', 3), ('2020-02', 2)]
+        )
+
+    def test_other_scales_total_in_their_minor_units(self):
+        self.assertEqual(_aggregate([], scale=3)[0]['sum'], 18760)
+
+    def test_unsupported_keys_are_rejected(self):
+        with self.assertRaises(ValueError):
+            _aggregate(['reference'])
+        with self.assertRaises(ValueError):
+            _aggregate(['day'], time_field='created_timestamp')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,422 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import aiohttp
+import requests
+
+from tmvault.aio import (
+    AsyncCustomersAPI, AsyncPaymentsAPI, AsyncRestAPIClient,
+    AsyncTMVaultClient
+)
+from tmvault.rest_api import BatchGetResult, RetryPolicy
+from tmvault.rest_api.customers import CustomersAPI
+from tmvault.rest_api.payments import PaymentsAPI
+
+
+class _FakeResponse:
+
+    def __init__(self, status, body, url) -> None:
+        self.status = status
+        self.url = url
+        self.headers = {}
+        self._body = json.dumps(body).encode()
+
+    async def read(self):
+        return self._body
+
+    async def json(self, content_type='application/json'):
+        return json.loads(self._body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeSession:
+    """Stands in for the aiohttp session, answering requests with the given
+    (status, body) pairs in turn, or raising the given exceptions, and
+    recording every request."""
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.requests = []
+        self.closed = False
+
+    def request(self, method, url, params=None, data=None, headers=None,
+                timeout=None):
+        self.requests.append({
+            'method': method, 'url': url, 'params': params,
+            'data': json.loads(data) if data is not None else None,
+            'headers': headers,
+        })
+        outcome = self.outcomes.pop(0) if self.outcomes else (200, {})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _FakeResponse(*outcome, url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _client(name, *outcomes, **kwargs):
+    client = AsyncRestAPIClient(
+        f'http://{name}.aio.test', 'token',
+        retry_policy=RetryPolicy(backoff_base=0, jitter=False), **kwargs
+    )
+    client._session = _FakeSession(*outcomes)
+    return client
+
+
+class AsyncRestAPIClientTest(unittest.TestCase):
+
+    def test_list_params_are_sent_as_repeated_keys(self):
+        client = _client('params', (200, {'transactions': []}))
+        response = asyncio.run(client.get(
+            '/v1/transactions', {'account_ids': ['a', 'b'], 'page_size': 10}
+        ))
+        self.assertEqual(response, {'transactions': []})
+        request, = client._session.requests
+        self.assertEqual(
+            request['url'], 'http://params.aio.test/v1/transactions'
+        )
+        self.assertEqual(
+            request['params'],
+            [('account_ids', 'a'), ('account_ids', 'b'), ('page_size', '10')]
+        )
+
+    def test_bodies_are_json_with_a_request_id(self):
+        client = _client('post', (200, {'id': 'customer'}))
+        asyncio.run(client.post(
+            '/v1/customers', {'customer': {'id': 'customer'}},
+            request_id='request'
+        ))
+        request, = client._session.requests
+        self.assertEqual(request['method'], 'POST')
+        self.assertEqual(request['data'], {
+            'request_id': 'request', 'customer': {'id': 'customer'}
+        })
+        self.assertEqual(
+            request['headers'], {'Content-Type': 'application/json'}
+        )
+
+    def test_failures_are_retried_with_the_same_request_id(self):
+        client = _client(
+            'retry', (503, {}), aiohttp.ClientConnectionError('reset'),
+            (200, {'id': 'payment'})
+        )
+        response = asyncio.run(client.put('/v1/payments/payment', {}))
+        self.assertEqual(response, {'id': 'payment'})
+        request_ids = {
+            r['data']['request_id'] for r in client._session.requests
+        }
+        self.assertEqual(len(client._session.requests), 3)
+        self.assertEqual(len(request_ids), 1)
+        metrics = client.metrics()['PUT /v1/payments/{id}']
+        self.assertEqual((metrics.requests, metrics.retries), (3, 2))
+        self.assertEqual(
+            metrics.status_codes, {'503': 1, 'error': 1, '200': 1}
+        )
+
+    def test_errors_carry_the_vault_details(self):
+        client = _client('error', (400, {
+            'vault_error_code': 'invalid_argument', 'tracing_id': 'trace',
+            'message': 'bad account'
+        }))
+        with self.assertRaises(requests.HTTPError) as raised:
+            asyncio.run(client.get('/v1/accounts/account'))
+        message = str(raised.exception)
+        self.assertIn('Vault Error Code: <invalid_argument>', message)
+        self.assertIn('Message: <bad account>', message)
+
+    def test_batch_get_is_chunked(self):
+        client = _client(
+            'batch',
+            (200, {'customers': {'a': {'id': 'a'}, 'b': {'id': 'b'}}}),
+            (200, {'customers': {}}),
+            batch_get_chunk_size=2
+        )
+        result = asyncio.run(client.batch_get(
+            '/v1/customers:batchGet', 'customers', ['a', 'b', 'a', 'c']
+        ))
+        self.assertEqual(list(result), ['a', 'b'])
+        self.assertEqual(result.missing_ids, ['c'])
+        self.assertEqual(
+            [r['params'] for r in client._session.requests],
+            [[('ids', 'a'), ('ids', 'b')], [('ids', 'c')]]
+        )
+
+    def test_concurrency_is_capped_at_the_pool_size(self):
+        client = _client('pool', pool_maxsize=2, batch_get_concurrency=8)
+        self.assertEqual(client.batch_get_concurrency, 2)
+        self.assertEqual(client.max_concurrency(5), 2)
+        self.assertEqual(client.max_concurrency(1), 1)
+        with self.assertRaises(ValueError):
+            client.max_concurrency(0)
+
+    def test_close_closes_the_session(self):
+        client = _client('close')
+        session = client._session
+        asyncio.run(client.close())
+        self.assertTrue(session.closed)
+        self.assertIsNone(client._session)
+
+
+class _RecordingClient:
+    """Answers each (method, path) with the JSON given for it, or the
+    result of calling it with the request data, and records the requests
+    made without their random request IDs."""
+
+    def __init__(self, responses) -> None:
+        self.responses = responses
+        self.requests = []
+
+    def _respond(self, method, path, data=None):
+        if data is not None:
+            data = {k: v for k, v in data.items() if k != 'request_id'}
+        self.requests.append((method, path, data))
+        response = self.responses[(method, path)]
+        return response(data) if callable(response) else response
+
+    def get(self, path, params=None, timeout=None):
+        return self._respond('GET', path)
+
+    def post(self, path, data, request_id=None, timeout=None):
+        return self._respond('POST', path, data)
+
+    def put(self, path, data, request_id=None, timeout=None):
+        return self._respond('PUT', path, data)
+
+    def batch_get(self, path, collection, ids, timeout=None):
+        response = self._respond('GET', path, {'ids': list(ids)})
+        return BatchGetResult(
+            {id_: response[id_] for id_ in ids if id_ in response},
+            [id_ for id_ in ids if id_ not in response]
+        )
+
+
+class _AsyncRecordingClient(_RecordingClient):
+
+    async def get(self, path, params=None, timeout=None):
+        return _RecordingClient.get(self, path, params)
+
+    async def post(self, path, data, request_id=None, timeout=None):
+        return _RecordingClient.post(self, path, data)
+
+    async def put(self, path, data, request_id=None, timeout=None):
+        return _RecordingClient.put(self, path, data)
+
+    async def batch_get(self, path, collection, ids, timeout=None):
+        return _RecordingClient.batch_get(self, path, collection, ids)
+
+
+def _customer(first_name='Ada'):
+    return {
+        'id': 'customer',
+        'customer_details': {'first_name': first_name},
+        'additional_details': {'colour': 'blue'},
+    }
+
+
+_CUSTOMER_RESPONSES = {
+    ('GET', '/v1/customers/customer'): _customer(),
+    ('GET', '/v1/customers:batchGet'): {'customer': _customer()},
+    ('POST', '/v1/customers'): _customer(),
+    ('PUT', '/v1/customers/customer:updateAdditionalDetails'): _customer(),
+    ('PUT', '/v1/customers/customer'): _customer('Grace'),
+}
+
+
+def _party(account_number):
+    return {
+        'account_id': f'account-{account_number}',
+        'bban': {'bank_id': '040511', 'account_number': account_number},
+    }
+
+
+def _payment(status):
+    return {
+        'id': 'payment', 'amount': '1.00', 'current_status': status,
+        'debitor_party': _party('1'), 'creditor_party': _party('2'),
+    }
+
+
+class _SettlingPayments:
+    """Answers the payment reads with the payment awaiting settlement, then
+    settled."""
+
+    def __init__(self) -> None:
+        self.reads = 0
+
+    def __call__(self, data):
+        self.reads += 1
+        status = (
+            'PAYMENT_STATUS_SETTLED' if self.reads > 1
+            else 'PAYMENT_STATUS_AWAITING_SETTLEMENT'
+        )
+        return {'payment': _payment(status)}
+
+
+def _payment_responses():
+    return {
+        ('POST', '/v1/payments'): _payment('PAYMENT_STATUS_RECEIVED'),
+        ('PUT', '/v1/payments/payment'): _payment(
+            'PAYMENT_STATUS_AWAITING_SETTLEMENT'
+        ),
+        ('GET', '/v1/payments:batchGet'): _SettlingPayments(),
+    }
+
+
+class AsyncMirrorTest(unittest.TestCase):
+    """The async APIs send the same requests, and return the same results,
+    as the blocking ones."""
+
+    def _assert_mirrored(self, sync_call, async_call, responses):
+        sync_client = _RecordingClient(responses())
+        async_client = _AsyncRecordingClient(responses())
+        result = sync_call(sync_client)
+        async_result = asyncio.run(async_call(async_client))
+        self.assertEqual(async_client.requests, sync_client.requests)
+        self.assertEqual(repr(async_result), repr(result))
+        return sync_client.requests, result
+
+    def test_customers(self):
+        def customers(api):
+            return [
+                api.get_customer('customer'),
+                dict(api.get_customers(['customer', 'missing'])),
+                api.create_customer(customer_id='customer', first_name='Ada'),
+                api.update_customer(
+                    'customer', first_name='Grace',
+                    additional_details_to_upsert={'colour': 'blue'}
+                ),
+            ]
+
+        async def async_customers(api):
+            return [
+                await api.get_customer('customer'),
+                dict(await api.get_customers(['customer', 'missing'])),
+                await api.create_customer(
+                    customer_id='customer', first_name='Ada'
+                ),
+                await api.update_customer(
+                    'customer', first_name='Grace',
+                    additional_details_to_upsert={'colour': 'blue'}
+                ),
+            ]
+
+        requests_made, result = self._assert_mirrored(
+            lambda client: customers(CustomersAPI(client)),
+            lambda client: async_customers(AsyncCustomersAPI(client)),
+            lambda: dict(_CUSTOMER_RESPONSES)
+        )
+        self.assertEqual(len(requests_made), 5)
+        self.assertEqual(result[3].first_name, 'Grace')
+
+    def test_payments_are_settled(self):
+        arguments = dict(
+            amount='1.00', debtor_account_id='debtor',
+            debtor_sort_code='040511', debtor_account_number='1',
+            creditor_account_id='creditor', creditor_sort_code='040511',
+            creditor_account_number='2', reference='rent'
+        )
+        no_wait = mock.patch.multiple(
+            'tmvault.rest_api.payments', PAYMENT_POLL_INTERVAL=0
+        )
+        async_no_wait = mock.patch.multiple(
+            'tmvault.aio.payments', PAYMENT_POLL_INTERVAL=0
+        )
+        with no_wait, async_no_wait:
+            requests_made, payment = self._assert_mirrored(
+                lambda client: PaymentsAPI(client).create_payment(
+                    **arguments
+                ),
+                lambda client: AsyncPaymentsAPI(client).create_payment(
+                    **arguments
+                ),
+                _payment_responses
+            )
+        self.assertEqual(
+            [(method, path) for method, path, _ in requests_made],
+            [
+                ('POST', '/v1/payments'),
+                ('PUT', '/v1/payments/payment'),
+                ('GET', '/v1/payments:batchGet'),
+                ('GET', '/v1/payments:batchGet'),
+            ]
+        )
+        self.assertEqual(
+            payment.current_status.value, 'PAYMENT_STATUS_SETTLED'
+        )
+
+
+_CONFIG = {
+    'user': 'user',
+    'service_account_token': 'token',
+    'core_api_url': 'http://core.aio.test',
+    'xpl_api_url': 'http://xpl.aio.test',
+    'payments_hub_api_url': 'http://payments-hub.aio.test',
+    'kafka_url': 'localhost:9092',
+    'vault_cidr': '127.0.0.1/32',
+}
+
+
+class AsyncTMVaultClientTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        config_file = tempfile.NamedTemporaryFile(
+            'w', suffix='.json', delete=False
+        )
+        with config_file:
+            json.dump(_CONFIG, config_file)
+        self.addCleanup(os.remove, config_file.name)
+        self.config_path = config_file.name
+
+    def test_settings_are_passed_to_every_api_client(self):
+        client = AsyncTMVaultClient(
+            self.config_path, pool_maxsize=4, batch_get_chunk_size=10,
+            read_timeout=5
+        )
+        rest_clients = [
+            client._core_rest_api, client._xpl_rest_api,
+            client._payments_hub_rest_api
+        ]
+        self.assertEqual(
+            [c.api_uri for c in rest_clients],
+            [
+                'http://core.aio.test', 'http://xpl.aio.test',
+                'http://payments-hub.aio.test'
+            ]
+        )
+        for rest_client in rest_clients:
+            self.assertEqual(rest_client.headers, {'X-Auth-Token': 'token'})
+            self.assertEqual(rest_client.pool_maxsize, 4)
+            self.assertEqual(rest_client.batch_get_chunk_size, 10)
+            self.assertEqual(rest_client.read_timeout, 5)
+        self.assertIs(client.accounts, client.accounts)
+        self.assertIs(client.customers._rest_api, client._core_rest_api)
+        self.assertIs(
+            client.payments._rest_api_client, client._payments_hub_rest_api
+        )
+        self.assertEqual(
+            set(client.metrics()), {'core', 'xpl', 'payments_hub'}
+        )
+
+    def test_leaving_the_context_closes_the_sessions(self):
+        async def use():
+            async with AsyncTMVaultClient(self.config_path) as client:
+                session = client._core_rest_api._session = _FakeSession()
+            return client, session
+
+        client, session = asyncio.run(use())
+        self.assertTrue(session.closed)
+        self.assertIsNone(client._core_rest_api._session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import threading
+import unittest
+
+from requests import HTTPError, Response
+
+from tmvault.rest_api import BatchGetResult, RestAPIClient, RetryPolicy
+from tmvault.rest_api.batch import chunk_ids, unique_ids
+
+
+class _BatchGetSession:
+    """Answers batchGet requests with the requested IDs that do not start
+    with `missing`, and records the IDs of every request."""
+
+    def __init__(self, fail_on=None) -> None:
+        self.chunks = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, **kwargs):
+        ids = params['ids']
+        with self._lock:
+            self.chunks.append(ids)
+        response = Response()
+        response.status_code = 500 if self.fail_on in ids else 200
+        response._content = json.dumps({'customers': {
+            id_: {'id': id_}
+            for id_ in ids if not id_.startswith('missing')
+        }}).encode()
+        return response
+
+
+def _client(name, session, chunk_size=3, **kwargs):
+    client = RestAPIClient(
+        f'http://{name}.batch.test', 'token',
+        batch_get_chunk_size=chunk_size, batch_get_concurrency=2, **kwargs
+    )
+    client._session = session
+    return client
+
+
+class BatchGetTest(unittest.TestCase):
+
+    def test_ids_are_deduplicated_and_chunked(self):
+        session = _BatchGetSession()
+        ids = ['a', 'b', 'a', 'c', 'd', 'e', 'b', 'f', 'g']
+        result = _client('chunked', session).batch_get(
+            '/v1/customers:batchGet', 'customers', ids
+        )
+        self.assertEqual(
+            sorted(session.chunks),
+            [['a', 'b', 'c'], ['d', 'e', 'f'], ['g']]
+        )
+        self.assertEqual(list(result), ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
+        self.assertEqual(result.missing_ids, [])
+
+    def test_missing_ids_are_reported_in_request_order(self):
+        session = _BatchGetSession()
+        result = _client('missing', session, chunk_size=2).batch_get(
+            '/v1/customers:batchGet', 'customers',
+            ['a', 'missing-1', 'b', 'c', 'missing-2']
+        )
+        self.assertEqual(set(result), {'a', 'b', 'c'})
+        self.assertEqual(result.missing_ids, ['missing-1', 'missing-2'])
+
+    def test_no_ids_send_no_request(self):
+        session = _BatchGetSession()
+        result = _client('empty', session).batch_get(
+            '/v1/customers:batchGet', 'customers', []
+        )
+        self.assertEqual((result, result.missing_ids), ({}, []))
+        self.assertEqual(session.chunks, [])
+
+    def test_a_failed_chunk_fails_the_call(self):
+        session = _BatchGetSession(fail_on='e')
+        client = _client(
+            'failed', session, retry_policy=RetryPolicy(max_attempts=1)
+        )
+        with self.assertRaises(HTTPError):
+            client.batch_get(
+                '/v1/customers:batchGet', 'customers', list('abcdefg')
+            )
+
+    def test_map_keeps_the_missing_ids(self):
+        result = BatchGetResult({'a': {'id': 'a'}}, ['b']).map(
+            lambda customer: customer['id'].upper()
+        )
+        self.assertEqual(result, {'a': 'A'})
+        self.assertEqual(result.missing_ids, ['b'])
+
+    def test_helpers(self):
+        self.assertEqual(unique_ids(['b', 'a', 'b']), ['b', 'a'])
+        self.assertEqual(chunk_ids(['a', 'b', 'c'], 2), [['a', 'b'], ['c']])
+        with self.assertRaises(ValueError):
+            chunk_ids(['a'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import time
+import unittest
+
+from tmvault.errors import CircuitOpenError
+from tmvault.rest_api import CircuitBreakerPolicy, CircuitState
+from tmvault.rest_api.circuit_breaker import CircuitBreaker
+
+
+def _breaker(half_open_probes=1):
+    return CircuitBreaker('/v1/accounts/{id}', CircuitBreakerPolicy(
+        window_size=2, minimum_calls=2, open_seconds=0.01,
+        half_open_probes=half_open_probes
+    ))
+
+
+def _open(breaker):
+    for _ in range(2):
+        breaker.record(breaker.before_call(), True, 0)
+    assert breaker.state == CircuitState.OPEN
+    time.sleep(0.02)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_stale_success_does_not_close_a_half_open_circuit(self):
+        breaker = _breaker()
+        stale = breaker.before_call()
+        _open(breaker)
+        probe = breaker.before_call()
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        breaker.record(stale, False, 0)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        # The probe slot is still taken
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record(probe, False, 0)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_stale_failure_does_not_reopen_a_half_open_circuit(self):
+        breaker = _breaker()
+        stale = breaker.before_call()
+        _open(breaker)
+        probe = breaker.before_call()
+        breaker.record(stale, True, 0)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        breaker.record(probe, False, 0)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_stale_outcomes_do_not_admit_extra_probes(self):
+        breaker = _breaker()
+        stale = [breaker.before_call() for _ in range(3)]
+        _open(breaker)
+        breaker.before_call()
+        for token in stale:
+            breaker.record(token, False, 0)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_failed_probe_reopens_the_circuit(self):
+        breaker = _breaker()
+        _open(breaker)
+        breaker.record(breaker.before_call(), True, 0)
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from tmvault import client as client_module
+from tmvault.client import TMVaultClient
+
+_CONFIG = {
+    'user': 'user',
+    'service_account_token': 'token',
+    'core_api_url': 'http://127.0.0.1:1',
+    'xpl_api_url': 'http://127.0.0.1:2',
+    'payments_hub_api_url': 'http://127.0.0.1:3',
+    'kafka_url': 'localhost:9092',
+    'vault_cidr': '127.0.0.1/32',
+}
+
+
+class _FakeWatcher:
+    """Counts the watchers started, failing the first `failures` starts."""
+
+    started = 0
+    failures = 0
+    _lock = threading.Lock()
+
+    def __init__(self, bootstrap_servers, json_codec=None) -> None:
+        with _FakeWatcher._lock:
+            _FakeWatcher.started += 1
+            if _FakeWatcher.started <= _FakeWatcher.failures:
+                raise IOError('broker unavailable')
+        time.sleep(0.01)
+        self.listeners = []
+
+    def add_listener(self, *listener) -> None:
+        self.listeners.append(listener)
+
+    def close(self) -> None:
+        pass
+
+
+class TransactionWatcherTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        _FakeWatcher.started = 0
+        _FakeWatcher.failures = 0
+        config_file = tempfile.NamedTemporaryFile(
+            'w', suffix='.json', delete=False
+        )
+        with config_file:
+            json.dump(_CONFIG, config_file)
+        self.addCleanup(os.remove, config_file.name)
+        patcher = mock.patch.object(
+            client_module, 'TransactionWatcher', _FakeWatcher
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TMVaultClient(
+            config_file.name, transaction_cache_size=10,
+            cache_routing_details=False
+        )
+        self.addCleanup(self.client.close)
+
+    def test_concurrent_first_use_starts_one_watcher(self):
+        watchers = []
+        threads = [
+            threading.Thread(
+                target=lambda: watchers.append(
+                    self.client._transaction_watcher()
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(_FakeWatcher.started, 1)
+        self.assertEqual(len({id(watcher) for watcher in watchers}), 1)
+        self.assertEqual(len(watchers[0].listeners), 1)
+
+    def test_failed_start_is_retried_after_a_backoff(self):
+        _FakeWatcher.failures = 1
+        with self.assertLogs('tmvault.client', 'WARNING'):
+            self.assertIsNone(self.client._transaction_watcher())
+        self.assertIsNone(self.client._transaction_watcher())
+        self.assertEqual(_FakeWatcher.started, 1)
+
+        later = time.monotonic() + client_module.WATCHER_RETRY_SECONDS
+        with mock.patch.object(client_module.time, 'monotonic',
+                               return_value=later):
+            self.assertIsNotNone(self.client._transaction_watcher())
+        self.assertEqual(_FakeWatcher.started, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from tmvault import codec as codec_module
+from tmvault.codec import JSONCodec, get_codec
+
+_DOCUMENT = {
+    'id': 'transaction',
+    'reference': 'café £',
+    'charge_amount': {'value': '12.34', 'denomination': 'GBP'},
+    'is_credit': True,
+    'posting_instruction_batch_ids': [],
+    'payee_id': None,
+}
+
+
+def _without(*libraries):
+    # Importing a module mapped to None raises ImportError
+    return mock.patch.dict(
+        'sys.modules', {library: None for library in libraries}
+    )
+
+
+class GetCodecTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        patcher = mock.patch.object(codec_module, '_codecs', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_codec_instance_is_used_as_is(self):
+        codec = JSONCodec()
+        self.assertIs(get_codec(codec), codec)
+
+    def test_named_codec_is_shared(self):
+        self.assertEqual(get_codec('json').name, 'json')
+        self.assertIs(get_codec('json'), get_codec('json'))
+
+    def test_unknown_name_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_codec('yaml')
+
+    def test_missing_named_library_is_an_error(self):
+        with _without('ujson'), self.assertRaises(ImportError):
+            get_codec('ujson')
+
+    def test_default_is_the_first_library_installed(self):
+        with _without('orjson', 'simdjson'):
+            with _without('ujson'):
+                self.assertEqual(get_codec().name, 'json')
+            codec_module._codecs.clear()
+            try:
+                import ujson  # noqa: F401
+            except ImportError:
+                expected = 'json'
+            else:
+                expected = 'ujson'
+            self.assertEqual(get_codec().name, expected)
+
+    def test_every_installed_codec_round_trips_the_same_json(self):
+        for name in codec_module.CODEC_PREFERENCE:
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            with self.subTest(codec=name):
+                encoded = codec.dumps(_DOCUMENT)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(codec.loads(encoded), _DOCUMENT)
+                self.assertEqual(
+                    codec.loads(JSONCodec().dumps(_DOCUMENT)), _DOCUMENT
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from importlib.util import find_spec
+
+from tmvault.rest_api.columnar import (
+    TRANSACTION_COLUMNS, amount_to_minor_units, page_columns
+)
+from tmvault.rest_api.transactions import TransactionsAPI
+
+_ROWS = [
+    {
+        'id': 'credit', 'account_id': 'a',
+        'charge_amount': {'value': '12.34', 'denomination': 'GBP',
+                          'asset': 'CASH'},
+        'is_credit': True, 'reference': 'first',
+        'status': 'TRANSACTION_STATUS_BOOKED',
+        'rejection_code': 'REJECTION_CODE_UNKNOWN',
+        'value_timestamp': '2020-01-01T10:00:00Z',
+        'booking_timestamp': '2020-01-01T10:00:01.5Z',
+        'last_update_timestamp': '2020-01-01T10:00:02Z',
+        'payee_id': 'payee', 'payment_order_id': 'order',
+    },
+    {
+        'id': 'debit', 'account_id': 'a',
+        'charge_amount': {'value': '-0.05', 'denomination': 'EUR'},
+        'is_credit': False,
+        'status': 'TRANSACTION_STATUS_PENDING',
+        'value_timestamp': '2020-01-02T00:00:00+01:00',
+        'last_update_timestamp': '2020-01-02T00:00:00Z',
+    },
+    {
+        'id': 'whole', 'account_id': 'b',
+        'charge_amount': {'value': '7', 'denomination': 'GBP'},
+        'is_credit': True,
+    },
+]
+
+
+class _FakeClient:
+    """Answers /v1/transactions with `_ROWS`, one per page."""
+
+    def get(self, path, params=None, deadline=None):
+        index = int(params.get('page_token') or 0)
+        response = {'transactions': _ROWS[index:index + 1]}
+        if index + 1 < len(_ROWS):
+            response['next_page_token'] = str(index + 1)
+        return response
+
+
+def _api():
+    return TransactionsAPI(_FakeClient())
+
+
+class MinorUnitsTest(unittest.TestCase):
+
+    def test_amounts_are_converted_exactly(self):
+        self.assertEqual(amount_to_minor_units('12.34', 2), 1234)
+        self.assertEqual(amount_to_minor_units('-0.05', 2), -5)
+        self.assertEqual(amount_to_minor_units('7', 2), 700)
+        self.assertEqual(amount_to_minor_units('1.500', 2), 150)
+        self.assertEqual(amount_to_minor_units('', 2), 0)
+        self.assertEqual(
+            amount_to_minor_units('92233720368547758.07', 2),
+            9223372036854775807
+        )
+        with self.assertRaises(ValueError):
+            amount_to_minor_units('0.001', 2)
+
+    def test_page_columns_keep_other_values_as_returned(self):
+        columns = page_columns(_ROWS, 2)
+        self.assertEqual(columns['amount'], [1234, -5, 700])
+        self.assertEqual(columns['denomination'], ['GBP', 'EUR', 'GBP'])
+        self.assertEqual(columns['status'][2], None)
+
+
+class CSVTest(unittest.TestCase):
+
+    def test_csv_round_trip(self):
+        file = io.StringIO()
+        self.assertEqual(_api().export_csv(file), 3)
+        file.seek(0)
+        rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0]), list(TRANSACTION_COLUMNS))
+        self.assertEqual(
+            [row['amount'] for row in rows], ['1234', '-5', '700']
+        )
+        self.assertEqual(rows[0]['booking_timestamp'], _ROWS[0][
+            'booking_timestamp'
+        ])
+        self.assertEqual(rows[1]['reference'], '')
+        self.assertEqual(rows[1]['is_credit'], 'False')
+
+
+@unittest.skipUnless(find_spec('numpy'), 'NumPy is not installed')
+class ColumnsTest(unittest.TestCase):
+
+    def test_columns_are_typed(self):
+        import numpy as np
+        columns = _api().export_columns()
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(list(columns), list(TRANSACTION_COLUMNS))
+        self.assertEqual(columns['amount'].dtype, np.int64)
+        self.assertEqual(list(columns['amount']), [1234, -5, 700])
+        self.assertEqual(columns['is_credit'].dtype, np.bool_)
+        self.assertEqual(
+            columns['value_timestamp'].dtype, np.dtype('datetime64[us]')
+        )
+        self.assertEqual(columns['status'].dtype, np.int16)
+        self.assertEqual(columns['id'].dtype, object)
+
+    def test_timestamps_are_utc_and_missing_ones_nat(self):
+        import numpy as np
+        columns = _api().export_columns()
+        self.assertEqual(
+            list(columns['value_timestamp'][:2]),
+            [
+                np.datetime64('2020-01-01T10:00:00', 'us'),
+                np.datetime64('2020-01-01T23:00:00', 'us'),
+            ]
+        )
+        self.assertEqual(
+            columns['booking_timestamp'][0],
+            np.datetime64('2020-01-01T10:00:01.5', 'us')
+        )
+        self.assertTrue(np.isnat(columns['booking_timestamp'][1]))
+
+    def test_categories_decode_and_keep_enum_codes(self):
+        columns = _api().export_columns()
+        self.assertEqual(columns.decode('denomination'), ['GBP', 'EUR', 'GBP'])
+        self.assertEqual(
+            columns.decode('status'),
+            ['TRANSACTION_STATUS_BOOKED', 'TRANSACTION_STATUS_PENDING', None]
+        )
+        # Enum codes do not depend on the values exported
+        self.assertEqual(
+            columns['status'][0],
+            columns.categories['status'].index('TRANSACTION_STATUS_BOOKED')
+        )
+        self.assertEqual(
+            columns.categories['status'],
+            _api().export_columns(statuses=[]).categories['status']
+        )
+
+    @unittest.skipUnless(find_spec('pandas'), 'pandas is not installed')
+    def test_to_pandas_has_categoricals(self):
+        frame = _api().export_columns().to_pandas()
+        self.assertEqual(list(frame.columns), list(TRANSACTION_COLUMNS))
+        self.assertEqual(str(frame['denomination'].dtype), 'category')
+        self.assertEqual(list(frame['denomination']), ['GBP', 'EUR', 'GBP'])
+
+
+@unittest.skipUnless(
+    find_spec('numpy') and find_spec('pyarrow'),
+    'NumPy or pyarrow is not installed'
+)
+class ParquetTest(unittest.TestCase):
+
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'transactions.parquet')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, path)
+        self.assertEqual(_api().export_parquet(path), 3)
+        parquet = pyarrow.parquet.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.column_names, list(TRANSACTION_COLUMNS))
+        self.assertEqual(str(table.schema.field('amount').type), 'int64')
+        self.assertEqual(
+            str(table.schema.field('value_timestamp').type),
+            'timestamp[us, tz=UTC]'
+        )
+        values = table.to_pydict()
+        self.assertEqual(values['amount'], [1234, -5, 700])
+        self.assertEqual(values['denomination'], ['GBP', 'EUR', 'GBP'])
+        self.assertEqual(
+            values['status'],
+            ['TRANSACTION_STATUS_BOOKED', 'TRANSACTION_STATUS_PENDING', None]
+        )
+        self.assertEqual(
+            values['value_timestamp'][1].isoformat(),
+            '2020-01-01T23:00:00+00:00'
+        )
+        self.assertIsNone(values['booking_timestamp'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
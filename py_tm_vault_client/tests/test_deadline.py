@@ -0,0 +1,24 @@
+import unittest
+
+from tmvault.rest_api import Deadline
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_timeouts_without_deadline(self):
+        self.assertEqual(Deadline().timeouts(3.05, 30), (3.05, 30))
+        self.assertEqual(Deadline().timeouts(3.05, None), (3.05, None))
+        self.assertEqual(Deadline().timeouts(None, None), (None, None))
+
+    def test_timeouts_are_capped_to_the_time_remaining(self):
+        connect_timeout, read_timeout = Deadline(1).timeouts(3.05, None)
+        self.assertLessEqual(connect_timeout, 1)
+        self.assertLessEqual(read_timeout, 1)
+        self.assertGreater(read_timeout, 0.5)
+
+    def test_timeouts_never_reach_zero(self):
+        self.assertEqual(Deadline(0).timeouts(3.05, None), (0.001, 0.001))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from tmvault.aio.ingestion import create_all as async_create_all
+from tmvault.rest_api import Deadline
+from tmvault.rest_api.ingestion import (
+    IngestionCheckpoint, IngestionProgress, create_all, with_stable_ids
+)
+
+
+def _ledger(*references):
+    return [
+        {'account_id': 'account', 'reference': reference}
+        for reference in references
+    ]
+
+
+class _Vault:
+    """Creates transactions idempotently, like Vault, failing those whose
+    reference is in `failing`."""
+
+    def __init__(self, failing=()) -> None:
+        self.failing = set(failing)
+        self.created = {}
+        self.requests = []
+
+    def create(self, body, request_id):
+        self.requests.append(request_id)
+        if body['reference'] in self.failing:
+            raise IOError('connection reset')
+        self.created.setdefault(request_id, body)
+        return body
+
+    async def create_async(self, body, request_id):
+        return self.create(body, request_id)
+
+
+class WithStableIdsTest(unittest.TestCase):
+
+    def test_ids_depend_on_content_only(self):
+        first, first_request_id = with_stable_ids(_ledger('a')[0])
+        again, again_request_id = with_stable_ids(_ledger('a')[0])
+        other, other_request_id = with_stable_ids(_ledger('b')[0])
+        self.assertEqual(first, again)
+        self.assertEqual(first_request_id, again_request_id)
+        self.assertNotEqual(first['id'], other['id'])
+        self.assertNotEqual(first_request_id, other_request_id)
+
+    def test_body_is_not_changed(self):
+        body = _ledger('a')[0]
+        with_id, _ = with_stable_ids(body)
+        self.assertNotIn('id', body)
+        self.assertIn('id', with_id)
+
+    def test_given_id_is_kept(self):
+        body, _ = with_stable_ids({'id': 'mine', 'reference': 'a'})
+        self.assertEqual(body['id'], 'mine')
+
+
+class CreateAllTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'ledger.checkpoint')
+
+    def _run(self, vault, items):
+        checkpoint = IngestionCheckpoint(self.path)
+        try:
+            return create_all(
+                items, dict, vault.create, 2,
+                IngestionProgress(checkpoint, None, 60), Deadline()
+            )
+        finally:
+            checkpoint.close()
+
+    def test_resumed_run_skips_created_items_wherever_they_are(self):
+        vault = _Vault(failing={'c'})
+        report = self._run(vault, _ledger('a', 'b', 'c'))
+        self.assertEqual((report.created, report.failed), (2, 1))
+
+        # A row was added before the others, and the failure went away
+        vault.failing.clear()
+        report = self._run(vault, _ledger('new', 'a', 'b', 'c'))
+        self.assertEqual((report.created, report.skipped), (2, 2))
+        self.assertEqual(
+            sorted(body['reference'] for body in vault.created.values()),
+            ['a', 'b', 'c', 'new']
+        )
+
+    def test_lost_checkpoint_is_covered_by_idempotency(self):
+        vault = _Vault()
+        self._run(vault, _ledger('a', 'b'))
+        os.remove(self.path)
+        self._run(vault, _ledger('new', 'a', 'b'))
+        self.assertEqual(len(vault.requests), 5)
+        self.assertEqual(len(vault.created), 3)
+
+    def test_line_cut_short_by_a_crash_is_dropped(self):
+        vault = _Vault()
+        self._run(vault, _ledger('a', 'b'))
+        with open(self.path, 'a') as file:
+            file.write('2 half-writ')
+        checkpoint = IngestionCheckpoint(self.path)
+        checkpoint.close()
+        self.assertEqual(len(checkpoint.done), 2)
+        with open(self.path) as file:
+            self.assertTrue(file.read().endswith('\n'))
+
+    def test_async_resumed_run_skips_created_items(self):
+        vault = _Vault()
+
+        def run(items):
+            checkpoint = IngestionCheckpoint(self.path)
+            try:
+                return asyncio.run(async_create_all(
+                    items, dict, vault.create_async, 2,
+                    IngestionProgress(checkpoint, None, 60), Deadline()
+                ))
+            finally:
+                checkpoint.close()
+
+        run(_ledger('a', 'b'))
+        report = run(_ledger('new', 'a', 'b'))
+        self.assertEqual((report.created, report.skipped), (1, 2))
+        self.assertEqual(len(vault.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
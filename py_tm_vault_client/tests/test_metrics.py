@@ -0,0 +1,150 @@
+import unittest
+
+import requests
+from requests import Response
+
+from tmvault.rest_api import (
+    EndpointMetrics, RestAPIClient, RetryPolicy, prometheus_text
+)
+from tmvault.rest_api.metrics import RequestMetrics
+from tmvault.utils import endpoint_template
+
+_INF = float('inf')
+
+
+def _metrics(*durations):
+    metrics = EndpointMetrics('GET', '/v1/accounts/{id}', (0.1, 1.0))
+    for duration in durations:
+        metrics.record(duration, '200', 0, 10)
+    return metrics
+
+
+class _ScriptedSession:
+    """Answers requests with the given status codes in turn, or raises the
+    given exceptions."""
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+
+    def request(self, method, url, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = Response()
+        response.status_code = outcome
+        response._content = b'{"id": "account"}'
+        return response
+
+
+class EndpointMetricsTest(unittest.TestCase):
+
+    def test_latencies_are_counted_in_buckets_up_to_their_bound(self):
+        metrics = _metrics(0.05, 0.1, 0.5, 2.0)
+        self.assertEqual(metrics.latency_counts, [2, 1, 1])
+        self.assertEqual(
+            metrics.cumulative_latency_counts(),
+            [(0.1, 2), (1.0, 3), (_INF, 4)]
+        )
+
+    def test_quantiles_are_bucket_bounds(self):
+        metrics = _metrics(0.05, 0.1, 0.5, 2.0)
+        self.assertEqual(metrics.latency_quantile(0.5), 0.1)
+        self.assertEqual(metrics.latency_quantile(0.75), 1.0)
+        self.assertEqual(metrics.latency_quantile(0.99), _INF)
+        self.assertIsNone(_metrics().latency_quantile(0.5))
+        with self.assertRaises(ValueError):
+            metrics.latency_quantile(1.5)
+
+    def test_snapshot_is_not_updated(self):
+        metrics = _metrics(0.05)
+        snapshot = metrics.snapshot()
+        metrics.record(0.05, '503', 0, 0)
+        self.assertEqual(snapshot.requests, 1)
+        self.assertEqual(snapshot.status_codes, {'200': 1})
+        self.assertEqual(snapshot.latency_counts, [1, 0, 0])
+
+    def test_buckets_must_increase(self):
+        with self.assertRaises(ValueError):
+            RequestMetrics((1.0, 0.1))
+
+    def test_paths_are_reduced_to_templates(self):
+        self.assertEqual(
+            endpoint_template('/v1/accounts/1234'), '/v1/accounts/{id}'
+        )
+        self.assertEqual(
+            endpoint_template('/v1/customers/56:updateAdditionalDetails'),
+            '/v1/customers/{id}:updateAdditionalDetails'
+        )
+        self.assertEqual(
+            endpoint_template('/v1/accounts:batchGet'), '/v1/accounts:batchGet'
+        )
+
+
+class ClientMetricsTest(unittest.TestCase):
+
+    def test_requests_are_recorded_per_endpoint_template(self):
+        client = RestAPIClient(
+            'http://metrics.test', 'token',
+            retry_policy=RetryPolicy(backoff_base=0, jitter=False)
+        )
+        client._session = _ScriptedSession(
+            503, 200, requests.ConnectionError('reset'), 200
+        )
+        client.get('/v1/accounts/first')
+        client.get('/v1/accounts/second')
+        metrics = client.metrics()
+        self.assertEqual(list(metrics), ['GET /v1/accounts/{id}'])
+        accounts = metrics['GET /v1/accounts/{id}']
+        self.assertEqual(accounts.requests, 4)
+        self.assertEqual(accounts.retries, 2)
+        self.assertEqual(
+            accounts.status_codes, {'503': 1, '200': 2, 'error': 1}
+        )
+        self.assertEqual(accounts.response_bytes, 3 * 17)
+
+
+class PrometheusTextTest(unittest.TestCase):
+
+    def test_histogram_and_counters(self):
+        metrics = _metrics(0.05, 2.0)
+        metrics.record_retry()
+        metrics.latency_seconds = 2.5
+        labels = 'api="core",method="GET",endpoint="/v1/accounts/{id}"'
+        self.assertEqual(
+            prometheus_text({'core': {'GET /v1/accounts/{id}': metrics}}),
+            '# HELP tmvault_rest_request_duration_seconds Latency of Vault '
+            'REST API requests.\n'
+            '# TYPE tmvault_rest_request_duration_seconds histogram\n'
+            f'tmvault_rest_request_duration_seconds_bucket{{{labels},'
+            f'le="0.1"}} 1\n'
+            f'tmvault_rest_request_duration_seconds_bucket{{{labels},'
+            f'le="1.0"}} 1\n'
+            f'tmvault_rest_request_duration_seconds_bucket{{{labels},'
+            f'le="+Inf"}} 2\n'
+            f'tmvault_rest_request_duration_seconds_sum{{{labels}}} 2.5\n'
+            f'tmvault_rest_request_duration_seconds_count{{{labels}}} 2\n'
+            '# HELP tmvault_rest_requests_total Vault REST API requests by '
+            'status code.\n'
+            '# TYPE tmvault_rest_requests_total counter\n'
+            f'tmvault_rest_requests_total{{{labels},status="200"}} 2\n'
+            '# HELP tmvault_rest_retries_total Vault REST API requests that '
+            'were retries.\n'
+            '# TYPE tmvault_rest_retries_total counter\n'
+            f'tmvault_rest_retries_total{{{labels}}} 1\n'
+            '# HELP tmvault_rest_request_bytes_total Bytes sent in Vault '
+            'REST API request bodies.\n'
+            '# TYPE tmvault_rest_request_bytes_total counter\n'
+            f'tmvault_rest_request_bytes_total{{{labels}}} 0\n'
+            '# HELP tmvault_rest_response_bytes_total Bytes received in '
+            'Vault REST API response bodies.\n'
+            '# TYPE tmvault_rest_response_bytes_total counter\n'
+            f'tmvault_rest_response_bytes_total{{{labels}}} 20\n'
+        )
+
+    def test_label_values_are_escaped(self):
+        text = prometheus_text({'a "quoted"\\api\n': {'x': _metrics()}})
+        self.assertIn('api="a \\"quoted\\"\\\\api\\n"', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
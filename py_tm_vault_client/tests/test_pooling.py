@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from tmvault.rest_api import RestAPIClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers every GET with an empty JSON object over a keep-alive
+    connection, after `delay` seconds."""
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class PoolStatsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def test_sequential_requests_reuse_one_connection(self):
+        client = RestAPIClient(self.url, 'token')
+        for _ in range(5):
+            client.get('/v1/accounts/account')
+        self.assertEqual(
+            client.pool_stats.as_dict(),
+            {'opened': 1, 'reused': 4, 'waited': 0}
+        )
+
+    def test_blocking_pool_waits_for_a_free_connection(self):
+        _Handler.delay = 0.1
+        self.addCleanup(setattr, _Handler, 'delay', 0.0)
+        client = RestAPIClient(
+            self.url, 'token', pool_maxsize=1, pool_block=True,
+            coalesce_gets=False
+        )
+        threads = [
+            threading.Thread(
+                target=client.get, args=('/v1/accounts/account',)
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = client.pool_stats
+        self.assertEqual(stats.opened, 1)
+        self.assertEqual(stats.reused, 2)
+        self.assertGreaterEqual(stats.waited, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
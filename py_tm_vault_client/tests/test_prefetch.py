@@ -0,0 +1,132 @@
+import asyncio
+import gc
+import threading
+import time
+import unittest
+
+from tmvault.aio.prefetch import prefetch as async_prefetch
+from tmvault.rest_api.prefetch import prefetch
+
+
+class _Pages:
+    """Yields `count` pages, recording how many were produced, and fails
+    after `fail_after` pages if given."""
+
+    def __init__(self, count=100, fail_after=None) -> None:
+        self.count = count
+        self.fail_after = fail_after
+        self.produced = 0
+
+    def __iter__(self):
+        for page in range(self.count):
+            if page == self.fail_after:
+                raise IOError('page failed')
+            self.produced += 1
+            yield page
+
+    async def __aiter__(self):
+        for page in self:
+            await asyncio.sleep(0)
+            yield page
+
+
+def _prefetch_threads():
+    return [
+        t for t in threading.enumerate() if t.name == 'tmvault-prefetch'
+    ]
+
+
+def _wait_for_no_prefetch_threads():
+    for _ in range(50):
+        if not _prefetch_threads():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class PrefetchTest(unittest.TestCase):
+
+    def test_items_are_iterated_in_order(self):
+        self.assertEqual(list(prefetch(_Pages(5), 2)), list(range(5)))
+
+    def test_stays_at_most_depth_ahead(self):
+        pages = _Pages()
+        iterator = prefetch(pages, 2)
+        next(iterator)
+        time.sleep(0.1)
+        # The depth buffered, and one more waiting for room
+        self.assertLessEqual(pages.produced, 1 + 2 + 1)
+        iterator.close()
+
+    def test_stopping_early_stops_the_background_thread(self):
+        pages = _Pages()
+        for page in prefetch(pages, 2):
+            if page == 3:
+                break
+        self.assertTrue(_wait_for_no_prefetch_threads())
+        produced = pages.produced
+        time.sleep(0.2)
+        self.assertEqual(pages.produced, produced)
+        self.assertLess(produced, 10)
+
+    def test_dropping_an_unstarted_iterator_stops_the_thread(self):
+        iterator = prefetch(_Pages(), 1)
+        del iterator
+        gc.collect()
+        self.assertTrue(_wait_for_no_prefetch_threads())
+
+    def test_error_is_raised_after_the_items_before_it(self):
+        received = []
+        with self.assertRaises(IOError):
+            for page in prefetch(_Pages(fail_after=3), 2):
+                received.append(page)
+        self.assertEqual(received, [0, 1, 2])
+
+    def test_depth_zero_uses_no_thread(self):
+        pages = _Pages(3)
+        iterator = prefetch(pages, 0)
+        self.assertEqual(pages.produced, 0)
+        self.assertEqual(list(iterator), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            prefetch(pages, -1)
+
+
+class AsyncPrefetchTest(unittest.TestCase):
+
+    def test_items_are_iterated_in_order(self):
+        async def collect():
+            return [page async for page in async_prefetch(_Pages(5), 2)]
+
+        self.assertEqual(asyncio.run(collect()), list(range(5)))
+
+    def test_stopping_early_cancels_the_producer(self):
+        pages = _Pages()
+
+        async def stop_early():
+            iterator = async_prefetch(pages, 2)
+            async for page in iterator:
+                if page == 3:
+                    break
+            await iterator.aclose()
+            produced = pages.produced
+            await asyncio.sleep(0.05)
+            return produced
+
+        produced = asyncio.run(stop_early())
+        self.assertEqual(pages.produced, produced)
+        self.assertLess(produced, 10)
+
+    def test_error_is_raised_after_the_items_before_it(self):
+        received = []
+
+        async def collect():
+            async for page in async_prefetch(_Pages(fail_after=3), 2):
+                received.append(page)
+
+        with self.assertRaises(IOError):
+            asyncio.run(collect())
+        self.assertEqual(received, [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
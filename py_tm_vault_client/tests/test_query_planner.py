@@ -0,0 +1,146 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tmvault.enums import (
+    ChargeAmountAsset, TransactionOrderBy, TransactionStatus
+)
+from tmvault.models import Transaction
+from tmvault.models.subsidiary import ChargeAmount
+from tmvault.rest_api.query_planner import fan_out, split_id_filters
+
+_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+_ORDER_BY = [TransactionOrderBy.ORDER_BY_VALUE_TIMESTAMP_ASC]
+
+
+def _transaction(id_: str, seconds: int) -> Transaction:
+    when = _START + timedelta(seconds=seconds)
+    return Transaction(
+        id_=id_,
+        account_id='account',
+        charge_amount=ChargeAmount(ChargeAmountAsset.CASH, '1.00', 'GBP'),
+        is_credit=True,
+        reference=id_,
+        status=TransactionStatus.TRANSACTION_STATUS_BOOKED,
+        rejection_code=None,
+        value_timestamp=when,
+        booking_timestamp=when,
+        last_update_timestamp=when,
+        payee_id=None,
+        payment_order_id=None,
+        posting_instruction_batch_ids=[],
+    )
+
+
+class _FakePages:
+    """Three pages of two transactions per query, recording the requests
+    and threads in flight.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.highest = 0
+        self.threads = set()
+        self.requests = 0
+
+    def __call__(self, id_filters):
+        query = id_filters['account_ids'][0]
+        for page in range(3):
+            with self._lock:
+                self.in_flight += 1
+                self.highest = max(self.highest, self.in_flight)
+                self.threads.add(threading.current_thread().name)
+                self.requests += 1
+            time.sleep(0.005)
+            with self._lock:
+                self.in_flight -= 1
+            yield [
+                _transaction(f'{query}-{page}-{i}', page * 2 + i)
+                for i in range(2)
+            ]
+
+
+class FanOutTest(unittest.TestCase):
+
+    def _queries(self, count):
+        return [
+            {'account_ids': [f'account{i}'], 'payee_ids': None}
+            for i in range(count)
+        ]
+
+    def test_many_queries_share_a_bounded_pool(self):
+        pages = _FakePages()
+        before = threading.active_count()
+        transactions = list(fan_out(
+            pages, self._queries(40), _ORDER_BY,
+            prefetch_pages=2, concurrency=4
+        ))
+        self.assertEqual(len(transactions), 40 * 6)
+        self.assertEqual(
+            [t.value_timestamp for t in transactions],
+            sorted(t.value_timestamp for t in transactions)
+        )
+        self.assertLessEqual(pages.highest, 4)
+        self.assertLessEqual(len(pages.threads), 4)
+        time.sleep(0.05)
+        self.assertLessEqual(threading.active_count(), before + 4)
+
+    def test_without_prefetch_pages_are_fetched_when_reached(self):
+        pages = _FakePages()
+        transactions = list(fan_out(
+            pages, self._queries(5), _ORDER_BY,
+            prefetch_pages=0, concurrency=2
+        ))
+        self.assertEqual(len(transactions), 5 * 6)
+
+    def test_abandoned_merge_stops_fetching(self):
+        pages = _FakePages()
+        iterator = fan_out(
+            pages, self._queries(10), _ORDER_BY,
+            prefetch_pages=1, concurrency=2
+        )
+        next(iterator)
+        iterator.close()
+        time.sleep(0.05)
+        requested = pages.requests
+        time.sleep(0.05)
+        self.assertEqual(pages.requests, requested)
+        self.assertLess(requested, 30)
+
+    def test_errors_are_raised_to_the_caller(self):
+        def pages(id_filters):
+            yield [_transaction('a', 0)]
+            raise IOError('boom')
+
+        with self.assertRaises(IOError):
+            list(fan_out(
+                pages, self._queries(3), _ORDER_BY,
+                prefetch_pages=2, concurrency=2
+            ))
+
+
+class SplitIdFiltersTest(unittest.TestCase):
+
+    def test_splits_into_every_combination(self):
+        queries = split_id_filters({
+            'account_ids': ['a1', 'a2', 'a3'],
+            'payee_ids': ['p1', 'p2'],
+            'payment_order_ids': None,
+        }, group_size=2)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(
+            sorted(q['account_ids'] for q in queries), [['a1', 'a2'], ['a3']]
+        )
+
+    def test_rejects_too_many_queries(self):
+        with self.assertRaises(ValueError):
+            split_id_filters({
+                'account_ids': [f'a{i}' for i in range(1000)],
+                'payee_ids': [f'p{i}' for i in range(1000)],
+            }, group_size=50)
+
+
+if __name__ == '__main__':
+    unittest.main()
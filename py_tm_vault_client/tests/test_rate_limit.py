@@ -0,0 +1,49 @@
+import unittest
+
+from tmvault.rest_api import RateLimit, RateLimiter
+from tmvault.rest_api.rate_limit import shared_rate_limiter
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def _drain(self, limiter, requests):
+        for _ in range(requests):
+            self.assertLess(limiter.acquire(), 0.01)
+            limiter.release()
+
+    def test_new_client_with_the_same_limits_keeps_the_bucket(self):
+        limiter = shared_rate_limiter(
+            'http://same-limits', RateLimit(requests_per_second=10, burst=2)
+        )
+        self._drain(limiter, 2)
+        again = shared_rate_limiter(
+            'http://same-limits', RateLimit(requests_per_second=10, burst=2)
+        )
+        self.assertIs(again, limiter)
+        self.assertGreater(limiter.acquire(), 0.05)
+        limiter.release()
+
+    def test_new_limits_do_not_refill_the_bucket(self):
+        limiter = RateLimiter(RateLimit(requests_per_second=10, burst=2))
+        self._drain(limiter, 2)
+        limiter.configure(RateLimit(requests_per_second=10, burst=5))
+        self.assertGreater(limiter.acquire(), 0.05)
+        limiter.release()
+
+    def test_new_limits_clamp_the_bucket_to_their_burst(self):
+        limiter = RateLimiter(RateLimit(requests_per_second=10, burst=5))
+        limiter.configure(RateLimit(requests_per_second=10, burst=1))
+        self._drain(limiter, 1)
+        self.assertGreater(limiter.acquire(), 0.05)
+        limiter.release()
+
+    def test_equal_limits_hash_alike(self):
+        limit = RateLimit(requests_per_second=10, burst=2)
+        same = RateLimit(requests_per_second=10, burst=2)
+        self.assertEqual(limit, same)
+        self.assertEqual(len({limit, same}), 1)
+        self.assertNotEqual(limit, RateLimit(requests_per_second=10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+
+from tmvault.aio.transactions import AsyncTransactionsAPI
+from tmvault.rest_api.records import (
+    TRANSACTION_FIELDS, record_factory, record_type
+)
+from tmvault.rest_api.transactions import TransactionsAPI
+
+
+def _transaction(index):
+    return {
+        'id': f'transaction-{index}',
+        'account_id': 'account',
+        'charge_amount': {'value': f'{index}.50', 'denomination': 'GBP'},
+        'is_credit': index % 2 == 0,
+        'status': 'TRANSACTION_STATUS_BOOKED',
+        'value_timestamp': f'2020-01-01T00:00:{index:02}Z',
+    }
+
+
+class _FakeClient:
+    """Answers /v1/transactions with `count` transactions in pages of 2."""
+
+    def __init__(self, count=5) -> None:
+        self.transactions = [_transaction(i) for i in range(count)]
+        self.requests = 0
+
+    def get(self, path, params=None, deadline=None):
+        self.requests += 1
+        start = int(params.get('page_token') or 0)
+        response = {'transactions': self.transactions[start:start + 2]}
+        if start + 2 < len(self.transactions):
+            response['next_page_token'] = str(start + 2)
+        return response
+
+
+class _AsyncFakeClient(_FakeClient):
+
+    async def get(self, path, params=None, deadline=None):
+        return _FakeClient.get(self, path, params, deadline)
+
+
+class RecordFactoryTest(unittest.TestCase):
+
+    def test_dicts_have_only_the_fields_asked_for(self):
+        to_record = record_factory(['id', 'charge_amount.value', 'payee_id'])
+        self.assertEqual(to_record(_transaction(1)), {
+            'id': 'transaction-1',
+            'charge_amount.value': '1.50',
+            'payee_id': None,
+        })
+
+    def test_without_fields_dicts_are_the_json(self):
+        transaction = _transaction(1)
+        self.assertIs(record_factory()(transaction), transaction)
+
+    def test_rows_are_namedtuples_with_underscores(self):
+        to_record = record_factory(
+            ['id', 'charge_amount.denomination'], as_rows=True
+        )
+        row = to_record(_transaction(1))
+        self.assertEqual(row._fields, ('id', 'charge_amount_denomination'))
+        self.assertEqual(row, ('transaction-1', 'GBP'))
+        self.assertEqual(row.charge_amount_denomination, 'GBP')
+
+    def test_rows_without_fields_have_every_top_level_field(self):
+        row = record_factory(as_rows=True)(_transaction(1))
+        self.assertEqual(
+            row._fields,
+            tuple(field for field in TRANSACTION_FIELDS if '.' not in field)
+        )
+        self.assertEqual(row.charge_amount['value'], '1.50')
+
+    def test_missing_charge_amount_is_none(self):
+        to_record = record_factory(['charge_amount.value'])
+        self.assertEqual(to_record({'id': 'x'}), {'charge_amount.value': None})
+
+    def test_row_types_are_shared(self):
+        self.assertIs(record_type(('id',)), record_type(('id',)))
+
+    def test_unknown_fields_are_rejected(self):
+        with self.assertRaises(ValueError):
+            record_factory(['id', 'charge_amount.currency'])
+
+
+class IterTransactionRecordsTest(unittest.TestCase):
+
+    def test_every_page_is_iterated(self):
+        client = _FakeClient()
+        records = list(TransactionsAPI(client).iter_transaction_records(
+            account_ids=['account'], fields=['id', 'is_credit'],
+            as_rows=True
+        ))
+        self.assertEqual(
+            [(r.id, r.is_credit) for r in records],
+            [(f'transaction-{i}', i % 2 == 0) for i in range(5)]
+        )
+        self.assertEqual(client.requests, 3)
+
+    def test_unknown_fields_are_rejected_before_any_request(self):
+        client = _FakeClient()
+        records = TransactionsAPI(client).iter_transaction_records(
+            fields=['amount']
+        )
+        with self.assertRaises(ValueError):
+            next(records)
+        self.assertEqual(client.requests, 0)
+
+    def test_async_every_page_is_iterated(self):
+        async def collect():
+            api = AsyncTransactionsAPI(_AsyncFakeClient())
+            return [
+                record async for record in api.iter_transaction_records(
+                    fields=['id', 'charge_amount.value']
+                )
+            ]
+
+        records = asyncio.run(collect())
+        self.assertEqual(len(records), 5)
+        self.assertEqual(
+            records[4], {'id': 'transaction-4', 'charge_amount.value': '4.50'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
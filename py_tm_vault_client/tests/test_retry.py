@@ -0,0 +1,118 @@
+import json
+import time
+import unittest
+from email.utils import formatdate
+
+import requests
+from requests import HTTPError, Response
+
+from tmvault.rest_api import RestAPIClient, RetryPolicy
+
+
+class _ScriptedSession:
+    """Answers requests with the given status codes in turn, or raises the
+    given exceptions, and records the body of every request."""
+
+    def __init__(self, *outcomes, retry_after=None) -> None:
+        self.outcomes = list(outcomes)
+        self.retry_after = retry_after
+        self.bodies = []
+        self.sent_at = []
+
+    def request(self, method, url, data=None, **kwargs):
+        self.bodies.append(json.loads(data) if data else None)
+        self.sent_at.append(time.monotonic())
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = Response()
+        response.status_code = outcome
+        response._content = b'{"id": "created"}'
+        if self.retry_after is not None and outcome != 200:
+            response.headers['Retry-After'] = self.retry_after
+        return response
+
+
+def _client(name, session, **policy):
+    client = RestAPIClient(
+        f'http://{name}.retry.test', 'token',
+        retry_policy=RetryPolicy(backoff_base=0, jitter=False, **policy)
+    )
+    client._session = session
+    return client
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_retry_after_is_a_floor_on_the_backoff(self):
+        policy = RetryPolicy(backoff_base=1, jitter=False)
+        self.assertEqual(policy.backoff(0, '3'), 3)
+        self.assertEqual(policy.backoff(2, '3'), 4)
+        self.assertEqual(policy.backoff(0, 'not a delay'), 1)
+
+    def test_retry_after_may_be_an_http_date(self):
+        policy = RetryPolicy(backoff_base=0, jitter=False)
+        delay = policy.backoff(0, formatdate(time.time() + 30, usegmt=True))
+        self.assertGreater(delay, 25)
+        self.assertLessEqual(delay, 30)
+
+    def test_only_the_configured_failures_are_retried(self):
+        policy = RetryPolicy(max_attempts=2, retry_connection_errors=False)
+        self.assertTrue(policy.should_retry(0, 503))
+        self.assertFalse(policy.should_retry(0, 400))
+        self.assertFalse(policy.should_retry(0))
+        self.assertFalse(policy.should_retry(1, 503))
+
+
+class RetryTest(unittest.TestCase):
+
+    def test_retried_post_keeps_its_request_id(self):
+        session = _ScriptedSession(
+            503, requests.ConnectionError('reset'), 200
+        )
+        client = _client('request-id', session)
+        response = client.post('/v1/accounts', {'account': {}})
+        self.assertEqual(response, {'id': 'created'})
+        request_ids = [body['request_id'] for body in session.bodies]
+        self.assertEqual(len(request_ids), 3)
+        self.assertEqual(len(set(request_ids)), 1)
+
+    def test_given_request_id_is_sent(self):
+        session = _ScriptedSession(503, 200)
+        _client('given-id', session).put(
+            '/v1/accounts/account', {'account': {}}, request_id='mine'
+        )
+        self.assertEqual(
+            [body['request_id'] for body in session.bodies], ['mine', 'mine']
+        )
+
+    def test_retry_waits_for_retry_after(self):
+        session = _ScriptedSession(429, 200, retry_after='0.1')
+        _client('retry-after', session).get('/v1/accounts/account')
+        self.assertGreaterEqual(session.sent_at[1] - session.sent_at[0], 0.1)
+
+    def test_gives_up_with_the_api_error_when_the_deadline_has_no_room(self):
+        session = _ScriptedSession(503, 200, retry_after='10')
+        client = _client('no-room', session)
+        started = time.monotonic()
+        with self.assertRaises(HTTPError) as raised:
+            client.get('/v1/accounts/account', timeout=1)
+        self.assertEqual(raised.exception.response.status_code, 503)
+        self.assertEqual(len(session.bodies), 1)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        session = _ScriptedSession(503, 503, 200)
+        with self.assertRaises(HTTPError):
+            _client('attempts', session, max_attempts=2).get('/v1/accounts')
+        self.assertEqual(len(session.bodies), 2)
+
+    def test_client_errors_are_not_retried(self):
+        session = _ScriptedSession(400, 200)
+        with self.assertRaises(HTTPError):
+            _client('client-error', session).get('/v1/accounts')
+        self.assertEqual(len(session.bodies), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tmvault.rest_api import RoutingCache
+
+
+class RoutingCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'routing.sqlite')
+
+    def _cache(self, path=None):
+        cache = RoutingCache(path)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_details_are_kept_in_memory(self):
+        cache = self._cache()
+        cache.put_many({'a': ('040511', '1'), 'b': ('040511', '2')})
+        self.assertEqual(cache.get('a'), ('040511', '1'))
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(len(cache), 2)
+
+    def test_details_are_loaded_by_the_next_cache_at_the_path(self):
+        first = self._cache(self.path)
+        first.put_many({'a': ('040511', '1'), 'b': ('040511', '2')})
+        first.put_many({'b': ('040512', '3')})
+        first.close()
+        second = self._cache(self.path)
+        self.assertEqual(len(second), 2)
+        self.assertEqual(
+            second.get_many(['a', 'b', 'c']),
+            ({'a': ('040511', '1'), 'b': ('040512', '3')}, ['c'])
+        )
+
+    def test_stats_count_hits_and_misses(self):
+        cache = self._cache()
+        cache.put_many({'a': ('040511', '1')})
+        cache.get_many(['a', 'b', 'c'])
+        # Checking what is missing is not a lookup
+        self.assertEqual(cache.missing(['a', 'd']), ['d'])
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 2, 1))
+        self.assertAlmostEqual(stats.hit_ratio, 1 / 3)
+        cache.get('a')
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(cache.stats().hits, 2)
+
+    def test_closing_keeps_the_memory_cache(self):
+        cache = self._cache(self.path)
+        cache.put_many({'a': ('040511', '1')})
+        cache.close()
+        cache.put_many({'b': ('040511', '2')})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(len(self._cache(self.path)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
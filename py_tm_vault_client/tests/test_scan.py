@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tmvault.aio.scan import AsyncSliceScan
+from tmvault.enums import (
+    ChargeAmountAsset, TransactionOrderBy, TransactionStatus
+)
+from tmvault.models import Transaction
+from tmvault.models.subsidiary import ChargeAmount
+from tmvault.rest_api.scan import SliceScan
+
+_START = datetime(2020, 1, 1)
+_PAGES_PER_SLICE = 3
+_ORDER_BY = [TransactionOrderBy.ORDER_BY_VALUE_TIMESTAMP_ASC]
+
+
+def _transaction(id_: str, when: datetime) -> Transaction:
+    when = when.replace(tzinfo=timezone.utc)
+    return Transaction(
+        id_=id_,
+        account_id='account',
+        charge_amount=ChargeAmount(ChargeAmountAsset.CASH, '1.00', 'GBP'),
+        is_credit=True,
+        reference=id_,
+        status=TransactionStatus.TRANSACTION_STATUS_BOOKED,
+        rejection_code=None,
+        value_timestamp=when,
+        booking_timestamp=when,
+        last_update_timestamp=when,
+        payee_id=None,
+        payment_order_id=None,
+        posting_instruction_batch_ids=[],
+    )
+
+
+class _Requests:
+    """Counts the requests in flight, and the most there ever were."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.highest = 0
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.highest = max(self.highest, self.in_flight)
+
+    def end(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _slice_pages(time_slice):
+    # One transaction per page, at the start of the slice, so the slices
+    # overlap in value_timestamp order and have to be merged
+    return [
+        [_transaction(
+            f'{time_slice.start.isoformat()}-{i}',
+            _START + timedelta(seconds=i)
+        )]
+        for i in range(_PAGES_PER_SLICE)
+    ]
+
+
+class _Page(list):
+
+    def __init__(self, requests, pages, index):
+        super().__init__(pages[index])
+        self._requests = requests
+        self._pages = pages
+        self._index = index
+
+    def is_next_page(self):
+        return self._index + 1 < len(self._pages)
+
+    def get_next_page(self, deadline=None):
+        self._requests.start()
+        try:
+            time.sleep(0.01)
+            return _Page(self._requests, self._pages, self._index + 1)
+        finally:
+            self._requests.end()
+
+
+class _AsyncPage(_Page):
+
+    async def get_next_page(self, deadline=None):
+        self._requests.start()
+        try:
+            await asyncio.sleep(0.01)
+            return _AsyncPage(self._requests, self._pages, self._index + 1)
+        finally:
+            self._requests.end()
+
+
+class SliceScanTest(unittest.TestCase):
+
+    def _scan(self, scan_type, fetch_page, concurrency):
+        return scan_type(
+            fetch_page,
+            'last_update_timestamp',
+            slices=8,
+            concurrency=concurrency,
+            max_slice_pages=100,
+            min_slice_width=timedelta(seconds=1)
+        )
+
+    def test_merged_scan_respects_concurrency(self):
+        requests = _Requests()
+
+        def fetch_page(time_slice, order_by):
+            requests.start()
+            try:
+                time.sleep(0.01)
+                return _Page(requests, _slice_pages(time_slice), 0)
+            finally:
+                requests.end()
+
+        scan = self._scan(SliceScan, fetch_page, concurrency=2)
+        transactions = list(scan.scan(
+            {'from': _START, 'to': _START + timedelta(hours=8)},
+            _ORDER_BY, ordered=True
+        ))
+        self.assertEqual(len(transactions), 8 * _PAGES_PER_SLICE)
+        self.assertEqual(
+            [t.value_timestamp for t in transactions],
+            sorted(t.value_timestamp for t in transactions)
+        )
+        self.assertEqual(requests.highest, 2)
+
+    def test_async_merged_scan_respects_concurrency(self):
+        requests = _Requests()
+
+        async def fetch_page(time_slice, order_by):
+            requests.start()
+            try:
+                await asyncio.sleep(0.01)
+                return _AsyncPage(requests, _slice_pages(time_slice), 0)
+            finally:
+                requests.end()
+
+        async def scan_all():
+            scan = self._scan(AsyncSliceScan, fetch_page, concurrency=2)
+            return [t async for t in scan.scan(
+                {'from': _START, 'to': _START + timedelta(hours=8)},
+                _ORDER_BY, ordered=True
+            )]
+
+        transactions = asyncio.run(scan_all())
+        self.assertEqual(len(transactions), 8 * _PAGES_PER_SLICE)
+        self.assertEqual(requests.highest, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+
+from requests import HTTPError
+
+from tmvault.errors import DeadlineExceededError
+from tmvault.rest_api import Deadline
+from tmvault.rest_api.single_flight import SingleFlight
+
+
+def _run_together(count, target):
+    """Runs `target` on `count` threads, returning what each returned or
+    raised."""
+    outcomes = [None] * count
+
+    def run(index):
+        try:
+            outcomes[index] = target(index)
+        except BaseException as e:
+            outcomes[index] = e
+
+    threads = [
+        threading.Thread(target=run, args=(i,)) for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_result(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.05)
+            return b'{}'
+
+        outcomes = _run_together(
+            8, lambda i: single_flight.do('key', func)
+        )
+        self.assertEqual(outcomes, [b'{}'] * 8)
+        self.assertEqual(len(calls), 1)
+        stats = single_flight.stats()
+        self.assertEqual(
+            (stats.requests, stats.executed, stats.coalesced), (8, 1, 7)
+        )
+
+    def test_later_calls_are_made_again(self):
+        single_flight = SingleFlight()
+        self.assertEqual(single_flight.do('key', lambda: 1), 1)
+        self.assertEqual(single_flight.do('key', lambda: 2), 2)
+
+    def test_each_waiter_raises_its_own_copy_of_the_error(self):
+        single_flight = SingleFlight()
+        error = HTTPError('404 Not Found', response='response')
+
+        def func():
+            time.sleep(0.05)
+            raise error
+
+        outcomes = _run_together(
+            4, lambda i: single_flight.do('key', func)
+        )
+        for outcome in outcomes:
+            self.assertIsInstance(outcome, HTTPError)
+            self.assertEqual(str(outcome), str(error))
+            self.assertEqual(outcome.response, 'response')
+        self.assertEqual(len({id(outcome) for outcome in outcomes}), 4)
+        self.assertIn(error, outcomes)
+
+    def test_waiter_with_time_left_retries_after_a_leader_deadline(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.05)
+            if len(calls) == 1:
+                raise DeadlineExceededError('GET /v1/accounts/account', 0.05)
+            return b'{}'
+
+        leader = threading.Thread(
+            target=lambda: self.assertRaises(
+                DeadlineExceededError, single_flight.do, 'key', func
+            )
+        )
+        leader.start()
+        time.sleep(0.01)
+        result = single_flight.do('key', func, Deadline(5))
+        leader.join()
+        self.assertEqual(result, b'{}')
+        self.assertEqual(len(calls), 2)
+
+    def test_waiter_gives_up_at_its_own_deadline(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+
+        def func():
+            started.set()
+            time.sleep(0.2)
+            return b'{}'
+
+        leader = threading.Thread(target=single_flight.do, args=('key', func))
+        leader.start()
+        started.wait()
+        with self.assertRaises(DeadlineExceededError):
+            single_flight.do('key', func, Deadline(0.01))
+        leader.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
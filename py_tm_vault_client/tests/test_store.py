@@ -0,0 +1,215 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tmvault.enums import (
+    ChargeAmountAsset, TransactionDirection, TransactionOrderBy,
+    TransactionStatus
+)
+from tmvault.models import Transaction
+from tmvault.models.subsidiary import ChargeAmount
+from tmvault.store import TransactionStore
+
+_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def _transaction(
+    id_: str,
+    seconds: int,
+    value: str = '1.00',
+    is_credit: bool = True,
+    account_id: str = 'account',
+    status: TransactionStatus = TransactionStatus.TRANSACTION_STATUS_BOOKED
+) -> Transaction:
+    when = _START + timedelta(seconds=seconds)
+    return Transaction(
+        id_=id_,
+        account_id=account_id,
+        charge_amount=ChargeAmount(ChargeAmountAsset.CASH, value, 'GBP'),
+        is_credit=is_credit,
+        reference=id_,
+        status=status,
+        rejection_code=None,
+        value_timestamp=when,
+        booking_timestamp=when,
+        last_update_timestamp=when,
+        payee_id=None,
+        payment_order_id=None,
+        posting_instruction_batch_ids=[],
+    )
+
+
+class UpsertTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.store = TransactionStore(':memory:')
+        self.addCleanup(self.store.close)
+
+    def test_stored_transactions_read_back_equal(self):
+        transaction = _transaction('transaction', 1, '12.34')
+        transaction.posting_instruction_batch_ids = ['batch']
+        self.assertEqual(self.store.upsert([transaction]), 1)
+        self.assertEqual(
+            self.store.get_transaction('transaction'), transaction
+        )
+        self.assertIsNone(self.store.get_transaction('unknown'))
+
+    def test_older_version_never_replaces_a_newer_one(self):
+        newer = _transaction('transaction', 10, '2.00')
+        self.store.upsert([newer])
+        self.assertEqual(
+            self.store.upsert([_transaction('transaction', 5, '1.00')]), 0
+        )
+        self.assertEqual(self.store.get_transaction('transaction'), newer)
+
+    def test_newer_or_same_version_replaces_the_stored_one(self):
+        self.store.upsert([_transaction('transaction', 5, '1.00')])
+        same_time = _transaction('transaction', 5, '1.50')
+        self.assertEqual(self.store.upsert([same_time]), 1)
+        self.assertEqual(
+            self.store.get_transaction('transaction'), same_time
+        )
+        newer = _transaction('transaction', 6, '2.00')
+        self.assertEqual(self.store.upsert([newer]), 1)
+        self.assertEqual(self.store.get_transaction('transaction'), newer)
+        self.assertEqual(len(self.store), 1)
+
+    def test_high_water_mark_moves_with_the_upsert(self):
+        mark = (datetime(2020, 1, 1, 0, 0, 5), 'transaction')
+        self.store.upsert(
+            [_transaction('transaction', 5)], 'sync', mark
+        )
+        self.assertEqual(self.store.get_high_water_mark('sync'), mark)
+        self.assertIsNone(self.store.get_high_water_mark('other'))
+        self.store.reset_high_water_mark('sync')
+        self.assertIsNone(self.store.get_high_water_mark('sync'))
+
+
+class QueryTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.store = TransactionStore(':memory:')
+        self.addCleanup(self.store.close)
+        self.store.upsert([
+            _transaction('credit-a', 1, account_id='a'),
+            _transaction('debit-a', 2, is_credit=False, account_id='a'),
+            _transaction('credit-b', 3, account_id='b'),
+            _transaction(
+                'pending-b', 4, account_id='b',
+                status=TransactionStatus.TRANSACTION_STATUS_PENDING
+            ),
+        ])
+
+    def _ids(self, **kwargs):
+        return [t.id_ for t in self.store.list_transactions(**kwargs)]
+
+    def test_default_order_is_latest_update_first(self):
+        self.assertEqual(
+            self._ids(), ['pending-b', 'credit-b', 'debit-a', 'credit-a']
+        )
+        self.assertEqual(self._ids(limit=2), ['pending-b', 'credit-b'])
+
+    def test_filters_combine(self):
+        self.assertEqual(self._ids(account_ids=['a']), ['debit-a', 'credit-a'])
+        self.assertEqual(
+            self._ids(
+                direction=TransactionDirection.TRANSACTION_DIRECTION_CREDIT,
+                statuses=[TransactionStatus.TRANSACTION_STATUS_BOOKED]
+            ),
+            ['credit-b', 'credit-a']
+        )
+        self.assertEqual(
+            self._ids(
+                direction=TransactionDirection.TRANSACTION_DIRECTION_DEBIT
+            ),
+            ['debit-a']
+        )
+        self.assertEqual(self._ids(payee_ids=[]), [])
+
+    def test_ranges_include_from_and_exclude_to(self):
+        self.assertEqual(
+            self._ids(
+                value_timestamp_range={
+                    'from': _START + timedelta(seconds=2),
+                    'to': _START + timedelta(seconds=4),
+                },
+                order_by=[TransactionOrderBy.ORDER_BY_VALUE_TIMESTAMP_ASC]
+            ),
+            ['debit-a', 'credit-b']
+        )
+
+    def test_file_store_is_read_from_other_threads(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'transactions.sqlite')
+        self.addCleanup(os.rmdir, directory)
+        for suffix in ('', '-wal', '-shm'):
+            self.addCleanup(
+                lambda p=path + suffix: os.path.exists(p) and os.remove(p)
+            )
+        with TransactionStore(path) as store:
+            store.upsert([_transaction('transaction', 1)])
+            counts = []
+            thread = threading.Thread(
+                target=lambda: counts.append(len(store))
+            )
+            thread.start()
+            thread.join()
+            self.assertEqual(counts, [1])
+
+
+class ChargeAmountTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.store = TransactionStore(':memory:')
+        self.addCleanup(self.store.close)
+        # Equal as floats, but not as decimals
+        self.store.upsert([
+            _transaction('low', 1, '9007199254740992'),
+            _transaction('high', 2, '9007199254740993'),
+            _transaction('small', 3, '0.1'),
+            _transaction('tiny', 4, '0.000000000000000001'),
+        ])
+
+    def _ids(self, **kwargs):
+        return [t.id_ for t in self.store.list_transactions(**kwargs)]
+
+    def test_amount_ranges_compare_exact_decimals(self):
+        self.assertEqual(
+            self._ids(charge_amount_value_range={
+                'from': '9007199254740993'
+            }),
+            ['high']
+        )
+        self.assertEqual(
+            self._ids(charge_amount_value_range={
+                'from': '0.000000000000000001', 'to': '0.1'
+            }),
+            ['tiny']
+        )
+
+    def test_amounts_sort_as_exact_decimals(self):
+        self.assertEqual(
+            self._ids(order_by=[
+                TransactionOrderBy.ORDER_BY_CHARGE_AMOUNT_VALUE_ASC
+            ]),
+            ['tiny', 'small', 'low', 'high']
+        )
+
+    def test_aggregate_takes_the_order_of_the_rest_api(self):
+        totals = self.store.aggregate(
+            [], order_by=[TransactionOrderBy.ORDER_BY_CHARGE_AMOUNT_VALUE_ASC],
+            charge_amount_value_range={'from': '1'}, scale=0
+        )
+        self.assertEqual(totals.to_dicts(), [dict(
+            count=2,
+            sum=18014398509481985,
+            min=9007199254740992,
+            max=9007199254740993,
+            net=18014398509481985,
+        )])
+
+
+if __name__ == '__main__':
+    unittest.main()
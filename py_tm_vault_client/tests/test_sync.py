@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tmvault.enums import ChargeAmountAsset, TransactionStatus
+from tmvault.models import Transaction
+from tmvault.models.subsidiary import ChargeAmount
+from tmvault.store import TransactionStore, TransactionSync
+from tmvault.utils import naive_utc
+
+_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def _transaction(id_: str, seconds: int) -> Transaction:
+    when = _START + timedelta(seconds=seconds)
+    return Transaction(
+        id_=id_,
+        account_id='account',
+        charge_amount=ChargeAmount(ChargeAmountAsset.CASH, '1.00', 'GBP'),
+        is_credit=True,
+        reference=id_,
+        status=TransactionStatus.TRANSACTION_STATUS_BOOKED,
+        rejection_code=None,
+        value_timestamp=when,
+        booking_timestamp=when,
+        last_update_timestamp=when,
+        payee_id=None,
+        payment_order_id=None,
+        posting_instruction_batch_ids=[],
+    )
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _Page(list):
+
+    def __init__(self, api, pages, index):
+        super().__init__(pages[index])
+        self._api = api
+        self._pages = pages
+        self._index = index
+
+    def is_next_page(self):
+        return self._index + 1 < len(self._pages)
+
+    def get_next_page(self, deadline=None):
+        if self._api.interrupt_after == self._index:
+            raise _Interrupted()
+        return _Page(self._api, self._pages, self._index + 1)
+
+
+class _FakeTransactionsAPI:
+    """Lists transactions in last_update_timestamp order, but not by ID
+    within a timestamp, in pages of `page_size`.
+    """
+
+    def __init__(self, transactions, page_size):
+        self.transactions = transactions
+        self.page_size = page_size
+        self.interrupt_after = None
+
+    def _list_transactions(self, filters, **_):
+        start = (filters.last_update_timestamp_range or {}).get('from')
+        listed = [
+            t for t in self.transactions
+            if start is None or naive_utc(t.last_update_timestamp) >= start
+        ]
+        pages = [
+            listed[i:i + self.page_size]
+            for i in range(0, len(listed), self.page_size)
+        ] or [[]]
+        return _Page(self, pages, 0)
+
+
+class TransactionSyncTest(unittest.TestCase):
+
+    def test_interrupted_run_resumes_within_a_split_timestamp(self):
+        # Four transactions share a timestamp, unordered by ID, and the
+        # page boundary falls between them
+        transactions = [
+            _transaction('a', 0),
+            _transaction('z', 1),
+            _transaction('m', 1),
+            _transaction('b', 1),
+            _transaction('c', 1),
+            _transaction('d', 2),
+        ]
+        api = _FakeTransactionsAPI(transactions, page_size=3)
+        with TransactionStore(':memory:') as store:
+            sync = TransactionSync(api, store)
+
+            api.interrupt_after = 0
+            with self.assertRaises(_Interrupted):
+                sync.run()
+            self.assertEqual(len(store), 3)
+
+            api.interrupt_after = None
+            sync.run()
+            self.assertEqual(
+                sorted(t.id_ for t in store.list_transactions()),
+                ['a', 'b', 'c', 'd', 'm', 'z']
+            )
+            self.assertEqual(
+                sync.high_water_mark[0],
+                naive_utc(_START + timedelta(seconds=2))
+            )
+
+    def test_run_without_changes_stores_nothing_new(self):
+        api = _FakeTransactionsAPI(
+            [_transaction('a', 0), _transaction('b', 1)], page_size=10
+        )
+        with TransactionStore(':memory:') as store:
+            sync = TransactionSync(api, store)
+            first = sync.run()
+            second = sync.run()
+            self.assertEqual(first.fetched, 2)
+            # Only the transaction at the high-water mark is listed again
+            self.assertEqual(second.fetched, 1)
+            self.assertEqual(len(store), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import json
+import queue
+import time
+import types
+import unittest
+from unittest import mock
+
+from tmvault.models import Transaction
+from tmvault.rest_api import BatchGetResult, TransactionCache
+from tmvault.rest_api.transactions import TransactionsAPI
+from tmvault.stream_api import TransactionWatcher
+
+
+def _json(id_, second=0):
+    return {
+        'id': id_,
+        'account_id': 'account',
+        'charge_amount': {
+            'asset': 'CASH', 'value': '1.00', 'denomination': 'GBP'
+        },
+        'is_credit': True,
+        'status': 'TRANSACTION_STATUS_BOOKED',
+        'rejection_code': 'REJECTION_CODE_UNKNOWN',
+        'value_timestamp': '2020-01-01T00:00:00Z',
+        'booking_timestamp': '2020-01-01T00:00:00Z',
+        'last_update_timestamp': f'2020-01-01T00:00:{second:02}Z',
+    }
+
+
+def _transaction(id_, second=0):
+    return Transaction.from_json(_json(id_, second))
+
+
+def _cache(*transactions, max_size=10):
+    cache = TransactionCache(max_size)
+    cache.put(transactions, 0)
+    return cache
+
+
+class TransactionCacheTest(unittest.TestCase):
+
+    def test_least_recently_used_is_evicted(self):
+        cache = _cache(_transaction('a'), _transaction('b'), max_size=2)
+        cache.get_many(['a'])
+        cache.put([_transaction('c')], 0)
+        found, missing, _ = cache.get_many(['a', 'b', 'c'])
+        self.assertEqual(sorted(found), ['a', 'c'])
+        self.assertEqual(missing, ['b'])
+        stats = cache.stats()
+        self.assertEqual(
+            (stats.hits, stats.misses, stats.evictions, stats.size),
+            (3, 1, 1, 2)
+        )
+
+    def test_an_older_version_does_not_replace_a_newer_one(self):
+        cache = _cache(_transaction('a', 2))
+        cache.put([_transaction('a', 1)], 0)
+        found, _, _ = cache.get_many(['a'])
+        self.assertEqual(found['a'].last_update_timestamp.second, 2)
+
+    def test_a_newer_version_invalidates(self):
+        cache = _cache(_transaction('a', 1), _transaction('b', 1))
+        cache.invalidate(_transaction('a', 1))
+        cache.invalidate(_transaction('b', 2))
+        found, missing, _ = cache.get_many(['a', 'b'])
+        self.assertEqual((list(found), missing), (['a'], ['b']))
+        self.assertEqual(cache.stats().invalidations, 1)
+
+    def test_a_version_fetched_before_an_event_is_not_cached(self):
+        cache = TransactionCache(10)
+        _, _, generation = cache.get_many(['a'])
+        cache.invalidate(_transaction('a', 2))
+        cache.put([_transaction('a', 1)], generation)
+        self.assertEqual(len(cache), 0)
+        cache.put([_transaction('a', 2)], generation)
+        self.assertEqual(len(cache), 1)
+
+    def test_fetches_started_before_a_clear_are_not_cached(self):
+        cache = _cache(_transaction('a'))
+        _, _, generation = cache.get_many(['b'])
+        cache.clear()
+        cache.put([_transaction('b')], generation)
+        self.assertEqual(len(cache), 0)
+
+    def test_max_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TransactionCache(0)
+
+
+class _BatchGetClient:
+    """Answers batchGet with the requested IDs that do not start with
+    `missing`, and records the IDs of every request."""
+
+    def __init__(self) -> None:
+        self.requested = []
+
+    def batch_get(self, endpoint_path, collection, ids, timeout=None):
+        self.requested.append(list(ids))
+        return BatchGetResult(
+            {id_: _json(id_) for id_ in ids if not id_.startswith('missing')},
+            [id_ for id_ in ids if id_.startswith('missing')]
+        )
+
+
+class _Watcher:
+
+    def __init__(self, ready=True) -> None:
+        self.ready = ready
+
+
+class BatchGetTransactionsTest(unittest.TestCase):
+
+    def test_only_uncached_ids_are_fetched_while_watched(self):
+        client = _BatchGetClient()
+        cache = TransactionCache(10)
+        api = TransactionsAPI(client, lambda: _Watcher(), cache)
+        api.batch_get_transactions(['a', 'b'])
+        result = api.batch_get_transactions(['c', 'a', 'missing', 'b', 'c'])
+        self.assertEqual(client.requested, [['a', 'b'], ['c', 'missing']])
+        self.assertEqual(list(result), ['c', 'a', 'b'])
+        self.assertEqual(result.missing_ids, ['missing'])
+        self.assertEqual(
+            api.batch_get_transactions(['b', 'a']).missing_ids, []
+        )
+        self.assertEqual(len(client.requested), 2)
+
+    def test_cache_is_not_used_while_unwatched(self):
+        client = _BatchGetClient()
+        cache = TransactionCache(10)
+        watcher = _Watcher(ready=False)
+        api = TransactionsAPI(client, lambda: watcher, cache)
+        api.batch_get_transactions(['a'])
+        api.batch_get_transactions(['a'])
+        self.assertEqual(client.requested, [['a'], ['a']])
+        self.assertEqual(len(cache), 0)
+
+
+class _FakeConsumer:
+    """Stands in for the Kafka consumer, returning the messages put on
+    `messages`."""
+
+    def __init__(self, bootstrap_servers, topic, group_id, on_assign=None,
+                 on_revoke=None, on_error=None) -> None:
+        self.on_assign = on_assign
+        self.on_revoke = on_revoke
+        self.messages = queue.Queue()
+        _FakeConsumer.last = self
+
+    def consume_bytes(self, deadline=None):
+        try:
+            return self.messages.get(timeout=0.01)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        pass
+
+
+class WatcherInvalidationTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        kafka = types.ModuleType('tmvault.stream_api.kafka')
+        kafka.Consumer = _FakeConsumer
+        patcher = mock.patch.dict(
+            'sys.modules', {'tmvault.stream_api.kafka': kafka}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = _cache(_transaction('a', 1), _transaction('b', 1))
+        watcher = TransactionWatcher('kafka:9092')
+        self.addCleanup(watcher.close)
+        # As wired up by TMVaultClient
+        watcher.add_listener(self.cache.invalidate, self.cache.clear)
+        self.consumer = _FakeConsumer.last
+        self.consumer.on_assign()
+
+    def _wait_for_size(self, size):
+        for _ in range(100):
+            if len(self.cache) == size:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_update_events_invalidate(self):
+        self.consumer.messages.put(json.dumps({
+            'event_id': 'event',
+            'timestamp': '2020-01-01T00:00:02Z',
+            'transaction_updated': {
+                'update_mask': {'paths': ['status']},
+                'transaction': _json('a', 2),
+            },
+        }).encode())
+        self.assertTrue(self._wait_for_size(1))
+        self.assertEqual(self.cache.get_many(['a', 'b'])[1], ['a'])
+
+    def test_losing_the_stream_clears(self):
+        self.consumer.on_revoke()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
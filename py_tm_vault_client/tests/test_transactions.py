@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+
+from tmvault.aio.transactions import AsyncTransactionsAPI
+from tmvault.enums import TransactionDirection, TransactionStatus
+from tmvault.rest_api.filters import TransactionFilters
+from tmvault.rest_api.transactions import TransactionsAPI
+
+
+def _transaction(index):
+    return {
+        'id': f'transaction-{index}',
+        'account_id': 'account',
+        'charge_amount': {
+            'asset': 'CASH',
+            'value': f'{index}.50',
+            'denomination': 'GBP',
+        },
+        'is_credit': index % 2 == 0,
+        'status': 'TRANSACTION_STATUS_BOOKED',
+        'rejection_code': 'REJECTION_CODE_UNKNOWN',
+        'value_timestamp': f'2020-01-01T00:00:{index:02}Z',
+        'booking_timestamp': f'2020-01-01T00:00:{index:02}Z',
+        'last_update_timestamp': f'2020-01-01T00:00:{index:02}Z',
+    }
+
+
+class _FakeClient:
+    """Answers /v1/transactions with `count` transactions in pages of
+    `page_size`, and records the params of each request.
+    """
+
+    def __init__(self, count=5, page_size=2) -> None:
+        self.transactions = [_transaction(i) for i in range(count)]
+        self.page_size = page_size
+        self.params = []
+
+    def get(self, path, params=None, deadline=None):
+        self.params.append(dict(params))
+        start = int(params.get('page_token') or 0)
+        end = start + self.page_size
+        response = {'transactions': self.transactions[start:end]}
+        if end < len(self.transactions):
+            response['next_page_token'] = str(end)
+        return response
+
+
+class _AsyncFakeClient(_FakeClient):
+
+    async def get(self, path, params=None, deadline=None):
+        return _FakeClient.get(self, path, params, deadline)
+
+
+_FILTERS = dict(
+    account_ids=['account'],
+    payment_order_ids=['order'],
+    payee_ids=['payee'],
+    direction=TransactionDirection.TRANSACTION_DIRECTION_CREDIT,
+    statuses=[TransactionStatus.TRANSACTION_STATUS_BOOKED],
+    value_timestamp_range={'from': datetime(2020, 1, 1, tzinfo=timezone.utc)},
+    booking_timestamp_range={'to': datetime(2020, 1, 2, tzinfo=timezone.utc)},
+    last_update_timestamp_range={
+        'from': datetime(2020, 1, 3, tzinfo=timezone.utc)
+    },
+    charge_amount_value_range={'from': '1', 'to': '10'},
+)
+
+
+def _filter_params(params):
+    return {
+        name: value for name, value in params.items()
+        if name not in ('page_size', 'page_token')
+    }
+
+
+class TransactionFiltersTest(unittest.TestCase):
+
+    def test_filters_are_given_by_name_only(self):
+        with self.assertRaises(TypeError):
+            TransactionFilters(['account'])
+
+    def test_replace_leaves_the_original(self):
+        filters = TransactionFilters(account_ids=['a'], payee_ids=['p'])
+        replaced = filters.replace(account_ids=['b'])
+        self.assertEqual(replaced.account_ids, ['b'])
+        self.assertEqual(replaced.payee_ids, ['p'])
+        self.assertEqual(filters.account_ids, ['a'])
+
+    def test_every_method_sends_the_same_filters_on_every_page(self):
+        expected = None
+        for method in (
+            lambda api: api.list_transactions(**_FILTERS).get_next_page(),
+            lambda api: list(api.iter_transactions(**_FILTERS)),
+            lambda api: list(api.iter_transaction_records(**_FILTERS)),
+        ):
+            client = _FakeClient()
+            method(TransactionsAPI(client))
+            self.assertGreater(len(client.params), 1)
+            sent = [_filter_params(params) for params in client.params]
+            expected = expected or sent[0]
+            self.assertEqual(sent, [expected] * len(sent))
+        self.assertEqual(expected['payee_ids'], ['payee'])
+        self.assertEqual(
+            expected['direction'], 'TRANSACTION_DIRECTION_CREDIT'
+        )
+        self.assertEqual(expected['charge_amount_value_range.to'], '10')
+
+    def test_async_methods_send_the_same_filters(self):
+        sync_client = _FakeClient()
+        list(TransactionsAPI(sync_client).iter_transactions(**_FILTERS))
+        client = _AsyncFakeClient()
+        api = AsyncTransactionsAPI(client)
+
+        async def iterate():
+            return [t async for t in api.iter_transactions(**_FILTERS)]
+
+        transactions = asyncio.run(iterate())
+        self.assertEqual(len(transactions), 5)
+        self.assertEqual(client.params, sync_client.params)
+
+
+if __name__ == '__main__':
+    unittest.main()
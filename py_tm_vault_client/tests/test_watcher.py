@@ -0,0 +1,249 @@
+import json
+import queue
+import time
+import types
+import unittest
+from unittest import mock
+
+from tmvault.errors import TransactionsNotFoundError
+from tmvault.models import Transaction
+from tmvault.rest_api.transactions import TransactionsAPI
+from tmvault.stream_api import TransactionWatcher
+
+
+def _transaction(account_id='account'):
+    return {
+        'id': 'transaction',
+        'account_id': account_id,
+        'charge_amount': {
+            'asset': 'CASH', 'value': '1.00', 'denomination': 'GBP'
+        },
+        'is_credit': True,
+        'status': 'TRANSACTION_STATUS_BOOKED',
+        'rejection_code': 'REJECTION_CODE_UNKNOWN',
+        'value_timestamp': '2020-01-01T00:00:00Z',
+        'booking_timestamp': '2020-01-01T00:00:00Z',
+        'last_update_timestamp': '2020-01-01T00:00:00Z',
+    }
+
+
+def _event(account_id='account'):
+    return json.dumps({
+        'event_id': 'event',
+        'timestamp': '2020-01-01T00:00:00Z',
+        'change_id': 'change',
+        'transaction_created': {'transaction': _transaction(account_id)},
+    }).encode()
+
+
+class _FakeConsumer:
+    """Stands in for the Kafka consumer, returning the messages put on
+    `messages`, or raising them if they are exceptions."""
+
+    def __init__(self, bootstrap_servers, topic, group_id, on_assign=None,
+                 on_revoke=None, on_error=None) -> None:
+        self.on_assign = on_assign
+        self.on_revoke = on_revoke
+        self.messages = queue.Queue()
+        self.closed = False
+        _FakeConsumer.last = self
+
+    def consume_bytes(self, deadline=None):
+        try:
+            message = self.messages.get(timeout=0.01)
+        except queue.Empty:
+            return None
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _wait_until(condition):
+    for _ in range(100):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TransactionWatcherTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        kafka = types.ModuleType('tmvault.stream_api.kafka')
+        kafka.Consumer = _FakeConsumer
+        patcher = mock.patch.dict(
+            'sys.modules', {'tmvault.stream_api.kafka': kafka}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.watcher = TransactionWatcher('kafka:9092')
+        self.addCleanup(self.watcher.close)
+        self.consumer = _FakeConsumer.last
+
+    def test_ready_once_assigned_until_revoked(self):
+        gaps = []
+        self.watcher.add_listener(lambda transaction: None,
+                                  lambda: gaps.append(True))
+        self.assertFalse(self.watcher.ready)
+        self.consumer.on_assign()
+        self.assertTrue(self.watcher.ready)
+        self.consumer.on_revoke()
+        self.assertFalse(self.watcher.ready)
+        self.assertEqual(gaps, [True])
+        # Only the first of several losses is a gap
+        self.consumer.on_revoke()
+        self.assertEqual(gaps, [True])
+
+    def test_a_message_after_a_failure_makes_it_ready_again(self):
+        self.consumer.on_assign()
+        self.consumer.messages.put(IOError('broker down'))
+        self.assertTrue(_wait_until(lambda: not self.watcher.ready))
+        self.consumer.messages.put(_event())
+        self.assertTrue(_wait_until(lambda: self.watcher.ready))
+
+    def test_close_stops_it(self):
+        self.consumer.on_assign()
+        self.watcher.close()
+        self.assertFalse(self.watcher.ready)
+        self.assertTrue(self.consumer.closed)
+
+    def test_matching_events_wake_waits(self):
+        matching = self.watcher.wait_for(
+            lambda transaction: transaction.account_id == 'account'
+        )
+        other = self.watcher.wait_for(
+            lambda transaction: transaction.account_id == 'other'
+        )
+        seen = []
+        self.watcher.add_listener(seen.append)
+        self.consumer.messages.put(b'not json')
+        self.consumer.messages.put(_event())
+        transaction = matching.wait(1)
+        self.assertIsInstance(transaction, Transaction)
+        self.assertEqual(transaction.account_id, 'account')
+        self.assertIsNone(other.wait(0.05))
+        self.assertEqual([t.id_ for t in seen], ['transaction'])
+
+    def test_cancelled_waits_are_not_woken(self):
+        wait = self.watcher.wait_for(lambda transaction: True)
+        self.watcher.cancel(wait)
+        self.consumer.messages.put(_event())
+        self.assertIsNone(wait.wait(0.05))
+
+
+class _ListingClient:
+    """Answers /v1/transactions with nothing for the first `found_after`
+    requests, or for every request if it is None."""
+
+    def __init__(self, found_after=None) -> None:
+        self.found_after = found_after
+        self.calls = 0
+
+    def get(self, path, params=None, deadline=None):
+        self.calls += 1
+        if self.found_after is None or self.calls <= self.found_after:
+            return {'transactions': []}
+        return {'transactions': [_transaction()]}
+
+
+class _FakeWait:
+
+    def __init__(self, on_wait) -> None:
+        self.on_wait = on_wait
+        self.timeouts = []
+
+    def wait(self, timeout=None):
+        self.timeouts.append(timeout)
+        return self.on_wait()
+
+
+class _FakeWatcher:
+
+    def __init__(self, on_wait, ready=True) -> None:
+        self.ready = ready
+        self.wait = _FakeWait(on_wait)
+        self.matches = None
+        self.cancelled = False
+
+    def wait_for(self, matches):
+        self.matches = matches
+        return self.wait
+
+    def cancel(self, wait) -> None:
+        self.cancelled = wait is self.wait
+
+
+class ListTransactionsWhenExistsTest(unittest.TestCase):
+
+    def test_an_event_lists_again_without_waiting(self):
+        client = _ListingClient()
+
+        def event_arrives():
+            client.found_after = client.calls
+            return Transaction.from_json(_transaction())
+
+        watcher = _FakeWatcher(event_arrives)
+        api = TransactionsAPI(client, lambda: watcher)
+        started = time.monotonic()
+        transactions = api.list_transactions_when_exists(
+            account_ids=['account'], max_retry_seconds=30,
+            retry_interval_seconds=30
+        )
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(len(watcher.wait.timeouts), 1)
+        self.assertTrue(watcher.cancelled)
+        event = Transaction.from_json(_transaction())
+        self.assertTrue(watcher.matches(event))
+        self.assertFalse(
+            watcher.matches(Transaction.from_json(_transaction('other')))
+        )
+
+    def test_polls_without_a_watcher(self):
+        client = _ListingClient(found_after=2)
+        api = TransactionsAPI(client, lambda: None)
+        transactions = api.list_transactions_when_exists(
+            account_ids=['account'], retry_interval_seconds=0.01
+        )
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(client.calls, 3)
+
+    def test_polls_while_the_watcher_is_not_ready(self):
+        client = _ListingClient(found_after=2)
+        watcher = _FakeWatcher(lambda: None, ready=False)
+        api = TransactionsAPI(client, lambda: watcher)
+        api.list_transactions_when_exists(
+            account_ids=['account'], retry_interval_seconds=0.01
+        )
+        self.assertEqual(watcher.wait.timeouts, [0.01, 0.02])
+        self.assertTrue(watcher.cancelled)
+
+    def test_not_using_the_stream_does_not_start_the_watcher(self):
+        def watcher():
+            raise AssertionError('The watcher was started')
+
+        client = _ListingClient(found_after=1)
+        api = TransactionsAPI(client, watcher)
+        api.list_transactions_when_exists(
+            account_ids=['account'], retry_interval_seconds=0.01,
+            use_stream=False
+        )
+        self.assertEqual(client.calls, 2)
+
+    def test_not_found_after_the_retry_time(self):
+        client = _ListingClient()
+        api = TransactionsAPI(client, lambda: None)
+        with self.assertRaises(TransactionsNotFoundError):
+            api.list_transactions_when_exists(
+                account_ids=['account'], max_retry_seconds=0.1,
+                retry_interval_seconds=0.01
+            )
+        self.assertGreater(client.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+from .client import AsyncTMVaultClient
+from .rest_api_client import AsyncRestAPIClient
+from .accounts import AsyncAccountsAPI
+from .customers import AsyncCustomersAPI
+from .transactions import AsyncTransactionsAPI, AsyncTransactionsList
+from .payments import AsyncPaymentsAPI
+
+__all__ = [
+    'AsyncTMVaultClient',
+    'AsyncRestAPIClient',
+    'AsyncAccountsAPI',
+    'AsyncCustomersAPI',
+    'AsyncTransactionsAPI',
+    'AsyncTransactionsList',
+    'AsyncPaymentsAPI'
+]
@@ -0,0 +1,282 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Union
+
+from .rest_api_client import AsyncRestAPIClient
+from ..const import DEFAULT_ACCOUNTS_CONCURRENCY
+from ..enums import PostingPhase
+from ..models import Account
+from ..rest_api.batch import chunk_ids, unique_ids
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.accounts import (
+    AccountBalances, _account_to_create, _get_account_params,
+    _list_accounts_params, _live_balances,
+    _payment_device_ids_by_account_id, _payment_device_link_to_create,
+    _routing_details_by_account_id, _set_routing_details,
+    _uk_bank_account_number_to_create
+)
+from ..rest_api.routing_cache import RoutingCache, RoutingDetails
+
+
+class AsyncAccountsAPI:
+    """The awaitable counterpart of :class:`tmvault.rest_api.AccountsAPI`.
+    """
+
+    def __init__(
+        self,
+        core_rest_api: AsyncRestAPIClient,
+        payments_hub_rest_api: AsyncRestAPIClient,
+        routing_cache: RoutingCache = None
+    ):
+        self._core_rest_api = core_rest_api
+        self._payments_hub_rest_api = payments_hub_rest_api
+        self._routing_cache = routing_cache
+
+    async def list_accounts_for_customer(
+            self,
+            customer_id: str,
+            include_uk_sort_code_and_account_number: bool = True,
+            timeout: Union[float, Deadline] = None
+    ) -> List[Account]:
+        """See :meth:`tmvault.rest_api.AccountsAPI.list_accounts_for_customer`.
+        """
+        deadline = as_deadline(timeout)
+        json_response = await self._core_rest_api.get(
+            '/v1/accounts', _list_accounts_params(customer_id), deadline
+        )
+        account_list = list(map(Account.from_json, json_response['accounts']))
+        if include_uk_sort_code_and_account_number:
+            await self._add_sort_code_account_number_to_account_list(
+                account_list, deadline
+            )
+        return account_list
+
+    async def get_account(
+            self,
+            account_id: str,
+            include_uk_sort_code_and_account_number: bool = True,
+            effective_timestamp: datetime = None,
+            timeout: Union[float, Deadline] = None
+    ) -> Account:
+        """See :meth:`tmvault.rest_api.AccountsAPI.get_account`.
+        """
+        deadline = as_deadline(timeout)
+        json_response = await self._core_rest_api.get(
+            '/v1/accounts/%s' % account_id,
+            _get_account_params(effective_timestamp),
+            deadline
+        )
+        account = Account.from_json(json_response)
+        if include_uk_sort_code_and_account_number:
+            await self._add_sort_code_account_number_to_account_list(
+                [account], deadline
+            )
+        return account
+
+    async def get_accounts(
+            self,
+            account_ids: List[str],
+            include_uk_sort_code_and_account_number: bool = True,
+            effective_timestamp: datetime = None,
+            concurrency: int = DEFAULT_ACCOUNTS_CONCURRENCY,
+            timeout: Union[float, Deadline] = None
+    ) -> Dict[str, Account]:
+        """See :meth:`tmvault.rest_api.AccountsAPI.get_accounts`.
+        """
+        concurrency = self._core_rest_api.max_concurrency(concurrency)
+        deadline = as_deadline(timeout)
+        account_ids = unique_ids(account_ids)
+        if not account_ids:
+            return {}
+        params = _get_account_params(effective_timestamp)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get_account(account_id: str) -> Account:
+            async with semaphore:
+                return Account.from_json(await self._core_rest_api.get(
+                    '/v1/accounts/%s' % account_id, params, deadline
+                ))
+
+        accounts = asyncio.gather(*map(get_account, account_ids))
+        if include_uk_sort_code_and_account_number:
+            accounts, routing_details = await asyncio.gather(
+                accounts, self._get_routing_details(account_ids, deadline)
+            )
+            for a in accounts:
+                _set_routing_details(a, routing_details[a.id_])
+        else:
+            accounts = await accounts
+        return {a.id_: a for a in accounts}
+
+    async def get_balances(
+            self,
+            account_ids: List[str],
+            phase: PostingPhase = PostingPhase.POSTING_PHASE_COMMITTED,
+            address: str = None,
+            concurrency: int = DEFAULT_ACCOUNTS_CONCURRENCY,
+            timeout: Union[float, Deadline] = None
+    ) -> Dict[str, AccountBalances]:
+        """See :meth:`tmvault.rest_api.AccountsAPI.get_balances`.
+        """
+        concurrency = self._core_rest_api.max_concurrency(concurrency)
+        deadline = as_deadline(timeout)
+        account_ids = unique_ids(account_ids)
+        params = _get_account_params()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get_balances(account_id: str) -> AccountBalances:
+            async with semaphore:
+                account_dict = await self._core_rest_api.get(
+                    '/v1/accounts/%s' % account_id, params, deadline
+                )
+            return _live_balances(account_dict, phase, address)
+
+        return dict(zip(
+            account_ids,
+            await asyncio.gather(*map(get_balances, account_ids))
+        ))
+
+    async def create_account(
+        self,
+        account_id: str = None,
+        product_id: str = None,
+        stakeholder_customer_ids: List[str] = None,
+        instance_param_vals: Dict[str, str] = None,
+        details: Dict[str, str] = None,
+        with_uk_account_number_and_sort_code: bool = True,
+        timeout: Union[float, Deadline] = None
+    ) -> Account:
+        """See :meth:`tmvault.rest_api.AccountsAPI.create_account`.
+        """
+        deadline = as_deadline(timeout)
+        account_to_create = _account_to_create(
+            account_id,
+            product_id,
+            stakeholder_customer_ids,
+            instance_param_vals,
+            details
+        )
+        account = Account.from_json(await self._core_rest_api.post(
+            '/v1/accounts', {'account': account_to_create}, timeout=deadline
+        ))
+        if not with_uk_account_number_and_sort_code:
+            return account
+
+        uk_bank_account_number_dict = await self._payments_hub_rest_api.post(
+            '/v1/uk-bank-account-numbers',
+            _uk_bank_account_number_to_create(),
+            timeout=deadline
+        )
+        await self._payments_hub_rest_api.post(
+            '/v1/payment-device-links',
+            _payment_device_link_to_create(
+                uk_bank_account_number_dict['id'], account.id_
+            ),
+            timeout=deadline
+        )
+        routing_details = (
+            uk_bank_account_number_dict['sort_code'],
+            uk_bank_account_number_dict['account_number']
+        )
+        _set_routing_details(account, routing_details)
+        if self._routing_cache is not None:
+            self._routing_cache.put_many({account.id_: routing_details})
+        return account
+
+    async def update_account_stakeholders(
+        self,
+        account_id: str,
+        new_stakeholder_customer_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> Account:
+        """See
+        :meth:`tmvault.rest_api.AccountsAPI.update_account_stakeholders`.
+        """
+        deadline = as_deadline(timeout)
+        put_response = await self._core_rest_api.put(
+            '/v1/accounts/%s' % account_id, {
+                'account': {
+                    'stakeholder_ids': new_stakeholder_customer_ids
+                },
+                'update_mask': {
+                    'paths': ['stakeholder_ids']
+                }
+            }, timeout=deadline
+        )
+        return await self.get_account(put_response['id'], timeout=deadline)
+
+    async def prewarm_routing_cache(
+        self,
+        account_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> int:
+        """See :meth:`tmvault.rest_api.AccountsAPI.prewarm_routing_cache`.
+        """
+        if self._routing_cache is None:
+            raise ValueError('The client has no routing cache')
+        routing_details = await self._fetch_routing_details(
+            self._routing_cache.missing(unique_ids(account_ids)),
+            as_deadline(timeout)
+        )
+        self._routing_cache.put_many(routing_details)
+        return len(routing_details)
+
+    async def _add_sort_code_account_number_to_account_list(
+        self, account_list: List[Account], deadline: Deadline = None
+    ) -> None:
+        routing_details = await self._get_routing_details(
+            [a.id_ for a in account_list], deadline
+        )
+        for a in account_list:
+            _set_routing_details(a, routing_details[a.id_])
+
+    async def _get_routing_details(
+        self, account_ids: List[str], deadline: Deadline = None
+    ) -> Dict[str, RoutingDetails]:
+        if self._routing_cache is None:
+            return await self._fetch_routing_details(account_ids, deadline)
+        routing_details, missing_ids = self._routing_cache.get_many(
+            account_ids
+        )
+        if missing_ids:
+            fetched = await self._fetch_routing_details(
+                missing_ids, deadline
+            )
+            self._routing_cache.put_many(fetched)
+            routing_details.update(fetched)
+        return routing_details
+
+    async def _fetch_routing_details(
+        self, account_ids: List[str], deadline: Deadline = None
+    ) -> Dict[str, RoutingDetails]:
+        if not account_ids:
+            return {}
+        semaphore = asyncio.Semaphore(
+            self._core_rest_api.batch_get_concurrency
+        )
+
+        async def get_links(chunk: List[str]) -> Dict[str, any]:
+            async with semaphore:
+                return await self._core_rest_api.get(
+                    '/v1/payment-device-links', {'account_ids': chunk},
+                    deadline
+                )
+
+        responses = await asyncio.gather(*(
+            get_links(chunk)
+            for chunk in chunk_ids(
+                unique_ids(account_ids),
+                self._core_rest_api.batch_get_chunk_size
+            )
+        ))
+        payment_device_id_by_account_id = _payment_device_ids_by_account_id(
+            responses
+        )
+
+        payment_devices = await self._core_rest_api.batch_get(
+            '/v1/payment-devices:batchGet', 'payment_devices',
+            payment_device_id_by_account_id.values(), deadline
+        )
+        return _routing_details_by_account_id(
+            payment_device_id_by_account_id, payment_devices
+        )
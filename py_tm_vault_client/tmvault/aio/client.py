@@ -0,0 +1,213 @@
+from typing import Dict, Union
+
+from ..codec import JSONCodec
+from ..config import VaultConfig, default_config_path
+from ..const import (
+    DEFAULT_ASYNC_POOL_MAXSIZE, DEFAULT_BATCH_GET_CHUNK_SIZE,
+    DEFAULT_BATCH_GET_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT
+)
+from ..rest_api import (
+    CircuitBreakerPolicy, EndpointMetrics, RetryPolicy, RoutingCache,
+    RoutingCacheStats, prometheus_text
+)
+from .accounts import AsyncAccountsAPI
+from .customers import AsyncCustomersAPI
+from .payments import AsyncPaymentsAPI
+from .rest_api_client import AsyncRestAPIClient
+from .transactions import AsyncTransactionsAPI
+
+
+class AsyncTMVaultClient:
+    """An asyncio client for communicating with an instance of Vault.
+
+    This offers the same REST API methods as :class:`tmvault.TMVaultClient`,
+    as coroutines, so a single event loop can keep many Vault calls in
+    flight at once. Models and enums are shared with the blocking client.
+    Requires the :mod:`aiohttp` library.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import asyncio
+        from py_tm_vault_client.tmvault.aio import AsyncTMVaultClient
+
+        async def main():
+            async with AsyncTMVaultClient('/path/to/vault-config.json') as c:
+                accounts = await asyncio.gather(
+                    *(c.accounts.get_account(id_) for id_ in account_ids)
+                )
+
+    :param config_path: Path to the JSON configuration file.
+                        Optional, defaults to data/vault-config.json.
+    :type config_path: str
+    :param pool_maxsize: The maximum number of concurrent connections to each
+                         of the core, XPL and Payments Hub APIs, which also
+                         caps the `concurrency` of the methods that send
+                         requests concurrently. Optional, defaults to 100.
+    :type pool_maxsize: int
+    :param retry_policy: How failed REST requests are retried.
+                         Optional, defaults to
+                         :class:`tmvault.rest_api.RetryPolicy` with its
+                         default settings.
+    :type retry_policy: :class:`tmvault.rest_api.RetryPolicy`
+    :param circuit_breaker_policy: When to stop sending requests to a failing
+                                   REST endpoint. Optional, defaults to
+                                   :class:`tmvault.rest_api.CircuitBreakerPolicy`
+                                   with its default settings.
+    :type circuit_breaker_policy:
+        :class:`tmvault.rest_api.CircuitBreakerPolicy`
+    :param json_codec: The JSON codec, or name of the JSON library, used for
+                       REST bodies. Optional, defaults to the fastest one
+                       installed, see :func:`tmvault.codec.get_codec`.
+    :type json_codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    :param batch_get_chunk_size: The maximum number of IDs sent in one
+                                 batchGet request, e.g. by
+                                 `transactions.batch_get_transactions`.
+                                 Optional, defaults to 100.
+    :type batch_get_chunk_size: int
+    :param batch_get_concurrency: The maximum number of batchGet chunks
+                                  requested at the same time by one call.
+                                  Optional, defaults to 8.
+    :type batch_get_concurrency: int
+    :param connect_timeout: The maximum number of seconds to wait for a
+                            connection to the API to be established.
+                            Optional, defaults to 3.05.
+    :type connect_timeout: float
+    :param read_timeout: The maximum number of seconds to wait for the API to
+                         send data once connected. Every method also takes a
+                         `timeout` for the whole operation. Optional,
+                         defaults to 30.
+    :type read_timeout: float
+    :param cache_routing_details: If True, the UK sort codes and account
+                                  numbers of accounts are cached, as they
+                                  never change, so reading an account again
+                                  sends one request instead of three.
+                                  Optional, defaults to True.
+    :type cache_routing_details: bool
+    :param routing_cache_path: A SQLite database file the routing cache is
+                               also kept in, so it survives restarts.
+                               Optional, defaults to memory only.
+    :type routing_cache_path: str
+    """
+
+    def __init__(
+        self,
+        config_path: str = None,
+        pool_maxsize: int = DEFAULT_ASYNC_POOL_MAXSIZE,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker_policy: CircuitBreakerPolicy = None,
+        json_codec: Union[str, JSONCodec] = None,
+        batch_get_chunk_size: int = DEFAULT_BATCH_GET_CHUNK_SIZE,
+        batch_get_concurrency: int = DEFAULT_BATCH_GET_CONCURRENCY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        cache_routing_details: bool = True,
+        routing_cache_path: str = None
+    ) -> None:
+        config_path = config_path if config_path else default_config_path()
+        config = VaultConfig.from_json_file_path(config_path)
+
+        # Set up REST base clients
+        rest_kwargs = dict(
+            pool_maxsize=pool_maxsize,
+            retry_policy=retry_policy,
+            circuit_breaker_policy=circuit_breaker_policy,
+            json_codec=json_codec,
+            batch_get_chunk_size=batch_get_chunk_size,
+            batch_get_concurrency=batch_get_concurrency,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout
+        )
+        self._core_rest_api = AsyncRestAPIClient(
+            config.core_api_url, config.service_account_token, **rest_kwargs
+        )
+        self._xpl_rest_api = AsyncRestAPIClient(
+            config.xpl_api_url, config.service_account_token, **rest_kwargs
+        )
+        self._payments_hub_rest_api = AsyncRestAPIClient(
+            config.payments_hub_api_url, config.service_account_token,
+            **rest_kwargs
+        )
+
+        self._routing_cache = (
+            RoutingCache(routing_cache_path)
+            if cache_routing_details else None
+        )
+
+        # Declare REST API clients
+        self._transactions_api = None
+        self._accounts_api = None
+        self._customers_api = None
+        self._payments_hub_api = None
+
+    async def __aenter__(self) -> 'AsyncTMVaultClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    def metrics(self) -> Dict[str, Dict[str, EndpointMetrics]]:
+        """See :meth:`tmvault.TMVaultClient.metrics`.
+        """
+        return {
+            'core': self._core_rest_api.metrics(),
+            'xpl': self._xpl_rest_api.metrics(),
+            'payments_hub': self._payments_hub_rest_api.metrics(),
+        }
+
+    def prometheus_metrics(self) -> str:
+        """See :meth:`tmvault.TMVaultClient.prometheus_metrics`.
+        """
+        return prometheus_text(self.metrics())
+
+    def routing_cache_stats(self) -> RoutingCacheStats:
+        """See :meth:`tmvault.TMVaultClient.routing_cache_stats`.
+        """
+        if self._routing_cache is None:
+            return RoutingCacheStats()
+        return self._routing_cache.stats()
+
+    async def close(self) -> None:
+        """Closes the connections of every REST API client, and the routing
+        cache database if any."""
+        await self._core_rest_api.close()
+        await self._xpl_rest_api.close()
+        await self._payments_hub_rest_api.close()
+        if self._routing_cache is not None:
+            self._routing_cache.close()
+
+    @property
+    def accounts(self) -> AsyncAccountsAPI:
+        """An object for managing customer accounts."""
+        if self._accounts_api is None:
+            self._accounts_api = AsyncAccountsAPI(
+                self._core_rest_api, self._payments_hub_rest_api,
+                self._routing_cache
+            )
+        return self._accounts_api
+
+    @property
+    def customers(self) -> AsyncCustomersAPI:
+        """An object for managing customers."""
+        if self._customers_api is None:
+            self._customers_api = AsyncCustomersAPI(self._core_rest_api)
+        return self._customers_api
+
+    @property
+    def transactions(self) -> AsyncTransactionsAPI:
+        """An object for managing transactions."""
+        if self._transactions_api is None:
+            self._transactions_api = AsyncTransactionsAPI(self._xpl_rest_api)
+        return self._transactions_api
+
+    @property
+    def payments(self) -> AsyncPaymentsAPI:
+        """An object for creating and retrieving payments."""
+        if self._payments_hub_api is None:
+            self._payments_hub_api = AsyncPaymentsAPI(
+                self._payments_hub_rest_api
+            )
+        return self._payments_hub_api
@@ -0,0 +1,154 @@
+from datetime import date
+from typing import Dict, List, Union
+
+from .rest_api_client import AsyncRestAPIClient
+from ..enums import (
+    CustomerAccessibility, CustomerContactMethod, CustomerGender, CustomerTitle
+)
+from ..models import Customer
+from ..rest_api.batch import BatchGetResult
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.customers import _customer_to_create, _customer_updates
+
+
+class AsyncCustomersAPI:
+    """The awaitable counterpart of :class:`tmvault.rest_api.CustomersAPI`.
+    """
+
+    def __init__(self, rest_api: AsyncRestAPIClient):
+        self._rest_api = rest_api
+
+    async def get_customer(
+        self,
+        customer_id: str,
+        timeout: Union[float, Deadline] = None
+    ) -> Customer:
+        """See :meth:`tmvault.rest_api.CustomersAPI.get_customer`.
+        """
+        json_response = await self._rest_api.get(
+            '/v1/customers/%s' % customer_id, timeout=timeout)
+        return Customer.from_json(json_response)
+
+    async def get_customers(
+        self,
+        customer_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """See :meth:`tmvault.rest_api.CustomersAPI.get_customers`.
+        """
+        return (await self._rest_api.batch_get(
+            '/v1/customers:batchGet', 'customers', customer_ids, timeout
+        )).map(Customer.from_json)
+
+    async def create_customer(
+        self,
+        customer_id: str = None,
+        title: CustomerTitle = None,
+        first_name: str = None,
+        middle_name: str = None,
+        last_name: str = None,
+        dob: date = None,
+        gender: CustomerGender = None,
+        nationality: str = None,
+        email_address: str = None,
+        mobile_phone_number: str = None,
+        home_phone_number: str = None,
+        business_phone_number: str = None,
+        contact_method: CustomerContactMethod =
+        CustomerContactMethod.CUSTOMER_CONTACT_METHOD_NONE,
+        country_of_residence: str = None,
+        country_of_taxation: str = None,
+        accessibility: CustomerAccessibility = None,
+        additional_details: Dict[str, str] = None,
+        timeout: Union[float, Deadline] = None
+    ) -> Customer:
+        """See :meth:`tmvault.rest_api.CustomersAPI.create_customer`.
+        """
+        post_response = await self._rest_api.post('/v1/customers', {
+            'customer': _customer_to_create(
+                customer_id,
+                title,
+                first_name,
+                middle_name,
+                last_name,
+                dob,
+                gender,
+                nationality,
+                email_address,
+                mobile_phone_number,
+                home_phone_number,
+                business_phone_number,
+                contact_method,
+                country_of_residence,
+                country_of_taxation,
+                accessibility,
+                additional_details
+            )
+        }, timeout=timeout)
+        return Customer.from_json(post_response)
+
+    async def update_customer(
+        self,
+        customer_id: str,
+        title: CustomerTitle = None,
+        first_name: str = None,
+        middle_name: str = None,
+        last_name: str = None,
+        dob: date = None,
+        gender: CustomerGender = None,
+        nationality: str = None,
+        email_address: str = None,
+        mobile_phone_number: str = None,
+        home_phone_number: str = None,
+        business_phone_number: str = None,
+        contact_method: CustomerContactMethod = None,
+        country_of_residence: str = None,
+        country_of_taxation: str = None,
+        accessibility: CustomerAccessibility = None,
+        additional_details_to_upsert: Dict[str, str] = None,
+        additional_details_to_remove: List[str] = None,
+        timeout: Union[float, Deadline] = None
+    ) -> Customer:
+        """See :meth:`tmvault.rest_api.CustomersAPI.update_customer`.
+        """
+        deadline = as_deadline(timeout)
+        additional_details_put_data, customer_put_data = (
+            _customer_updates(
+                customer_id,
+                title,
+                first_name,
+                middle_name,
+                last_name,
+                dob,
+                gender,
+                nationality,
+                email_address,
+                mobile_phone_number,
+                home_phone_number,
+                business_phone_number,
+                contact_method,
+                country_of_residence,
+                country_of_taxation,
+                accessibility,
+                additional_details_to_upsert,
+                additional_details_to_remove
+            )
+        )
+        updated_customer_json = None
+        if additional_details_put_data is not None:
+            updated_customer_json = await self._rest_api.put(
+                f'/v1/customers/{customer_id}:updateAdditionalDetails',
+                additional_details_put_data,
+                timeout=deadline
+            )
+        if customer_put_data is not None:
+            updated_customer_json = await self._rest_api.put(
+                '/v1/customers/%s' % customer_id, customer_put_data,
+                timeout=deadline
+            )
+
+        return (
+            Customer.from_json(updated_customer_json)
+            if updated_customer_json
+            else await self.get_customer(customer_id, timeout=deadline)
+        )
@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from ..models import Transaction
+from ..rest_api.deadline import Deadline
+from ..rest_api.ingestion import (
+    CreateTransactionResult, CreateTransactionsReport, IngestionProgress,
+    with_stable_ids
+)
+
+# Creates a transaction from its JSON body, with the given request_id
+AsyncCreateFunction = Callable[
+    [Dict[str, Any], str], Awaitable[Transaction]
+]
+
+
+async def create_all(
+    items: Iterable[Dict[str, Any]],
+    to_body: Callable[[Dict[str, Any]], Dict[str, Any]],
+    create: AsyncCreateFunction,
+    concurrency: int,
+    progress: IngestionProgress,
+    deadline: Deadline
+) -> CreateTransactionsReport:
+    """See :func:`tmvault.rest_api.ingestion.create_all`, with a task per
+    transaction instead of a thread.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    in_flight = set()
+    stopped = False
+
+    async def create_one(
+        index: int, body: Dict[str, Any], request_id: str
+    ) -> CreateTransactionResult:
+        try:
+            transaction = await create(body, request_id)
+        except Exception as e:
+            return CreateTransactionResult(
+                index, body['id'], request_id, error=e
+            )
+        return CreateTransactionResult(
+            index, body['id'], request_id, transaction
+        )
+
+    async def handle_finished() -> None:
+        done, _ = await asyncio.wait(
+            in_flight, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            in_flight.discard(task)
+            progress.handle(task.result())
+
+    try:
+        for index, item in enumerate(items):
+            try:
+                body, request_id = with_stable_ids(to_body(item))
+            except Exception as e:
+                progress.handle(
+                    CreateTransactionResult(index, None, None, error=e)
+                )
+                continue
+            if progress.skip(body['id']):
+                continue
+            if deadline.expired():
+                stopped = True
+                break
+            # Waits for a task to finish before reading the next item
+            if len(in_flight) == concurrency:
+                await handle_finished()
+            in_flight.add(asyncio.ensure_future(
+                create_one(index, body, request_id)
+            ))
+        while in_flight:
+            await handle_finished()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+    report = progress.finish()
+    if stopped:
+        deadline.check('creating transactions')
+    return report
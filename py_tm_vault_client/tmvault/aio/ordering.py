@@ -0,0 +1,33 @@
+import asyncio
+import heapq
+from typing import AsyncIterable, AsyncIterator, List
+
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+from ..rest_api.ordering import transaction_sort_key
+
+
+async def merge_ordered(
+    streams: List[AsyncIterable[Transaction]],
+    order_by: List[TransactionOrderBy] = None
+) -> AsyncIterator[Transaction]:
+    """The awaitable counterpart of
+    :func:`tmvault.rest_api.ordering.merge_ordered`.
+    """
+    key = transaction_sort_key(order_by)
+    iterators = [stream.__aiter__() for stream in streams]
+    # The stream index breaks ties, so transactions are never compared
+    heap = []
+
+    async def advance(index: int) -> None:
+        try:
+            transaction = await iterators[index].__anext__()
+        except StopAsyncIteration:
+            return
+        heapq.heappush(heap, (key(transaction), index, transaction))
+
+    await asyncio.gather(*(advance(i) for i in range(len(iterators))))
+    while heap:
+        _, index, transaction = heapq.heappop(heap)
+        yield transaction
+        await advance(index)
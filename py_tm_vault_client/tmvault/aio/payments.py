@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, List, Union
+
+from .rest_api_client import AsyncRestAPIClient
+from ..const import PAYMENT_POLL_INTERVAL
+from ..enums import PaymentStatus
+from ..models import Payment
+from ..rest_api.batch import BatchGetResult
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.payments import (
+    _is_settling, _payment_to_create, _settle_payment_request
+)
+
+
+class AsyncPaymentsAPI:
+    """The awaitable counterpart of :class:`tmvault.rest_api.PaymentsAPI`.
+    """
+
+    def __init__(self, rest_api_client: AsyncRestAPIClient) -> None:
+        self._rest_api_client = rest_api_client
+
+    async def create_payment(
+            self,
+            amount: str,
+            debtor_account_id: str,
+            debtor_sort_code: str,
+            debtor_account_number: str,
+            creditor_account_id: str,
+            creditor_sort_code: str,
+            creditor_account_number: str,
+            reference: str,
+            currency: str = "GBP",
+            metadata: Dict[str, str] = {},
+            timeout: Union[float, Deadline] = None
+    ) -> Payment:
+        """See :meth:`tmvault.rest_api.PaymentsAPI.create_payment`.
+        """
+        deadline = as_deadline(timeout)
+        post_response = await self._rest_api_client.post('/v1/payments', {
+            'payment': _payment_to_create(
+                amount,
+                debtor_account_id,
+                debtor_sort_code,
+                debtor_account_number,
+                creditor_account_id,
+                creditor_sort_code,
+                creditor_account_number,
+                reference,
+                currency,
+                metadata,
+            )
+        }, timeout=deadline)
+
+        created_payment = Payment.from_json(post_response)
+        # We check that the payment passed validation, otherwise we return the
+        # created payment. Inspect status_reason for more details.
+        if created_payment.current_status !=\
+                PaymentStatus.PAYMENT_STATUS_RECEIVED:
+            return created_payment
+
+        payment_id = created_payment.id_
+        put_response = await self._rest_api_client.put(
+            '/v1/payments/%s' % payment_id, _settle_payment_request(),
+            timeout=deadline
+        )
+        fetched_payment = Payment.from_json(put_response)
+
+        while _is_settling(fetched_payment):
+            deadline.check(f'waiting for payment {payment_id} to settle')
+            await asyncio.sleep(deadline.cap(PAYMENT_POLL_INTERVAL))
+            fetched_payment = await self.get_payment(
+                payment_id, timeout=deadline
+            )
+
+        return fetched_payment
+
+    async def get_payment(
+        self,
+        payment_id: str,
+        timeout: Union[float, Deadline] = None
+    ) -> Payment:
+        """See :meth:`tmvault.rest_api.PaymentsAPI.get_payment`.
+        """
+        return (await self.get_payments([payment_id], timeout))[payment_id]
+
+    async def get_payments(
+        self,
+        payment_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """See :meth:`tmvault.rest_api.PaymentsAPI.get_payments`.
+        """
+        return (await self._rest_api_client.batch_get(
+            '/v1/payments:batchGet', 'payments', payment_ids, timeout
+        )).map(Payment.from_json)
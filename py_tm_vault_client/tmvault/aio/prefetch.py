@@ -0,0 +1,47 @@
+import asyncio
+from typing import AsyncIterable, AsyncIterator, TypeVar
+
+T = TypeVar('T')
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+async def prefetch(items: AsyncIterable[T], depth: int) -> AsyncIterator[T]:
+    """The awaitable counterpart of
+    :func:`tmvault.rest_api.prefetch.prefetch`, which iterates over `items`
+    in a background task.
+    """
+    if depth < 0:
+        raise ValueError('depth must not be negative')
+    if depth == 0:
+        async for item in items:
+            yield item
+        return
+
+    buffer = asyncio.Queue(maxsize=depth)
+
+    async def produce() -> None:
+        try:
+            async for item in items:
+                await buffer.put(item)
+        except Exception as e:
+            await buffer.put(_Failure(e))
+            return
+        await buffer.put(_DONE)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        producer.cancel()
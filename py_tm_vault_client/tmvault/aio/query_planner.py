@@ -0,0 +1,50 @@
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List
+
+from .ordering import merge_ordered
+from .prefetch import prefetch
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+
+# Gets the pages, as AsyncTransactionsLists, of a query with the given ID
+# filters
+AsyncQueryPages = Callable[
+    [Dict[str, List[str]]], AsyncIterator[List[Transaction]]
+]
+
+
+def fan_out(
+    pages: AsyncQueryPages,
+    queries: List[Dict[str, List[str]]],
+    order_by: List[TransactionOrderBy],
+    prefetch_pages: int,
+    concurrency: int
+) -> AsyncIterator[Transaction]:
+    """The awaitable counterpart of
+    :func:`tmvault.rest_api.query_planner.fan_out`, which pages through every
+    query in its own task.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    slots = asyncio.Semaphore(concurrency)
+
+    async def limited(
+        query: Dict[str, List[str]]
+    ) -> AsyncIterator[List[Transaction]]:
+        query_pages = pages(query).__aiter__()
+        while True:
+            async with slots:
+                try:
+                    page = await query_pages.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield page
+
+    async def stream(
+        query: Dict[str, List[str]]
+    ) -> AsyncIterator[Transaction]:
+        async for page in prefetch(limited(query), prefetch_pages):
+            for transaction in page:
+                yield transaction
+
+    return merge_ordered([stream(query) for query in queries], order_by)
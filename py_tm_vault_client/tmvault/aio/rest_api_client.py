@@ -0,0 +1,418 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from uuid import uuid4
+
+import aiohttp
+import requests
+
+from ..codec import JSONCodec, get_codec
+from ..const import (
+    DEFAULT_ASYNC_POOL_MAXSIZE, DEFAULT_BATCH_GET_CHUNK_SIZE,
+    DEFAULT_BATCH_GET_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_LATENCY_BUCKETS, DEFAULT_READ_TIMEOUT
+)
+from ..errors import DeadlineExceededError
+from ..rest_api.batch import (
+    BatchGetResult, chunk_ids, merge_batch_responses, unique_ids
+)
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerPolicy, CircuitBreakers, CircuitState
+)
+from ..rest_api.metrics import (
+    EndpointMetrics, RequestMetrics, prometheus_text
+)
+from ..rest_api.retry import RetryPolicy
+from ..utils import endpoint_template, get_logger
+
+log = get_logger(__name__)
+
+
+def _query_params(params: Dict[str, any]) -> List[Tuple[str, str]]:
+    # aiohttp does not expand list values into repeated keys like requests
+    # does, and only accepts strings and numbers.
+    query = []
+    for key, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((key, str(v)) for v in values)
+    return query
+
+
+async def raise_for_status(response: aiohttp.ClientResponse):
+    """Raises a :class:`requests.HTTPError` carrying the Vault error details,
+    mirroring :func:`tmvault.rest_api.rest_api_client.raise_for_status`.
+    """
+    if response.status < 400:
+        return
+    try:
+        json_response = await response.json(content_type=None)
+        vault_error_code = json_response.get('vault_error_code')
+        tracing_id = json_response.get('tracing_id')
+        message = json_response.get('message')
+        error_message = (
+            f'Request to url <{response.url}> '
+            f'failed with HTTP Code <{response.status}>, '
+            f'Vault Error Code: <{vault_error_code}>, '
+            f'Tracing ID <{tracing_id}>, '
+            f'Message: <{message}>'
+        )
+    except (ValueError, AttributeError):
+        # If the response does not contain a JSON object
+        error_message = (
+            'Request to url %s failed with http code %s, body: %s' % (
+                response.url, response.status, await response.read())
+        )
+    raise requests.HTTPError(error_message)
+
+
+class AsyncRestAPIClient:
+    """An asyncio HTTP client for one Vault REST API, built on
+    :mod:`aiohttp`. The awaitable counterpart of
+    :class:`tmvault.rest_api.RestAPIClient`.
+
+    The underlying :class:`aiohttp.ClientSession` is created lazily on the
+    first request, so the client can be constructed outside a running event
+    loop.
+
+    :param base_api_uri: The base URL of the API, e.g. the core API URL.
+    :type base_api_uri: str
+    :param access_token: The service account token used to authenticate.
+    :type access_token: str
+    :param pool_maxsize: The maximum number of connections, and therefore
+                         requests in flight, to the API. It also caps the
+                         `concurrency` of the methods that send requests
+                         concurrently, and `batch_get_concurrency`.
+                         Defaults to 100.
+    :type pool_maxsize: int
+    :param retry_policy: How failed requests are retried. Defaults to
+                         :class:`tmvault.rest_api.RetryPolicy` with its
+                         default settings.
+    :type retry_policy: :class:`tmvault.rest_api.RetryPolicy`
+    :param circuit_breaker_policy: When to stop sending requests to a failing
+                                   endpoint. Defaults to
+                                   :class:`tmvault.rest_api.CircuitBreakerPolicy`
+                                   with its default settings.
+    :type circuit_breaker_policy:
+        :class:`tmvault.rest_api.CircuitBreakerPolicy`
+    :param json_codec: The JSON codec, or name of the JSON library, used to
+                       encode request bodies and decode responses. Defaults
+                       to the fastest one installed, see
+                       :func:`tmvault.codec.get_codec`.
+    :type json_codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    :param batch_get_chunk_size: The maximum number of IDs sent in one
+                                 batchGet request by :meth:`batch_get`.
+                                 Defaults to 100.
+    :type batch_get_chunk_size: int
+    :param batch_get_concurrency: The maximum number of batchGet chunks
+                                  requested at the same time by one call.
+                                  Defaults to 8.
+    :type batch_get_concurrency: int
+    :param connect_timeout: The maximum number of seconds to wait for a
+                            connection to the API to be established.
+                            Defaults to 3.05.
+    :type connect_timeout: float
+    :param read_timeout: The maximum number of seconds to wait for the API to
+                         send data once connected. Defaults to 30.
+    :type read_timeout: float
+    :param latency_buckets: The upper bounds, in seconds, of the latency
+                            histogram recorded for each endpoint. Defaults to
+                            5ms to 10s.
+    :type latency_buckets: Sequence[float]
+    """
+
+    def __init__(
+        self,
+        base_api_uri: str,
+        access_token: str,
+        pool_maxsize: int = DEFAULT_ASYNC_POOL_MAXSIZE,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker_policy: CircuitBreakerPolicy = None,
+        json_codec: Union[str, JSONCodec] = None,
+        batch_get_chunk_size: int = DEFAULT_BATCH_GET_CHUNK_SIZE,
+        batch_get_concurrency: int = DEFAULT_BATCH_GET_CONCURRENCY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        self.headers = {
+            'X-Auth-Token': access_token
+        }
+        self.api_uri = base_api_uri
+        self.retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy()
+        )
+        self._circuit_breakers = CircuitBreakers(
+            base_api_uri,
+            circuit_breaker_policy if circuit_breaker_policy is not None
+            else CircuitBreakerPolicy()
+        )
+        self.json_codec = get_codec(json_codec)
+        if batch_get_chunk_size < 1:
+            raise ValueError('batch_get_chunk_size must be at least 1')
+        if batch_get_concurrency < 1:
+            raise ValueError('batch_get_concurrency must be at least 1')
+        self.pool_maxsize = pool_maxsize
+        self.batch_get_chunk_size = batch_get_chunk_size
+        self.batch_get_concurrency = min(batch_get_concurrency, pool_maxsize)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._metrics = RequestMetrics(latency_buckets)
+        self._session = None
+
+    def max_concurrency(self, concurrency: int) -> int:
+        """
+        :return: `concurrency`, capped at `pool_maxsize`, for the methods
+                 that send requests to the API concurrently.
+        :rtype: int
+        :raises ValueError: If `concurrency` is less than 1.
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        return min(concurrency, self.pool_maxsize)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize)
+            )
+        return self._session
+
+    async def get(
+        self,
+        endpoint_path: str,
+        params: Dict[str, any] = {},
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
+        """Performs an HTTP GET request to the Vault REST API and returns the
+        json-encoded response.
+
+        :param endpoint_path: API endpoint path, starting with /
+        :type endpoint_path: str
+        :param params: Dictionary of query parameters
+        :type params: Dict[str, any]
+        :param timeout: The deadline for the request, including retries, in
+                        seconds or as a :class:`tmvault.rest_api.Deadline`.
+                        Optional, defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises requests.HTTPError: If the HTTP request returned an error
+                                    status code (4xx, 5xx)
+        :raises tmvault.errors.DeadlineExceededError: If the deadline passes
+        :rtype: dict
+        """
+        return await self._request(
+            'GET', endpoint_path, params=_query_params(params),
+            deadline=as_deadline(timeout)
+        )
+
+    async def batch_get(
+        self,
+        endpoint_path: str,
+        collection: str,
+        ids: Iterable[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """Performs a batchGet request for any number of IDs, in concurrent
+        chunks. See :meth:`tmvault.rest_api.RestAPIClient.batch_get`.
+
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
+        """
+        deadline = as_deadline(timeout)
+        ids = unique_ids(ids)
+        semaphore = asyncio.Semaphore(self.batch_get_concurrency)
+
+        async def get_chunk(chunk):
+            async with semaphore:
+                return await self.get(endpoint_path, {'ids': chunk}, deadline)
+
+        responses = await asyncio.gather(*(
+            get_chunk(chunk)
+            for chunk in chunk_ids(ids, self.batch_get_chunk_size)
+        ))
+        return merge_batch_responses(ids, responses, collection)
+
+    async def post(
+        self,
+        endpoint_path: str,
+        data: Dict[str, any],
+        request_id: str = None,
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
+        """Performs an HTTP POST request to the Vault REST API and returns the
+        json-encoded response.
+
+        :param endpoint_path: API endpoint path
+        :type endpoint_path: str
+        :param data: JSON dictionary to post
+        :type data: Dict[str, any]
+        :param request_id: The idempotency key sent to Vault. Every retry of
+                           this call reuses it. Optional, defaults to a
+                           random UUID4 string.
+        :type request_id: str
+        :raises requests.HTTPError: If the HTTP request returned an error
+                                    status code (4xx, 5xx)
+        :rtype: dict
+        """
+        post_json = {'request_id': request_id or str(uuid4()), **data}
+        return await self._request(
+            'POST', endpoint_path, json=post_json,
+            deadline=as_deadline(timeout)
+        )
+
+    async def put(
+        self,
+        endpoint_path: str,
+        data: Dict[str, any],
+        request_id: str = None,
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
+        """Performs an HTTP PUT request to the Vault REST API and returns the
+        json-encoded response.
+
+        :param endpoint_path: API endpoint path
+        :type endpoint_path: str
+        :param data: JSON dictionary to put
+        :type data: Dict[str, any]
+        :param request_id: The idempotency key sent to Vault. Every retry of
+                           this call reuses it. Optional, defaults to a
+                           random UUID4 string.
+        :type request_id: str
+        :raises requests.HTTPError: If the HTTP request returned an error
+                                    status code (4xx, 5xx)
+        :rtype: dict
+        """
+        put_json = {'request_id': request_id or str(uuid4()), **data}
+        return await self._request(
+            'PUT', endpoint_path, json=put_json,
+            deadline=as_deadline(timeout)
+        )
+
+    async def _request(
+        self,
+        method: str,
+        endpoint_path: str,
+        params: List[Tuple[str, str]] = None,
+        json: Dict[str, any] = None,
+        deadline: Deadline = None
+    ) -> dict:
+        deadline = deadline if deadline is not None else Deadline()
+        operation = f'{method} {endpoint_path}'
+        url = f'{self.api_uri}{endpoint_path}'
+        body, headers = None, None
+        if json is not None:
+            body = self.json_codec.dumps(json)
+            headers = {'Content-Type': 'application/json'}
+        template = endpoint_template(endpoint_path)
+        circuit_breaker = self._circuit_breakers.get(template)
+        endpoint_metrics = self._metrics.get(method, template)
+        request_bytes = len(body or b'')
+        attempt = 0
+        while True:
+            deadline.check(operation)
+            if attempt > 0:
+                endpoint_metrics.record_retry()
+            connect_timeout, read_timeout = deadline.timeouts(
+                self.connect_timeout, self.read_timeout
+            )
+            circuit_token = circuit_breaker.before_call()
+            start = time.monotonic()
+            recorded = False
+            try:
+                async with self._get_session().request(
+                    method, url, params=params, data=body, headers=headers,
+                    timeout=aiohttp.ClientTimeout(
+                        total=deadline.remaining(),
+                        sock_connect=connect_timeout,
+                        sock_read=read_timeout
+                    )
+                ) as response:
+                    content = await response.read()
+                    duration = time.monotonic() - start
+                    circuit_breaker.record(
+                        circuit_token, response.status >= 500, duration
+                    )
+                    endpoint_metrics.record(
+                        duration, str(response.status), request_bytes,
+                        len(content)
+                    )
+                    recorded = True
+                    if not self.retry_policy.should_retry(
+                        attempt, response.status
+                    ):
+                        await raise_for_status(response)
+                        return self.json_codec.loads(content)
+                    delay = self.retry_policy.backoff(
+                        attempt, response.headers.get('Retry-After')
+                    )
+                    if not deadline.allows(delay):
+                        await raise_for_status(response)
+                        return self.json_codec.loads(content)
+                    log.debug(
+                        f'{method} {url} failed with HTTP Code '
+                        f'<{response.status}>, retrying in {delay:.2f}s...'
+                    )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not recorded:
+                    self._record_error(
+                        circuit_breaker, circuit_token, endpoint_metrics,
+                        start, request_bytes
+                    )
+                if deadline.expired():
+                    raise DeadlineExceededError(
+                        operation, deadline.timeout_seconds
+                    ) from e
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                if not deadline.allows(delay):
+                    raise
+                log.debug(
+                    f'{method} {url} failed with {e!r}, '
+                    f'retrying in {delay:.2f}s...'
+                )
+            except Exception:
+                if not recorded:
+                    self._record_error(
+                        circuit_breaker, circuit_token, endpoint_metrics,
+                        start, request_bytes
+                    )
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _record_error(
+        circuit_breaker: CircuitBreaker,
+        circuit_token: Optional[int],
+        endpoint_metrics: EndpointMetrics,
+        start: float,
+        request_bytes: int
+    ) -> None:
+        duration = time.monotonic() - start
+        circuit_breaker.record(circuit_token, True, duration)
+        endpoint_metrics.record(duration, 'error', request_bytes, 0)
+
+    def circuit_states(self) -> Dict[str, CircuitState]:
+        """The state of the circuit breaker of every endpoint template this
+        client has called, e.g. `/v1/accounts/{id}`.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.CircuitState`]
+        """
+        return self._circuit_breakers.states()
+
+    def metrics(self) -> Dict[str, EndpointMetrics]:
+        """See :meth:`tmvault.rest_api.RestAPIClient.metrics`.
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self, api: str = None) -> str:
+        """See :meth:`tmvault.rest_api.RestAPIClient.prometheus_metrics`.
+        """
+        return prometheus_text({api or self.api_uri: self.metrics()})
+
+    async def close(self) -> None:
+        """Closes every pooled connection held by this client."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
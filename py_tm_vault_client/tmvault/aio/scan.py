@@ -0,0 +1,114 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, List, Tuple
+
+from .ordering import merge_ordered
+from .prefetch import prefetch
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+from ..rest_api.ordering import order_by_parts
+from ..rest_api.scan import SliceScan, TimeSlice
+
+
+class AsyncSliceScan(SliceScan):
+    """The awaitable counterpart of :class:`tmvault.rest_api.scan.SliceScan`,
+    which reads slices in tasks and whose `fetch_page` is a coroutine.
+    """
+
+    async def _scan_slice(
+        self,
+        time_slice: TimeSlice,
+        order_by: List[TransactionOrderBy],
+        descending: bool
+    ) -> Tuple[List[Transaction], List[TimeSlice]]:
+        page = await self._fetch_page(time_slice, order_by)
+        transactions, read = [], 0
+        while True:
+            transactions.extend(
+                t for t in page if t.id_ not in time_slice.skip_ids
+            )
+            read += len(page)
+            if not page.is_next_page():
+                return transactions, []
+            rest = self._split_rest(
+                time_slice, transactions, read, descending
+            )
+            if rest:
+                return transactions, rest
+            page = await page.get_next_page(self._deadline)
+
+    async def _scan_in_order(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> AsyncIterator[Transaction]:
+        descending = order_by_parts(order_by)[0][1]
+        # Each entry is a slice and, once started, the task reading it
+        entries: Deque[list] = deque([s, None] for s in slices)
+        running = 0
+        try:
+            while entries:
+                for entry in entries:
+                    if running >= self._concurrency:
+                        break
+                    if entry[1] is None:
+                        entry[1] = asyncio.ensure_future(self._scan_slice(
+                            entry[0], order_by, descending
+                        ))
+                        running += 1
+                _, task = entries.popleft()
+                transactions, rest = await task
+                running -= 1
+                entries.extendleft([s, None] for s in reversed(rest))
+                for transaction in transactions:
+                    yield transaction
+        finally:
+            for _, task in entries:
+                if task is not None:
+                    task.cancel()
+
+    async def _scan_unordered(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> AsyncIterator[Transaction]:
+        pending = deque(slices)
+        running = set()
+        try:
+            while pending or running:
+                while pending and len(running) < self._concurrency:
+                    running.add(asyncio.ensure_future(self._scan_slice(
+                        pending.popleft(), order_by, True
+                    )))
+                done, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    transactions, rest = task.result()
+                    pending.extend(rest)
+                    for transaction in transactions:
+                        yield transaction
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _scan_merged(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> AsyncIterator[Transaction]:
+        slots = asyncio.Semaphore(self._concurrency)
+
+        async def stream(time_slice: TimeSlice) -> AsyncIterator[Transaction]:
+            async def pages():
+                async with slots:
+                    page = await self._fetch_page(time_slice, order_by)
+                yield page
+                while page.is_next_page():
+                    async with slots:
+                        page = await page.get_next_page(self._deadline)
+                    yield page
+            async for page in prefetch(pages(), 1):
+                for transaction in page:
+                    yield transaction
+        return merge_ordered([stream(s) for s in slices], order_by)
@@ -0,0 +1,512 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import (
+    Any, AsyncIterator, Callable, Dict, Iterable, List, Union
+)
+
+from .ingestion import create_all
+from .prefetch import prefetch
+from .query_planner import fan_out
+from .rest_api_client import AsyncRestAPIClient
+from .scan import AsyncSliceScan
+from ..const import (
+    DEFAULT_AMOUNT_SCALE, DEFAULT_CREATE_CONCURRENCY,
+    DEFAULT_CREATE_LOG_SECONDS, DEFAULT_FAN_OUT_CONCURRENCY,
+    DEFAULT_ID_FILTER_GROUP_SIZE, DEFAULT_PREFETCH_PAGES,
+    DEFAULT_RETRY_INTERVAL, DEFAULT_RETRY_SECONDS, DEFAULT_SCAN_CONCURRENCY,
+    DEFAULT_SCAN_MAX_SLICE_PAGES, DEFAULT_SCAN_MIN_SLICE_SECONDS,
+    DEFAULT_SCAN_SLICES, DEFAULT_RETRY_BACKOFF_MAX_WAIT
+)
+from ..enums import (
+    TransactionDirection, TransactionOrderBy, TransactionRejectionCode,
+    TransactionStatus
+)
+from ..errors import TransactionsNotFoundError
+from ..models import Transaction
+from ..models.subsidiary import ChargeAmount
+from ..rest_api.aggregation import TransactionAggregates, aggregate_columns
+from ..rest_api.batch import BatchGetResult
+from ..rest_api.columnar import TransactionColumns, TransactionColumnsBuilder
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.filters import TransactionFilters
+from ..rest_api.ingestion import (
+    CreateTransactionResult, CreateTransactionsReport, IngestionCheckpoint,
+    IngestionProgress
+)
+from ..rest_api.query_planner import split_id_filters
+from ..rest_api.records import record_factory
+from ..rest_api.scan import TimeSlice
+from ..rest_api.transactions import (
+    TransactionsList, _list_transactions_params, _transaction_to_create
+)
+from ..utils import get_logger
+
+log = get_logger(__name__)
+
+
+class AsyncTransactionsList(TransactionsList):
+    """A :class:`tmvault.rest_api.TransactionsList` whose `get_next_page()`
+    method is awaitable.
+    """
+
+    async def get_next_page(
+        self, timeout: Union[float, Deadline] = None
+    ) -> 'AsyncTransactionsList':
+        """
+        :param timeout: The deadline for getting the page, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: The next page of (up to) 100 transactions.
+        :rtype: :class:`tmvault.aio.AsyncTransactionsList`
+        """
+        if not self.page_token:
+            return AsyncTransactionsList([], self.transactions_api, "")
+        return await self.transactions_api._list_transactions(
+            self.filters, self.order_by, self.page_token, as_deadline(timeout)
+        )
+
+
+class AsyncTransactionsAPI:
+    """The awaitable counterpart of :class:`tmvault.rest_api.TransactionsAPI`.
+    """
+
+    def __init__(self, rest_api_client: AsyncRestAPIClient) -> None:
+        self._rest_api_client = rest_api_client
+
+    async def batch_get_transactions(
+        self,
+        transaction_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.batch_get_transactions`.
+        """
+        return (await self._rest_api_client.batch_get(
+            '/v1/transactions:batchGet', 'transactions', transaction_ids,
+            timeout
+        )).map(Transaction.from_json)
+
+    async def create_transaction(
+        self,
+        transaction_id: str = None,
+        account_id: str = None,
+        charge_amount: ChargeAmount = None,
+        is_credit: bool = None,
+        reference: str = None,
+        status: TransactionStatus = None,
+        value_timestamp: datetime = None,
+        booking_timestamp: datetime = None,
+        payee_id: str = None,
+        payment_order_id: str = None,
+        posting_instruction_batch_ids: List[str] = None,
+        rejection_code: TransactionRejectionCode = None,
+        timeout: Union[float, Deadline] = None
+    ) -> Transaction:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.create_transaction`.
+        """
+        post_response = await self._rest_api_client.post(
+            "/v1/transactions", {
+                "transaction": _transaction_to_create(
+                    transaction_id,
+                    account_id,
+                    charge_amount,
+                    is_credit,
+                    reference,
+                    status,
+                    value_timestamp,
+                    booking_timestamp,
+                    payee_id,
+                    payment_order_id,
+                    posting_instruction_batch_ids,
+                    rejection_code,
+                )
+            }, timeout=timeout
+        )
+        return Transaction.from_json(post_response)
+
+    async def create_transactions(
+        self,
+        transactions: Iterable[Dict[str, Any]],
+        concurrency: int = DEFAULT_CREATE_CONCURRENCY,
+        checkpoint_path: str = None,
+        on_result: Callable[[CreateTransactionResult], None] = None,
+        log_seconds: float = DEFAULT_CREATE_LOG_SECONDS,
+        timeout: Union[float, Deadline] = None
+    ) -> CreateTransactionsReport:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.create_transactions`.
+        """
+        deadline = as_deadline(timeout)
+
+        async def create(transaction: Dict[str, Any], request_id: str):
+            post_response = await self._rest_api_client.post(
+                '/v1/transactions', {'transaction': transaction},
+                request_id=request_id, timeout=deadline
+            )
+            return Transaction.from_json(post_response)
+
+        checkpoint = (
+            IngestionCheckpoint(checkpoint_path) if checkpoint_path else None
+        )
+        try:
+            return await create_all(
+                transactions,
+                lambda kwargs: _transaction_to_create(**kwargs),
+                create,
+                self._rest_api_client.max_concurrency(concurrency),
+                IngestionProgress(checkpoint, on_result, log_seconds),
+                deadline,
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+    async def list_transactions(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        timeout: Union[float, Deadline] = None
+    ) -> AsyncTransactionsList:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.list_transactions`.
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        return await self._list_transactions(
+            filters, order_by, deadline=as_deadline(timeout)
+        )
+
+    async def list_transactions_when_exists(
+            self,
+            account_ids: List[str] = None,
+            payment_order_ids: List[str] = None,
+            payee_ids: List[str] = None,
+            direction: TransactionDirection = None,
+            statuses: List[TransactionStatus] = None,
+            value_timestamp_range: Dict[str, datetime] = None,
+            booking_timestamp_range: Dict[str, datetime] = None,
+            last_update_timestamp_range: Dict[str, datetime] = None,
+            charge_amount_value_range: Dict[str, str] = None,
+            order_by: List[TransactionOrderBy] = None,
+            max_retry_seconds: int = DEFAULT_RETRY_SECONDS,
+            retry_interval_seconds: int = DEFAULT_RETRY_INTERVAL,
+            timeout: Union[float, Deadline] = None
+    ) -> AsyncTransactionsList:
+        """See
+        :meth:`tmvault.rest_api.TransactionsAPI.list_transactions_when_exists`.
+        """
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        waiting = Deadline(max_retry_seconds)
+        interval = retry_interval_seconds
+        while True:
+            transactions = await self._list_transactions(
+                filters, order_by, deadline=deadline
+            )
+            if len(transactions) > 0:
+                return transactions
+            if waiting.expired():
+                break
+            log.debug("Cannot find any transactions, retrying...")
+            deadline.check('waiting for transactions to exist')
+            await asyncio.sleep(deadline.cap(waiting.cap(interval)))
+            interval = min(interval * 2, DEFAULT_RETRY_BACKOFF_MAX_WAIT)
+        log.debug("Failed to find any transactions after waiting")
+        raise TransactionsNotFoundError(
+            "Cannot find any transactions for the list criteria used"
+        )
+
+    async def iter_transactions(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        id_filter_group_size: int = DEFAULT_ID_FILTER_GROUP_SIZE,
+        concurrency: int = DEFAULT_FAN_OUT_CONCURRENCY,
+        timeout: Union[float, Deadline] = None
+    ) -> AsyncIterator[Transaction]:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.iter_transactions`.
+        Use it with `async for`.
+        """
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+
+        async def pages(
+            id_filters: Dict[str, List[str]]
+        ) -> AsyncIterator[AsyncTransactionsList]:
+            page = await self._list_transactions(
+                filters.replace(**id_filters), order_by, deadline=deadline
+            )
+            yield page
+            while page.is_next_page():
+                page = await page.get_next_page(deadline)
+                yield page
+
+        queries = split_id_filters({
+            'account_ids': account_ids,
+            'payment_order_ids': payment_order_ids,
+            'payee_ids': payee_ids,
+        }, id_filter_group_size)
+        if len(queries) > 1:
+            async for transaction in fan_out(
+                pages, queries, order_by, prefetch_pages,
+                self._rest_api_client.max_concurrency(concurrency)
+            ):
+                yield transaction
+            return
+        async for page in prefetch(pages(queries[0]), prefetch_pages):
+            for transaction in page:
+                yield transaction
+
+    def scan_transactions(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        slice_by: str = 'last_update_timestamp',
+        slices: int = DEFAULT_SCAN_SLICES,
+        concurrency: int = DEFAULT_SCAN_CONCURRENCY,
+        ordered: bool = False,
+        max_slice_pages: int = DEFAULT_SCAN_MAX_SLICE_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> AsyncIterator[Transaction]:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.scan_transactions`.
+        Use it with `async for`.
+        """
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        slice_range = f'{slice_by}_range'
+
+        async def fetch_page(
+            time_slice: TimeSlice, slice_order_by: List[TransactionOrderBy]
+        ) -> AsyncTransactionsList:
+            return await self._list_transactions(
+                filters.replace(**{slice_range: time_slice.as_range()}),
+                slice_order_by,
+                deadline=deadline
+            )
+
+        return AsyncSliceScan(
+            fetch_page,
+            slice_by,
+            slices,
+            self._rest_api_client.max_concurrency(concurrency),
+            max_slice_pages,
+            timedelta(seconds=DEFAULT_SCAN_MIN_SLICE_SECONDS),
+            deadline
+        ).scan(getattr(filters, slice_range, None), order_by, ordered)
+
+    async def iter_transaction_records(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        fields: List[str] = None,
+        as_rows: bool = False,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> AsyncIterator[Union[dict, tuple]]:
+        """See
+        :meth:`tmvault.rest_api.TransactionsAPI.iter_transaction_records`.
+        """
+        to_record = record_factory(fields, as_rows)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        async for page in prefetch(pages, prefetch_pages):
+            for transaction in page:
+                yield to_record(transaction)
+
+    async def export_columns(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> TransactionColumns:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.export_columns`."""
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        return await self._export_columns(pages, scale, prefetch_pages)
+
+    async def _export_columns(
+        self,
+        pages: AsyncIterator[List[dict]],
+        scale: int,
+        prefetch_pages: int
+    ) -> TransactionColumns:
+        builder = TransactionColumnsBuilder(scale)
+        async for rows in prefetch(pages, prefetch_pages):
+            builder.add_page(rows)
+        return builder.build()
+
+    async def aggregate(
+        self,
+        group_by: List[str],
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        time_field: str = 'value_timestamp',
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> TransactionAggregates:
+        """See :meth:`tmvault.rest_api.TransactionsAPI.aggregate`."""
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        columns = await self._export_columns(pages, scale, prefetch_pages)
+        return aggregate_columns(columns, group_by, time_field)
+
+    async def _transaction_pages_json(
+        self,
+        filters: TransactionFilters,
+        order_by: List[TransactionOrderBy] = None,
+        deadline: Deadline = None
+    ) -> AsyncIterator[List[dict]]:
+        page_token = None
+        while True:
+            params = _list_transactions_params(filters, order_by, page_token)
+            json_response = await self._rest_api_client.get(
+                '/v1/transactions', params, deadline
+            )
+            yield json_response['transactions']
+            page_token = json_response.get('next_page_token')
+            if not page_token:
+                return
+
+    async def _list_transactions(
+        self,
+        filters: TransactionFilters,
+        order_by: List[TransactionOrderBy] = None,
+        page_token: str = None,
+        deadline: Deadline = None,
+    ) -> AsyncTransactionsList:
+        params = _list_transactions_params(filters, order_by, page_token)
+        json_response = await self._rest_api_client.get(
+            '/v1/transactions', params, deadline
+        )
+        return AsyncTransactionsList(
+            list(map(Transaction.from_json, json_response['transactions'])),
+            self,
+            json_response.get('next_page_token'),
+            order_by=order_by,
+            **filters.as_dict()
+        )
@@ -1,11 +1,26 @@
-import os
+import threading
+import time
+from typing import Dict, Optional, Union
 from uuid import uuid4
 
-from .config import VaultConfig
+from .codec import JSONCodec, get_codec
+from .config import VaultConfig, default_config_path
+from .const import (
+    DEFAULT_BATCH_GET_CHUNK_SIZE, DEFAULT_BATCH_GET_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_MAXSIZE, DEFAULT_READ_TIMEOUT,
+    WATCHER_RETRY_SECONDS
+)
 from .rest_api import (
-    RestAPIClient, AccountsAPI, CustomersAPI, TransactionsAPI, PaymentsAPI
+    RestAPIClient, AccountsAPI, CustomersAPI, TransactionsAPI, PaymentsAPI,
+    CircuitBreakerPolicy, CircuitState, EndpointMetrics, PoolStats,
+    RateLimit, RateLimiterStats, RetryPolicy, SingleFlightStats,
+    RoutingCache, RoutingCacheStats, TransactionCache, TransactionCacheStats,
+    prometheus_text
 )
-from .stream_api import TransactionsStreamAPI
+from .stream_api import TransactionsStreamAPI, TransactionWatcher
+from .utils import get_logger
+
+log = get_logger(__name__)
 
 
 class TMVaultClient:
@@ -28,33 +43,138 @@ class TMVaultClient:
                      group.
                      Optional, defaults to a random UUID4 string.
     :type group_id: str
+    :param pool_maxsize: The maximum number of keep-alive connections kept
+                         open to each of the core, XPL and Payments Hub APIs.
+                         Raise this if many threads share the client.
+                         It also caps the `concurrency` of the methods that
+                         send requests concurrently, see
+                         :class:`tmvault.rest_api.RestAPIClient`.
+                         Optional, defaults to 10.
+    :type pool_maxsize: int
+    :param retry_policy: How failed REST requests are retried.
+                         Optional, defaults to
+                         :class:`tmvault.rest_api.RetryPolicy` with its
+                         default settings.
+    :type retry_policy: :class:`tmvault.rest_api.RetryPolicy`
+    :param rate_limits: Client-side rate limits keyed by `core`, `xpl` or
+                        `payments_hub`. Limits are shared by every client and
+                        thread in the process talking to the same API URL.
+                        Optional, defaults to no limits.
+    :type rate_limits: Dict[str, :class:`tmvault.rest_api.RateLimit`]
+    :param circuit_breaker_policy: When to stop sending requests to a failing
+                                   REST endpoint. Optional, defaults to
+                                   :class:`tmvault.rest_api.CircuitBreakerPolicy`
+                                   with its default settings.
+    :type circuit_breaker_policy:
+        :class:`tmvault.rest_api.CircuitBreakerPolicy`
+    :param json_codec: The JSON codec, or name of the JSON library, used for
+                       REST bodies and Stream API messages. Optional,
+                       defaults to the fastest one installed, see
+                       :func:`tmvault.codec.get_codec`.
+    :type json_codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    :param coalesce_gets: If True, identical REST GET requests made
+                          concurrently, e.g. by several threads reading the
+                          same account, share one network request.
+                          Optional, defaults to True.
+    :type coalesce_gets: bool
+    :param batch_get_chunk_size: The maximum number of IDs sent in one
+                                 batchGet request, e.g. by
+                                 `transactions.batch_get_transactions`.
+                                 Optional, defaults to 100.
+    :type batch_get_chunk_size: int
+    :param batch_get_concurrency: The maximum number of batchGet chunks
+                                  requested at the same time by one call.
+                                  Optional, defaults to 8.
+    :type batch_get_concurrency: int
+    :param connect_timeout: The maximum number of seconds to wait for a
+                            connection to the API to be established.
+                            Optional, defaults to 3.05.
+    :type connect_timeout: float
+    :param read_timeout: The maximum number of seconds to wait for the API to
+                         send data once connected. Every method also takes a
+                         `timeout` for the whole operation. Optional,
+                         defaults to 30.
+    :type read_timeout: float
+    :param transaction_cache_size: If above 0, the maximum number of
+                                   transactions cached by
+                                   `transactions.batch_get_transactions`.
+                                   The cache is kept up to date by watching
+                                   the Stream API, so it needs Kafka.
+                                   Optional, defaults to 0, no cache.
+    :type transaction_cache_size: int
+    :param cache_routing_details: If True, the UK sort codes and account
+                                  numbers of accounts are cached, as they
+                                  never change, so reading an account again
+                                  sends one request instead of three.
+                                  Optional, defaults to True.
+    :type cache_routing_details: bool
+    :param routing_cache_path: A SQLite database file the routing cache is
+                               also kept in, so it survives restarts.
+                               Optional, defaults to memory only.
+    :type routing_cache_path: str
     """
 
     def __init__(
         self,
         config_path: str = None,
-        group_id: str = None
+        group_id: str = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        retry_policy: RetryPolicy = None,
+        rate_limits: Dict[str, RateLimit] = None,
+        circuit_breaker_policy: CircuitBreakerPolicy = None,
+        json_codec: Union[str, JSONCodec] = None,
+        coalesce_gets: bool = True,
+        batch_get_chunk_size: int = DEFAULT_BATCH_GET_CHUNK_SIZE,
+        batch_get_concurrency: int = DEFAULT_BATCH_GET_CONCURRENCY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        transaction_cache_size: int = 0,
+        cache_routing_details: bool = True,
+        routing_cache_path: str = None
     ) -> None:
-        config_path = config_path if config_path else os.path.join(
-            os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            ),
-            'data/vault-config.json'
-        )
+        config_path = config_path if config_path else default_config_path()
         config = VaultConfig.from_json_file_path(config_path)
 
+        rate_limits = rate_limits or {}
+        unknown_apis = set(rate_limits) - {'core', 'xpl', 'payments_hub'}
+        if unknown_apis:
+            raise ValueError(f'Unknown APIs in rate_limits: {unknown_apis}')
+
         self._bootstrap_servers = config.kafka_url
         self._group_id = group_id if group_id else str(uuid4())
+        self._json_codec = get_codec(json_codec)
 
         # Set up REST base clients
+        rest_kwargs = dict(
+            pool_maxsize=pool_maxsize,
+            retry_policy=retry_policy,
+            circuit_breaker_policy=circuit_breaker_policy,
+            json_codec=self._json_codec,
+            coalesce_gets=coalesce_gets,
+            batch_get_chunk_size=batch_get_chunk_size,
+            batch_get_concurrency=batch_get_concurrency,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout
+        )
         self._core_rest_api = RestAPIClient(
-            config.core_api_url, config.service_account_token
+            config.core_api_url, config.service_account_token,
+            rate_limit=rate_limits.get('core'),
+            **rest_kwargs
         )
         self._xpl_rest_api = RestAPIClient(
-            config.xpl_api_url, config.service_account_token
+            config.xpl_api_url, config.service_account_token,
+            rate_limit=rate_limits.get('xpl'),
+            **rest_kwargs
         )
         self._payments_hub_rest_api = RestAPIClient(
-            config.payments_hub_api_url, config.service_account_token
+            config.payments_hub_api_url, config.service_account_token,
+            rate_limit=rate_limits.get('payments_hub'),
+            **rest_kwargs
+        )
+
+        self._routing_cache = (
+            RoutingCache(routing_cache_path)
+            if cache_routing_details else None
         )
 
         # Declare REST API clients
@@ -65,6 +185,158 @@ class TMVaultClient:
 
         # Declare Stream API clients
         self._transactions_stream_api = None
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
+        self._watcher_retry_at = 0.0
+        self._transaction_cache = (
+            TransactionCache(transaction_cache_size)
+            if transaction_cache_size > 0 else None
+        )
+
+    def pool_stats(self) -> Dict[str, PoolStats]:
+        """Connection pool statistics for each of the REST APIs, keyed by
+        `core`, `xpl` and `payments_hub`. A healthy client reuses far more
+        connections than it opens.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.PoolStats`]
+        """
+        return {
+            'core': self._core_rest_api.pool_stats,
+            'xpl': self._xpl_rest_api.pool_stats,
+            'payments_hub': self._payments_hub_rest_api.pool_stats,
+        }
+
+    def rate_limit_stats(self) -> Dict[str, RateLimiterStats]:
+        """How long requests to each of the REST APIs have waited on the
+        client-side rate limits, keyed by `core`, `xpl` and `payments_hub`.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.RateLimiterStats`]
+        """
+        return {
+            'core': self._core_rest_api.rate_limiter.stats(),
+            'xpl': self._xpl_rest_api.rate_limiter.stats(),
+            'payments_hub': self._payments_hub_rest_api.rate_limiter.stats(),
+        }
+
+    def single_flight_stats(self) -> Dict[str, SingleFlightStats]:
+        """How many concurrent, identical GET requests to each of the REST
+        APIs were coalesced into one, keyed by `core`, `xpl` and
+        `payments_hub`.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.SingleFlightStats`]
+        """
+        return {
+            'core': self._core_rest_api.single_flight_stats(),
+            'xpl': self._xpl_rest_api.single_flight_stats(),
+            'payments_hub': self._payments_hub_rest_api.single_flight_stats(),
+        }
+
+    def routing_cache_stats(self) -> RoutingCacheStats:
+        """How often `accounts` found the UK sort code and account number of
+        an account in the routing cache. All zero if there is no cache.
+
+        :rtype: :class:`tmvault.rest_api.RoutingCacheStats`
+        """
+        if self._routing_cache is None:
+            return RoutingCacheStats()
+        return self._routing_cache.stats()
+
+    def transaction_cache_stats(self) -> TransactionCacheStats:
+        """How often `transactions.batch_get_transactions` was answered from
+        the transaction cache. All zero if there is no cache.
+
+        :rtype: :class:`tmvault.rest_api.TransactionCacheStats`
+        """
+        if self._transaction_cache is None:
+            return TransactionCacheStats()
+        return self._transaction_cache.stats()
+
+    def circuit_states(self) -> Dict[str, Dict[str, CircuitState]]:
+        """The state of every REST endpoint's circuit breaker, keyed by
+        `core`, `xpl` and `payments_hub`, then by endpoint template.
+
+        :rtype: Dict[str, Dict[str, :class:`tmvault.rest_api.CircuitState`]]
+        """
+        return {
+            'core': self._core_rest_api.circuit_states(),
+            'xpl': self._xpl_rest_api.circuit_states(),
+            'payments_hub': self._payments_hub_rest_api.circuit_states(),
+        }
+
+    def metrics(self) -> Dict[str, Dict[str, EndpointMetrics]]:
+        """The latency, size, status codes and retries of the requests sent
+        to each of the REST APIs, keyed by `core`, `xpl` and `payments_hub`,
+        then by method and endpoint template, e.g. `GET /v1/accounts/{id}`.
+
+        :rtype: Dict[str, Dict[str, :class:`tmvault.rest_api.EndpointMetrics`]]
+        """
+        return {
+            'core': self._core_rest_api.metrics(),
+            'xpl': self._xpl_rest_api.metrics(),
+            'payments_hub': self._payments_hub_rest_api.metrics(),
+        }
+
+    def prometheus_metrics(self) -> str:
+        """The :meth:`metrics` of every REST API in the Prometheus text
+        exposition format, labelled by `api`, `method` and `endpoint`.
+
+        :rtype: str
+        """
+        return prometheus_text(self.metrics())
+
+    def close(self) -> None:
+        """Closes the pooled connections of every REST API client, the
+        transaction watcher if it was started, and the routing cache database
+        if any."""
+        self._core_rest_api.close()
+        self._xpl_rest_api.close()
+        self._payments_hub_rest_api.close()
+        if self._routing_cache is not None:
+            self._routing_cache.close()
+        with self._watcher_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def _transaction_watcher(self) -> Optional[TransactionWatcher]:
+        # Started on first use, as most clients never wait for transactions.
+        # If Kafka is not configured or cannot be used, waiting falls back to
+        # polling the REST API, and a failed start is retried after
+        # WATCHER_RETRY_SECONDS.
+        watcher = self._watcher
+        if watcher is not None or not self._bootstrap_servers:
+            return watcher
+        with self._watcher_lock:
+            if (
+                self._watcher is None
+                and time.monotonic() >= self._watcher_retry_at
+            ):
+                self._watcher = self._start_watcher()
+            return self._watcher
+
+    def _start_watcher(self) -> Optional[TransactionWatcher]:
+        # Called with the watcher lock held
+        try:
+            watcher = TransactionWatcher(
+                self._bootstrap_servers, self._json_codec
+            )
+        except ImportError as e:
+            log.warning(f'Cannot watch transaction events, polling: {e}')
+            self._watcher_retry_at = float('inf')
+            return None
+        except Exception as e:
+            log.warning(
+                f'Cannot watch transaction events, polling and retrying in '
+                f'{WATCHER_RETRY_SECONDS}s: {e}'
+            )
+            self._watcher_retry_at = time.monotonic() + WATCHER_RETRY_SECONDS
+            return None
+        if self._transaction_cache is not None:
+            watcher.add_listener(
+                self._transaction_cache.invalidate,
+                self._transaction_cache.clear
+            )
+        return watcher
 
     @property
     def accounts(self) -> AccountsAPI:
@@ -73,7 +345,8 @@ class TMVaultClient:
         """
         if self._accounts_api is None:
             self._accounts_api = AccountsAPI(
-                self._core_rest_api, self._payments_hub_rest_api
+                self._core_rest_api, self._payments_hub_rest_api,
+                self._routing_cache
             )
         return self._accounts_api
 
@@ -92,7 +365,10 @@ class TMVaultClient:
         See the :doc:`Transactions documentation <transactions>` for details.
         """
         if self._transactions_api is None:
-            self._transactions_api = TransactionsAPI(self._xpl_rest_api)
+            self._transactions_api = TransactionsAPI(
+                self._xpl_rest_api, self._transaction_watcher,
+                self._transaction_cache
+            )
         return self._transactions_api
 
     @property
@@ -103,7 +379,7 @@ class TMVaultClient:
         """
         if self._transactions_stream_api is None:
             self._transactions_stream_api = TransactionsStreamAPI(
-                self._bootstrap_servers, self._group_id)
+                self._bootstrap_servers, self._group_id, self._json_codec)
         return self._transactions_stream_api
 
     @property
@@ -0,0 +1,102 @@
+import json
+from typing import Any, Dict, Union
+
+# Fastest first; the first one installed is used by default
+CODEC_PREFERENCE = ('orjson', 'simdjson', 'ujson', 'json')
+
+
+class JSONCodec:
+    """Encodes and decodes the JSON bodies of REST requests and Stream API
+    messages. The base class uses the standard library :mod:`json` module.
+
+    :ivar name: The name of the underlying JSON library.
+    :vartype name: str
+    """
+    name = 'json'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def __repr__(self) -> str:
+        return f'JSONCodec[name: {self.name}]'
+
+
+class OrjsonCodec(JSONCodec):
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+
+class SimdjsonCodec(JSONCodec):
+    name = 'simdjson'
+
+    def __init__(self) -> None:
+        import simdjson
+        self._simdjson = simdjson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._simdjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+_CODEC_CLASSES = {
+    'orjson': OrjsonCodec,
+    'simdjson': SimdjsonCodec,
+    'ujson': UjsonCodec,
+    'json': JSONCodec,
+}
+_codecs: Dict[str, JSONCodec] = {}
+
+
+def get_codec(codec: Union[str, JSONCodec] = None) -> JSONCodec:
+    """Returns a JSON codec.
+
+    :param codec: A :class:`JSONCodec` instance, which is returned as is, or
+                  the name of a JSON library: `orjson`, `simdjson`, `ujson`
+                  or `json`. Optional, defaults to the fastest library
+                  installed, falling back to the standard library.
+    :type codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    :raises ValueError: If the name is not a supported library.
+    :raises ImportError: If the named library is not installed.
+    :rtype: :class:`tmvault.codec.JSONCodec`
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is not None:
+        if codec not in _CODEC_CLASSES:
+            raise ValueError(
+                f'Unknown JSON codec <{codec}>, '
+                f'expected one of {list(_CODEC_CLASSES)}'
+            )
+        if codec not in _codecs:
+            _codecs[codec] = _CODEC_CLASSES[codec]()
+        return _codecs[codec]
+    for name in CODEC_PREFERENCE:
+        try:
+            return get_codec(name)
+        except ImportError:
+            continue
@@ -12,6 +12,15 @@ REQUIRED_CONFIG_KEYS = {
 }
 
 
+def default_config_path() -> str:
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
+            __file__
+        )))),
+        'data/vault-config.json'
+    )
+
+
 class VaultConfig:
     def __init__(self, config_dict) -> None:
         self.config_dict = config_dict
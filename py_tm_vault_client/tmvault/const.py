@@ -2,3 +2,38 @@ LIST_PAGE_SIZE = 100
 SORT_CODE_BASE = "989999"
 DEFAULT_RETRY_SECONDS = 5
 DEFAULT_RETRY_INTERVAL = 0.5
+DEFAULT_POOL_CONNECTIONS = 1
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_ASYNC_POOL_MAXSIZE = 100
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF_BASE = 0.1
+DEFAULT_RETRY_BACKOFF_MAX = 10
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_CIRCUIT_FAILURE_RATE = 0.5
+DEFAULT_CIRCUIT_WINDOW_SIZE = 20
+DEFAULT_CIRCUIT_MINIMUM_CALLS = 10
+DEFAULT_CIRCUIT_OPEN_SECONDS = 30
+DEFAULT_CIRCUIT_HALF_OPEN_PROBES = 1
+DEFAULT_BATCH_GET_CHUNK_SIZE = 100
+DEFAULT_BATCH_GET_CONCURRENCY = 8
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30
+PAYMENT_POLL_INTERVAL = 0.5
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+DEFAULT_PREFETCH_PAGES = 2
+DEFAULT_SCAN_SLICES = 8
+DEFAULT_SCAN_CONCURRENCY = 8
+DEFAULT_SCAN_MAX_SLICE_PAGES = 10
+DEFAULT_SCAN_MIN_SLICE_SECONDS = 1
+DEFAULT_ID_FILTER_GROUP_SIZE = 50
+DEFAULT_FAN_OUT_CONCURRENCY = 8
+MAX_FAN_OUT_QUERIES = 256
+DEFAULT_AMOUNT_SCALE = 2
+DEFAULT_RETRY_BACKOFF_MAX_WAIT = 4
+STREAM_RECHECK_SECONDS = 5
+WATCHER_RETRY_SECONDS = 30
+DEFAULT_CREATE_CONCURRENCY = 8
+DEFAULT_CREATE_LOG_SECONDS = 10
+DEFAULT_ACCOUNTS_CONCURRENCY = 8
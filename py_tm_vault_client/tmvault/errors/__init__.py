@@ -1,3 +1,6 @@
+from .rest_api import CircuitOpenError, DeadlineExceededError
 from .transactions import TransactionsNotFoundError
 
-__all__ = ['TransactionsNotFoundError']
+__all__ = [
+    'CircuitOpenError', 'DeadlineExceededError', 'TransactionsNotFoundError'
+]
@@ -0,0 +1,43 @@
+class CircuitOpenError(IOError):
+    """
+    Error raised by :class:`tmvault.rest_api.RestAPIClient` instead of
+    sending a request to an endpoint whose circuit breaker is open, because
+    recent requests to it have been failing or slow.
+
+    Error inherits from :class:`IOError`.
+
+    :ivar endpoint: The base URL and endpoint template of the circuit.
+    :vartype endpoint: str
+    :ivar retry_after_seconds: How long until the circuit lets a probe
+                               request through.
+    :vartype retry_after_seconds: float
+    """
+
+    def __init__(self, endpoint: str, retry_after_seconds: float) -> None:
+        super().__init__(
+            f'Circuit for <{endpoint}> is open, failing fast. '
+            f'Retry after {retry_after_seconds:.1f}s'
+        )
+        self.endpoint = endpoint
+        self.retry_after_seconds = retry_after_seconds
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Error raised when an SDK operation runs out of the time given to it via
+    its `timeout` argument, see :class:`tmvault.rest_api.Deadline`.
+
+    Error inherits from :class:`TimeoutError`, and therefore :class:`IOError`.
+
+    :ivar operation: What was being attempted when time ran out.
+    :vartype operation: str
+    :ivar timeout_seconds: The total time the operation was given.
+    :vartype timeout_seconds: float
+    """
+
+    def __init__(self, operation: str, timeout_seconds: float) -> None:
+        super().__init__(
+            f'Deadline of {timeout_seconds:.3f}s exceeded during {operation}'
+        )
+        self.operation = operation
+        self.timeout_seconds = timeout_seconds
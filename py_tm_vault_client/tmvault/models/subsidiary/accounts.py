@@ -168,5 +168,5 @@ class AccountBalance:
             as_of_pib_id=json_obj.get(
                 'as_of_posting_instruction_batch_id'),
             live_balances=list(
-                map(LiveBalance.from_json, json_obj.get('live_balances')))
+                map(LiveBalance.from_json, json_obj.get('live_balances', [])))
         )
@@ -1,13 +1,42 @@
+from .batch import BatchGetResult
+from .circuit_breaker import CircuitBreakerPolicy, CircuitState
+from .deadline import Deadline
+from .ingestion import CreateTransactionResult, CreateTransactionsReport
+from .metrics import EndpointMetrics, prometheus_text
+from .pooling import PoolStats
+from .rate_limit import RateLimit, RateLimiter, RateLimiterStats
+from .retry import RetryPolicy
+from .routing_cache import RoutingCache, RoutingCacheStats
+from .single_flight import SingleFlightStats
 from .rest_api_client import RestAPIClient
 from .accounts import AccountsAPI
 from .customers import CustomersAPI
+from .transaction_cache import TransactionCache, TransactionCacheStats
 from .transactions import TransactionsAPI, TransactionsList
 from .payments import PaymentsAPI
 
 __all__ = [
+    'BatchGetResult',
+    'CircuitBreakerPolicy',
+    'CircuitState',
+    'CreateTransactionResult',
+    'CreateTransactionsReport',
+    'Deadline',
+    'EndpointMetrics',
+    'prometheus_text',
+    'PoolStats',
+    'RateLimit',
+    'RateLimiter',
+    'RateLimiterStats',
+    'RetryPolicy',
+    'RoutingCache',
+    'RoutingCacheStats',
+    'SingleFlightStats',
     'RestAPIClient',
     'AccountsAPI',
     'CustomersAPI',
+    'TransactionCache',
+    'TransactionCacheStats',
     'TransactionsAPI',
     'TransactionsList',
     'PaymentsAPI'
@@ -1,28 +1,182 @@
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from .batch import chunk_ids, unique_ids
+from .deadline import Deadline, as_deadline
 from .rest_api_client import RestAPIClient
-from ..const import LIST_PAGE_SIZE, SORT_CODE_BASE
+from .routing_cache import RoutingCache, RoutingDetails
+from ..const import (
+    DEFAULT_ACCOUNTS_CONCURRENCY, LIST_PAGE_SIZE, SORT_CODE_BASE
+)
 from ..models import Account
-from ..utils import timestamp_now
-from ..enums import AccountStatus
+from ..utils import datetime_to_str, get_logger
+from ..enums import AccountStatus, PostingPhase
+
+log = get_logger(__name__)
 
 CREATE_STATUS = AccountStatus.ACCOUNT_STATUS_OPEN.value
 VIEW = 'ACCOUNT_VIEW_INCLUDE_BALANCES'
 
+# The live balances of an account, keyed by address, asset, phase and
+# denomination
+AccountBalances = Dict[Tuple[str, str, PostingPhase, str], Decimal]
+
+
+def _account_to_create(
+    account_id: str = None,
+    product_id: str = None,
+    stakeholder_customer_ids: List[str] = None,
+    instance_param_vals: Dict[str, str] = None,
+    details: Dict[str, str] = None,
+) -> Dict[str, any]:
+    account_to_create = {
+        'status': CREATE_STATUS
+    }
+    if account_id is not None:
+        account_to_create['id'] = account_id
+    if product_id is not None:
+        account_to_create['product_id'] = product_id
+    if stakeholder_customer_ids is not None:
+        account_to_create['stakeholder_ids'] = stakeholder_customer_ids
+    if instance_param_vals is not None:
+        account_to_create['instance_param_vals'] = instance_param_vals
+    if details is not None:
+        account_to_create['details'] = details
+    return account_to_create
+
+
+def _get_account_params(
+    effective_timestamp: datetime = None
+) -> Dict[str, any]:
+    # Without an effective timestamp Vault evaluates the parameters at the
+    # current time, and concurrent reads of an account are the same request,
+    # which the REST client coalesces into one
+    params = {
+        'view': VIEW
+    }
+    if effective_timestamp is not None:
+        params['instance_param_vals_effective_timestamp'] = datetime_to_str(
+            effective_timestamp
+        )
+    return params
+
+
+def _live_balances(
+    account_dict: Dict[str, any],
+    phase: Optional[PostingPhase],
+    address: Optional[str]
+) -> AccountBalances:
+    balances: AccountBalances = {}
+    live_balances = (
+        account_dict.get('account_balance') or {}
+    ).get('live_balances') or []
+    for live_balance in live_balances:
+        try:
+            balance_phase = PostingPhase(live_balance.get('phase'))
+        except ValueError:
+            log.warning(
+                f'Skipping a live balance of account '
+                f'<{account_dict.get("id")}> with unknown phase '
+                f'<{live_balance.get("phase")}>'
+            )
+            continue
+        balance_address = live_balance.get('account_address')
+        if phase is not None and balance_phase != phase:
+            continue
+        if address is not None and balance_address != address:
+            continue
+        key = (
+            balance_address,
+            live_balance.get('asset'),
+            balance_phase,
+            live_balance.get('denomination')
+        )
+        balances[key] = (
+            balances.get(key, Decimal(0))
+            + Decimal(live_balance.get('amount') or 0)
+        )
+    return balances
+
+
+def _list_accounts_params(customer_id: str) -> Dict[str, any]:
+    return {
+        'page_size': LIST_PAGE_SIZE,
+        'stakeholder_id': customer_id,
+        'view': VIEW
+    }
+
+
+def _uk_bank_account_number_to_create() -> Dict[str, any]:
+    return {
+        'uk_bank_account_number': {
+            'sort_code': SORT_CODE_BASE
+        }
+    }
+
+
+def _payment_device_link_to_create(
+    uk_bank_account_number_id: str, account_id: str
+) -> Dict[str, any]:
+    return {
+        'payment_device_link': {
+            'uk_bank_account_number_id': uk_bank_account_number_id,
+            'vault_account_id': account_id
+        }
+    }
+
+
+def _payment_device_ids_by_account_id(
+    payment_device_links_responses: Iterable[Dict[str, any]]
+) -> Dict[str, str]:
+    payment_device_id_by_account_id = {}
+    for response in payment_device_links_responses:
+        for link in response['payment_device_links']:
+            # An account's last link is the one used
+            payment_device_id_by_account_id[link['account_id']] = (
+                link['payment_device_id']
+            )
+    return payment_device_id_by_account_id
+
+
+def _routing_details_by_account_id(
+    payment_device_id_by_account_id: Dict[str, str],
+    payment_devices: Dict[str, Dict[str, any]]
+) -> Dict[str, RoutingDetails]:
+    routing_details = {}
+    for account_id, payment_device_id in (
+        payment_device_id_by_account_id.items()
+    ):
+        payment_device = payment_devices.get(payment_device_id)
+        if payment_device is not None:
+            routing_info = payment_device['routing_info']
+            routing_details[account_id] = (
+                routing_info['sort_code'], routing_info['account_number']
+            )
+    return routing_details
+
+
+def _set_routing_details(account: Account, routing_details: RoutingDetails):
+    account.uk_sort_code, account.uk_account_number = routing_details
+
 
 class AccountsAPI:
     def __init__(
         self,
         core_rest_api: RestAPIClient,
-        payments_hub_rest_api: RestAPIClient
+        payments_hub_rest_api: RestAPIClient,
+        routing_cache: RoutingCache = None
     ):
         self._core_rest_api = core_rest_api
         self._payments_hub_rest_api = payments_hub_rest_api
+        self._routing_cache = routing_cache
 
     def list_accounts_for_customer(
             self,
             customer_id: str,
-            include_uk_sort_code_and_account_number: bool = True
+            include_uk_sort_code_and_account_number: bool = True,
+            timeout: Union[float, Deadline] = None
     ) -> List[Account]:
         """Lists the accounts for a customer.
 
@@ -38,22 +192,29 @@ class AccountsAPI:
                                                         Defaults to True.
                                                         Optional.
         :type include_uk_sort_code_and_account_number: bool
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :rtype: List[Account]
         """
-        json_response = self._core_rest_api.get('/v1/accounts', {
-            'page_size': LIST_PAGE_SIZE,
-            'stakeholder_id': customer_id,
-            'view': VIEW
-        })
+        deadline = as_deadline(timeout)
+        json_response = self._core_rest_api.get(
+            '/v1/accounts', _list_accounts_params(customer_id), deadline
+        )
         account_list = list(map(Account.from_json, json_response['accounts']))
         if include_uk_sort_code_and_account_number:
-            self._add_sort_code_account_number_to_account_list(account_list)
+            self._add_sort_code_account_number_to_account_list(
+                account_list, deadline
+            )
         return account_list
 
     def get_account(
             self,
             account_id: str,
-            include_uk_sort_code_and_account_number: bool = True
+            include_uk_sort_code_and_account_number: bool = True,
+            effective_timestamp: datetime = None,
+            timeout: Union[float, Deadline] = None
     ) -> Account:
         """Gets an existing Account object by its ID.
 
@@ -68,20 +229,184 @@ class AccountsAPI:
                                                         Defaults to True.
                                                         Optional.
         :type include_uk_sort_code_and_account_number: bool
+        :param effective_timestamp: The time the instance parameters of the
+                                    account are evaluated at. Optional,
+                                    defaults to the current time.
+                                    Identical concurrent reads of the same
+                                    account share one request.
+        :type effective_timestamp: datetime
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The Account object.
         :rtype: Account
         """
+        deadline = as_deadline(timeout)
         json_response = self._core_rest_api.get(
-            '/v1/accounts/%s' % account_id, {
-                'instance_param_vals_effective_timestamp': timestamp_now(),
-                'view': VIEW
-            }
+            '/v1/accounts/%s' % account_id,
+            _get_account_params(effective_timestamp),
+            deadline
         )
         account = Account.from_json(json_response)
         if include_uk_sort_code_and_account_number:
-            self._add_sort_code_account_number_to_account(account)
+            self._add_sort_code_account_number_to_account_list(
+                [account], deadline
+            )
         return account
 
+    def get_accounts(
+            self,
+            account_ids: List[str],
+            include_uk_sort_code_and_account_number: bool = True,
+            effective_timestamp: datetime = None,
+            concurrency: int = DEFAULT_ACCOUNTS_CONCURRENCY,
+            timeout: Union[float, Deadline] = None
+    ) -> Dict[str, Account]:
+        """Gets many existing Account objects by their IDs.
+
+        The accounts are requested concurrently. Their sort codes and account
+        numbers are looked up at the same time, with one batched payment
+        device link and payment device lookup for all of them, so fetching
+        many accounts takes about as long as fetching one.
+
+        :param account_ids: The IDs of the accounts.
+        :type account_ids: List[str]
+        :param include_uk_sort_code_and_account_number: If this is set to True,
+                                                        the uk_sort_code
+                                                        and uk_account_number
+                                                        fields on the returned
+                                                        accounts will be
+                                                        populated.
+                                                        Defaults to True.
+                                                        Optional.
+        :type include_uk_sort_code_and_account_number: bool
+        :param effective_timestamp: The time the instance parameters of the
+                                    accounts are evaluated at. Optional,
+                                    defaults to the current time.
+        :type effective_timestamp: datetime
+        :param concurrency: The maximum number of accounts requested at once.
+                            Capped at the client's `pool_maxsize`.
+                            Defaults to 8.
+        :type concurrency: int
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises requests.HTTPError: If any account cannot be read, e.g. as it
+                                    does not exist.
+        :return: An account ID-to-Account object dictionary, in the order
+                 the IDs were given.
+        :rtype: Dict[str, Account]
+        """
+        concurrency = self._core_rest_api.max_concurrency(concurrency)
+        deadline = as_deadline(timeout)
+        account_ids = unique_ids(account_ids)
+        if not account_ids:
+            return {}
+        params = _get_account_params(effective_timestamp)
+
+        def get_account(account_id: str) -> Account:
+            return Account.from_json(self._core_rest_api.get(
+                '/v1/accounts/%s' % account_id, params, deadline
+            ))
+
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(account_ids)) + 1
+        ) as executor:
+            # The routing details only need the IDs, so they are looked up
+            # while the accounts are fetched
+            routing_details = (
+                executor.submit(
+                    self._get_routing_details, account_ids, deadline
+                )
+                if include_uk_sort_code_and_account_number else None
+            )
+            accounts = list(executor.map(get_account, account_ids))
+
+        if routing_details is not None:
+            routing_details = routing_details.result()
+            for a in accounts:
+                _set_routing_details(a, routing_details[a.id_])
+        return {a.id_: a for a in accounts}
+
+    def get_balances(
+            self,
+            account_ids: List[str],
+            phase: PostingPhase = PostingPhase.POSTING_PHASE_COMMITTED,
+            address: str = None,
+            concurrency: int = DEFAULT_ACCOUNTS_CONCURRENCY,
+            timeout: Union[float, Deadline] = None
+    ) -> Dict[str, AccountBalances]:
+        """Gets the live balances of many accounts, and nothing else.
+
+        Cheaper than :meth:`get_accounts` when only balances are needed: the
+        sort codes and account numbers of the accounts are not looked up,
+        and no :class:`Account` objects are built. The accounts are
+        requested concurrently.
+
+        Example::
+
+            balances = client.accounts.get_balances([account_id])
+            available = balances[account_id].get(
+                (
+                    'DEFAULT', 'COMMERCIAL_BANK_MONEY',
+                    PostingPhase.POSTING_PHASE_COMMITTED, 'GBP'
+                ),
+                Decimal(0)
+            )
+
+        :param account_ids: The IDs of the accounts.
+        :type account_ids: List[str]
+        :param phase: Only balances of this phase are returned, or every
+                      phase if None. Defaults to committed balances.
+                      Optional.
+        :type phase: :class:`tmvault.enums.PostingPhase`
+        :param address: Only balances of this account address are returned,
+                        e.g. `DEFAULT`, or every address if None. Optional.
+        :type address: str
+        :param concurrency: The maximum number of accounts requested at once.
+                            Capped at the client's `pool_maxsize`.
+                            Defaults to 8.
+        :type concurrency: int
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises requests.HTTPError: If any account cannot be read, e.g. as it
+                                    does not exist.
+        :return: An account ID-to-balances dictionary, in the order the IDs
+                 were given. The balances of an account map their
+                 `(address, asset, phase, denomination)` keys to exact
+                 amounts. Balances in a phase this SDK does not know are
+                 skipped with a warning.
+        :rtype: Dict[str, Dict[Tuple[str, str, PostingPhase, str], Decimal]]
+        """
+        concurrency = self._core_rest_api.max_concurrency(concurrency)
+        deadline = as_deadline(timeout)
+        account_ids = unique_ids(account_ids)
+        if not account_ids:
+            return {}
+        params = _get_account_params()
+
+        def get_balances(account_id: str) -> AccountBalances:
+            return _live_balances(
+                self._core_rest_api.get(
+                    '/v1/accounts/%s' % account_id, params, deadline
+                ),
+                phase,
+                address
+            )
+
+        if len(account_ids) == 1:
+            return {account_ids[0]: get_balances(account_ids[0])}
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(account_ids))
+        ) as executor:
+            return dict(zip(
+                account_ids, executor.map(get_balances, account_ids)
+            ))
+
     def create_account(
         self,
         account_id: str = None,
@@ -90,9 +415,22 @@ class AccountsAPI:
         instance_param_vals: Dict[str, str] = None,
         details: Dict[str, str] = None,
         with_uk_account_number_and_sort_code: bool = True,
+        timeout: Union[float, Deadline] = None
     ) -> Account:
         """Create an account for one or more customers.
 
+        The account is built from the responses rather than read back, so
+        this takes three round trips: creating the account, allocating its
+        UK account number and sort code, and linking them. The returned
+        account therefore has no balances nor derived parameters, both of
+        which are empty for a new account; use :meth:`get_account` to read
+        them later.
+
+        The number is only allocated once the account exists. Allocating it
+        at the same time would save a round trip, but would leave a number
+        allocated and never linked whenever creating the account fails, and
+        numbers cannot be released.
+
         :param account_id: The ID of the new account.
                            It must be unique.
                            Optional.
@@ -127,58 +465,55 @@ class AccountsAPI:
                                                      Defaults to True.
                                                      Optional.
         :type with_uk_account_number_and_sort_code: bool
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The created account.
         :rtype: :class:`tmvault.models.Account`
         """
+        deadline = as_deadline(timeout)
 
-        account_to_create = {
-            'status': CREATE_STATUS
-        }
-        if account_id is not None:
-            account_to_create['id'] = account_id
-        if product_id is not None:
-            account_to_create['product_id'] = product_id
-        if stakeholder_customer_ids is not None:
-            account_to_create['stakeholder_ids'] = stakeholder_customer_ids
-        if instance_param_vals is not None:
-            account_to_create['instance_param_vals'] = instance_param_vals
-        if details is not None:
-            account_to_create['details'] = details
-
-        account_dict = self._core_rest_api.post('/v1/accounts', {
-            'account': account_to_create,
-        })
-        account = self.get_account(
-            account_dict['id'], include_uk_sort_code_and_account_number=False
+        account_to_create = _account_to_create(
+            account_id,
+            product_id,
+            stakeholder_customer_ids,
+            instance_param_vals,
+            details
         )
 
-        if with_uk_account_number_and_sort_code:
-            uk_bank_account_number_dict = self._payments_hub_rest_api.post(
-                '/v1/uk-bank-account-numbers', {
-                    "uk_bank_account_number": {
-                        "sort_code": SORT_CODE_BASE
-                    }
-                }
-            )
-            self._payments_hub_rest_api.post('/v1/payment-device-links', {
-                'payment_device_link': {
-                    'uk_bank_account_number_id':
-                        uk_bank_account_number_dict['id'],
-                    'vault_account_id': account.id_
-                }
-            })
-            account.uk_sort_code = (
-                uk_bank_account_number_dict['sort_code']
-            )
-            account.uk_account_number = (
-                uk_bank_account_number_dict['account_number']
-            )
+        account = Account.from_json(self._core_rest_api.post(
+            '/v1/accounts', {'account': account_to_create}, timeout=deadline
+        ))
+        if not with_uk_account_number_and_sort_code:
+            return account
+
+        uk_bank_account_number_dict = self._payments_hub_rest_api.post(
+            '/v1/uk-bank-account-numbers',
+            _uk_bank_account_number_to_create(),
+            timeout=deadline
+        )
+        self._payments_hub_rest_api.post(
+            '/v1/payment-device-links',
+            _payment_device_link_to_create(
+                uk_bank_account_number_dict['id'], account.id_
+            ),
+            timeout=deadline
+        )
+        routing_details = (
+            uk_bank_account_number_dict['sort_code'],
+            uk_bank_account_number_dict['account_number']
+        )
+        _set_routing_details(account, routing_details)
+        if self._routing_cache is not None:
+            self._routing_cache.put_many({account.id_: routing_details})
         return account
 
     def update_account_stakeholders(
         self,
         account_id: str,
-        new_stakeholder_customer_ids: List[str]
+        new_stakeholder_customer_ids: List[str],
+        timeout: Union[float, Deadline] = None
     ) -> Account:
         """Change the stakeholder customers for an account.
 
@@ -188,9 +523,14 @@ class AccountsAPI:
                                              the new stakeholders of the
                                              account.
         :type new_stakeholder_customer_ids: List[str]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The updated account.
         :rtype: :class:`tmvault.models.Account`
         """
+        deadline = as_deadline(timeout)
         put_response = self._core_rest_api.put(
             '/v1/accounts/%s' % account_id, {
                 'account': {
@@ -199,74 +539,94 @@ class AccountsAPI:
                 'update_mask': {
                     'paths': ['stakeholder_ids']
                 }
-            }
-        )
-        return self.get_account(put_response['id'])
-
-    def _add_sort_code_account_number_to_account(
-        self, account: Account
-    ) -> None:
-        # Get payment device link
-        payment_device_links = self._core_rest_api.get(
-            '/v1/payment-device-links', {
-                'account_ids': [account.id_]
-            }
+            },
+            timeout=deadline
         )
+        return self.get_account(put_response['id'], timeout=deadline)
 
-        # Get the first one
-        payment_device_link = payment_device_links['payment_device_links'][0]
-        payment_device_id = payment_device_link['payment_device_id']
+    def prewarm_routing_cache(
+        self,
+        account_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> int:
+        """Fetches the UK sort codes and account numbers of accounts in bulk
+        into the routing cache, so that reading those accounts later needs
+        no payment device requests. Accounts already cached are skipped.
 
-        # Get the device
-        payment_devices_batch = self._core_rest_api.get(
-            '/v1/payment-devices:batchGet', {
-                'ids': [payment_device_id]
-            }
-        )
-        payment_device = (
-            payment_devices_batch['payment_devices'][payment_device_id]
+        :param account_ids: The IDs of the accounts.
+        :type account_ids: List[str]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises ValueError: If the client has no routing cache.
+        :return: The number of accounts added to the cache. Accounts with no
+                 UK sort code and account number are not added.
+        :rtype: int
+        """
+        if self._routing_cache is None:
+            raise ValueError('The client has no routing cache')
+        routing_details = self._fetch_routing_details(
+            self._routing_cache.missing(unique_ids(account_ids)),
+            as_deadline(timeout)
         )
-        routing_info = payment_device['routing_info']
-        sort_code = routing_info['sort_code']
-        account_number = routing_info['account_number']
-
-        account.uk_sort_code = sort_code
-        account.uk_account_number = account_number
+        self._routing_cache.put_many(routing_details)
+        return len(routing_details)
 
     def _add_sort_code_account_number_to_account_list(
-        self, account_list: List[Account]
+        self, account_list: List[Account], deadline: Deadline = None
     ) -> None:
-        # Get payment device link
-        payment_device_links_response = self._core_rest_api.get(
-            '/v1/payment-device-links', {
-                'account_ids': [a.id_ for a in account_list]
-            }
+        routing_details = self._get_routing_details(
+            [a.id_ for a in account_list], deadline
         )
-        payment_device_links_list = (
-            payment_device_links_response['payment_device_links']
+        for a in account_list:
+            _set_routing_details(a, routing_details[a.id_])
+
+    def _get_routing_details(
+        self, account_ids: List[str], deadline: Deadline = None
+    ) -> Dict[str, RoutingDetails]:
+        if self._routing_cache is None:
+            return self._fetch_routing_details(account_ids, deadline)
+        routing_details, missing_ids = self._routing_cache.get_many(
+            account_ids
         )
-        payment_device_id_by_account_id = {
-                link['account_id']: link['payment_device_id']
-                for link in payment_device_links_list
-        }
-        payment_device_ids = [
-            link['payment_device_id']
-            for link in payment_device_links_list
-        ]
-
-        # Get the device
-        payment_devices_batch = self._core_rest_api.get(
-            '/v1/payment-devices:batchGet', {
-                'ids': payment_device_ids
-            }
+        if missing_ids:
+            fetched = self._fetch_routing_details(missing_ids, deadline)
+            self._routing_cache.put_many(fetched)
+            routing_details.update(fetched)
+        return routing_details
+
+    def _fetch_routing_details(
+        self, account_ids: List[str], deadline: Deadline = None
+    ) -> Dict[str, RoutingDetails]:
+        if not account_ids:
+            return {}
+
+        # Get payment device links, in chunks to keep URLs short
+        def get_links(chunk: List[str]) -> Dict[str, any]:
+            return self._core_rest_api.get(
+                '/v1/payment-device-links', {'account_ids': chunk}, deadline
+            )
+
+        chunks = chunk_ids(
+            unique_ids(account_ids), self._core_rest_api.batch_get_chunk_size
+        )
+        if len(chunks) == 1:
+            responses = [get_links(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(
+                self._core_rest_api.batch_get_concurrency, len(chunks)
+            )) as executor:
+                responses = list(executor.map(get_links, chunks))
+        payment_device_id_by_account_id = _payment_device_ids_by_account_id(
+            responses
         )
-        payment_devices = payment_devices_batch['payment_devices']
 
-        for a in account_list:
-            payment_device_id = payment_device_id_by_account_id[a.id_]
-            payment_device = payment_devices[payment_device_id]
-            routing_info = payment_device['routing_info']
-            sort_code = routing_info['sort_code']
-            account_number = routing_info['account_number']
-            a.uk_sort_code = sort_code
-            a.uk_account_number = account_number
+        # Get the devices
+        payment_devices = self._core_rest_api.batch_get(
+            '/v1/payment-devices:batchGet', 'payment_devices',
+            payment_device_id_by_account_id.values(), deadline
+        )
+        return _routing_details_by_account_id(
+            payment_device_id_by_account_id, payment_devices
+        )
@@ -0,0 +1,219 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from .columnar import CATEGORY_COLUMNS, TIMESTAMP_COLUMNS, TransactionColumns
+from ..enums import TransactionDirection
+
+if TYPE_CHECKING:
+    # NumPy and pandas are optional, and only imported when used
+    import numpy
+    import pandas
+
+# The keys transactions can be grouped by. `day` and `month` are those of
+# the `time_field` timestamp, in UTC.
+GROUP_BY_KEYS = (
+    'account_id', 'payee_id', 'payment_order_id', 'denomination', 'asset',
+    'status', 'direction', 'day', 'month'
+)
+
+AGGREGATES = ('count', 'sum', 'min', 'max', 'net')
+
+
+def _factorize(np, values: 'numpy.ndarray') -> Tuple['numpy.ndarray', int]:
+    # Hashing is much faster than sorting Python strings, as np.unique does
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.int64, count=len(values)
+    )
+    return codes, len(index)
+
+
+def _group_codes(
+    np, columns: TransactionColumns, key: str, time_field: str
+) -> Tuple['numpy.ndarray', int]:
+    """
+    :return: A code per transaction for its value of `key`, from 0, and the
+             number of codes.
+    """
+    if key in CATEGORY_COLUMNS:
+        # Shifted so missing values, coded -1, get a code too
+        return (
+            columns[key].astype(np.int64) + 1,
+            len(columns.categories[key]) + 1
+        )
+    if key == 'direction':
+        return columns['is_credit'].astype(np.int64), 2
+    if key in ('day', 'month'):
+        unit = 'D' if key == 'day' else 'M'
+        periods = columns[time_field].astype(f'datetime64[{unit}]')
+        values, codes = np.unique(periods.view(np.int64), return_inverse=True)
+        return codes.reshape(-1).astype(np.int64), len(values)
+    return _factorize(np, columns[key])
+
+
+def _group_values(
+    np,
+    columns: TransactionColumns,
+    key: str,
+    time_field: str,
+    first: 'numpy.ndarray'
+) -> 'numpy.ndarray':
+    """
+    :return: The value of `key` of each group, from the index of the first
+             transaction in it.
+    """
+    if key in CATEGORY_COLUMNS:
+        categories = columns.categories[key]
+        return np.array(
+            [categories[c] if c >= 0 else None for c in columns[key][first]],
+            dtype=object
+        )
+    if key == 'direction':
+        credit = TransactionDirection.TRANSACTION_DIRECTION_CREDIT.value
+        debit = TransactionDirection.TRANSACTION_DIRECTION_DEBIT.value
+        return np.where(columns['is_credit'][first], credit, debit).astype(
+            object
+        )
+    if key in ('day', 'month'):
+        unit = 'D' if key == 'day' else 'M'
+        return columns[time_field][first].astype(f'datetime64[{unit}]')
+    return columns[key][first]
+
+
+class TransactionAggregates:
+    """Totals of the amounts of groups of transactions, as returned by
+    :meth:`tmvault.rest_api.TransactionsAPI.aggregate`, held as one NumPy
+    array per column with a row per group.
+
+    Besides a column per `group_by` key, it has:
+
+    - `count`: The number of transactions in the group.
+    - `sum`, `min` and `max`: Of the charge amounts, which are unsigned, in
+      int64 minor units.
+    - `net`: The credits minus the debits of the group, in minor units.
+
+    Columns are read like a dict, e.g. `aggregates['sum']`. Groups are in
+    no particular order.
+
+    :ivar group_by: The keys the transactions were grouped by.
+    :vartype group_by: List[str]
+    """
+
+    def __init__(
+        self, group_by: List[str], arrays: Dict[str, 'numpy.ndarray']
+    ) -> None:
+        self.group_by = group_by
+        self._arrays = arrays
+
+    def __getitem__(self, name: str) -> 'numpy.ndarray':
+        return self._arrays[name]
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def __len__(self) -> int:
+        return len(self._arrays['count'])
+
+    def __repr__(self) -> str:
+        return (
+            f'TransactionAggregates['
+            f'group_by: {self.group_by}, '
+            f'groups: {len(self)}'
+            f']'
+        )
+
+    def to_dicts(self) -> List[dict]:
+        """
+        :return: A dict of the columns of each group.
+        :rtype: List[dict]
+        """
+        names = list(self._arrays)
+        return [
+            dict(zip(names, row))
+            for row in zip(*(self._arrays[n].tolist() for n in names))
+        ]
+
+    def to_pandas(self) -> 'pandas.DataFrame':
+        """
+        :return: The groups as a DataFrame.
+        :raises ImportError: If pandas, from `requirements-columnar.txt`,
+                             is not installed.
+        :rtype: :class:`pandas.DataFrame`
+        """
+        import pandas
+        return pandas.DataFrame(self._arrays)
+
+
+def aggregate_columns(
+    columns: TransactionColumns,
+    group_by: List[str],
+    time_field: str = 'value_timestamp'
+) -> TransactionAggregates:
+    """Groups transactions by `group_by` and totals the amounts of each
+    group with NumPy grouped reductions, exactly on int64 minor units.
+
+    :param columns: The transactions, e.g. from
+                    :meth:`tmvault.rest_api.TransactionsAPI.export_columns`.
+    :param group_by: Keys from :data:`GROUP_BY_KEYS`. Empty to total every
+                     transaction in one group.
+    :param time_field: The timestamp `day` and `month` are taken from.
+    :raises ValueError: If a key or the time field is not supported.
+    :raises ImportError: If NumPy, from `requirements-columnar.txt`, is not
+                         installed.
+    """
+    import numpy as np
+
+    group_by = list(group_by)
+    for key in group_by:
+        if key not in GROUP_BY_KEYS:
+            raise ValueError(
+                f'Cannot group by <{key}>, expected one of {GROUP_BY_KEYS}'
+            )
+    if time_field not in TIMESTAMP_COLUMNS:
+        raise ValueError(
+            f'Unknown time_field <{time_field}>, '
+            f'expected one of {TIMESTAMP_COLUMNS}'
+        )
+
+    size = len(columns)
+    group_codes = [_group_codes(np, columns, k, time_field) for k in group_by]
+    if not group_codes:
+        group = np.zeros(size, dtype=np.int64)
+    elif np.prod([float(n) for _, n in group_codes]) < 2 ** 62:
+        group = np.ravel_multi_index(
+            [codes for codes, _ in group_codes],
+            [max(n, 1) for _, n in group_codes]
+        )
+    else:
+        # Too many combinations for one int64, so they are numbered instead
+        _, group = np.unique(
+            np.stack([codes for codes, _ in group_codes], axis=1),
+            axis=0, return_inverse=True
+        )
+        group = group.reshape(-1)
+
+    # Sorting once puts every group in a contiguous run, which the
+    # reductions then total without a Python loop
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    starts = np.flatnonzero(
+        np.concatenate(([True], sorted_group[1:] != sorted_group[:-1]))
+    ) if size else np.array([], dtype=np.int64)
+    amounts = columns['amount'][order]
+    signed = np.where(columns['is_credit'][order], amounts, -amounts)
+    first = order[starts]
+
+    arrays = {
+        key: _group_values(np, columns, key, time_field, first)
+        for key in group_by
+    }
+    if size:
+        arrays['count'] = np.diff(np.append(starts, size))
+        arrays['sum'] = np.add.reduceat(amounts, starts)
+        arrays['min'] = np.minimum.reduceat(amounts, starts)
+        arrays['max'] = np.maximum.reduceat(amounts, starts)
+        arrays['net'] = np.add.reduceat(signed, starts)
+    else:
+        for name in AGGREGATES:
+            arrays[name] = np.array([], dtype=np.int64)
+    return TransactionAggregates(group_by, arrays)
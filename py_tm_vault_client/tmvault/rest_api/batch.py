@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class BatchGetResult(dict):
+    """The resources returned by a batchGet method, keyed by ID.
+
+    This class inherits from python's builtin :class:`dict` class, so it can
+    be used exactly like the dictionaries these methods used to return.
+    It also records which of the requested IDs were not found.
+
+    :ivar missing_ids: The requested IDs that Vault did not return, in the
+                       order they were requested.
+    :vartype missing_ids: List[str]
+    """
+
+    def __init__(
+        self,
+        found: Dict[str, Any] = None,
+        missing_ids: List[str] = None
+    ) -> None:
+        super().__init__(found or {})
+        self.missing_ids = missing_ids if missing_ids is not None else []
+
+    def map(self, func: Callable[[Any], Any]) -> 'BatchGetResult':
+        """
+        :return: A copy of this result with `func` applied to every value,
+                 e.g. to convert the JSON responses into models.
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
+        """
+        return BatchGetResult(
+            {id_: func(value) for id_, value in self.items()},
+            list(self.missing_ids)
+        )
+
+
+def unique_ids(ids: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(ids))
+
+
+def chunk_ids(ids: List[str], chunk_size: int) -> List[List[str]]:
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+
+def merge_batch_responses(
+    ids: List[str],
+    responses: Iterable[Dict[str, Any]],
+    collection: str
+) -> BatchGetResult:
+    """Merges the responses of every chunk of a batchGet request.
+
+    :param ids: The unique IDs requested, in order.
+    :param responses: The JSON response of every chunk.
+    :param collection: The key of the response holding the ID-to-resource
+                       map, e.g. `transactions`.
+    """
+    found = {}
+    for response in responses:
+        found.update(response.get(collection) or {})
+    return BatchGetResult(
+        found, [id_ for id_ in ids if id_ not in found]
+    )
@@ -0,0 +1,228 @@
+from collections import deque
+from enum import Enum
+import threading
+import time
+from typing import Dict, Optional
+
+from ..const import (
+    DEFAULT_CIRCUIT_FAILURE_RATE, DEFAULT_CIRCUIT_HALF_OPEN_PROBES,
+    DEFAULT_CIRCUIT_MINIMUM_CALLS, DEFAULT_CIRCUIT_OPEN_SECONDS,
+    DEFAULT_CIRCUIT_WINDOW_SIZE
+)
+from ..errors import CircuitOpenError
+
+
+class CircuitState(Enum):
+    """The state of a :class:`CircuitBreaker`.
+
+    - :CLOSED: requests flow normally.
+    - :OPEN: requests fail fast with a
+             :class:`tmvault.errors.CircuitOpenError`.
+    - :HALF_OPEN: a limited number of probe requests are let through to
+                  test whether the endpoint has recovered.
+    """
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+
+class CircuitBreakerPolicy:
+    """Controls when a :class:`RestAPIClient` stops sending requests to a
+    failing endpoint.
+
+    Each endpoint template, such as `/v1/accounts/{id}`, has its own circuit.
+    The outcomes of the most recent requests to it are kept in a sliding
+    window; once the window holds at least `minimum_calls` outcomes and the
+    share of failures reaches `failure_rate_threshold`, the circuit opens.
+    A request fails if the connection fails, the API answers with a 5xx
+    status code, or, if `slow_call_seconds` is set, it takes longer than
+    that.
+
+    While open, requests raise :class:`tmvault.errors.CircuitOpenError`
+    without touching the network. After `open_seconds`, up to
+    `half_open_probes` requests are let through: if they all succeed the
+    circuit closes, otherwise it opens again.
+
+    :param failure_rate_threshold: The share of failed requests, between 0
+                                   and 1, that opens the circuit.
+                                   Defaults to 0.5.
+    :type failure_rate_threshold: float
+    :param slow_call_seconds: Requests slower than this count as failures.
+                              Optional, defaults to latency being ignored.
+    :type slow_call_seconds: float
+    :param window_size: The number of recent requests considered.
+                        Defaults to 20.
+    :type window_size: int
+    :param minimum_calls: The number of requests needed in the window before
+                          the circuit may open. Defaults to 10.
+    :type minimum_calls: int
+    :param open_seconds: How long the circuit stays open before probing.
+                         Defaults to 30.
+    :type open_seconds: float
+    :param half_open_probes: The number of probe requests allowed while
+                             half-open. Defaults to 1.
+    :type half_open_probes: int
+    :param enabled: Set to False to disable circuit breaking.
+                    Defaults to True.
+    :type enabled: bool
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = DEFAULT_CIRCUIT_FAILURE_RATE,
+        slow_call_seconds: float = None,
+        window_size: int = DEFAULT_CIRCUIT_WINDOW_SIZE,
+        minimum_calls: int = DEFAULT_CIRCUIT_MINIMUM_CALLS,
+        open_seconds: float = DEFAULT_CIRCUIT_OPEN_SECONDS,
+        half_open_probes: int = DEFAULT_CIRCUIT_HALF_OPEN_PROBES,
+        enabled: bool = True
+    ) -> None:
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError('failure_rate_threshold must be in (0, 1]')
+        if half_open_probes < 1:
+            raise ValueError('half_open_probes must be at least 1')
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.window_size = window_size
+        self.minimum_calls = min(minimum_calls, window_size)
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.enabled = enabled
+
+    def __repr__(self) -> str:
+        return (
+            f'CircuitBreakerPolicy['
+            f'failure_rate_threshold: {self.failure_rate_threshold}, '
+            f'slow_call_seconds: {self.slow_call_seconds}, '
+            f'window_size: {self.window_size}, '
+            f'minimum_calls: {self.minimum_calls}, '
+            f'open_seconds: {self.open_seconds}, '
+            f'half_open_probes: {self.half_open_probes}, '
+            f'enabled: {self.enabled}'
+            f']'
+        )
+
+
+class CircuitBreaker:
+    """A thread-safe circuit breaker for one endpoint of one API.
+    See :class:`CircuitBreakerPolicy` for how it behaves.
+    """
+
+    def __init__(self, endpoint: str, policy: CircuitBreakerPolicy) -> None:
+        self.endpoint = endpoint
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._outcomes = deque(maxlen=policy.window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # Incremented on every change of state, so the outcome of a request
+        # let through in an earlier state is told apart
+        self._generation = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    def before_call(self) -> Optional[int]:
+        """Call before sending a request.
+
+        :raises tmvault.errors.CircuitOpenError: If the circuit is open, or
+                                                 half-open with every probe
+                                                 already in flight.
+        :return: The token to pass to :meth:`record` with the outcome of the
+                 request.
+        """
+        if not self._policy.enabled:
+            return None
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return self._generation
+            now = time.monotonic()
+            retry_after = self._opened_at + self._policy.open_seconds - now
+            if self._state == CircuitState.OPEN:
+                if retry_after > 0:
+                    raise CircuitOpenError(self.endpoint, retry_after)
+                self._state = CircuitState.HALF_OPEN
+                self._generation += 1
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+            if self._probes_in_flight >= self._policy.half_open_probes:
+                raise CircuitOpenError(self.endpoint, max(0.0, retry_after))
+            self._probes_in_flight += 1
+            return self._generation
+
+    def record(
+        self, token: Optional[int], failed: bool, duration_seconds: float
+    ) -> None:
+        """Call with the outcome of every request let through by
+        :meth:`before_call`, and the token it returned.
+        """
+        if not self._policy.enabled or token is None:
+            return
+        slow_call_seconds = self._policy.slow_call_seconds
+        if slow_call_seconds is not None and (
+            duration_seconds > slow_call_seconds
+        ):
+            failed = True
+        with self._lock:
+            if token != self._generation:
+                # Let through in an earlier state, e.g. a request sent while
+                # closed finishing once half-open, so it is not a probe and
+                # says nothing about the current state
+                return
+            if self._state == CircuitState.HALF_OPEN:
+                self._probes_in_flight -= 1
+                if failed:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self._policy.half_open_probes:
+                        self._state = CircuitState.CLOSED
+                        self._generation += 1
+                        self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self._policy.minimum_calls:
+                failure_rate = sum(self._outcomes) / len(self._outcomes)
+                if failure_rate >= self._policy.failure_rate_threshold:
+                    self._open()
+
+    def _open(self) -> None:
+        # Must hold self._lock
+        self._state = CircuitState.OPEN
+        self._generation += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+class CircuitBreakers:
+    """The circuit breakers of one :class:`RestAPIClient`, created on demand
+    for each endpoint template.
+    """
+
+    def __init__(
+        self, base_api_uri: str, policy: CircuitBreakerPolicy
+    ) -> None:
+        self._base_api_uri = base_api_uri
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint_template: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint_template)
+            if breaker is None:
+                breaker = self._breakers[endpoint_template] = CircuitBreaker(
+                    f'{self._base_api_uri}{endpoint_template}', self._policy
+                )
+            return breaker
+
+    def states(self) -> Dict[str, CircuitState]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            template: breaker.state for template, breaker in breakers.items()
+        }
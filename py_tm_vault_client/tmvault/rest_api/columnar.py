@@ -0,0 +1,326 @@
+import csv
+from datetime import timezone
+from typing import (
+    TYPE_CHECKING, Dict, Iterable, List, Optional, TextIO, Union
+)
+
+from ..enums import (
+    ChargeAmountAsset, TransactionRejectionCode, TransactionStatus
+)
+from ..utils import datetime_from_timestamp_iso_string
+
+if TYPE_CHECKING:
+    # NumPy, pandas and pyarrow are optional, and only imported when used
+    import numpy
+    import pandas
+
+# The columns of an export, in order. posting_instruction_batch_ids is
+# left out as it holds a list per transaction.
+TRANSACTION_COLUMNS = (
+    'id', 'account_id', 'amount', 'denomination', 'asset', 'is_credit',
+    'reference', 'status', 'rejection_code', 'value_timestamp',
+    'booking_timestamp', 'last_update_timestamp', 'payee_id',
+    'payment_order_id'
+)
+
+TIMESTAMP_COLUMNS = (
+    'value_timestamp', 'booking_timestamp', 'last_update_timestamp'
+)
+# Category columns and the values they start with, so the codes of enums
+# are the same in every export
+CATEGORY_COLUMNS = {
+    'denomination': (),
+    'asset': tuple(a.value for a in ChargeAmountAsset),
+    'status': tuple(s.value for s in TransactionStatus),
+    'rejection_code': tuple(r.value for r in TransactionRejectionCode),
+}
+
+
+def amount_to_minor_units(value: Optional[str], scale: int) -> int:
+    """Converts an amount string, e.g. `12.34`, to an integer number of
+    minor units, e.g. `1234` for a `scale` of 2, without going through a
+    float.
+
+    :raises ValueError: If the amount has more significant decimal places
+                        than `scale`.
+    """
+    if not value:
+        return 0
+    sign = -1 if value.startswith('-') else 1
+    whole, _, fraction = value.lstrip('+-').partition('.')
+    if len(fraction) > scale:
+        if fraction[scale:].strip('0'):
+            raise ValueError(
+                f'Amount <{value}> has more than {scale} decimal places'
+            )
+        fraction = fraction[:scale]
+    return sign * (
+        int(whole or '0') * 10 ** scale + int(fraction.ljust(scale, '0') or 0)
+    )
+
+
+def page_columns(rows: List[dict], scale: int) -> Dict[str, list]:
+    """Extracts the columns of a page of transactions, as returned in the
+    JSON of `/v1/transactions`, into a list of values per column. Amounts
+    are converted to minor units, and everything else is kept as returned.
+    """
+    charge_amounts = [row.get('charge_amount') or {} for row in rows]
+    columns = {
+        name: [row.get(name) for row in rows]
+        for name in TRANSACTION_COLUMNS
+        if name not in ('amount', 'denomination', 'asset')
+    }
+    columns['amount'] = [
+        amount_to_minor_units(c.get('value'), scale) for c in charge_amounts
+    ]
+    columns['denomination'] = [c.get('denomination') for c in charge_amounts]
+    columns['asset'] = [c.get('asset') for c in charge_amounts]
+    return columns
+
+
+class _Categories:
+    """The values of a category column, each coded by its index."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values = list(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, values: List[Optional[str]]) -> List[int]:
+        codes = []
+        for value in values:
+            if value is None:
+                codes.append(-1)
+                continue
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        return codes
+
+
+def _timestamp_string(value: Optional[str]) -> str:
+    # NumPy parses naive ISO 8601 strings, and Vault returns UTC ones
+    if not value:
+        return 'NaT'
+    if value.endswith('Z'):
+        return value[:-1]
+    when = datetime_from_timestamp_iso_string(value)
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when.isoformat()
+
+
+class TransactionColumnsBuilder:
+    """Converts pages of transactions into typed NumPy arrays, one page at
+    a time, for :class:`TransactionColumns` or a Parquet file.
+
+    :param scale: The number of decimal places of the minor unit amounts
+                  are converted to.
+    :raises ImportError: If NumPy is not installed.
+    """
+
+    def __init__(self, scale: int) -> None:
+        import numpy
+        self._numpy = numpy
+        self.scale = scale
+        self.categories = {
+            name: _Categories(values)
+            for name, values in CATEGORY_COLUMNS.items()
+        }
+        self._chunks: Dict[str, list] = {
+            name: [] for name in TRANSACTION_COLUMNS
+        }
+
+    def convert_page(self, rows: List[dict]) -> Dict[str, 'numpy.ndarray']:
+        """
+        :return: An array per column of the page, in
+                 :data:`TRANSACTION_COLUMNS` order. Category columns hold
+                 int16 codes into :attr:`categories`, -1 if missing.
+        """
+        np = self._numpy
+        columns = page_columns(rows, self.scale)
+        arrays = {}
+        for name in TRANSACTION_COLUMNS:
+            values = columns[name]
+            if name == 'amount':
+                arrays[name] = np.array(values, dtype=np.int64)
+            elif name == 'is_credit':
+                arrays[name] = np.array(
+                    [bool(v) for v in values], dtype=np.bool_
+                )
+            elif name in TIMESTAMP_COLUMNS:
+                arrays[name] = np.array(
+                    [_timestamp_string(v) for v in values],
+                    dtype='datetime64[us]'
+                )
+            elif name in CATEGORY_COLUMNS:
+                arrays[name] = np.array(
+                    self.categories[name].encode(values), dtype=np.int16
+                )
+            else:
+                arrays[name] = np.array(values, dtype=object)
+        return arrays
+
+    def add_page(self, rows: List[dict]) -> None:
+        for name, array in self.convert_page(rows).items():
+            self._chunks[name].append(array)
+
+    def build(self) -> 'TransactionColumns':
+        np = self._numpy
+        empty = self.convert_page([])
+        return TransactionColumns(
+            {
+                name: np.concatenate(chunks or [empty[name]])
+                for name, chunks in self._chunks.items()
+            },
+            {
+                name: list(categories.values)
+                for name, categories in self.categories.items()
+            }
+        )
+
+
+class TransactionColumns:
+    """Transactions held as one typed NumPy array per column, as returned by
+    :meth:`tmvault.rest_api.TransactionsAPI.export_columns`.
+
+    - `amount` holds the charge amount in minor units, as int64.
+    - `value_timestamp`, `booking_timestamp` and `last_update_timestamp`
+      are UTC datetime64[us], NaT if missing.
+    - `denomination`, `asset`, `status` and `rejection_code` hold int16
+      codes into :attr:`categories`, -1 if missing.
+    - `is_credit` is bool, and the other columns hold strings.
+
+    Columns are read like a dict, e.g. `columns['amount']`.
+
+    :ivar categories: The values of each category column, indexed by code.
+                      The codes of enum values are the same in every export.
+    :vartype categories: Dict[str, List[str]]
+    """
+
+    def __init__(
+        self,
+        arrays: Dict[str, 'numpy.ndarray'],
+        categories: Dict[str, List[str]]
+    ) -> None:
+        self._arrays = arrays
+        self.categories = categories
+
+    def __getitem__(self, name: str) -> 'numpy.ndarray':
+        return self._arrays[name]
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def __len__(self) -> int:
+        return len(self._arrays['id'])
+
+    def __repr__(self) -> str:
+        return (
+            f'TransactionColumns['
+            f'rows: {len(self)}, '
+            f'columns: {list(self._arrays)}'
+            f']'
+        )
+
+    def decode(self, name: str) -> List[Optional[str]]:
+        """
+        :return: The values of a category column, None where missing.
+        :rtype: List[str]
+        """
+        values = self.categories[name]
+        return [values[code] if code >= 0 else None for code in self[name]]
+
+    def to_pandas(self) -> 'pandas.DataFrame':
+        """
+        :return: The columns as a DataFrame, with category columns as
+                 :class:`pandas.Categorical`.
+        :raises ImportError: If pandas, from `requirements-columnar.txt`,
+                             is not installed.
+        :rtype: :class:`pandas.DataFrame`
+        """
+        import pandas
+        return pandas.DataFrame({
+            name: (
+                pandas.Categorical.from_codes(
+                    array, categories=self.categories[name]
+                )
+                if name in self.categories
+                else array
+            )
+            for name, array in self._arrays.items()
+        })
+
+
+def write_csv(
+    pages: Iterable[List[dict]], file: Union[str, TextIO], scale: int
+) -> int:
+    """Writes pages of transactions to CSV as they arrive, with a header
+    row and the :data:`TRANSACTION_COLUMNS`. Amounts are in minor units,
+    and timestamps and enums as returned by Vault.
+
+    :return: The number of transactions written.
+    """
+    if isinstance(file, str):
+        with open(file, 'w', newline='') as opened:
+            return write_csv(pages, opened, scale)
+    writer = csv.writer(file)
+    writer.writerow(TRANSACTION_COLUMNS)
+    written = 0
+    for rows in pages:
+        columns = page_columns(rows, scale)
+        writer.writerows(zip(*(columns[n] for n in TRANSACTION_COLUMNS)))
+        written += len(rows)
+    return written
+
+
+def write_parquet(
+    pages: Iterable[List[dict]], file, scale: int
+) -> int:
+    """Writes pages of transactions to a Parquet file as they arrive, one
+    row group per page, with the types of :class:`TransactionColumns` and
+    category columns dictionary encoded.
+
+    :raises ImportError: If pyarrow or NumPy is not installed.
+    :return: The number of transactions written.
+    """
+    import pyarrow
+    import pyarrow.parquet
+
+    timestamp = pyarrow.timestamp('us', tz='UTC')
+    category = pyarrow.dictionary(pyarrow.int16(), pyarrow.string())
+    types = {
+        'amount': pyarrow.int64(),
+        'is_credit': pyarrow.bool_(),
+        **{name: timestamp for name in TIMESTAMP_COLUMNS},
+        **{name: category for name in CATEGORY_COLUMNS},
+    }
+    schema = pyarrow.schema([
+        (name, types.get(name, pyarrow.string()))
+        for name in TRANSACTION_COLUMNS
+    ])
+    builder = TransactionColumnsBuilder(scale)
+    written = 0
+    with pyarrow.parquet.ParquetWriter(file, schema) as writer:
+        for rows in pages:
+            arrays = builder.convert_page(rows)
+            columns = []
+            for name in TRANSACTION_COLUMNS:
+                array = arrays[name]
+                if name in CATEGORY_COLUMNS:
+                    columns.append(pyarrow.DictionaryArray.from_arrays(
+                        pyarrow.array(array, mask=array < 0),
+                        builder.categories[name].values
+                    ))
+                elif name in TIMESTAMP_COLUMNS:
+                    columns.append(pyarrow.array(array).cast(timestamp))
+                else:
+                    columns.append(pyarrow.array(
+                        array, type=schema.field(name).type
+                    ))
+            writer.write_table(
+                pyarrow.Table.from_arrays(columns, schema=schema)
+            )
+            written += len(rows)
+    return written
@@ -1,6 +1,8 @@
 from datetime import date
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 
+from .batch import BatchGetResult
+from .deadline import Deadline, as_deadline
 from .rest_api_client import RestAPIClient
 from ..enums import (
     CustomerAccessibility, CustomerContactMethod, CustomerGender, CustomerTitle
@@ -8,37 +10,229 @@ from ..enums import (
 from ..models import Customer
 
 
+def _customer_to_create(
+    customer_id: str = None,
+    title: CustomerTitle = None,
+    first_name: str = None,
+    middle_name: str = None,
+    last_name: str = None,
+    dob: date = None,
+    gender: CustomerGender = None,
+    nationality: str = None,
+    email_address: str = None,
+    mobile_phone_number: str = None,
+    home_phone_number: str = None,
+    business_phone_number: str = None,
+    contact_method: CustomerContactMethod = None,
+    country_of_residence: str = None,
+    country_of_taxation: str = None,
+    accessibility: CustomerAccessibility = None,
+    additional_details: Dict[str, str] = None
+) -> Dict[str, any]:
+    customer_details = {}
+    if title is not None:
+        customer_details['title'] = title.value
+    if first_name is not None:
+        customer_details['first_name'] = first_name
+    if middle_name is not None:
+        customer_details['middle_name'] = middle_name
+    if last_name is not None:
+        customer_details['last_name'] = last_name
+    if dob is not None:
+        customer_details['dob'] = str(last_name)
+    if gender is not None:
+        customer_details['gender'] = gender.value
+    if nationality is not None:
+        customer_details['nationality'] = nationality
+    if email_address is not None:
+        customer_details['email_address'] = email_address
+    if mobile_phone_number is not None:
+        customer_details['mobile_phone_number'] = mobile_phone_number
+    if home_phone_number is not None:
+        customer_details['home_phone_number'] = home_phone_number
+    if business_phone_number is not None:
+        customer_details['business_phone_number'] = business_phone_number
+    if contact_method is not None:
+        customer_details['contact_method'] = contact_method.value
+    if country_of_residence is not None:
+        customer_details['country_of_residence'] = country_of_residence
+    if country_of_taxation is not None:
+        customer_details['country_of_taxation'] = country_of_taxation
+    if accessibility is not None:
+        customer_details['accessibility'] = accessibility.value
+
+    customer = {
+        'customer_details': customer_details,
+        'identifiers': []
+    }
+    if customer_id is not None:
+        customer['id'] = customer_id
+    if email_address is not None:
+        customer['identifiers'].append(
+            {
+                'identifier_type': 'IDENTIFIER_TYPE_EMAIL',
+                'identifier': email_address
+            }
+        )
+    if additional_details is not None:
+        customer['additional_details'] = additional_details
+    return customer
+
+
+def _customer_updates(
+    customer_id: str,
+    title: CustomerTitle = None,
+    first_name: str = None,
+    middle_name: str = None,
+    last_name: str = None,
+    dob: date = None,
+    gender: CustomerGender = None,
+    nationality: str = None,
+    email_address: str = None,
+    mobile_phone_number: str = None,
+    home_phone_number: str = None,
+    business_phone_number: str = None,
+    contact_method: CustomerContactMethod = None,
+    country_of_residence: str = None,
+    country_of_taxation: str = None,
+    accessibility: CustomerAccessibility = None,
+    additional_details_to_upsert: Dict[str, str] = None,
+    additional_details_to_remove: List[str] = None
+) -> Tuple[Optional[Dict[str, any]], Optional[Dict[str, any]]]:
+    # Returns the bodies of the additional details PUT and the customer PUT,
+    # either of which is None if there is nothing to update.
+    additional_details_put_data = None
+    if additional_details_to_upsert or additional_details_to_remove:
+        additional_details_put_data = {
+            'id': customer_id
+        }
+        if additional_details_to_upsert:
+            additional_details_put_data['items_to_add'] = (
+                additional_details_to_upsert
+            )
+        if additional_details_to_remove:
+            additional_details_put_data['items_to_remove'] = (
+                additional_details_to_remove
+            )
+    update_mask_paths = []
+    customer_obj = {}
+    customer_details_obj = {}
+    if email_address:
+        customer_obj['identifiers'] = [
+            {
+                "identifier_type": "IDENTIFIER_TYPE_EMAIL",
+                "identifier": email_address
+            }
+        ]
+        update_mask_paths.append('identifiers')
+        customer_details_obj['email_address'] = email_address
+        update_mask_paths.append('customer_details.email_address')
+    if title:
+        customer_details_obj['title'] = title.value
+        update_mask_paths.append('customer_details.title')
+    if first_name:
+        customer_details_obj['first_name'] = first_name
+        update_mask_paths.append('customer_details.first_name')
+    if middle_name:
+        customer_details_obj['middle_name'] = middle_name
+        update_mask_paths.append('customer_details.middle_name')
+    if last_name:
+        customer_details_obj['last_name'] = last_name
+        update_mask_paths.append('customer_details.last_name')
+    if dob:
+        customer_details_obj['dob'] = str(dob)
+        update_mask_paths.append('customer_details.dob')
+    if gender:
+        customer_details_obj['gender'] = gender.value
+        update_mask_paths.append('customer_details.gender')
+    if nationality:
+        customer_details_obj['nationality'] = nationality
+        update_mask_paths.append('customer_details.nationality')
+    if mobile_phone_number:
+        customer_details_obj['mobile_phone_number'] = mobile_phone_number
+        update_mask_paths.append('customer_details.mobile_phone_number')
+    if home_phone_number:
+        customer_details_obj['home_phone_number'] = home_phone_number
+        update_mask_paths.append('customer_details.home_phone_number')
+    if business_phone_number:
+        customer_details_obj['business_phone_number'] = business_phone_number
+        update_mask_paths.append('customer_details.business_phone_number')
+    if contact_method:
+        customer_details_obj['contact_method'] = contact_method.value
+        update_mask_paths.append('customer_details.contact_method')
+    if country_of_residence:
+        customer_details_obj['country_of_residence'] = country_of_residence
+        update_mask_paths.append('customer_details.country_of_residence')
+    if country_of_taxation:
+        customer_details_obj['country_of_taxation'] = country_of_taxation
+        update_mask_paths.append('customer_details.country_of_taxation')
+    if accessibility:
+        customer_details_obj['accessibility'] = accessibility.value
+        update_mask_paths.append('customer_details.accessibility')
+
+    if len(customer_details_obj) > 0:
+        customer_obj['customer_details'] = customer_details_obj
+
+    customer_put_data = None
+    if len(update_mask_paths) > 0 and len(customer_obj) > 0:
+        customer_put_data = {
+            'customer': customer_obj,
+            'update_mask': {
+                'paths': update_mask_paths
+            }
+        }
+    return additional_details_put_data, customer_put_data
+
+
 class CustomersAPI:
     def __init__(self, rest_api: RestAPIClient):
         self._rest_api = rest_api
 
-    def get_customer(self, customer_id: str) -> Customer:
+    def get_customer(
+        self,
+        customer_id: str,
+        timeout: Union[float, Deadline] = None
+    ) -> Customer:
         """Gets an existing Customer object by its ID.
 
         :param customer_id: The ID of the customer.
         :type customer_id: str
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The Customer object.
         :rtype: :class:`tmvault.models.Customer`
         """
-        json_response = self._rest_api.get('/v1/customers/%s' % customer_id)
+        json_response = self._rest_api.get(
+            '/v1/customers/%s' % customer_id, timeout=timeout
+        )
         return Customer.from_json(json_response)
 
-    def get_customers(self, customer_ids: List[str]) -> Dict[str, Customer]:
+    def get_customers(
+        self,
+        customer_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
         """Gets multiple existing customers by their IDs.
 
+        Any number of IDs may be given; they are requested in concurrent
+        chunks, see :meth:`tmvault.rest_api.RestAPIClient.batch_get`.
+
         :param customer_ids: A list of the IDs of the customers.
         :type customer_ids: List[str]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: A customer ID-to-Customer object map of the requested
-                 customers.
-        :rtype: Dict[str, :class:`tmvault.models.Customer`]
+                 customers. IDs that were not found are listed in its
+                 `missing_ids` attribute.
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
         """
-        json_response = self._rest_api.get(
-            '/v1/customers:batchGet', {'ids': customer_ids})
-        customers_json_response = json_response.get('customers', {})
-        return {
-            customer_id: Customer.from_json(customer_json)
-            for customer_id, customer_json in customers_json_response.items()
-        }
+        return self._rest_api.batch_get(
+            '/v1/customers:batchGet', 'customers', customer_ids, timeout
+        ).map(Customer.from_json)
 
     def create_customer(
         self,
@@ -59,7 +253,8 @@ class CustomersAPI:
         country_of_residence: str = None,
         country_of_taxation: str = None,
         accessibility: CustomerAccessibility = None,
-        additional_details: Dict[str, str] = None
+        additional_details: Dict[str, str] = None,
+        timeout: Union[float, Deadline] = None
     ) -> Customer:
         """Creates a new customer
 
@@ -114,60 +309,36 @@ class CustomersAPI:
         :param additional_details: A string-to-string map of custom additional
                                    customer details, defaults to {}.
         :type additional_details: Dict[str, str], optional
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The created customer.
         :rtype: :class:`tmvault.models.Customer`
         """
-        customer_details = {}
-        if title is not None:
-            customer_details['title'] = title.value
-        if first_name is not None:
-            customer_details['first_name'] = first_name
-        if middle_name is not None:
-            customer_details['middle_name'] = middle_name
-        if last_name is not None:
-            customer_details['last_name'] = last_name
-        if dob is not None:
-            customer_details['dob'] = str(last_name)
-        if gender is not None:
-            customer_details['gender'] = gender.value
-        if nationality is not None:
-            customer_details['nationality'] = nationality
-        if email_address is not None:
-            customer_details['email_address'] = email_address
-        if mobile_phone_number is not None:
-            customer_details['mobile_phone_number'] = mobile_phone_number
-        if home_phone_number is not None:
-            customer_details['home_phone_number'] = home_phone_number
-        if business_phone_number is not None:
-            customer_details['business_phone_number'] = business_phone_number
-        if contact_method is not None:
-            customer_details['contact_method'] = contact_method.value
-        if country_of_residence is not None:
-            customer_details['country_of_residence'] = country_of_residence
-        if country_of_taxation is not None:
-            customer_details['country_of_taxation'] = country_of_taxation
-        if accessibility is not None:
-            customer_details['accessibility'] = accessibility.value
-
-        customer = {
-            'customer_details': customer_details,
-            'identifiers': []
-        }
-        if customer_id is not None:
-            customer['id'] = customer_id
-        if email_address is not None:
-            customer['identifiers'].append(
-                {
-                    'identifier_type': 'IDENTIFIER_TYPE_EMAIL',
-                    'identifier': email_address
-                }
-            )
-        if additional_details is not None:
-            customer['additional_details'] = additional_details
+        customer = _customer_to_create(
+            customer_id,
+            title,
+            first_name,
+            middle_name,
+            last_name,
+            dob,
+            gender,
+            nationality,
+            email_address,
+            mobile_phone_number,
+            home_phone_number,
+            business_phone_number,
+            contact_method,
+            country_of_residence,
+            country_of_taxation,
+            accessibility,
+            additional_details
+        )
 
         post_response = self._rest_api.post('/v1/customers', {
             'customer': customer
-        })
+        }, timeout=timeout)
         return Customer.from_json(post_response)
 
     def update_customer(
@@ -189,7 +360,8 @@ class CustomersAPI:
         country_of_taxation: str = None,
         accessibility: CustomerAccessibility = None,
         additional_details_to_upsert: Dict[str, str] = None,
-        additional_details_to_remove: List[str] = None
+        additional_details_to_remove: List[str] = None,
+        timeout: Union[float, Deadline] = None
     ) -> Customer:
         """Updates details of an existing customer. The named parameters you
         pass in will be changed on the Customer object.
@@ -246,93 +418,51 @@ class CustomersAPI:
                                              additional customer details to
                                              remove, defaults to None.
         :type additional_details_to_remove: List[str], optional
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The updated customer.
         :rtype: :class:`tmvault.models.Customer`
         """
+        deadline = as_deadline(timeout)
+        additional_details_put_data, customer_put_data = (
+            _customer_updates(
+                customer_id,
+                title,
+                first_name,
+                middle_name,
+                last_name,
+                dob,
+                gender,
+                nationality,
+                email_address,
+                mobile_phone_number,
+                home_phone_number,
+                business_phone_number,
+                contact_method,
+                country_of_residence,
+                country_of_taxation,
+                accessibility,
+                additional_details_to_upsert,
+                additional_details_to_remove
+            )
+        )
         updated_customer_json = None
-        if additional_details_to_upsert or additional_details_to_remove:
-            put_data = {
-                'id': customer_id
-            }
-            if additional_details_to_upsert:
-                put_data['items_to_add'] = additional_details_to_upsert
-            if additional_details_to_remove:
-                put_data['items_to_remove'] = additional_details_to_remove
+        if additional_details_put_data is not None:
             updated_customer_json = self._rest_api.put(
                 f'/v1/customers/{customer_id}:updateAdditionalDetails',
-                put_data
+                additional_details_put_data,
+                timeout=deadline
             )
-        update_mask_paths = []
-        customer_obj = {}
-        customer_details_obj = {}
-        if email_address:
-            customer_obj['identifiers'] = [
-                {
-                    "identifier_type": "IDENTIFIER_TYPE_EMAIL",
-                    "identifier": email_address
-                }
-            ]
-            update_mask_paths.append('identifiers')
-            customer_details_obj['email_address'] = email_address
-            update_mask_paths.append('customer_details.email_address')
-        if title:
-            customer_details_obj['title'] = title.value
-            update_mask_paths.append('customer_details.title')
-        if first_name:
-            customer_details_obj['first_name'] = first_name
-            update_mask_paths.append('customer_details.first_name')
-        if middle_name:
-            customer_details_obj['middle_name'] = middle_name
-            update_mask_paths.append('customer_details.middle_name')
-        if last_name:
-            customer_details_obj['last_name'] = last_name
-            update_mask_paths.append('customer_details.last_name')
-        if dob:
-            customer_details_obj['dob'] = str(dob)
-            update_mask_paths.append('customer_details.dob')
-        if gender:
-            customer_details_obj['gender'] = gender.value
-            update_mask_paths.append('customer_details.gender')
-        if nationality:
-            customer_details_obj['nationality'] = nationality
-            update_mask_paths.append('customer_details.nationality')
-        if mobile_phone_number:
-            customer_details_obj['mobile_phone_number'] = mobile_phone_number
-            update_mask_paths.append('customer_details.mobile_phone_number')
-        if home_phone_number:
-            customer_details_obj['home_phone_number'] = home_phone_number
-            update_mask_paths.append('customer_details.home_phone_number')
-        if business_phone_number:
-            customer_details_obj[
-                'business_phone_number'] = business_phone_number
-            update_mask_paths.append('customer_details.business_phone_number')
-        if contact_method:
-            customer_details_obj['contact_method'] = contact_method.value
-            update_mask_paths.append('customer_details.contact_method')
-        if country_of_residence:
-            customer_details_obj['country_of_residence'] = country_of_residence
-            update_mask_paths.append('customer_details.country_of_residence')
-        if country_of_taxation:
-            customer_details_obj['country_of_taxation'] = country_of_taxation
-            update_mask_paths.append('customer_details.country_of_taxation')
-        if accessibility:
-            customer_details_obj['accessibility'] = accessibility.value
-            update_mask_paths.append('customer_details.accessibility')
-
-        if len(customer_details_obj) > 0:
-            customer_obj['customer_details'] = customer_details_obj
-
-        if len(update_mask_paths) > 0 and len(customer_obj) > 0:
-            put_data = {
-                'customer': customer_obj,
-                'update_mask': {
-                    'paths': update_mask_paths
-                }
-            }
+        if customer_put_data is not None:
             updated_customer_json = self._rest_api.put(
-                '/v1/customers/%s' % customer_id, put_data)
+                '/v1/customers/%s' % customer_id, customer_put_data,
+                timeout=deadline
+            )
 
         return (
             Customer.from_json(updated_customer_json)
-            if updated_customer_json else self.get_customer(customer_id)
+            if updated_customer_json
+            else self.get_customer(customer_id, timeout=deadline)
         )
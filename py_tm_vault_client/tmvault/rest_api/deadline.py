@@ -0,0 +1,125 @@
+import time
+from typing import Optional, Tuple, Union
+
+from ..errors import DeadlineExceededError
+
+_MIN_TIMEOUT = 0.001
+
+
+class Deadline:
+    """The time by which an SDK operation, and every request, retry and
+    polling loop it makes, must be finished.
+
+    Every public SDK method takes a `timeout` argument, which is either a
+    number of seconds or a :class:`Deadline`. Passing a :class:`Deadline`
+    lets several calls share one budget, e.g. the time left to answer an
+    incoming web request:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from py_tm_vault_client.tmvault.rest_api import Deadline
+
+        deadline = Deadline(2.0)
+        account = client.accounts.get_account(account_id, timeout=deadline)
+        customer = client.customers.get_customer(
+            account.stakeholder_ids[0], timeout=deadline
+        )
+
+    If the deadline passes, :class:`tmvault.errors.DeadlineExceededError` is
+    raised.
+
+    :param timeout_seconds: The number of seconds from now until the
+                            deadline. Optional, defaults to no deadline.
+    :type timeout_seconds: float
+    """
+
+    def __init__(self, timeout_seconds: float = None) -> None:
+        if timeout_seconds is not None and timeout_seconds < 0:
+            raise ValueError('timeout_seconds must not be negative')
+        self.timeout_seconds = timeout_seconds
+        self._expires_at = (
+            time.monotonic() + timeout_seconds
+            if timeout_seconds is not None else None
+        )
+
+    def remaining(self) -> Optional[float]:
+        """
+        :return: The number of seconds left, which is 0 once the deadline
+                 has passed, or None if there is no deadline.
+        :rtype: float
+        """
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() == 0
+
+    def check(self, operation: str) -> None:
+        """
+        :raises tmvault.errors.DeadlineExceededError: If the deadline has
+                                                      passed.
+        """
+        if self.expired():
+            raise DeadlineExceededError(operation, self.timeout_seconds)
+
+    def allows(self, seconds: float) -> bool:
+        """
+        :return: True if there is more than `seconds` left.
+        :rtype: bool
+        """
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+    def cap(self, seconds: Optional[float]) -> Optional[float]:
+        """
+        :return: `seconds`, reduced to the time remaining if that is less.
+        :rtype: float
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        if seconds is None:
+            return remaining
+        return min(seconds, remaining)
+
+    def timeouts(
+        self, connect_timeout: Optional[float], read_timeout: Optional[float]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """
+        :return: The connect and read timeouts for the next request, each
+                 capped to the time remaining. A timeout of None, i.e. none,
+                 stays None if there is no deadline.
+        :rtype: Tuple[float, float]
+        """
+        return (
+            self._request_timeout(connect_timeout),
+            self._request_timeout(read_timeout)
+        )
+
+    def _request_timeout(self, seconds: Optional[float]) -> Optional[float]:
+        capped = self.cap(seconds)
+        if capped is None:
+            return None
+        # HTTP clients reject a timeout of zero, so never go quite that low
+        return max(_MIN_TIMEOUT, capped)
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        return (
+            f'Deadline['
+            f'timeout_seconds: {self.timeout_seconds}, '
+            f'remaining: '
+            f'{"None" if remaining is None else f"{remaining:.3f}"}'
+            f']'
+        )
+
+
+def as_deadline(timeout: Union[float, Deadline] = None) -> Deadline:
+    """Converts a `timeout` argument into a :class:`Deadline`, which starts
+    now if it is a number of seconds.
+    """
+    if isinstance(timeout, Deadline):
+        return timeout
+    return Deadline(timeout)
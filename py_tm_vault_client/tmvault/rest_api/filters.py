@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from ..enums import TransactionDirection, TransactionStatus
+
+
+class TransactionFilters:
+    """The filters of
+    :meth:`tmvault.rest_api.TransactionsAPI.list_transactions`, collected
+    once by every method that takes them and passed on as one value.
+
+    They can only be given by name, so no two of them can be swapped.
+    """
+
+    def __init__(
+        self,
+        *,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None
+    ) -> None:
+        self.account_ids = account_ids
+        self.payment_order_ids = payment_order_ids
+        self.payee_ids = payee_ids
+        self.direction = direction
+        self.statuses = statuses
+        self.value_timestamp_range = value_timestamp_range
+        self.booking_timestamp_range = booking_timestamp_range
+        self.last_update_timestamp_range = last_update_timestamp_range
+        self.charge_amount_value_range = charge_amount_value_range
+
+    def replace(self, **changes) -> 'TransactionFilters':
+        """
+        :return: A copy with the filters named in `changes` replaced.
+        :rtype: :class:`TransactionFilters`
+        """
+        return TransactionFilters(**{**self.as_dict(), **changes})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    def __repr__(self) -> str:
+        set_filters = ', '.join(
+            f'{name}: {value}'
+            for name, value in self.__dict__.items()
+            if value is not None
+        )
+        return f'TransactionFilters[{set_filters}]'
@@ -0,0 +1,307 @@
+import json
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+)
+from uuid import UUID, uuid5
+
+from .deadline import Deadline
+from ..models import Transaction
+from ..utils import get_logger
+
+log = get_logger(__name__)
+
+# Namespace of the IDs derived from the content of each transaction, so an
+# item gets the same IDs in every run
+_INGESTION_NAMESPACE = UUID('5d0c6a4e-2f0b-4b7e-9a43-3c2f8e1d7b90')
+
+# Creates a transaction from its JSON body, with the given request_id
+CreateFunction = Callable[[Dict[str, Any], str], Transaction]
+
+
+def _canonical_json(transaction: Dict[str, Any]) -> str:
+    return json.dumps(transaction, sort_keys=True, separators=(',', ':'))
+
+
+def with_stable_ids(
+    transaction: Dict[str, Any]
+) -> Tuple[Dict[str, Any], str]:
+    """Gives a transaction body without an ID one derived from its content,
+    and derives a `request_id` from the whole body.
+
+    A retried or resumed item therefore has the same IDs as before, wherever
+    it is in its iterable, so Vault returns the transaction it already
+    created rather than creating another. Identical bodies get the same IDs,
+    so transactions that must stay distinct need their own `id` or
+    `reference`.
+
+    :param transaction: The JSON body of the transaction, which is not
+                        changed.
+    :return: A copy of the body with an `id`, and the `request_id` to
+             create the transaction with.
+    """
+    if 'id' not in transaction:
+        transaction = {
+            **transaction,
+            'id': str(uuid5(
+                _INGESTION_NAMESPACE, f'id:{_canonical_json(transaction)}'
+            ))
+        }
+    return transaction, str(
+        uuid5(_INGESTION_NAMESPACE, _canonical_json(transaction))
+    )
+
+
+class CreateTransactionResult:
+    """The outcome of creating one transaction of
+    :meth:`tmvault.rest_api.TransactionsAPI.create_transactions`.
+
+    :ivar index: The position of the item in the iterable given.
+    :vartype index: int
+    :ivar transaction_id: The ID the transaction was created with.
+    :vartype transaction_id: str
+    :ivar request_id: The idempotency key it was created with.
+    :vartype request_id: str
+    :ivar transaction: The created transaction, or None if it failed.
+    :vartype transaction: :class:`tmvault.models.Transaction`
+    :ivar error: Why it failed, or None if it was created.
+    :vartype error: Exception
+    """
+
+    def __init__(
+        self,
+        index: int,
+        transaction_id: Optional[str],
+        request_id: Optional[str],
+        transaction: Transaction = None,
+        error: Exception = None
+    ) -> None:
+        self.index = index
+        self.transaction_id = transaction_id
+        self.request_id = request_id
+        self.transaction = transaction
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """True if the transaction was created."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return (
+            f'CreateTransactionResult['
+            f'index: {self.index}, '
+            f'transaction_id: {self.transaction_id}, '
+            f'ok: {self.ok}, '
+            f'error: {self.error!r}'
+            f']'
+        )
+
+
+class CreateTransactionsReport:
+    """The totals of a :meth:`tmvault.rest_api.TransactionsAPI.
+    create_transactions` run. Only failures are kept, so the report stays
+    small however many transactions are created; pass `on_result` to see
+    every one.
+
+    :ivar created: The number of transactions created.
+    :vartype created: int
+    :ivar skipped: The number of items skipped as the checkpoint file
+                   recorded their transaction IDs as created by an earlier
+                   run.
+    :vartype skipped: int
+    :ivar failures: The result of every item that failed, in the order they
+                    finished.
+    :vartype failures: List[:class:`CreateTransactionResult`]
+    :ivar seconds: How long the run took.
+    :vartype seconds: float
+    """
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.skipped = 0
+        self.failures: List[CreateTransactionResult] = []
+        self.seconds = 0.0
+
+    @property
+    def failed(self) -> int:
+        """The number of transactions that could not be created."""
+        return len(self.failures)
+
+    @property
+    def per_second(self) -> float:
+        """The number of transactions created or failed per second."""
+        done = self.created + self.failed
+        return done / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f'CreateTransactionsReport['
+            f'created: {self.created}, '
+            f'failed: {self.failed}, '
+            f'skipped: {self.skipped}, '
+            f'seconds: {self.seconds:.3f}, '
+            f'per_second: {self.per_second:.1f}'
+            f']'
+        )
+
+
+class IngestionCheckpoint:
+    """The transactions created so far by a run, recorded in a text file
+    with a line per item, so an interrupted run can carry on where it
+    stopped. Items are matched by transaction ID rather than position, so a
+    resumed run may read them in another order or with items added. Failed
+    items are not recorded, so they are tried again.
+
+    :param path: The checkpoint file, created if it does not exist.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: Set[str] = set()
+        complete = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                for line in file:
+                    # A line cut short by a crash is dropped
+                    if not line.endswith(b'\n'):
+                        break
+                    self.done.add(line.split()[1].decode())
+                    complete += len(line)
+        self._file = open(path, 'a')
+        self._file.truncate(complete)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self.done
+
+    def record(self, index: int, transaction_id: str) -> None:
+        self._file.write(f'{index} {transaction_id}\n')
+        # Flushed per item, so a crash loses at most the items in flight,
+        # which are created again with the same request_id
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class IngestionProgress:
+    """Records the result of every item of a run, and logs its throughput
+    every `log_seconds`.
+    """
+
+    def __init__(
+        self,
+        checkpoint: Optional[IngestionCheckpoint],
+        on_result: Optional[Callable[[CreateTransactionResult], None]],
+        log_seconds: float
+    ) -> None:
+        self.report = CreateTransactionsReport()
+        self._checkpoint = checkpoint
+        self._on_result = on_result
+        self._log_seconds = log_seconds
+        self._start = self._last_log = time.monotonic()
+
+    def skip(self, transaction_id: str) -> bool:
+        """
+        :return: True if the checkpoint recorded the transaction as created,
+                 in which case it is counted as skipped.
+        """
+        if (
+            self._checkpoint is None
+            or transaction_id not in self._checkpoint
+        ):
+            return False
+        self.report.skipped += 1
+        return True
+
+    def handle(self, result: CreateTransactionResult) -> None:
+        if result.ok:
+            self.report.created += 1
+            if self._checkpoint is not None:
+                self._checkpoint.record(result.index, result.transaction_id)
+        else:
+            self.report.failures.append(result)
+            log.warning(
+                f'Failed to create transaction {result.index} '
+                f'<{result.transaction_id}>: {result.error}'
+            )
+        if self._on_result is not None:
+            self._on_result(result)
+        now = time.monotonic()
+        if now - self._last_log >= self._log_seconds:
+            self._last_log = now
+            self.report.seconds = now - self._start
+            log.info(f'Creating transactions: {self.report}')
+
+    def finish(self) -> CreateTransactionsReport:
+        self.report.seconds = time.monotonic() - self._start
+        log.info(f'Created transactions: {self.report}')
+        return self.report
+
+
+def create_all(
+    items: Iterable[Dict[str, Any]],
+    to_body: Callable[[Dict[str, Any]], Dict[str, Any]],
+    create: CreateFunction,
+    concurrency: int,
+    progress: IngestionProgress,
+    deadline: Deadline
+) -> CreateTransactionsReport:
+    """Creates the transactions of `items` on a pool of `concurrency`
+    threads. Items are read from the iterable only as threads free up, so
+    memory stays bounded however many there are, and results are handled
+    on the calling thread as they finish.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    finished: 'queue.Queue[CreateTransactionResult]' = queue.Queue()
+    in_flight = 0
+    stopped = False
+
+    def create_one(
+        index: int, body: Dict[str, Any], request_id: str
+    ) -> CreateTransactionResult:
+        try:
+            transaction = create(body, request_id)
+        except Exception as e:
+            return CreateTransactionResult(
+                index, body['id'], request_id, error=e
+            )
+        return CreateTransactionResult(
+            index, body['id'], request_id, transaction
+        )
+
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix='tmvault-ingestion'
+    ) as executor:
+        for index, item in enumerate(items):
+            try:
+                body, request_id = with_stable_ids(to_body(item))
+            except Exception as e:
+                progress.handle(
+                    CreateTransactionResult(index, None, None, error=e)
+                )
+                continue
+            if progress.skip(body['id']):
+                continue
+            if deadline.expired():
+                stopped = True
+                break
+            # Waits for a thread to free up before reading the next item
+            if in_flight == concurrency:
+                progress.handle(finished.get())
+                in_flight -= 1
+            executor.submit(
+                create_one, index, body, request_id
+            ).add_done_callback(lambda future: finished.put(future.result()))
+            in_flight += 1
+        for _ in range(in_flight):
+            progress.handle(finished.get())
+
+    report = progress.finish()
+    if stopped:
+        deadline.check('creating transactions')
+    return report
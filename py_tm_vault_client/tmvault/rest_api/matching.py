@@ -0,0 +1,96 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
+
+from .filters import TransactionFilters
+from ..enums import TransactionDirection
+from ..models import Transaction
+from ..utils import naive_utc
+
+
+def _in_range(value, value_range: dict, convert) -> bool:
+    # Like Vault, `from` is inclusive and `to` exclusive
+    if value_range is None:
+        return True
+    if value is None:
+        return False
+    if value_range.get('from') is not None:
+        if value < convert(value_range['from']):
+            return False
+    if value_range.get('to') is not None:
+        if value >= convert(value_range['to']):
+            return False
+    return True
+
+
+def _timestamp(when: datetime):
+    return naive_utc(when) if when is not None else None
+
+
+def _amount(value: str):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def _as_set(values: Optional[list]) -> Optional[set]:
+    return set(values) if values is not None else None
+
+
+def transaction_matcher(
+    filters: TransactionFilters
+) -> Callable[[Transaction], bool]:
+    """
+    :return: A function telling whether a transaction, e.g. from a Stream
+             API event, matches the filters of
+             :meth:`tmvault.rest_api.TransactionsAPI.list_transactions`.
+    :rtype: Callable[[:class:`tmvault.models.Transaction`], bool]
+    """
+    account_ids = _as_set(filters.account_ids)
+    payment_order_ids = _as_set(filters.payment_order_ids)
+    payee_ids = _as_set(filters.payee_ids)
+    statuses = _as_set(filters.statuses)
+    direction = filters.direction
+
+    def matches(transaction: Transaction) -> bool:
+        if transaction is None:
+            return False
+        if account_ids is not None and (
+            transaction.account_id not in account_ids
+        ):
+            return False
+        if payment_order_ids is not None and (
+            transaction.payment_order_id not in payment_order_ids
+        ):
+            return False
+        if payee_ids is not None and transaction.payee_id not in payee_ids:
+            return False
+        if statuses is not None and transaction.status not in statuses:
+            return False
+        if direction == TransactionDirection.TRANSACTION_DIRECTION_CREDIT:
+            if not transaction.is_credit:
+                return False
+        elif direction == TransactionDirection.TRANSACTION_DIRECTION_DEBIT:
+            if transaction.is_credit:
+                return False
+        charge_amount = transaction.charge_amount
+        return (
+            _in_range(
+                _timestamp(transaction.value_timestamp),
+                filters.value_timestamp_range, naive_utc
+            )
+            and _in_range(
+                _timestamp(transaction.booking_timestamp),
+                filters.booking_timestamp_range, naive_utc
+            )
+            and _in_range(
+                _timestamp(transaction.last_update_timestamp),
+                filters.last_update_timestamp_range, naive_utc
+            )
+            and _in_range(
+                _amount(charge_amount.value if charge_amount else None),
+                filters.charge_amount_value_range, Decimal
+            )
+        )
+    return matches
@@ -0,0 +1,289 @@
+from bisect import bisect_left
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from ..const import DEFAULT_LATENCY_BUCKETS
+
+
+class EndpointMetrics:
+    """What a :class:`RestAPIClient` has sent to one endpoint template, e.g.
+    `GET /v1/accounts/{id}`. Every attempt counts as a request, so a call
+    retried twice is three requests and two retries.
+
+    :ivar method: The HTTP method.
+    :vartype method: str
+    :ivar endpoint: The endpoint template.
+    :vartype endpoint: str
+    :ivar requests: The number of requests sent.
+    :vartype requests: int
+    :ivar retries: The number of requests that were retries.
+    :vartype retries: int
+    :ivar status_codes: The number of responses by HTTP status code, with
+                        requests that got no response under `error`.
+    :vartype status_codes: Dict[str, int]
+    :ivar request_bytes: The total size of the request bodies sent.
+    :vartype request_bytes: int
+    :ivar response_bytes: The total size of the response bodies received.
+    :vartype response_bytes: int
+    :ivar latency_seconds: The total time spent waiting for responses.
+    :vartype latency_seconds: float
+    :ivar latency_buckets: The upper bounds, in seconds, of the latency
+                           histogram buckets.
+    :vartype latency_buckets: Tuple[float]
+    :ivar latency_counts: The number of requests in each latency bucket,
+                          followed by the number slower than the last bound.
+    :vartype latency_counts: List[int]
+    """
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        self._lock = threading.Lock()
+        self.method = method
+        self.endpoint = endpoint
+        self.requests = 0
+        self.retries = 0
+        self.status_codes: Dict[str, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency_seconds = 0.0
+        self.latency_buckets = tuple(latency_buckets)
+        self.latency_counts = [0] * (len(self.latency_buckets) + 1)
+
+    def record(
+        self,
+        duration_seconds: float,
+        status: str,
+        request_bytes: int,
+        response_bytes: int
+    ) -> None:
+        """Call with the outcome of every request sent."""
+        bucket = bisect_left(self.latency_buckets, duration_seconds)
+        with self._lock:
+            self.requests += 1
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+            self.request_bytes += request_bytes
+            self.response_bytes += response_bytes
+            self.latency_seconds += duration_seconds
+            self.latency_counts[bucket] += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> 'EndpointMetrics':
+        """
+        :return: A copy that is not updated by later requests.
+        :rtype: :class:`tmvault.rest_api.EndpointMetrics`
+        """
+        snapshot = EndpointMetrics(
+            self.method, self.endpoint, self.latency_buckets
+        )
+        with self._lock:
+            snapshot.requests = self.requests
+            snapshot.retries = self.retries
+            snapshot.status_codes = dict(self.status_codes)
+            snapshot.request_bytes = self.request_bytes
+            snapshot.response_bytes = self.response_bytes
+            snapshot.latency_seconds = self.latency_seconds
+            snapshot.latency_counts = list(self.latency_counts)
+        return snapshot
+
+    def latency_quantile(self, quantile: float) -> float:
+        """Estimates a latency percentile from the histogram.
+
+        :param quantile: Between 0 and 1, e.g. 0.99 for the 99th percentile.
+        :type quantile: float
+        :return: The upper bound of the bucket holding the quantile, which
+                 is infinite if it is slower than the last bucket, or None
+                 if no requests were sent.
+        :rtype: float
+        """
+        if not 0 <= quantile <= 1:
+            raise ValueError('quantile must be between 0 and 1')
+        total = sum(self.latency_counts)
+        if total == 0:
+            return None
+        rank = quantile * total
+        seen = 0
+        for upper_bound, count in zip(
+            self.latency_buckets + (float('inf'),), self.latency_counts
+        ):
+            seen += count
+            if seen >= rank and seen > 0:
+                return upper_bound
+        return float('inf')
+
+    def cumulative_latency_counts(self) -> List[Tuple[float, int]]:
+        """
+        :return: The number of requests at or below each bucket's upper
+                 bound, ending with infinity, as in a Prometheus histogram.
+        :rtype: List[Tuple[float, int]]
+        """
+        cumulative, seen = [], 0
+        for upper_bound, count in zip(
+            self.latency_buckets + (float('inf'),), self.latency_counts
+        ):
+            seen += count
+            cumulative.append((upper_bound, seen))
+        return cumulative
+
+    def as_dict(self) -> dict:
+        return {
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'requests': self.requests,
+            'retries': self.retries,
+            'status_codes': dict(self.status_codes),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'latency_seconds': self.latency_seconds,
+            'latency_p50': self.latency_quantile(0.5),
+            'latency_p99': self.latency_quantile(0.99),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'EndpointMetrics['
+            f'method: {self.method}, '
+            f'endpoint: {self.endpoint}, '
+            f'requests: {self.requests}, '
+            f'retries: {self.retries}, '
+            f'status_codes: {self.status_codes}, '
+            f'request_bytes: {self.request_bytes}, '
+            f'response_bytes: {self.response_bytes}, '
+            f'latency_p50: {self.latency_quantile(0.5)}, '
+            f'latency_p99: {self.latency_quantile(0.99)}'
+            f']'
+        )
+
+
+class RequestMetrics:
+    """The :class:`EndpointMetrics` of one :class:`RestAPIClient`, created on
+    demand for each method and endpoint template.
+    """
+
+    def __init__(
+        self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        if list(latency_buckets) != sorted(set(latency_buckets)):
+            raise ValueError('latency_buckets must be strictly increasing')
+        self._latency_buckets = tuple(latency_buckets)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+
+    def get(self, method: str, endpoint_template: str) -> EndpointMetrics:
+        key = f'{method} {endpoint_template}'
+        with self._lock:
+            metrics = self._endpoints.get(key)
+            if metrics is None:
+                metrics = self._endpoints[key] = EndpointMetrics(
+                    method, endpoint_template, self._latency_buckets
+                )
+            return metrics
+
+    def snapshot(self) -> Dict[str, EndpointMetrics]:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {
+            key: metrics.snapshot() for key, metrics in endpoints.items()
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _label_value(value: str) -> str:
+    return (
+        value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(
+        f'{name}="{_label_value(str(value))}"'
+        for name, value in labels.items()
+    ) + '}'
+
+
+def _bound(upper_bound: float) -> str:
+    return '+Inf' if upper_bound == float('inf') else repr(upper_bound)
+
+
+def prometheus_text(
+    metrics_by_api: Dict[str, Dict[str, EndpointMetrics]],
+    prefix: str = 'tmvault'
+) -> str:
+    """Formats request metrics in the Prometheus text exposition format, e.g.
+    to serve from a `/metrics` endpoint.
+
+    :param metrics_by_api: The metrics of each endpoint, keyed by the name
+                           used for the `api` label, e.g. as returned by
+                           :meth:`tmvault.TMVaultClient.metrics`.
+    :type metrics_by_api: Dict[str, Dict[str, EndpointMetrics]]
+    :param prefix: The prefix of every metric name. Defaults to `tmvault`.
+    :type prefix: str
+    :rtype: str
+    """
+    name = f'{prefix}_rest'
+    lines = [
+        f'# HELP {name}_request_duration_seconds Latency of Vault REST API '
+        f'requests.',
+        f'# TYPE {name}_request_duration_seconds histogram',
+    ]
+    counters = {
+        'requests_total': [],
+        'retries_total': [],
+        'request_bytes_total': [],
+        'response_bytes_total': [],
+    }
+    for api, endpoints in metrics_by_api.items():
+        for metrics in endpoints.values():
+            labels = {
+                'api': api,
+                'method': metrics.method,
+                'endpoint': metrics.endpoint,
+            }
+            for upper_bound, count in metrics.cumulative_latency_counts():
+                bucket_labels = _labels(**labels, le=_bound(upper_bound))
+                lines.append(
+                    f'{name}_request_duration_seconds_bucket{bucket_labels} '
+                    f'{count}'
+                )
+            lines.append(
+                f'{name}_request_duration_seconds_sum{_labels(**labels)} '
+                f'{metrics.latency_seconds!r}'
+            )
+            lines.append(
+                f'{name}_request_duration_seconds_count{_labels(**labels)} '
+                f'{metrics.requests}'
+            )
+            for status, count in sorted(metrics.status_codes.items()):
+                counters['requests_total'].append(
+                    f'{_labels(**labels, status=status)} {count}'
+                )
+            counters['retries_total'].append(
+                f'{_labels(**labels)} {metrics.retries}'
+            )
+            counters['request_bytes_total'].append(
+                f'{_labels(**labels)} {metrics.request_bytes}'
+            )
+            counters['response_bytes_total'].append(
+                f'{_labels(**labels)} {metrics.response_bytes}'
+            )
+    descriptions = {
+        'requests_total': 'Vault REST API requests by status code.',
+        'retries_total': 'Vault REST API requests that were retries.',
+        'request_bytes_total': 'Bytes sent in Vault REST API request bodies.',
+        'response_bytes_total':
+            'Bytes received in Vault REST API response bodies.',
+    }
+    for counter, samples in counters.items():
+        lines.append(f'# HELP {name}_{counter} {descriptions[counter]}')
+        lines.append(f'# TYPE {name}_{counter} counter')
+        lines.extend(f'{name}_{counter}{sample}' for sample in samples)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+from decimal import Decimal, InvalidOperation
+import heapq
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+
+
+def _charge_amount_value(transaction: Transaction) -> Decimal:
+    try:
+        return Decimal(transaction.charge_amount.value)
+    except (InvalidOperation, TypeError):
+        return None
+
+
+_ORDER_FIELDS = {
+    'LAST_UPDATE_TIMESTAMP': lambda t: t.last_update_timestamp,
+    'VALUE_TIMESTAMP': lambda t: t.value_timestamp,
+    'BOOKING_TIMESTAMP': lambda t: t.booking_timestamp,
+    'REFERENCE': lambda t: t.reference,
+    'CHARGE_AMOUNT_DENOMINATION': lambda t: t.charge_amount.denomination,
+    'CHARGE_AMOUNT_VALUE': _charge_amount_value,
+}
+
+
+class _Descending:
+    """Inverts the ordering of the value it wraps."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _Descending) and self.value == other.value
+        )
+
+
+def order_by_parts(
+    order_by: List[TransactionOrderBy] = None
+) -> List[Tuple[str, bool]]:
+    """
+    :return: The field and whether it is descending for every sort applied
+             by Vault, i.e. `order_by` followed by the default
+             last_update_timestamp descending.
+    :rtype: List[Tuple[str, bool]]
+    """
+    parts = []
+    for order in list(order_by or []) + [
+        TransactionOrderBy.ORDER_BY_LAST_UPDATE_TIMESTAMP_DESC
+    ]:
+        field, _, direction = order.value[len('ORDER_BY_'):].rpartition('_')
+        parts.append((field, direction == 'DESC'))
+    return parts
+
+
+def transaction_sort_key(
+    order_by: List[TransactionOrderBy] = None
+) -> Callable[[Transaction], tuple]:
+    """
+    :return: A sort key that orders transactions the way Vault does for
+             `order_by`. Missing values sort after present ones.
+    :rtype: Callable[[Transaction], tuple]
+    """
+    parts = [
+        (_ORDER_FIELDS[field], descending)
+        for field, descending in order_by_parts(order_by)
+    ]
+
+    def key(transaction: Transaction) -> tuple:
+        values = []
+        for get_value, descending in parts:
+            value = get_value(transaction)
+            values.append((
+                value is None, _Descending(value) if descending else value
+            ))
+        return tuple(values)
+    return key
+
+
+def merge_ordered(
+    streams: Iterable[Iterable[Transaction]],
+    order_by: List[TransactionOrderBy] = None
+) -> Iterator[Transaction]:
+    """Lazily k-way merges streams of transactions that are each already
+    ordered by `order_by` into one stream in that order.
+    """
+    return heapq.merge(*streams, key=transaction_sort_key(order_by))
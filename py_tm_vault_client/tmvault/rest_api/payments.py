@@ -1,11 +1,78 @@
 import time
-from typing import Dict
+from typing import Dict, List, Union
 
+from .batch import BatchGetResult
+from .deadline import Deadline, as_deadline
 from .rest_api_client import RestAPIClient
+from ..const import PAYMENT_POLL_INTERVAL
 from ..models import Payment
 from ..enums import PaymentStatus
 
 
+def _party(
+    account_id: str, name: str, sort_code: str, account_number: str
+) -> Dict[str, any]:
+    return {
+        'account_id': account_id,
+        'name': name,
+        'bban': {
+            'bank_id_code': 'GBDSC',
+            'bank_id': sort_code,
+            'account_number': account_number,
+        }
+    }
+
+
+def _payment_to_create(
+    amount: str,
+    debtor_account_id: str,
+    debtor_sort_code: str,
+    debtor_account_number: str,
+    creditor_account_id: str,
+    creditor_sort_code: str,
+    creditor_account_number: str,
+    reference: str,
+    currency: str,
+    metadata: Dict[str, str],
+) -> Dict[str, any]:
+    return {
+        'scheme': "OnUs",
+        'amount': amount,
+        'currency': currency,
+        'reference': reference,
+        'debitor_party': _party(
+            debtor_account_id, 'debtor_name',
+            debtor_sort_code, debtor_account_number
+        ),
+        'creditor_party': _party(
+            creditor_account_id, 'creditor_name',
+            creditor_sort_code, creditor_account_number
+        ),
+        'direction': "PAYMENT_DIRECTION_OUTBOUND",
+        'payment_type': "PAYMENT_TYPE_IMMEDIATE_PAYMENT",
+        'metadata':  metadata,
+    }
+
+
+def _settle_payment_request() -> Dict[str, any]:
+    return {
+        'payment': {
+            'target_status': PaymentStatus.PAYMENT_STATUS_SETTLED.value,
+        },
+        'update_mask': {
+            'paths': ['target_status'],
+        }
+    }
+
+
+def _is_settling(payment: Payment) -> bool:
+    return (
+        payment.current_status == PaymentStatus.PAYMENT_STATUS_RECEIVED or
+        payment.current_status ==
+        PaymentStatus.PAYMENT_STATUS_AWAITING_SETTLEMENT
+    )
+
+
 class PaymentsAPI:
     def __init__(self, rest_api_client: RestAPIClient) -> None:
         self._rest_api_client = rest_api_client
@@ -22,6 +89,7 @@ class PaymentsAPI:
             reference: str,
             currency: str = "GBP",
             metadata: Dict[str, str] = {},
+            timeout: Union[float, Deadline] = None
     ) -> Payment:
         """Creates a new payment.
 
@@ -54,42 +122,33 @@ class PaymentsAPI:
         :param metadata: Additional information related to the payment,
                          optional.
         :type metadata: Dict[str, str]
+        :param timeout: The deadline for creating the payment and waiting for
+                        it to settle, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises tmvault.errors.DeadlineExceededError: If the payment has not
+                                                      settled by the
+                                                      deadline.
         :return: The created payment.
         :rtype: :class:`tmvault.models.Payment`
         """
-
-        debtor_party = {
-            'account_id': debtor_account_id,
-            'name': 'debtor_name',
-            'bban': {
-                'bank_id_code': 'GBDSC',
-                'bank_id': debtor_sort_code,
-                'account_number': debtor_account_number,
-            }
-        }
-        creditor_party = {
-            'account_id': creditor_account_id,
-            'name': 'creditor_name',
-            'bban': {
-                'bank_id_code': 'GBDSC',
-                'bank_id': creditor_sort_code,
-                'account_number': creditor_account_number,
-            }
-        }
+        deadline = as_deadline(timeout)
 
         post_response = self._rest_api_client.post('/v1/payments', {
-            'payment': {
-                'scheme': "OnUs",
-                'amount': amount,
-                'currency': currency,
-                'reference': reference,
-                'debitor_party': debtor_party,
-                'creditor_party': creditor_party,
-                'direction': "PAYMENT_DIRECTION_OUTBOUND",
-                'payment_type': "PAYMENT_TYPE_IMMEDIATE_PAYMENT",
-                'metadata':  metadata,
-            }
-        })
+            'payment': _payment_to_create(
+                amount,
+                debtor_account_id,
+                debtor_sort_code,
+                debtor_account_number,
+                creditor_account_id,
+                creditor_sort_code,
+                creditor_account_number,
+                reference,
+                currency,
+                metadata,
+            )
+        }, timeout=deadline)
 
         created_payment = Payment.from_json(post_response)
         # We check that the payment passed validation, otherwise we return the
@@ -99,40 +158,59 @@ class PaymentsAPI:
             return created_payment
 
         payment_id = created_payment.id_
-        put_data = {
-            'payment': {
-                'target_status': PaymentStatus.PAYMENT_STATUS_SETTLED.value,
-            },
-            'update_mask': {
-                'paths': ['target_status'],
-            }
-        }
-
         put_response = self._rest_api_client.put(
-            '/v1/payments/%s' % payment_id, put_data)
+            '/v1/payments/%s' % payment_id, _settle_payment_request(),
+            timeout=deadline
+        )
         fetched_payment = Payment.from_json(put_response)
 
-        while fetched_payment.current_status ==\
-                PaymentStatus.PAYMENT_STATUS_RECEIVED or \
-                fetched_payment.current_status ==\
-                PaymentStatus.PAYMENT_STATUS_AWAITING_SETTLEMENT:
-            fetched_payment = self.get_payment(payment_id)
-            time.sleep(0.5)
+        while _is_settling(fetched_payment):
+            deadline.check(f'waiting for payment {payment_id} to settle')
+            time.sleep(deadline.cap(PAYMENT_POLL_INTERVAL))
+            fetched_payment = self.get_payment(payment_id, timeout=deadline)
 
         return fetched_payment
 
-    def get_payment(self, payment_id: str) -> Payment:
+    def get_payment(
+        self,
+        payment_id: str,
+        timeout: Union[float, Deadline] = None
+    ) -> Payment:
         """Gets an existing Payment object by its ID.
 
         :param payment_id: The ID of the payment.
         :type payment_id: str
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The Payment object.
         :rtype: :class:`tmvault.models.Payment`
         """
 
-        json_response = self._rest_api_client.get(
-            '/v1/payments:batchGet', {'ids': [payment_id]}
-        )
-        payments_json_response = json_response.get('payments', {})
-        fetched_payment = payments_json_response[payment_id]
-        return Payment.from_json(fetched_payment)
+        return self.get_payments([payment_id], timeout)[payment_id]
+
+    def get_payments(
+        self,
+        payment_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """Gets multiple existing payments by their IDs.
+
+        Any number of IDs may be given; they are requested in concurrent
+        chunks, see :meth:`tmvault.rest_api.RestAPIClient.batch_get`.
+
+        :param payment_ids: A list of the IDs of the payments.
+        :type payment_ids: List[str]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: A payment ID-to-Payment object map of the requested
+                 payments. IDs that were not found are listed in its
+                 `missing_ids` attribute.
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
+        """
+        return self._rest_api_client.batch_get(
+            '/v1/payments:batchGet', 'payments', payment_ids, timeout
+        ).map(Payment.from_json)
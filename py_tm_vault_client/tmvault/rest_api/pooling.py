@@ -0,0 +1,119 @@
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+
+
+class PoolStats:
+    """Connection pool statistics for a :class:`RestAPIClient`.
+
+    :ivar opened: The number of times a new TCP (and TLS) connection had to be
+                  established.
+    :vartype opened: int
+    :ivar reused: The number of requests served over an already open
+                  keep-alive connection.
+    :vartype reused: int
+    :ivar waited: The number of requests that had to wait for a connection to
+                  be returned to an exhausted pool. This is only non-zero when
+                  the pool is configured to block.
+    :vartype waited: int
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.waited = 0
+
+    def record_checkout(self, reused: bool, waited: bool) -> None:
+        with self._lock:
+            if reused:
+                self.reused += 1
+            else:
+                self.opened += 1
+            if waited:
+                self.waited += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'waited': self.waited,
+            }
+
+    def __repr__(self) -> str:
+        return (
+            f'PoolStats['
+            f'opened: {self.opened}, '
+            f'reused: {self.reused}, '
+            f'waited: {self.waited}'
+            f']'
+        )
+
+
+class _StatsMixin:
+    pool_stats: PoolStats = None
+
+    def _get_conn(self, timeout=None):
+        # An empty queue means every connection is checked out, so a blocking
+        # pool will wait here until another thread releases one.
+        waited = self.block and self.pool is not None and self.pool.empty()
+        conn = super()._get_conn(timeout)
+        # Fresh and dropped connections have no socket until they connect.
+        reused = getattr(conn, 'sock', None) is not None
+        if self.pool_stats is not None:
+            self.pool_stats.record_checkout(reused, waited)
+        return conn
+
+
+class _StatsHTTPConnectionPool(_StatsMixin, HTTPConnectionPool):
+    pass
+
+
+class _StatsHTTPSConnectionPool(_StatsMixin, HTTPSConnectionPool):
+    pass
+
+
+class _StatsPoolManager(PoolManager):
+    def __init__(self, pool_stats: PoolStats, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool_stats = pool_stats
+        self.pool_classes_by_scheme = {
+            'http': _StatsHTTPConnectionPool,
+            'https': _StatsHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.pool_stats = self.pool_stats
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """A :class:`requests.adapters.HTTPAdapter` which records connection
+    reuse into a :class:`PoolStats` object.
+    """
+
+    def __init__(self, pool_stats: PoolStats, **kwargs) -> None:
+        self.pool_stats = pool_stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False,
+                         **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _StatsPoolManager(
+            self.pool_stats,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs
+        )
+
+    def __setstate__(self, state):
+        # HTTPAdapter rebuilds its pool manager when unpickled, so the stats
+        # object has to be restored before that happens.
+        self.pool_stats = state.get('pool_stats', PoolStats())
+        super().__setstate__(state)
@@ -0,0 +1,87 @@
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+import weakref
+
+T = TypeVar('T')
+
+# How often a producer blocked on a full buffer checks whether the consumer
+# has gone away
+_STOP_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """Iterates over `items` on a background thread, staying up to `depth`
+    items ahead of the caller, e.g. to download the next pages of a list
+    while the current one is processed.
+
+    The background thread starts right away rather than on the first
+    `next`, so several prefetched iterators, e.g. merged streams, fetch their
+    first items concurrently. An exception raised by `items` is re-raised to
+    the caller once the items before it have been consumed. If the caller
+    stops iterating early, or drops the iterator, the background thread stops
+    after the item it is fetching.
+
+    :param items: The items, typically a generator making API requests.
+    :type items: Iterable
+    :param depth: The maximum number of items fetched ahead. 0 fetches
+                  nothing ahead and uses no thread.
+    :type depth: int
+    :rtype: Iterator
+    """
+    if depth < 0:
+        raise ValueError('depth must not be negative')
+    if depth == 0:
+        return iter(items)
+    return _prefetch(items, depth)
+
+
+def _prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    buffer = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=_STOP_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    def consume() -> Iterator[T]:
+        try:
+            while True:
+                item = buffer.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            stopped.set()
+
+    threading.Thread(
+        target=produce, name='tmvault-prefetch', daemon=True
+    ).start()
+    iterator = consume()
+    # A generator dropped before it was started never runs its finally
+    weakref.finalize(iterator, stopped.set)
+    return iterator
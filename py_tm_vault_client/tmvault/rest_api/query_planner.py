@@ -0,0 +1,177 @@
+import itertools
+import operator
+import threading
+from collections import deque
+from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from .batch import chunk_ids, unique_ids
+from .ordering import merge_ordered
+from ..const import MAX_FAN_OUT_QUERIES
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+
+# Gets the pages, as TransactionsLists, of a query with the given ID filters
+QueryPages = Callable[[Dict[str, List[str]]], Iterator[List[Transaction]]]
+
+
+def split_id_filters(
+    id_filters: Dict[str, List[str]],
+    group_size: int,
+    max_queries: int = MAX_FAN_OUT_QUERIES
+) -> List[Dict[str, List[str]]]:
+    """Splits ID filters too large for one query into groups of at most
+    `group_size` IDs per filter.
+
+    A transaction has a single account, payment order and payee, so it
+    matches exactly one combination of the groups of every filter. Querying
+    every combination therefore returns each transaction once.
+
+    :param id_filters: The IDs of each filter, e.g. `account_ids`, or None
+                       for filters that are not used.
+    :param group_size: The maximum number of IDs of one filter in a query.
+    :param max_queries: The maximum number of queries to split into. Every
+                        query is open at once while their results are
+                        merged, so this bounds the memory used.
+    :raises ValueError: If the filters would need more than `max_queries`
+                        queries.
+    :return: The ID filters of every query to run.
+    :rtype: List[Dict[str, List[str]]]
+    """
+    if group_size < 1:
+        raise ValueError('group_size must be at least 1')
+    names = [name for name, ids in id_filters.items() if ids]
+    groups_per_filter = [
+        chunk_ids(unique_ids(id_filters[name]), group_size) for name in names
+    ]
+    # Checked before building them, as their number is a product
+    queries = reduce(
+        operator.mul, (len(groups) for groups in groups_per_filter), 1
+    )
+    if queries > max_queries:
+        raise ValueError(
+            f'The ID filters need {queries} queries of at most {group_size} '
+            f'IDs per filter, more than the {max_queries} allowed; use a '
+            f'larger id_filter_group_size or fewer IDs'
+        )
+    return [
+        {**id_filters, **dict(zip(names, groups))}
+        for groups in itertools.product(*groups_per_filter)
+    ]
+
+
+class _QueryStream:
+    """The pages of one query of :func:`fan_out`, each fetched on the shared
+    pool once the previous one has been, staying up to `depth` pages ahead
+    of the merge.
+    """
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        pages: Iterator[List[Transaction]],
+        depth: int
+    ) -> None:
+        self._executor = executor
+        self._pages = pages
+        self._depth = depth
+        self._condition = threading.Condition()
+        self._buffer: Deque[List[Transaction]] = deque()
+        self._fetching = False
+        self._waiting = False
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self.stopped = False
+
+    def start(self) -> None:
+        with self._condition:
+            self._submit()
+
+    def stop(self) -> None:
+        with self._condition:
+            self.stopped = True
+
+    def _submit(self) -> None:
+        # Called with the condition held. A depth of 0 only fetches the page
+        # the merge is waiting for.
+        wanted = max(self._depth, 1 if self._waiting else 0)
+        if (self._fetching or self._done or self.stopped
+                or len(self._buffer) >= wanted):
+            return
+        self._fetching = True
+        try:
+            self._executor.submit(self._fetch)
+        except RuntimeError:
+            # The pool was shut down as the merge was abandoned
+            self._fetching = False
+            self.stopped = True
+
+    def _fetch(self) -> None:
+        page = error = None
+        try:
+            page = next(self._pages, None)
+        except BaseException as e:
+            error = e
+        with self._condition:
+            self._fetching = False
+            if error is not None:
+                self._error = error
+                self._done = True
+            elif page is None:
+                self._done = True
+            else:
+                self._buffer.append(page)
+                self._submit()
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[Transaction]:
+        while True:
+            with self._condition:
+                self._waiting = True
+                self._submit()
+                while not self._buffer and not self._done:
+                    self._condition.wait()
+                self._waiting = False
+                if self._buffer:
+                    page = self._buffer.popleft()
+                    self._submit()
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            yield from page
+
+
+def fan_out(
+    pages: QueryPages,
+    queries: List[Dict[str, List[str]]],
+    order_by: List[TransactionOrderBy],
+    prefetch_pages: int,
+    concurrency: int
+) -> Iterator[Transaction]:
+    """Pages through every query on a pool of `concurrency` threads, so at
+    most that many requests are in flight at once however many queries
+    there are, and k-way merges them into one stream ordered by `order_by`.
+    Each query stays up to `prefetch_pages` pages ahead of the merge.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    if prefetch_pages < 0:
+        raise ValueError('prefetch_pages must not be negative')
+    executor = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix='tmvault-fan-out'
+    )
+    streams = [
+        _QueryStream(executor, pages(query), prefetch_pages)
+        for query in queries
+    ]
+    # Every query is started before the merge reads their heads
+    for stream in streams:
+        stream.start()
+    try:
+        yield from merge_ordered(streams, order_by)
+    finally:
+        for stream in streams:
+            stream.stop()
+        executor.shutdown(wait=False)
@@ -0,0 +1,252 @@
+from contextlib import contextmanager
+import threading
+import time
+from typing import Dict
+
+_rate_limiters: Dict[str, 'RateLimiter'] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+class RateLimit:
+    """Client-side limits on the requests sent to one Vault API.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from py_tm_vault_client.tmvault import TMVaultClient
+        from py_tm_vault_client.tmvault.rest_api import RateLimit
+
+        client = TMVaultClient(
+            '/path/to/your/vault-config.json',
+            rate_limits={
+                'payments_hub': RateLimit(
+                    requests_per_second=20, max_in_flight=8
+                ),
+            }
+        )
+
+    :param requests_per_second: The rate at which the token bucket refills.
+                                Optional, defaults to unlimited.
+    :type requests_per_second: float
+    :param burst: The size of the token bucket, i.e. how many requests may be
+                  sent at once after a quiet period. Optional, defaults to
+                  `requests_per_second` (and at least 1).
+    :type burst: float
+    :param max_in_flight: The maximum number of requests allowed to be
+                          waiting on a response at the same time.
+                          Optional, defaults to unlimited.
+    :type max_in_flight: int
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = None,
+        burst: float = None,
+        max_in_flight: int = None
+    ) -> None:
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError('requests_per_second must be positive')
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError('max_in_flight must be at least 1')
+        self.requests_per_second = requests_per_second
+        self.burst = (
+            burst if burst is not None
+            else max(1.0, requests_per_second or 1.0)
+        )
+        self.max_in_flight = max_in_flight
+
+    def _key(self) -> tuple:
+        return self.requests_per_second, self.burst, self.max_in_flight
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RateLimit) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f'RateLimit['
+            f'requests_per_second: {self.requests_per_second}, '
+            f'burst: {self.burst}, '
+            f'max_in_flight: {self.max_in_flight}'
+            f']'
+        )
+
+
+class RateLimiterStats:
+    """How long callers have waited on a :class:`RateLimiter`.
+
+    :ivar requests: The number of requests that passed the limiter.
+    :vartype requests: int
+    :ivar delayed: The number of requests that had to wait.
+    :vartype delayed: int
+    :ivar total_wait_seconds: The total time spent waiting.
+    :vartype total_wait_seconds: float
+    :ivar max_wait_seconds: The longest single wait.
+    :vartype max_wait_seconds: float
+    :ivar in_flight: The number of requests currently awaiting a response.
+    :vartype in_flight: int
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.in_flight = 0
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'delayed': self.delayed,
+            'total_wait_seconds': self.total_wait_seconds,
+            'max_wait_seconds': self.max_wait_seconds,
+            'in_flight': self.in_flight,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'RateLimiterStats['
+            f'requests: {self.requests}, '
+            f'delayed: {self.delayed}, '
+            f'total_wait_seconds: {self.total_wait_seconds:.3f}, '
+            f'max_wait_seconds: {self.max_wait_seconds:.3f}, '
+            f'in_flight: {self.in_flight}'
+            f']'
+        )
+
+
+class RateLimiter:
+    """A thread-safe token bucket plus a cap on requests in flight.
+
+    One limiter exists per base URL per process, see
+    :func:`shared_rate_limiter`, so every thread and every
+    :class:`RestAPIClient` talking to the same API shares its limits.
+    """
+
+    def __init__(self, rate_limit: RateLimit = None) -> None:
+        self._lock = threading.Lock()
+        self._in_flight_released = threading.Condition(self._lock)
+        self._stats = RateLimiterStats()
+        self._rate_limit = rate_limit or RateLimit()
+        # A new limiter starts with a full bucket
+        self._tokens = self._rate_limit.burst
+        self._last_refill = time.monotonic()
+
+    @property
+    def rate_limit(self) -> RateLimit:
+        return self._rate_limit
+
+    def configure(self, rate_limit: RateLimit) -> None:
+        """Replaces the limits, unless they are the same. Requests already
+        waiting pick up the new in-flight cap immediately.
+
+        The bucket keeps the tokens it has, capped to the new burst, rather
+        than being refilled, so creating another client with limits does not
+        let a burst of requests past the limiter.
+        """
+        with self._lock:
+            if rate_limit == self._rate_limit:
+                return
+            now = time.monotonic()
+            rate = self._rate_limit.requests_per_second
+            if rate is not None:
+                # Tokens earned under the old rate until now
+                self._tokens = min(
+                    self._rate_limit.burst,
+                    self._tokens + (now - self._last_refill) * rate
+                )
+            else:
+                # The bucket was not in use, so it is full
+                self._tokens = rate_limit.burst
+            self._tokens = min(self._tokens, rate_limit.burst)
+            self._last_refill = now
+            self._rate_limit = rate_limit
+            self._in_flight_released.notify_all()
+
+    def stats(self) -> RateLimiterStats:
+        """
+        :return: A snapshot of this limiter's statistics.
+        :rtype: :class:`tmvault.rest_api.RateLimiterStats`
+        """
+        with self._lock:
+            snapshot = RateLimiterStats()
+            snapshot.__dict__.update(self._stats.__dict__)
+            return snapshot
+
+    def _reserve_token(self, now: float) -> float:
+        # Must hold self._lock. Takes a token, letting the bucket go negative
+        # so that waiters queue up in arrival order, and returns how long the
+        # caller has to sleep before its token is actually available.
+        rate = self._rate_limit.requests_per_second
+        if rate is None:
+            return 0.0
+        self._tokens = min(
+            self._rate_limit.burst,
+            self._tokens + (now - self._last_refill) * rate
+        )
+        self._last_refill = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+    def acquire(self) -> float:
+        """Blocks until a request may be sent.
+
+        :return: The number of seconds the caller waited.
+        :rtype: float
+        """
+        start = time.monotonic()
+        with self._lock:
+            while (
+                self._rate_limit.max_in_flight is not None and
+                self._stats.in_flight >= self._rate_limit.max_in_flight
+            ):
+                self._in_flight_released.wait()
+            self._stats.in_flight += 1
+            token_wait = self._reserve_token(time.monotonic())
+        if token_wait > 0:
+            time.sleep(token_wait)
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats.requests += 1
+            if waited > 0.001:
+                self._stats.delayed += 1
+                self._stats.total_wait_seconds += waited
+                self._stats.max_wait_seconds = max(
+                    self._stats.max_wait_seconds, waited
+                )
+        return waited
+
+    def release(self) -> None:
+        """Marks a request acquired with :meth:`acquire` as finished."""
+        with self._lock:
+            self._stats.in_flight -= 1
+            self._in_flight_released.notify()
+
+    @contextmanager
+    def limit(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def shared_rate_limiter(
+    base_api_uri: str, rate_limit: RateLimit = None
+) -> RateLimiter:
+    """Returns the process-wide :class:`RateLimiter` for an API, creating it
+    if needed. If `rate_limit` is given and differs from the limiter's
+    current limits it replaces them, see :meth:`RateLimiter.configure`;
+    otherwise the existing limits are kept.
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(base_api_uri)
+        if limiter is None:
+            limiter = _rate_limiters[base_api_uri] = RateLimiter(rate_limit)
+        elif rate_limit is not None:
+            limiter.configure(rate_limit)
+        return limiter
@@ -0,0 +1,66 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+# The fields a transaction record can have, as named in the JSON returned by
+# Vault. Dotted fields are those of the charge amount.
+TRANSACTION_FIELDS = (
+    'id', 'account_id', 'charge_amount', 'charge_amount.value',
+    'charge_amount.denomination', 'charge_amount.asset', 'is_credit',
+    'reference', 'status', 'rejection_code', 'value_timestamp',
+    'booking_timestamp', 'last_update_timestamp', 'payee_id',
+    'payment_order_id', 'posting_instruction_batch_ids'
+)
+
+
+@lru_cache(maxsize=None)
+def record_type(fields: Tuple[str, ...]) -> type:
+    """
+    :return: A namedtuple type with a field per transaction field, with dots
+             replaced by underscores, e.g. `charge_amount_value`.
+    """
+    return namedtuple(
+        'TransactionRecord', [field.replace('.', '_') for field in fields]
+    )
+
+
+def _getter(field: str) -> Callable[[dict], Any]:
+    parent, _, child = field.partition('.')
+    if not child:
+        return lambda transaction: transaction.get(parent)
+    return lambda transaction: (transaction.get(parent) or {}).get(child)
+
+
+def record_factory(
+    fields: List[str] = None, as_rows: bool = False
+) -> Callable[[dict], Any]:
+    """Builds the function converting a transaction, as returned in the JSON
+    of `/v1/transactions`, into a record with only `fields`.
+
+    :param fields: Fields from :data:`TRANSACTION_FIELDS`, or None for every
+                   field of the JSON.
+    :param as_rows: If True, records are namedtuples rather than dicts.
+    :raises ValueError: If a field is not supported.
+    """
+    if fields is None:
+        if as_rows:
+            fields = [f for f in TRANSACTION_FIELDS if '.' not in f]
+        else:
+            # Keeping the decoded dict is cheapest
+            return lambda transaction: transaction
+    fields = tuple(fields)
+    for field in fields:
+        if field not in TRANSACTION_FIELDS:
+            raise ValueError(
+                f'Unknown transaction field <{field}>, '
+                f'expected one of {TRANSACTION_FIELDS}'
+            )
+    getters = [_getter(field) for field in fields]
+    if as_rows:
+        make = record_type(fields)._make
+        return lambda transaction: make(
+            getter(transaction) for getter in getters
+        )
+    return lambda transaction: {
+        field: getter(transaction) for field, getter in zip(fields, getters)
+    }
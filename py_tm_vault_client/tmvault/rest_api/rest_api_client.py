@@ -1,8 +1,40 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Dict, Hashable, Iterable, Sequence, Union
 from uuid import uuid4
 
 import requests
 
+from .batch import (
+    BatchGetResult, chunk_ids, merge_batch_responses, unique_ids
+)
+from .deadline import Deadline, as_deadline
+from .circuit_breaker import (
+    CircuitBreaker, CircuitBreakerPolicy, CircuitBreakers, CircuitState
+)
+from .metrics import EndpointMetrics, RequestMetrics, prometheus_text
+from .pooling import PooledHTTPAdapter, PoolStats
+from .rate_limit import RateLimit, RateLimiter, shared_rate_limiter
+from .retry import RetryPolicy
+from .single_flight import SingleFlight, SingleFlightStats
+from ..codec import JSONCodec, get_codec
+from ..const import (
+    DEFAULT_BATCH_GET_CHUNK_SIZE, DEFAULT_BATCH_GET_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT, DEFAULT_LATENCY_BUCKETS,
+    DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, DEFAULT_READ_TIMEOUT
+)
+from ..errors import DeadlineExceededError
+from ..utils import endpoint_template, get_logger
+
+log = get_logger(__name__)
+
+
+def _get_key(endpoint_path: str, params: Dict[str, any]) -> Hashable:
+    return endpoint_path, tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in params.items()
+    ))
+
 
 # We use this because the HTTPError raised within `response.raise_for_status()`
 # ignores the body of the response which has vault error information in
@@ -35,13 +67,201 @@ def raise_for_status(response: requests.Response):
 
 
 class RestAPIClient:
-    def __init__(self, base_api_uri: str, access_token: str) -> None:
+    """A keep-alive HTTP client for one Vault REST API.
+
+    Every client owns a :class:`requests.Session`, so connections to the API
+    are pooled and reused between calls instead of paying for a new TCP
+    connection and TLS handshake on every request.
+
+    :param base_api_uri: The base URL of the API, e.g. the core API URL.
+    :type base_api_uri: str
+    :param access_token: The service account token used to authenticate.
+    :type access_token: str
+    :param pool_maxsize: The maximum number of keep-alive connections kept
+                         open to the API. Set this to at least the number of
+                         threads sharing the client. It also caps the
+                         `concurrency` of the methods that send requests
+                         concurrently, and `batch_get_concurrency`, as
+                         requests beyond it would open throwaway
+                         connections. Defaults to 10.
+    :type pool_maxsize: int
+    :param pool_block: If True, requests wait for a free connection when all
+                       `pool_maxsize` connections are in use rather than
+                       opening a throwaway one. Defaults to False.
+    :type pool_block: bool
+    :param retry_policy: How failed requests are retried. Defaults to
+                         :class:`RetryPolicy` with its default settings.
+    :type retry_policy: :class:`tmvault.rest_api.RetryPolicy`
+    :param rate_limit: Limits on the requests sent to this API. These are
+                       shared with every other client in the process using
+                       the same `base_api_uri`. Defaults to keeping any
+                       limits already configured for it, or none.
+    :type rate_limit: :class:`tmvault.rest_api.RateLimit`
+    :param circuit_breaker_policy: When to stop sending requests to a failing
+                                   endpoint. Defaults to
+                                   :class:`CircuitBreakerPolicy` with its
+                                   default settings.
+    :type circuit_breaker_policy:
+        :class:`tmvault.rest_api.CircuitBreakerPolicy`
+    :param json_codec: The JSON codec, or name of the JSON library, used to
+                       encode request bodies and decode responses. Defaults
+                       to the fastest one installed, see
+                       :func:`tmvault.codec.get_codec`.
+    :type json_codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    :param coalesce_gets: If True, identical GET requests (same path and
+                          params) made while one is already in flight wait
+                          for it and share its response instead of being sent
+                          again. Defaults to True.
+    :type coalesce_gets: bool
+    :param batch_get_chunk_size: The maximum number of IDs sent in one
+                                 batchGet request by :meth:`batch_get`.
+                                 Defaults to 100.
+    :type batch_get_chunk_size: int
+    :param batch_get_concurrency: The maximum number of batchGet chunks
+                                  requested at the same time. Defaults to 8.
+    :type batch_get_concurrency: int
+    :param connect_timeout: The maximum number of seconds to wait for a
+                            connection to the API to be established.
+                            Defaults to 3.05.
+    :type connect_timeout: float
+    :param read_timeout: The maximum number of seconds to wait for the API to
+                         send data once connected. Defaults to 30.
+    :type read_timeout: float
+    :param latency_buckets: The upper bounds, in seconds, of the latency
+                            histogram recorded for each endpoint. Defaults to
+                            5ms to 10s.
+    :type latency_buckets: Sequence[float]
+    """
+
+    def __init__(
+        self,
+        base_api_uri: str,
+        access_token: str,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        retry_policy: RetryPolicy = None,
+        rate_limit: RateLimit = None,
+        circuit_breaker_policy: CircuitBreakerPolicy = None,
+        json_codec: Union[str, JSONCodec] = None,
+        coalesce_gets: bool = True,
+        batch_get_chunk_size: int = DEFAULT_BATCH_GET_CHUNK_SIZE,
+        batch_get_concurrency: int = DEFAULT_BATCH_GET_CONCURRENCY,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
         self.headers = {
             'X-Auth-Token': access_token
         }
         self.api_uri = base_api_uri
+        self.retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy()
+        )
+        self._rate_limiter = shared_rate_limiter(base_api_uri, rate_limit)
+        self._circuit_breakers = CircuitBreakers(
+            base_api_uri,
+            circuit_breaker_policy if circuit_breaker_policy is not None
+            else CircuitBreakerPolicy()
+        )
+        self.json_codec = get_codec(json_codec)
+        self._single_flight = SingleFlight() if coalesce_gets else None
+        if batch_get_chunk_size < 1:
+            raise ValueError('batch_get_chunk_size must be at least 1')
+        if batch_get_concurrency < 1:
+            raise ValueError('batch_get_concurrency must be at least 1')
+        self.pool_maxsize = pool_maxsize
+        self.batch_get_chunk_size = batch_get_chunk_size
+        self.batch_get_concurrency = min(batch_get_concurrency, pool_maxsize)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._metrics = RequestMetrics(latency_buckets)
+        self._pool_stats = PoolStats()
+        adapter = PooledHTTPAdapter(
+            self._pool_stats,
+            pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        """Statistics on how many connections were opened, reused and
+        waited for by this client.
+
+        :rtype: :class:`tmvault.rest_api.PoolStats`
+        """
+        return self._pool_stats
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """The process-wide rate limiter for this client's API.
+
+        :rtype: :class:`tmvault.rest_api.RateLimiter`
+        """
+        return self._rate_limiter
+
+    def max_concurrency(self, concurrency: int) -> int:
+        """
+        :return: `concurrency`, capped at `pool_maxsize`, for the methods
+                 that send requests to the API concurrently.
+        :rtype: int
+        :raises ValueError: If `concurrency` is less than 1.
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        return min(concurrency, self.pool_maxsize)
+
+    def single_flight_stats(self) -> SingleFlightStats:
+        """How many GET requests this client coalesced. All zero if
+        `coalesce_gets` is disabled.
+
+        :rtype: :class:`tmvault.rest_api.SingleFlightStats`
+        """
+        if self._single_flight is None:
+            return SingleFlightStats()
+        return self._single_flight.stats()
+
+    def circuit_states(self) -> Dict[str, CircuitState]:
+        """The state of the circuit breaker of every endpoint template this
+        client has called, e.g. `/v1/accounts/{id}`.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.CircuitState`]
+        """
+        return self._circuit_breakers.states()
+
+    def metrics(self) -> Dict[str, EndpointMetrics]:
+        """The latency, size, status codes and retries of the requests sent
+        by this client, keyed by method and endpoint template, e.g.
+        `GET /v1/accounts/{id}`.
+
+        :rtype: Dict[str, :class:`tmvault.rest_api.EndpointMetrics`]
+        """
+        return self._metrics.snapshot()
+
+    def prometheus_metrics(self, api: str = None) -> str:
+        """The :meth:`metrics` in the Prometheus text exposition format.
+
+        :param api: The value of the `api` label. Optional, defaults to the
+                    base URL of the API.
+        :type api: str
+        :rtype: str
+        """
+        return prometheus_text({api or self.api_uri: self.metrics()})
+
+    def close(self) -> None:
+        """Closes every pooled connection held by this client."""
+        self._session.close()
 
-    def get(self, endpoint_path: str, params: Dict[str, any] = {}) -> dict:
+    def get(
+        self,
+        endpoint_path: str,
+        params: Dict[str, any] = {},
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
         """Performs an HTTP GET request to the Vault REST API and returns the
         json-encoded response.
 
@@ -55,21 +275,90 @@ class RestAPIClient:
         :type endpoint_path: str
         :param params: Dictionary of query parameters
         :type params: Dict[str, any]
+        :param timeout: The deadline for the request, including retries, in
+                        seconds or as a :class:`Deadline`. Optional, defaults
+                        to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         ...
         :raises requests.HTTPError: [ErrorDescription]
+        :raises tmvault.errors.DeadlineExceededError: If the deadline passes
         ...
         :return: If the HTTP request returned an error status code (4xx, 5xx)
         :rtype: dict
         """
-        response = requests.get(
-            f'{self.api_uri}{endpoint_path}',
-            params=params,
-            headers=self.headers
+        deadline = as_deadline(timeout)
+        if self._single_flight is None:
+            return self._request(
+                'GET', endpoint_path, params=params, deadline=deadline
+            )
+        # Waiters share the response body, but each decodes its own copy so
+        # that no two callers ever hold the same mutable dict.
+        content = self._single_flight.do(
+            _get_key(endpoint_path, params),
+            lambda: self._request_content(
+                'GET', endpoint_path, params=params, deadline=deadline
+            ),
+            deadline
         )
-        raise_for_status(response)
-        return response.json()
+        return self.json_codec.loads(content)
+
+    def batch_get(
+        self,
+        endpoint_path: str,
+        collection: str,
+        ids: Iterable[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
+        """Performs a batchGet request for any number of IDs.
+
+        The IDs are de-duplicated and split into chunks of
+        `batch_get_chunk_size`, keeping every URL well below server limits.
+        Up to `batch_get_concurrency` chunks are requested at the same time,
+        and their results are merged.
+
+        Example:
+        .. code-block:: python
+            rest_api_client.batch_get(
+                '/v1/customers:batchGet', 'customers', customer_ids)
+
+        :param endpoint_path: API endpoint path, ending with `:batchGet`
+        :type endpoint_path: str
+        :param collection: The key of the response holding the
+                           ID-to-resource map, e.g. `customers`
+        :type collection: str
+        :param ids: The IDs of the resources requested
+        :type ids: Iterable[str]
+        :param timeout: The deadline for every chunk, in seconds or as a
+                        :class:`Deadline`. Optional, defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises requests.HTTPError: If any chunk fails
+        :return: The JSON resources found keyed by ID, with the IDs that were
+                 not found in `missing_ids`
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
+        """
+        deadline = as_deadline(timeout)
+        ids = unique_ids(ids)
+        chunks = chunk_ids(ids, self.batch_get_chunk_size)
+
+        def get_chunk(chunk):
+            return self.get(endpoint_path, {'ids': chunk}, deadline)
+
+        if len(chunks) <= 1:
+            responses = list(map(get_chunk, chunks))
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.batch_get_concurrency, len(chunks))
+            ) as executor:
+                responses = list(executor.map(get_chunk, chunks))
+        return merge_batch_responses(ids, responses, collection)
 
-    def post(self, endpoint_path: str, data: Dict[str, any]) -> dict:
+    def post(
+        self,
+        endpoint_path: str,
+        data: Dict[str, any],
+        request_id: str = None,
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
         """Performs an HTTP POST request to the Vault REST API and returns the
         json-encoded response.
 
@@ -92,22 +381,34 @@ class RestAPIClient:
         :type endpoint_path: str
         :param data: JSON dictionary to post
         :type data: Dict[str, any]
+        :param request_id: The idempotency key sent to Vault. Every retry of
+                           this call reuses it. Optional, defaults to a
+                           random UUID4 string.
+        :type request_id: str
+        :param timeout: The deadline for the request, including retries, in
+                        seconds or as a :class:`Deadline`. Optional, defaults
+                        to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         ...
         :raises requests.HTTPError: [ErrorDescription]
+        :raises tmvault.errors.DeadlineExceededError: If the deadline passes
         ...
         :return: If the HTTP request returned an error status code (4xx, 5xx)
         :rtype: dict
         """
-        post_json = {'request_id': str(uuid4()), **data}
-        response = requests.post(
-            f'{self.api_uri}{endpoint_path}',
-            json=post_json,
-            headers=self.headers
+        post_json = {'request_id': request_id or str(uuid4()), **data}
+        return self._request(
+            'POST', endpoint_path, json=post_json,
+            deadline=as_deadline(timeout)
         )
-        raise_for_status(response)
-        return response.json()
 
-    def put(self, endpoint_path: str, data: Dict[str, any]) -> dict:
+    def put(
+        self,
+        endpoint_path: str,
+        data: Dict[str, any],
+        request_id: str = None,
+        timeout: Union[float, Deadline] = None
+    ) -> dict:
         """Performs an HTTP PUT request to the Vault REST API and returns the
         json-encoded response.
 
@@ -128,17 +429,134 @@ class RestAPIClient:
         :type endpoint_path: str
         :param data: JSON dictionary to put
         :type data: Dict[str, any]
+        :param request_id: The idempotency key sent to Vault. Every retry of
+                           this call reuses it. Optional, defaults to a
+                           random UUID4 string.
+        :type request_id: str
+        :param timeout: The deadline for the request, including retries, in
+                        seconds or as a :class:`Deadline`. Optional, defaults
+                        to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         ...
         :raises requests.HTTPError: [ErrorDescription]
+        :raises tmvault.errors.DeadlineExceededError: If the deadline passes
         ...
         :return: If the HTTP request returned an error status code (4xx, 5xx)
         :rtype: dict
         """
-        put_json = {'request_id': str(uuid4()), **data}
-        response = requests.put(
-            f'{self.api_uri}{endpoint_path}',
-            json=put_json,
-            headers=self.headers
+        put_json = {'request_id': request_id or str(uuid4()), **data}
+        return self._request(
+            'PUT', endpoint_path, json=put_json,
+            deadline=as_deadline(timeout)
+        )
+
+    def _request(
+        self,
+        method: str,
+        endpoint_path: str,
+        params: Dict[str, any] = None,
+        json: Dict[str, any] = None,
+        deadline: Deadline = None
+    ) -> dict:
+        return self.json_codec.loads(
+            self._request_content(
+                method, endpoint_path, params, json, deadline
+            )
+        )
+
+    def _request_content(
+        self,
+        method: str,
+        endpoint_path: str,
+        params: Dict[str, any] = None,
+        json: Dict[str, any] = None,
+        deadline: Deadline = None
+    ) -> bytes:
+        # The body, and therefore the request_id, is built once by the caller
+        # so that every attempt below is the same idempotent request.
+        deadline = deadline if deadline is not None else Deadline()
+        operation = f'{method} {endpoint_path}'
+        url = f'{self.api_uri}{endpoint_path}'
+        body, headers = None, None
+        if json is not None:
+            body = self.json_codec.dumps(json)
+            headers = {'Content-Type': 'application/json'}
+        template = endpoint_template(endpoint_path)
+        circuit_breaker = self._circuit_breakers.get(template)
+        endpoint_metrics = self._metrics.get(method, template)
+        attempt = 0
+        while True:
+            deadline.check(operation)
+            if attempt > 0:
+                endpoint_metrics.record_retry()
+            try:
+                response = self._send(
+                    circuit_breaker, endpoint_metrics, method, url,
+                    params=params, data=body, headers=headers,
+                    timeout=deadline.timeouts(
+                        self.connect_timeout, self.read_timeout
+                    )
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if deadline.expired():
+                    raise DeadlineExceededError(
+                        operation, deadline.timeout_seconds
+                    ) from e
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                if not deadline.allows(delay):
+                    raise
+                log.debug(
+                    f'{method} {url} failed with {e!r}, '
+                    f'retrying in {delay:.2f}s...'
+                )
+            else:
+                if not self.retry_policy.should_retry(
+                    attempt, response.status_code
+                ):
+                    raise_for_status(response)
+                    return response.content
+                delay = self.retry_policy.backoff(
+                    attempt, response.headers.get('Retry-After')
+                )
+                if not deadline.allows(delay):
+                    # Not enough time left to retry, so fail with the error
+                    # the API gave instead of a less helpful timeout
+                    raise_for_status(response)
+                    return response.content
+                log.debug(
+                    f'{method} {url} failed with HTTP Code '
+                    f'<{response.status_code}>, retrying in {delay:.2f}s...'
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(
+        self,
+        circuit_breaker: CircuitBreaker,
+        endpoint_metrics: EndpointMetrics,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> requests.Response:
+        request_bytes = len(kwargs.get('data') or b'')
+        circuit_token = circuit_breaker.before_call()
+        with self._rate_limiter.limit():
+            start = time.monotonic()
+            try:
+                response = self._session.request(method, url, **kwargs)
+            except Exception:
+                duration = time.monotonic() - start
+                circuit_breaker.record(circuit_token, True, duration)
+                endpoint_metrics.record(duration, 'error', request_bytes, 0)
+                raise
+        duration = time.monotonic() - start
+        circuit_breaker.record(
+            circuit_token, response.status_code >= 500, duration
+        )
+        endpoint_metrics.record(
+            duration, str(response.status_code), request_bytes,
+            len(response.content)
         )
-        raise_for_status(response)
-        return response.json()
+        return response
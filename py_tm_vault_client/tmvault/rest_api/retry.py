@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+from typing import Iterable, Optional
+
+from ..const import (
+    DEFAULT_RETRY_BACKOFF_BASE, DEFAULT_RETRY_BACKOFF_MAX,
+    DEFAULT_RETRY_MAX_ATTEMPTS, DEFAULT_RETRY_STATUSES
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a `Retry-After` header, which is either a number of seconds or
+    an HTTP date, into a number of seconds from now.
+
+    :return: The number of seconds to wait, or None if the header is missing
+             or malformed.
+    :rtype: float
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Controls how a :class:`RestAPIClient` retries failed requests.
+
+    Requests are retried on connection errors and on the configured HTTP
+    status codes, waiting an exponentially increasing, randomly jittered
+    delay between attempts. If the API sends a `Retry-After` header, the
+    client waits at least that long.
+
+    POST and PUT requests keep the same `request_id` across every attempt,
+    so Vault deduplicates a retried write instead of applying it twice.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from py_tm_vault_client.tmvault import TMVaultClient
+        from py_tm_vault_client.tmvault.rest_api import RetryPolicy
+
+        client = TMVaultClient(
+            '/path/to/your/vault-config.json',
+            retry_policy=RetryPolicy(max_attempts=6, backoff_max=30)
+        )
+
+    :param max_attempts: The total number of attempts per request, including
+                         the first. 1 disables retries. Defaults to 4.
+    :type max_attempts: int
+    :param backoff_base: The delay in seconds before the first retry, which
+                         doubles with every further attempt. Defaults to 0.1.
+    :type backoff_base: float
+    :param backoff_max: The maximum delay in seconds between attempts.
+                        Defaults to 10.
+    :type backoff_max: float
+    :param retry_statuses: The HTTP status codes to retry on.
+                           Defaults to 429, 500, 502, 503 and 504.
+    :type retry_statuses: Iterable[int]
+    :param retry_connection_errors: Whether to retry when the connection
+                                    fails or times out. Defaults to True.
+    :type retry_connection_errors: bool
+    :param jitter: Whether to randomise delays ("full jitter") so that many
+                   clients do not retry in lockstep. Defaults to True.
+    :type jitter: bool
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+        backoff_base: float = DEFAULT_RETRY_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_RETRY_BACKOFF_MAX,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        retry_connection_errors: bool = True,
+        jitter: bool = True
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.jitter = jitter
+
+    def should_retry(self, attempt: int, status_code: int = None) -> bool:
+        """
+        :param attempt: The zero-based number of the attempt that failed.
+        :type attempt: int
+        :param status_code: The HTTP status code of the response, or None if
+                            the request failed with a connection error.
+        :type status_code: int
+        :return: True if another attempt should be made.
+        :rtype: bool
+        """
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if status_code is None:
+            return self.retry_connection_errors
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: str = None) -> float:
+        """
+        :param attempt: The zero-based number of the attempt that failed.
+        :type attempt: int
+        :param retry_after: The `Retry-After` header of the response, if any.
+        :type retry_after: str
+        :return: The number of seconds to wait before the next attempt.
+        :rtype: float
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after_seconds = parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            delay = max(delay, retry_after_seconds)
+        return delay
+
+    def __repr__(self) -> str:
+        return (
+            f'RetryPolicy['
+            f'max_attempts: {self.max_attempts}, '
+            f'backoff_base: {self.backoff_base}, '
+            f'backoff_max: {self.backoff_max}, '
+            f'retry_statuses: {sorted(self.retry_statuses)}, '
+            f'retry_connection_errors: {self.retry_connection_errors}, '
+            f'jitter: {self.jitter}'
+            f']'
+        )
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
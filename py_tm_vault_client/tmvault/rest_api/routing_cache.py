@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# The UK sort code and account number of an account
+RoutingDetails = Tuple[str, str]
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS routing_details (
+    account_id TEXT PRIMARY KEY,
+    sort_code TEXT NOT NULL,
+    account_number TEXT NOT NULL
+)
+'''
+
+
+class RoutingCacheStats:
+    """How often a :class:`RoutingCache` saved the payment device requests
+    of an account.
+
+    :ivar hits: The number of accounts whose routing details were cached.
+    :vartype hits: int
+    :ivar misses: The number of accounts whose routing details had to be
+                  fetched.
+    :vartype misses: int
+    :ivar size: The number of accounts cached.
+    :vartype size: int
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of accounts served from the cache, 0 if none were
+        asked."""
+        requested = self.hits + self.misses
+        return self.hits / requested if requested else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': self.size,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'RoutingCacheStats['
+            f'hits: {self.hits}, '
+            f'misses: {self.misses}, '
+            f'size: {self.size}, '
+            f'hit_ratio: {self.hit_ratio:.3f}'
+            f']'
+        )
+
+
+class RoutingCache:
+    """The UK sort code and account number of accounts, keyed by account
+    ID, as used by :class:`tmvault.rest_api.AccountsAPI`. They never change
+    once allocated, so they are cached for as long as the cache lives.
+
+    The cache is held in memory. If `path` is given, it is also written to
+    a SQLite database there and loaded from it on start, so it survives
+    restarts and can be shared by processes started one after the other.
+
+    :param path: The SQLite database backing the cache, created if it does
+                 not exist. Optional, defaults to memory only.
+    :type path: str
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = RoutingCacheStats()
+        self._details: Dict[str, RoutingDetails] = {}
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            with self._connection:
+                self._connection.execute(_SCHEMA)
+            for account_id, sort_code, account_number in (
+                self._connection.execute(
+                    'SELECT account_id, sort_code, account_number '
+                    'FROM routing_details'
+                )
+            ):
+                self._details[account_id] = (sort_code, account_number)
+
+    def __len__(self) -> int:
+        return len(self._details)
+
+    def __repr__(self) -> str:
+        return (
+            f'RoutingCache['
+            f'path: {self.path}, '
+            f'size: {len(self)}'
+            f']'
+        )
+
+    def stats(self) -> RoutingCacheStats:
+        """
+        :return: A snapshot of the statistics.
+        :rtype: :class:`tmvault.rest_api.RoutingCacheStats`
+        """
+        with self._lock:
+            snapshot = RoutingCacheStats()
+            snapshot.__dict__.update(self._stats.__dict__)
+            snapshot.size = len(self._details)
+            return snapshot
+
+    def get(self, account_id: str) -> Optional[RoutingDetails]:
+        return self.get_many([account_id])[0].get(account_id)
+
+    def get_many(
+        self, account_ids: Iterable[str]
+    ) -> Tuple[Dict[str, RoutingDetails], List[str]]:
+        """
+        :return: The cached routing details of `account_ids`, and the IDs
+                 that are not cached.
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for account_id in account_ids:
+                details = self._details.get(account_id)
+                if details is None:
+                    missing.append(account_id)
+                else:
+                    found[account_id] = details
+            self._stats.hits += len(found)
+            self._stats.misses += len(missing)
+        return found, missing
+
+    def missing(self, account_ids: Iterable[str]) -> List[str]:
+        """
+        :return: The IDs of `account_ids` that are not cached, without
+                 counting them in the statistics.
+        """
+        with self._lock:
+            return [a for a in account_ids if a not in self._details]
+
+    def put_many(self, details: Dict[str, RoutingDetails]) -> None:
+        if not details:
+            return
+        with self._lock:
+            self._details.update(details)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.executemany(
+                        'INSERT OR REPLACE INTO routing_details '
+                        '(account_id, sort_code, account_number) '
+                        'VALUES (?, ?, ?)',
+                        [(a, s, n) for a, (s, n) in details.items()]
+                    )
+
+    def close(self) -> None:
+        """Closes the database backing the cache, if any."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,320 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+import math
+import threading
+from typing import (
+    Callable, Deque, FrozenSet, Iterator, List, Tuple
+)
+
+from .deadline import Deadline
+from .ordering import merge_ordered, order_by_parts
+from .prefetch import prefetch
+from ..const import LIST_PAGE_SIZE
+from ..enums import TransactionOrderBy
+from ..models import Transaction
+from ..utils import naive_utc
+
+SCAN_FIELDS = ('last_update_timestamp', 'value_timestamp')
+
+# Never split a hot slice into more parts than this at once
+_MAX_SPLIT = 16
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class TimeSlice:
+    """A slice `[start, end)` of a timestamp range, scanned by one chain of
+    pages.
+
+    :ivar start: The inclusive start of the slice, as a naive UTC datetime.
+    :vartype start: :class:`datetime.datetime`
+    :ivar end: The exclusive end of the slice, as a naive UTC datetime.
+    :vartype end: :class:`datetime.datetime`
+    :ivar skip_ids: The IDs of transactions at the slice's boundary that
+                    were already returned by the slice it was split from.
+    :vartype skip_ids: FrozenSet[str]
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        end: datetime,
+        skip_ids: FrozenSet[str] = frozenset()
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.skip_ids = skip_ids
+
+    @property
+    def width(self) -> timedelta:
+        return self.end - self.start
+
+    def split(self, parts: int) -> List['TimeSlice']:
+        """
+        :return: `parts` contiguous slices covering this one, oldest first.
+        :rtype: List[:class:`tmvault.rest_api.scan.TimeSlice`]
+        """
+        step = self.width / parts
+        bounds = [self.start + step * i for i in range(parts)] + [self.end]
+        return [
+            TimeSlice(bounds[i], bounds[i + 1], self.skip_ids)
+            for i in range(parts)
+            if bounds[i] < bounds[i + 1]
+        ]
+
+    def as_range(self) -> dict:
+        return {'from': self.start, 'to': self.end}
+
+    def __repr__(self) -> str:
+        return (
+            f'TimeSlice['
+            f'start: {self.start.isoformat()}, '
+            f'end: {self.end.isoformat()}, '
+            f'skip_ids: {len(self.skip_ids)}'
+            f']'
+        )
+
+
+# Gets the first page, as a TransactionsList, of a slice in the given order
+FetchPage = Callable[[TimeSlice, List[TransactionOrderBy]], List[Transaction]]
+
+
+class SliceScan:
+    """Pages through the slices of a timestamp range concurrently.
+
+    :param fetch_page: Gets the first page of a slice, given the slice and
+                       the order of the request, as a
+                       :class:`tmvault.rest_api.TransactionsList`.
+    :param field: The timestamp the range is on, one of :data:`SCAN_FIELDS`.
+    :param slices: The number of slices the range is first split into.
+    :param concurrency: The maximum number of slices scanned at once, and
+                        so of requests in flight.
+    :param max_slice_pages: A slice estimated, from its first page, to hold
+                            more pages than this is split further.
+    :param min_slice_width: Slices are never split narrower than this.
+    :param deadline: The deadline for every request of the scan.
+    """
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        field: str,
+        slices: int,
+        concurrency: int,
+        max_slice_pages: int,
+        min_slice_width: timedelta,
+        deadline: Deadline = None
+    ) -> None:
+        if field not in SCAN_FIELDS:
+            raise ValueError(f'Can only slice on one of {SCAN_FIELDS}')
+        if slices < 1:
+            raise ValueError('slices must be at least 1')
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        if max_slice_pages < 1:
+            raise ValueError('max_slice_pages must be at least 1')
+        self._fetch_page = fetch_page
+        self._field = field
+        self._slices = slices
+        self._concurrency = concurrency
+        self._max_slice_pages = max_slice_pages
+        self._min_slice_width = min_slice_width
+        self._deadline = deadline
+
+    def scan(
+        self,
+        time_range: dict,
+        order_by: List[TransactionOrderBy] = None,
+        ordered: bool = False
+    ) -> Iterator[Transaction]:
+        """
+        :param time_range: The range to scan, with a `from` and optional `to`
+                           naive UTC datetime. `to` defaults to now.
+        :param order_by: The order of the results if `ordered` is True.
+        :param ordered: If False, transactions are returned as soon as their
+                        slice has been read.
+        """
+        if not time_range or time_range.get('from') is None:
+            raise ValueError(
+                f'A {self._field}_range with a "from" is needed to scan '
+                f'in slices'
+            )
+        whole = TimeSlice(
+            naive_utc(time_range['from']),
+            naive_utc(time_range.get('to') or datetime.utcnow())
+        )
+        slices = (
+            whole.split(self._slices) if whole.width > timedelta(0) else []
+        )
+
+        if not ordered:
+            return self._scan_unordered(slices, self._slice_order(True))
+        primary_field, descending = order_by_parts(order_by)[0]
+        if primary_field == self._field.upper():
+            # Slices never overlap on the field they are sorted by, so
+            # reading them one after the other keeps the order.
+            if descending:
+                slices.reverse()
+            return self._scan_in_order(slices, order_by)
+        return self._scan_merged(slices, order_by)
+
+    def _slice_order(self, descending: bool) -> List[TransactionOrderBy]:
+        return [TransactionOrderBy[
+            f'ORDER_BY_{self._field.upper()}_'
+            f'{"DESC" if descending else "ASC"}'
+        ]]
+
+    def _scan_slice(
+        self,
+        time_slice: TimeSlice,
+        order_by: List[TransactionOrderBy],
+        descending: bool
+    ) -> Tuple[List[Transaction], List[TimeSlice]]:
+        """Reads a whole slice, unless a page shows that it is hot, in which
+        case the rest of it is returned split into narrower slices, in the
+        order they should be read.
+        """
+        page = self._fetch_page(time_slice, order_by)
+        transactions, read = [], 0
+        while True:
+            transactions.extend(
+                t for t in page if t.id_ not in time_slice.skip_ids
+            )
+            read += len(page)
+            if not page.is_next_page():
+                return transactions, []
+            rest = self._split_rest(
+                time_slice, transactions, read, descending
+            )
+            if rest:
+                return transactions, rest
+            page = page.get_next_page(self._deadline)
+
+    def _split_rest(
+        self,
+        time_slice: TimeSlice,
+        transactions: List[Transaction],
+        read: int,
+        descending: bool
+    ) -> List[TimeSlice]:
+        """Splits the part of a slice not yet read if, going by the density
+        of the `read` transactions so far, it holds too many pages.
+        """
+        if not transactions:
+            return []
+        boundary = naive_utc(getattr(transactions[-1], self._field))
+        # Everything on the read side of the boundary has been read, but
+        # only some of the transactions exactly at it may have been.
+        at_boundary = set()
+        for transaction in reversed(transactions):
+            if naive_utc(getattr(transaction, self._field)) != boundary:
+                break
+            at_boundary.add(transaction.id_)
+        skip_ids = time_slice.skip_ids | at_boundary
+        if descending:
+            covered = time_slice.end - boundary
+            rest = TimeSlice(
+                time_slice.start, boundary + _ONE_MICROSECOND, skip_ids
+            )
+        else:
+            covered = boundary - time_slice.start
+            rest = TimeSlice(boundary, time_slice.end, skip_ids)
+        estimated_pages = (
+            read * (rest.width / max(covered, _ONE_MICROSECOND))
+            / LIST_PAGE_SIZE
+        )
+        if estimated_pages <= self._max_slice_pages:
+            return []
+        parts = min(
+            math.ceil(estimated_pages / self._max_slice_pages),
+            _MAX_SPLIT,
+            rest.width // max(self._min_slice_width, _ONE_MICROSECOND)
+        )
+        if parts < 2:
+            return []
+        rest_slices = rest.split(parts)
+        if descending:
+            rest_slices.reverse()
+        return rest_slices
+
+    def _scan_in_order(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> Iterator[Transaction]:
+        descending = order_by_parts(order_by)[0][1]
+        # Each entry is a slice and, once submitted, the future reading it
+        entries: Deque[list] = deque([s, None] for s in slices)
+        executor = ThreadPoolExecutor(max_workers=self._concurrency)
+        running = 0
+        try:
+            while entries:
+                # Read ahead of the slice being returned, in order
+                for entry in entries:
+                    if running >= self._concurrency:
+                        break
+                    if entry[1] is None:
+                        entry[1] = executor.submit(
+                            self._scan_slice, entry[0], order_by, descending
+                        )
+                        running += 1
+                _, future = entries.popleft()
+                transactions, rest = future.result()
+                running -= 1
+                entries.extendleft([s, None] for s in reversed(rest))
+                yield from transactions
+        finally:
+            for _, future in entries:
+                if future is not None:
+                    future.cancel()
+            executor.shutdown(wait=False)
+
+    def _scan_unordered(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> Iterator[Transaction]:
+        pending = deque(slices)
+        running = set()
+        executor = ThreadPoolExecutor(max_workers=self._concurrency)
+        try:
+            while pending or running:
+                while pending and len(running) < self._concurrency:
+                    running.add(executor.submit(
+                        self._scan_slice, pending.popleft(), order_by, True
+                    ))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    transactions, rest = future.result()
+                    pending.extend(rest)
+                    yield from transactions
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _scan_merged(
+        self,
+        slices: List[TimeSlice],
+        order_by: List[TransactionOrderBy]
+    ) -> Iterator[Transaction]:
+        # Slices sorted by another field overlap in that order, so each is
+        # streamed by its own thread and they are k-way merged. The density
+        # of a slice cannot be estimated from its first page in this order,
+        # so hot slices are not split. Every stream starts at once, so page
+        # requests take a slot to keep at most `concurrency` in flight.
+        slots = threading.BoundedSemaphore(self._concurrency)
+
+        def stream(time_slice: TimeSlice) -> Iterator[Transaction]:
+            def pages():
+                with slots:
+                    page = self._fetch_page(time_slice, order_by)
+                yield page
+                while page.is_next_page():
+                    with slots:
+                        page = page.get_next_page(self._deadline)
+                    yield page
+            for page in prefetch(pages(), 1):
+                yield from page
+        return merge_ordered(map(stream, slices), order_by)
@@ -0,0 +1,134 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from .deadline import Deadline
+from ..errors import DeadlineExceededError
+
+
+class SingleFlightStats:
+    """How many GET requests a :class:`RestAPIClient` collapsed.
+
+    :ivar requests: The number of GET calls made on the client.
+    :vartype requests: int
+    :ivar executed: The number of GET requests actually sent to the API.
+    :vartype executed: int
+    :ivar coalesced: The number of GET calls answered by an identical
+                     request that was already in flight.
+    :vartype coalesced: int
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'SingleFlightStats['
+            f'requests: {self.requests}, '
+            f'executed: {self.executed}, '
+            f'coalesced: {self.coalesced}'
+            f']'
+        )
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    # Raising an exception sets its traceback, so each waiter raises its own
+    # copy rather than the leader's exception. Built without calling
+    # __init__, as subclasses may take other arguments than their args.
+    copied = type(error).__new__(type(error), *error.args)
+    copied.args = error.args
+    if isinstance(error, OSError):
+        for name in ('errno', 'strerror', 'filename', 'filename2'):
+            if getattr(error, name) is not None:
+                setattr(copied, name, getattr(error, name))
+    copied.__dict__.update(error.__dict__)
+    return copied
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time. Callers arriving while a call
+    for their key is in flight wait for it and share its result, or a copy
+    of its exception, instead of making the call again. A caller whose call
+    failed with :class:`tmvault.errors.DeadlineExceededError`, but who still
+    has time, makes the call again rather than sharing an error caused by
+    another caller's deadline.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = SingleFlightStats()
+
+    def stats(self) -> SingleFlightStats:
+        """
+        :return: A snapshot of the statistics.
+        :rtype: :class:`tmvault.rest_api.SingleFlightStats`
+        """
+        with self._lock:
+            snapshot = SingleFlightStats()
+            snapshot.__dict__.update(self._stats.__dict__)
+            return snapshot
+
+    def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Any],
+        deadline: Deadline = None
+    ) -> Any:
+        with self._lock:
+            self._stats.requests += 1
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self._stats.executed += 1
+            if leader:
+                return self._lead(key, call, func)
+
+            # A waiter gives up at its own deadline, even though the call it
+            # is waiting on may have a later one.
+            while not call.done.wait(deadline and deadline.remaining()):
+                deadline.check('waiting for an identical request in flight')
+            if (
+                isinstance(call.error, DeadlineExceededError)
+                and not (deadline and deadline.expired())
+            ):
+                # The call ran out of its caller's time, not this one's
+                continue
+            with self._lock:
+                self._stats.coalesced += 1
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return call.result
+
+    def _lead(
+        self, key: Hashable, call: _Call, func: Callable[[], Any]
+    ) -> Any:
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a new call rather than getting this result
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
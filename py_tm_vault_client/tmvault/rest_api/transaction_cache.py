@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from ..models import Transaction
+from ..utils import naive_utc
+
+
+class TransactionCacheStats:
+    """How well a :class:`TransactionCache` is doing.
+
+    :ivar hits: The number of IDs served from the cache.
+    :vartype hits: int
+    :ivar misses: The number of IDs that had to be fetched.
+    :vartype misses: int
+    :ivar evictions: The number of transactions dropped to stay within
+                     `max_size`.
+    :vartype evictions: int
+    :ivar invalidations: The number of transactions dropped because an event
+                         reported a newer version of them.
+    :vartype invalidations: int
+    :ivar size: The number of transactions cached.
+    :vartype size: int
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.size = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of IDs served from the cache, 0 if none were asked."""
+        requested = self.hits + self.misses
+        return self.hits / requested if requested else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': self.size,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'TransactionCacheStats['
+            f'hits: {self.hits}, '
+            f'misses: {self.misses}, '
+            f'evictions: {self.evictions}, '
+            f'invalidations: {self.invalidations}, '
+            f'size: {self.size}, '
+            f'hit_ratio: {self.hit_ratio:.3f}'
+            f']'
+        )
+
+
+def _version(transaction: Transaction) -> datetime:
+    when = transaction.last_update_timestamp
+    return naive_utc(when) if when is not None else datetime.min
+
+
+class TransactionCache:
+    """A least recently used cache of transactions by ID, holding at most
+    `max_size` of them, as used by
+    :meth:`tmvault.rest_api.TransactionsAPI.batch_get_transactions`.
+
+    Versions are compared by `last_update_timestamp`, so an older version
+    of a transaction never replaces a newer one, and one fetched before an
+    event reported a newer version is not cached.
+
+    :param max_size: The maximum number of transactions cached.
+    :type max_size: int
+    """
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._transactions: 'OrderedDict[str, Transaction]' = OrderedDict()
+        # The latest version reported by an event of each recently
+        # invalidated transaction, bounded like the cache itself
+        self._floors: 'OrderedDict[str, datetime]' = OrderedDict()
+        self._generation = 0
+        self._stats = TransactionCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._transactions)
+
+    def __repr__(self) -> str:
+        return (
+            f'TransactionCache['
+            f'max_size: {self.max_size}, '
+            f'size: {len(self)}'
+            f']'
+        )
+
+    def stats(self) -> TransactionCacheStats:
+        """
+        :return: A snapshot of the statistics.
+        :rtype: :class:`tmvault.rest_api.TransactionCacheStats`
+        """
+        with self._lock:
+            snapshot = TransactionCacheStats()
+            snapshot.__dict__.update(self._stats.__dict__)
+            snapshot.size = len(self._transactions)
+            return snapshot
+
+    def get_many(
+        self, transaction_ids: Iterable[str]
+    ) -> Tuple[Dict[str, Transaction], List[str], int]:
+        """
+        :return: The cached transactions of `transaction_ids`, the IDs that
+                 are not cached, and the generation to :meth:`put` the
+                 fetched ones with.
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for id_ in transaction_ids:
+                transaction = self._transactions.get(id_)
+                if transaction is None:
+                    missing.append(id_)
+                    continue
+                self._transactions.move_to_end(id_)
+                found[id_] = transaction
+            self._stats.hits += len(found)
+            self._stats.misses += len(missing)
+            return found, missing, self._generation
+
+    def put(
+        self, transactions: Iterable[Transaction], generation: int
+    ) -> None:
+        """Caches fetched transactions, unless the cache was cleared since
+        `generation` was returned by :meth:`get_many`.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            for transaction in transactions:
+                id_ = transaction.id_
+                floor = self._floors.get(id_)
+                if floor is not None and _version(transaction) < floor:
+                    continue
+                cached = self._transactions.get(id_)
+                if (cached is not None
+                        and _version(transaction) < _version(cached)):
+                    continue
+                self._transactions[id_] = transaction
+                self._transactions.move_to_end(id_)
+            while len(self._transactions) > self.max_size:
+                self._transactions.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, transaction: Transaction) -> None:
+        """Drops the cached version of a transaction if `transaction` is a
+        newer one, e.g. from a transaction event.
+        """
+        id_ = transaction.id_
+        version = _version(transaction)
+        with self._lock:
+            floor = self._floors.get(id_)
+            if floor is None or floor < version:
+                self._floors[id_] = version
+            self._floors.move_to_end(id_)
+            while len(self._floors) > self.max_size:
+                self._floors.popitem(last=False)
+            cached = self._transactions.get(id_)
+            if cached is not None and _version(cached) < version:
+                del self._transactions[id_]
+                self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drops every transaction, e.g. when events may have been missed.
+        Transactions being fetched at the time are not cached.
+        """
+        with self._lock:
+            self._transactions.clear()
+            self._floors.clear()
+            self._generation += 1
@@ -1,10 +1,36 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
-from typing import List, Dict
+from typing import (
+    TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Dict, Optional,
+    TextIO, Union
+)
 
+from .aggregation import TransactionAggregates, aggregate_columns
+from .batch import BatchGetResult, unique_ids
+from .columnar import (
+    TransactionColumns, TransactionColumnsBuilder, write_csv, write_parquet
+)
+from .deadline import Deadline, as_deadline
+from .filters import TransactionFilters
+from .ingestion import (
+    CreateTransactionResult, CreateTransactionsReport, IngestionCheckpoint,
+    IngestionProgress, create_all
+)
+from .matching import transaction_matcher
+from .prefetch import prefetch
+from .query_planner import fan_out, split_id_filters
+from .records import record_factory
+from .scan import SliceScan, TimeSlice
+from .transaction_cache import TransactionCache
 from .rest_api_client import RestAPIClient
 from ..const import (
-    DEFAULT_RETRY_SECONDS, DEFAULT_RETRY_INTERVAL, LIST_PAGE_SIZE
+    DEFAULT_AMOUNT_SCALE, DEFAULT_CREATE_CONCURRENCY,
+    DEFAULT_CREATE_LOG_SECONDS, DEFAULT_FAN_OUT_CONCURRENCY,
+    DEFAULT_ID_FILTER_GROUP_SIZE, DEFAULT_PREFETCH_PAGES,
+    DEFAULT_RETRY_SECONDS, DEFAULT_RETRY_INTERVAL, DEFAULT_SCAN_CONCURRENCY,
+    DEFAULT_SCAN_MAX_SLICE_PAGES, DEFAULT_SCAN_MIN_SLICE_SECONDS,
+    DEFAULT_SCAN_SLICES, DEFAULT_RETRY_BACKOFF_MAX_WAIT, LIST_PAGE_SIZE,
+    STREAM_RECHECK_SECONDS
 )
 from ..enums import (
     TransactionStatus, TransactionRejectionCode,
@@ -15,9 +41,122 @@ from ..models.subsidiary import ChargeAmount
 from ..utils import datetime_to_str, get_logger
 from ..errors import TransactionsNotFoundError
 
+if TYPE_CHECKING:
+    from ..stream_api import TransactionWatcher
+
 log = get_logger(__name__)
 
 
+def _transaction_to_create(
+    transaction_id: str = None,
+    account_id: str = None,
+    charge_amount: ChargeAmount = None,
+    is_credit: bool = None,
+    reference: str = None,
+    status: TransactionStatus = None,
+    value_timestamp: datetime = None,
+    booking_timestamp: datetime = None,
+    payee_id: str = None,
+    payment_order_id: str = None,
+    posting_instruction_batch_ids: List[str] = None,
+    rejection_code: TransactionRejectionCode = None,
+) -> Dict[str, any]:
+    transaction = {}
+
+    if transaction_id is not None:
+        transaction['id'] = transaction_id
+    if account_id is not None:
+        transaction['account_id'] = account_id
+    if charge_amount is not None:
+        transaction['charge_amount'] = charge_amount.get_dict()
+    if is_credit is not None:
+        transaction['is_credit'] = is_credit
+    if reference is not None:
+        transaction['reference'] = reference
+    if status is not None:
+        transaction['status'] = status.value
+    if value_timestamp is not None:
+        transaction['value_timestamp'] = datetime_to_str(value_timestamp)
+    if booking_timestamp is not None:
+        transaction['booking_timestamp'] = datetime_to_str(
+            booking_timestamp
+        )
+    if payee_id is not None:
+        transaction['payee_id'] = payee_id
+    if payment_order_id is not None:
+        transaction['payment_order_id'] = payment_order_id
+    if posting_instruction_batch_ids is not None:
+        transaction['posting_instruction_batch_ids'] = (
+            posting_instruction_batch_ids
+        )
+    if rejection_code is not None:
+        transaction['rejection_code'] = rejection_code.value
+    return transaction
+
+
+def _list_transactions_params(
+    filters: TransactionFilters,
+    order_by: List[TransactionOrderBy] = None,
+    page_token: str = None,
+) -> Dict[str, any]:
+    params = {
+        'page_size': LIST_PAGE_SIZE
+    }
+
+    if filters.account_ids is not None:
+        params['account_ids'] = filters.account_ids
+    if filters.payment_order_ids is not None:
+        params['payment_order_ids'] = filters.payment_order_ids
+    if filters.payee_ids is not None:
+        params['payee_ids'] = filters.payee_ids
+    if filters.direction is not None:
+        params['direction'] = filters.direction.value
+    if filters.statuses is not None:
+        params['statuses'] = [s.value for s in filters.statuses]
+    if filters.value_timestamp_range is not None:
+        if 'from' in filters.value_timestamp_range:
+            params['value_timestamp_range.from'] = datetime_to_str(
+                filters.value_timestamp_range['from']
+            )
+        if 'to' in filters.value_timestamp_range:
+            params['value_timestamp_range.to'] = datetime_to_str(
+                filters.value_timestamp_range['to']
+            )
+    if filters.booking_timestamp_range is not None:
+        if 'from' in filters.booking_timestamp_range:
+            params['booking_timestamp_range.from'] = datetime_to_str(
+                filters.booking_timestamp_range['from']
+            )
+        if 'to' in filters.booking_timestamp_range:
+            params['booking_timestamp_range.to'] = datetime_to_str(
+                filters.booking_timestamp_range['to']
+            )
+    if filters.last_update_timestamp_range is not None:
+        if 'from' in filters.last_update_timestamp_range:
+            params['last_update_timestamp_range.from'] = datetime_to_str(
+                filters.last_update_timestamp_range['from']
+            )
+        if 'to' in filters.last_update_timestamp_range:
+            params['last_update_timestamp_range.to'] = datetime_to_str(
+                filters.last_update_timestamp_range['to']
+            )
+    if filters.charge_amount_value_range is not None:
+        if 'from' in filters.charge_amount_value_range:
+            params['charge_amount_value_range.from'] = (
+                filters.charge_amount_value_range['from']
+            )
+        if 'to' in filters.charge_amount_value_range:
+            params['charge_amount_value_range.to'] = (
+                filters.charge_amount_value_range['to']
+            )
+    if order_by is not None:
+        params['order_by'] = [o.value for o in order_by]
+
+    if page_token is not None:
+        params['page_token'] = page_token
+    return params
+
+
 class TransactionsList(list):
     """
     A list of transactions, which is returned by the `list_transactions`
@@ -66,6 +205,24 @@ class TransactionsList(list):
         self.charge_amount_value_range = charge_amount_value_range
         self.order_by = order_by
 
+    @property
+    def filters(self) -> TransactionFilters:
+        """
+        :return: The filters the transactions were listed with.
+        :rtype: :class:`tmvault.rest_api.filters.TransactionFilters`
+        """
+        return TransactionFilters(
+            account_ids=self.account_ids,
+            payment_order_ids=self.payment_order_ids,
+            payee_ids=self.payee_ids,
+            direction=self.direction,
+            statuses=self.statuses,
+            value_timestamp_range=self.value_timestamp_range,
+            booking_timestamp_range=self.booking_timestamp_range,
+            last_update_timestamp_range=self.last_update_timestamp_range,
+            charge_amount_value_range=self.charge_amount_value_range
+        )
+
     def is_next_page(self) -> bool:
         """
         :return: True if there is a next page of transactions,
@@ -74,53 +231,98 @@ class TransactionsList(list):
         """
         return bool(self.page_token)
 
-    def get_next_page(self) -> 'TransactionsList':
+    def get_next_page(
+        self, timeout: Union[float, Deadline] = None
+    ) -> 'TransactionsList':
         """
+        :param timeout: The deadline for getting the page, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The next page of (up to) 100 transactions.
         :rtype: :class:`tmvault.rest_api.TransactionsList`
         """
         if not self.page_token:
             return TransactionsList([], self.transactions_api, "")
         return self.transactions_api._list_transactions(
-            self.account_ids,
-            self.payment_order_ids,
-            self.payee_ids,
-            self.direction,
-            self.statuses,
-            self.value_timestamp_range,
-            self.booking_timestamp_range,
-            self.last_update_timestamp_range,
-            self.charge_amount_value_range,
-            self.order_by,
-            self.page_token
+            self.filters, self.order_by, self.page_token, as_deadline(timeout)
         )
 
 
 class TransactionsAPI:
-    def __init__(self, rest_api_client: RestAPIClient) -> None:
+    def __init__(
+        self,
+        rest_api_client: RestAPIClient,
+        transaction_watcher: Callable[
+            [], Optional['TransactionWatcher']
+        ] = None,
+        transaction_cache: TransactionCache = None
+    ) -> None:
         self._rest_api_client = rest_api_client
+        # Gets the Stream API watcher, or None if it is unavailable
+        self._transaction_watcher = transaction_watcher
+        # Invalidated by the watcher, see TMVaultClient
+        self._transaction_cache = transaction_cache
 
     def batch_get_transactions(
         self,
-        transaction_ids: List[str]
-    ) -> Dict[str, Transaction]:
+        transaction_ids: List[str],
+        timeout: Union[float, Deadline] = None
+    ) -> BatchGetResult:
         """Gets multiple existing transactions by their IDs.
 
+        Any number of IDs may be given; they are requested in concurrent
+        chunks, see :meth:`tmvault.rest_api.RestAPIClient.batch_get`.
+
+        If the client has a transaction cache, see
+        :class:`tmvault.TMVaultClient`, cached transactions are returned
+        without a request, and only the others are fetched. The cache is
+        only used while the Stream API is watched, as transaction events are
+        what keep it up to date. Cached transactions are shared, so do not
+        modify them.
+
         :param transaction_ids: A list of the IDs of the transactions
                                 requested.
         :type transaction_ids: List[str]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: A transaction ID-to-Transaction object dictionary of the
-                 requested transactions.
-        :rtype: Dict[str, :class:`tmvault.models.Transaction`]
+                 requested transactions. IDs that were not found are listed
+                 in its `missing_ids` attribute.
+        :rtype: :class:`tmvault.rest_api.BatchGetResult`
         """
-        params = {'ids': transaction_ids}
-        json_response = self._rest_api_client.get(
-            '/v1/transactions:batchGet', params
+        cache = self._transaction_cache
+        if cache is None or not self._is_watched():
+            return self._batch_get_transactions(transaction_ids, timeout)
+        ids = unique_ids(transaction_ids)
+        found, missing_ids, generation = cache.get_many(ids)
+        if not missing_ids:
+            return BatchGetResult(found)
+        fetched = self._batch_get_transactions(missing_ids, timeout)
+        cache.put(fetched.values(), generation)
+        found.update(fetched)
+        return BatchGetResult(
+            {id_: found[id_] for id_ in ids if id_ in found},
+            fetched.missing_ids
         )
-        return {
-            id_: Transaction.from_json(json) for id_, json in
-            json_response['transactions'].items()
-        }
+
+    def _batch_get_transactions(
+        self,
+        transaction_ids: List[str],
+        timeout: Union[float, Deadline]
+    ) -> BatchGetResult:
+        return self._rest_api_client.batch_get(
+            '/v1/transactions:batchGet', 'transactions', transaction_ids,
+            timeout
+        ).map(Transaction.from_json)
+
+    def _is_watched(self) -> bool:
+        if self._transaction_watcher is None:
+            return False
+        watcher = self._transaction_watcher()
+        return watcher is not None and watcher.ready
 
     def create_transaction(
         self,
@@ -136,6 +338,7 @@ class TransactionsAPI:
         payment_order_id: str = None,
         posting_instruction_batch_ids: List[str] = None,
         rejection_code: TransactionRejectionCode = None,
+        timeout: Union[float, Deadline] = None
     ) -> Transaction:
         """Create a new transaction.
 
@@ -203,46 +406,133 @@ class TransactionsAPI:
                                 for being rejected.
                                 Optional.
         :type rejection_code: :class:`tmvault.enums.TransactionRejectionCode`
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: The created transaction
         :rtype: :class:`tmvault.models.Transaction`
         """
 
-        transaction = {}
-
-        if transaction_id is not None:
-            transaction['id'] = transaction_id
-        if account_id is not None:
-            transaction['account_id'] = account_id
-        if charge_amount is not None:
-            transaction['charge_amount'] = charge_amount.get_dict()
-        if is_credit is not None:
-            transaction['is_credit'] = is_credit
-        if reference is not None:
-            transaction['reference'] = reference
-        if status is not None:
-            transaction['status'] = status.value
-        if value_timestamp is not None:
-            transaction['value_timestamp'] = datetime_to_str(value_timestamp)
-        if booking_timestamp is not None:
-            transaction['booking_timestamp'] = datetime_to_str(
-                booking_timestamp
-            )
-        if payee_id is not None:
-            transaction['payee_id'] = payee_id
-        if payment_order_id is not None:
-            transaction['payment_order_id'] = payment_order_id
-        if posting_instruction_batch_ids is not None:
-            transaction['posting_instruction_batch_ids'] = (
-                posting_instruction_batch_ids
-            )
-        if rejection_code is not None:
-            transaction['rejection_code'] = rejection_code.value
+        transaction = _transaction_to_create(
+            transaction_id,
+            account_id,
+            charge_amount,
+            is_credit,
+            reference,
+            status,
+            value_timestamp,
+            booking_timestamp,
+            payee_id,
+            payment_order_id,
+            posting_instruction_batch_ids,
+            rejection_code,
+        )
 
         post_response = self._rest_api_client.post("/v1/transactions", {
             "transaction": transaction
-        })
+        }, timeout=timeout)
         return Transaction.from_json(post_response)
 
+    def create_transactions(
+        self,
+        transactions: Iterable[Dict[str, Any]],
+        concurrency: int = DEFAULT_CREATE_CONCURRENCY,
+        checkpoint_path: str = None,
+        on_result: Callable[[CreateTransactionResult], None] = None,
+        log_seconds: float = DEFAULT_CREATE_LOG_SECONDS,
+        timeout: Union[float, Deadline] = None
+    ) -> CreateTransactionsReport:
+        """Creates many transactions, e.g. to import a ledger, with up to
+        `concurrency` requests in flight at once.
+
+        Transactions are read from the iterable as requests finish, so it
+        may be a generator over any number of them. Each one is given a
+        `request_id` derived from its content, and an ID derived from its
+        content if it has none, so a retry or a resumed run never creates it
+        twice, even if items were added before it. Transactions with
+        identical arguments are therefore created once; give each its own
+        `transaction_id` or `reference` to keep them distinct. Progress and
+        throughput are logged every `log_seconds`.
+
+        A transaction that fails is reported, and does not stop the others.
+
+        Example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            def read_ledger():
+                for row in csv.DictReader(open('ledger.csv')):
+                    yield {
+                        'account_id': row['account'],
+                        'charge_amount': ChargeAmount(
+                            ChargeAmountAsset.CASH, row['amount'], 'GBP'
+                        ),
+                        'status': TransactionStatus.TRANSACTION_STATUS_BOOKED
+                    }
+
+            report = client.transactions.create_transactions(
+                read_ledger(), concurrency=16,
+                checkpoint_path='ledger.checkpoint'
+            )
+
+        :param transactions: The keyword arguments of
+                             :meth:`create_transaction` for each transaction,
+                             without `timeout`.
+        :type transactions: Iterable[Dict[str, Any]]
+        :param concurrency: The maximum number of transactions being created
+                            at once, capped at the client's `pool_maxsize`.
+                            Defaults to 8.
+        :type concurrency: int
+        :param checkpoint_path: A file recording the IDs of the transactions
+                                created so far. If given, a run skips the
+                                transactions an earlier run created.
+                                Optional.
+        :type checkpoint_path: str
+        :param on_result: Called on the calling thread with the result of
+                          every transaction as it finishes, e.g. to write a
+                          report per transaction. Optional.
+        :type on_result: Callable[[:class:`CreateTransactionResult`], None]
+        :param log_seconds: How often progress is logged. Defaults to 10.
+        :type log_seconds: float
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises tmvault.errors.DeadlineExceededError: If the deadline passes
+                                                      before every transaction
+                                                      is tried. The checkpoint
+                                                      records those created.
+        :return: The numbers of transactions created, failed and skipped,
+                 and the result of every failure.
+        :rtype: :class:`tmvault.rest_api.CreateTransactionsReport`
+        """
+        deadline = as_deadline(timeout)
+
+        def create(transaction: Dict[str, Any], request_id: str):
+            post_response = self._rest_api_client.post(
+                '/v1/transactions', {'transaction': transaction},
+                request_id=request_id, timeout=deadline
+            )
+            return Transaction.from_json(post_response)
+
+        checkpoint = (
+            IngestionCheckpoint(checkpoint_path) if checkpoint_path else None
+        )
+        try:
+            return create_all(
+                transactions,
+                lambda kwargs: _transaction_to_create(**kwargs),
+                create,
+                self._rest_api_client.max_concurrency(concurrency),
+                IngestionProgress(checkpoint, on_result, log_seconds),
+                deadline,
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
     def list_transactions(
         self,
         account_ids: List[str] = None,
@@ -254,7 +544,8 @@ class TransactionsAPI:
         booking_timestamp_range: Dict[str, datetime] = None,
         last_update_timestamp_range: Dict[str, datetime] = None,
         charge_amount_value_range: Dict[str, str] = None,
-        order_by: List[TransactionOrderBy] = None
+        order_by: List[TransactionOrderBy] = None,
+        timeout: Union[float, Deadline] = None
     ) -> TransactionsList:
         """
         Returns a filtered list of transactions.
@@ -329,20 +620,25 @@ class TransactionsAPI:
                          with the secondary sort performed on
                          the default column (last update timestamp desc).
         :type order_by: List[:class:`tmvault.enums.TransactionOrderBy`]
+        :param timeout: The deadline for the whole operation, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
         :return: :class:`tmvault.rest_api.TransactionsList`
         """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
         return self._list_transactions(
-            account_ids,
-            payment_order_ids,
-            payee_ids,
-            direction,
-            statuses,
-            value_timestamp_range,
-            booking_timestamp_range,
-            last_update_timestamp_range,
-            charge_amount_value_range,
-            order_by,
-            None
+            filters, order_by, deadline=as_deadline(timeout)
         )
 
     def list_transactions_when_exists(
@@ -358,12 +654,14 @@ class TransactionsAPI:
             charge_amount_value_range: Dict[str, str] = None,
             order_by: List[TransactionOrderBy] = None,
             max_retry_seconds: int = DEFAULT_RETRY_SECONDS,
-            retry_interval_seconds: int = DEFAULT_RETRY_INTERVAL
+            retry_interval_seconds: int = DEFAULT_RETRY_INTERVAL,
+            timeout: Union[float, Deadline] = None,
+            use_stream: bool = True
     ) -> TransactionsList:
         """
         This method performs the same function as `list_transactions`,
         but if `list_transactions` returns no results
-        it retries for a pre-determined amount of time
+        it waits for a pre-determined amount of time
         until a transaction exists.
         If after this time a transaction does not exist,
         a :class:`tmvault.errors.TransactionsNotFoundError` is raised.
@@ -372,6 +670,11 @@ class TransactionsAPI:
         whilst the payment processes. In almost all other cases
         it is expected that you would use `list_transactions`.
 
+        Rather than polling, it waits for a matching transaction event on
+        the Stream API, and lists the transactions again as soon as one
+        arrives. If the Stream API is unavailable, it polls instead, backing
+        off from `retry_interval_seconds` between attempts.
+
         Returns a filtered list of transactions.
         You must provide at least one of the available filter criteria to
         filter transactions.
@@ -446,39 +749,84 @@ class TransactionsAPI:
                                   Defaults to 5 seconds.
                                   Optional.
         :type max_retry_seconds: int
-        :param retry_interval_seconds: The time period between each attempt
-                                       to list transactions.
+        :param retry_interval_seconds: The time period before the second
+                                       attempt to list transactions when
+                                       polling, doubled after each attempt
+                                       up to 4 seconds.
                                        Defaults to 0.5 seconds.
                                        Optional.
+        :param timeout: The deadline for the whole operation, including
+                        every attempt, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :param use_stream: If False, always poll rather than wait for
+                           Stream API events. Defaults to True.
+        :type use_stream: bool
         :return: :class:`tmvault.rest_api.TransactionsList`
         """
-        end_seconds = time.time() + max_retry_seconds
-        while time.time() <= end_seconds:
-            transactions = self.list_transactions(
-                account_ids,
-                payment_order_ids,
-                payee_ids,
-                direction,
-                statuses,
-                value_timestamp_range,
-                booking_timestamp_range,
-                last_update_timestamp_range,
-                charge_amount_value_range,
-                order_by,
-            )
-            if len(transactions) == 0:
-                if time.time() + retry_interval_seconds <= end_seconds:
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        waiting = Deadline(max_retry_seconds)
+        watcher = (
+            self._transaction_watcher()
+            if use_stream and self._transaction_watcher is not None
+            else None
+        )
+        # Watching starts before the first attempt, so an event arriving
+        # just after it is not missed
+        wait = watcher.wait_for(
+            transaction_matcher(filters)
+        ) if watcher is not None else None
+        interval = retry_interval_seconds
+        woken = False
+        try:
+            while True:
+                transactions = self._list_transactions(
+                    filters, order_by, deadline=deadline
+                )
+                if len(transactions) > 0:
+                    return transactions
+                if waiting.expired():
                     break
+                deadline.check('waiting for transactions to exist')
+                if wait is not None and watcher.ready and not woken:
+                    log.debug("Cannot find any transactions, waiting...")
+                    # Listing again now and then covers an event missed
+                    # while the watcher was reconnecting
+                    woken = wait.wait(deadline.cap(waiting.cap(
+                        STREAM_RECHECK_SECONDS
+                    ))) is not None
+                    continue
+                # Polling, or the event arrived before the transaction could
+                # be listed
                 log.debug("Cannot find any transactions, retrying...")
-                time.sleep(retry_interval_seconds)
-                continue
-            return transactions
+                pause = deadline.cap(waiting.cap(interval))
+                if wait is not None:
+                    wait.wait(pause)
+                else:
+                    time.sleep(pause)
+                interval = min(interval * 2, DEFAULT_RETRY_BACKOFF_MAX_WAIT)
+                woken = False
+        finally:
+            if wait is not None:
+                watcher.cancel(wait)
         log.debug("Failed to find any transactions after waiting")
         raise TransactionsNotFoundError(
             "Cannot find any transactions for the list criteria used"
         )
 
-    def _list_transactions(
+    def iter_transactions(
         self,
         account_ids: List[str] = None,
         payment_order_ids: List[str] = None,
@@ -490,65 +838,593 @@ class TransactionsAPI:
         last_update_timestamp_range: Dict[str, datetime] = None,
         charge_amount_value_range: Dict[str, str] = None,
         order_by: List[TransactionOrderBy] = None,
-        page_token: str = None,
-    ) -> TransactionsList:
-        params = {
-            'page_size': LIST_PAGE_SIZE
-        }
-
-        if account_ids is not None:
-            params['account_ids'] = account_ids
-        if payment_order_ids is not None:
-            params['payment_order_ids'] = payment_order_ids
-        if payee_ids is not None:
-            params['payee_ids'] = payee_ids
-        if direction is not None:
-            params['direction'] = direction.value
-        if statuses is not None:
-            params['statuses'] = [s.value for s in statuses]
-        if value_timestamp_range is not None:
-            if 'from' in value_timestamp_range:
-                params['value_timestamp_range.from'] = datetime_to_str(
-                    value_timestamp_range['from']
-                )
-            if 'to' in value_timestamp_range:
-                params['value_timestamp_range.to'] = datetime_to_str(
-                    value_timestamp_range['to']
-                )
-        if booking_timestamp_range is not None:
-            if 'from' in booking_timestamp_range:
-                params['booking_timestamp_range.from'] = datetime_to_str(
-                    booking_timestamp_range['from']
-                )
-            if 'to' in booking_timestamp_range:
-                params['booking_timestamp_range.to'] = datetime_to_str(
-                    booking_timestamp_range['to']
-                )
-        if last_update_timestamp_range is not None:
-            if 'from' in last_update_timestamp_range:
-                params['last_update_timestamp_range.from'] = datetime_to_str(
-                    last_update_timestamp_range['from']
-                )
-            if 'to' in last_update_timestamp_range:
-                params['last_update_timestamp_range.to'] = datetime_to_str(
-                    last_update_timestamp_range['to']
-                )
-        if charge_amount_value_range is not None:
-            if 'from' in charge_amount_value_range:
-                params['charge_amount_value_range.from'] = (
-                    charge_amount_value_range['from']
-                )
-            if 'to' in charge_amount_value_range:
-                params['charge_amount_value_range.to'] = (
-                    charge_amount_value_range['to']
-                )
-        if order_by is not None:
-            params['order_by'] = [o.value for o in order_by]
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        id_filter_group_size: int = DEFAULT_ID_FILTER_GROUP_SIZE,
+        concurrency: int = DEFAULT_FAN_OUT_CONCURRENCY,
+        timeout: Union[float, Deadline] = None
+    ) -> Iterator[Transaction]:
+        """
+        Iterates over every transaction matching the filters, across all
+        pages, in the order returned by :meth:`list_transactions`.
 
-        if page_token is not None:
-            params['page_token'] = page_token
+        The next pages are downloaded on a background thread while the
+        current one is processed, so a long scan is limited by bandwidth
+        rather than by one round trip per 100 transactions. Pages are only
+        requested as the iteration reaches them, and stop being requested
+        when it is abandoned.
 
-        json_response = self._rest_api_client.get('/v1/transactions', params)
+        An `account_ids`, `payment_order_ids` or `payee_ids` filter with more
+        than `id_filter_group_size` IDs is split into groups, rather than
+        sent as one very long query. Every combination of groups is paged
+        through in parallel, and the results are merged back into the order
+        given by `order_by`, so the iteration is the same as for a single
+        query.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            for transaction in client.transactions.iter_transactions(
+                account_ids=[account_id]
+            ):
+                print(transaction.charge_amount.value)
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param prefetch_pages: The maximum number of pages downloaded ahead
+                               of the iteration, per query. 0 downloads each
+                               page only when it is reached. Defaults to 2.
+        :type prefetch_pages: int
+        :param id_filter_group_size: The maximum number of IDs of one filter
+                                     sent in a query. Defaults to 50.
+        :type id_filter_group_size: int
+        :raises ValueError: If the ID filters would be split into more than
+                            256 queries, e.g. 1,000 account IDs and 1,000
+                            payee IDs in groups of 50.
+        :param concurrency: The maximum number of requests in flight at once
+                            when the ID filters are split. Defaults to 8.
+        :type concurrency: int
+        :param timeout: The deadline for the whole iteration, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: An iterator of :class:`tmvault.models.Transaction`
+        :rtype: Iterator[:class:`tmvault.models.Transaction`]
+        """
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+
+        def pages(
+            id_filters: Dict[str, List[str]]
+        ) -> Iterator[TransactionsList]:
+            page = self._list_transactions(
+                filters.replace(**id_filters), order_by, deadline=deadline
+            )
+            yield page
+            while page.is_next_page():
+                page = page.get_next_page(deadline)
+                yield page
+
+        queries = split_id_filters({
+            'account_ids': account_ids,
+            'payment_order_ids': payment_order_ids,
+            'payee_ids': payee_ids,
+        }, id_filter_group_size)
+        if len(queries) > 1:
+            yield from fan_out(
+                pages, queries, order_by, prefetch_pages,
+                self._rest_api_client.max_concurrency(concurrency)
+            )
+            return
+        for page in prefetch(pages(queries[0]), prefetch_pages):
+            yield from page
+
+    def scan_transactions(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        slice_by: str = 'last_update_timestamp',
+        slices: int = DEFAULT_SCAN_SLICES,
+        concurrency: int = DEFAULT_SCAN_CONCURRENCY,
+        ordered: bool = False,
+        max_slice_pages: int = DEFAULT_SCAN_MAX_SLICE_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> Iterator[Transaction]:
+        """
+        Iterates over every transaction matching the filters by splitting a
+        timestamp range into slices and paging through the slices
+        concurrently, e.g. to backfill months of history over several
+        connections instead of following one chain of pages.
+
+        The range of `slice_by` must have a 'from', and its 'to' defaults to
+        now. Once the first page of a slice is read, a slice estimated to
+        hold more than `max_slice_pages` pages is split further, so a burst
+        of transactions in a short period does not hold up the scan.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            for transaction in client.transactions.scan_transactions(
+                account_ids=[account_id],
+                value_timestamp_range={'from': datetime(2020, 1, 1)},
+                slice_by='value_timestamp',
+            ):
+                print(transaction.charge_amount.value)
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param order_by: The order of the transactions returned, used only
+                         if `ordered` is True. Ordering by `slice_by` reads
+                         the slices one after the other, and any other order
+                         k-way merges every slice, read by its own thread,
+                         without splitting hot slices.
+        :type order_by: List[:class:`tmvault.enums.TransactionOrderBy`]
+        :param slice_by: The timestamp to slice on, either
+                         `last_update_timestamp` or `value_timestamp`.
+                         Defaults to `last_update_timestamp`.
+        :type slice_by: str
+        :param slices: The number of slices the range is first split into.
+                       Defaults to 8.
+        :type slices: int
+        :param concurrency: The maximum number of slices read at the same
+                            time, capped at the client's `pool_maxsize`.
+                            Defaults to 8.
+        :type concurrency: int
+        :param ordered: If True, transactions are returned in `order_by`
+                        order. If False, they are returned as soon as their
+                        slice has been read, which is faster. Defaults to
+                        False.
+        :type ordered: bool
+        :param max_slice_pages: The most pages a slice is estimated to hold
+                                before it is split further. Defaults to 10.
+        :type max_slice_pages: int
+        :param timeout: The deadline for the whole scan, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: An iterator of :class:`tmvault.models.Transaction`
+        :rtype: Iterator[:class:`tmvault.models.Transaction`]
+        """
+        deadline = as_deadline(timeout)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        slice_range = f'{slice_by}_range'
+
+        def fetch_page(
+            time_slice: TimeSlice, slice_order_by: List[TransactionOrderBy]
+        ) -> TransactionsList:
+            return self._list_transactions(
+                filters.replace(**{slice_range: time_slice.as_range()}),
+                slice_order_by,
+                deadline=deadline
+            )
+
+        return SliceScan(
+            fetch_page,
+            slice_by,
+            slices,
+            self._rest_api_client.max_concurrency(concurrency),
+            max_slice_pages,
+            timedelta(seconds=DEFAULT_SCAN_MIN_SLICE_SECONDS),
+            deadline
+        ).scan(getattr(filters, slice_range, None), order_by, ordered)
+
+    def iter_transaction_records(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        fields: List[str] = None,
+        as_rows: bool = False,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> Iterator[Union[dict, tuple]]:
+        """
+        Iterates over every transaction matching the filters, across all
+        pages, as lightweight records rather than
+        :class:`tmvault.models.Transaction` objects.
+
+        Records hold values as returned by Vault, e.g. timestamps and enums
+        as strings, and only the `fields` asked for. Only the pages being
+        iterated and prefetched are held in memory, so a scan of any length
+        runs in constant memory, as long as the caller does not keep the
+        records.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            for record in client.transactions.iter_transaction_records(
+                account_ids=[account_id],
+                fields=['id', 'charge_amount.value', 'is_credit'],
+                as_rows=True
+            ):
+                print(record.id, record.charge_amount_value)
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param fields: The fields of each record, from
+                       :data:`tmvault.rest_api.records.TRANSACTION_FIELDS`.
+                       Dotted fields, e.g. `charge_amount.value`, are those of
+                       the charge amount. Optional, defaults to every field.
+        :type fields: List[str]
+        :param as_rows: If True, records are namedtuples, with dots in field
+                        names replaced by underscores. Otherwise they are
+                        dicts keyed by field. Defaults to False.
+        :type as_rows: bool
+        :param prefetch_pages: The maximum number of pages downloaded ahead
+                               of the iteration. Defaults to 2.
+        :type prefetch_pages: int
+        :param timeout: The deadline for the whole iteration, in seconds or
+                        as a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :raises ValueError: If a field is not supported.
+        :return: An iterator of the records.
+        :rtype: Iterator[Union[dict, tuple]]
+        """
+        to_record = record_factory(fields, as_rows)
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        for page in prefetch(pages, prefetch_pages):
+            yield from map(to_record, page)
+
+    def export_columns(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> TransactionColumns:
+        """
+        Returns every transaction matching the filters as one typed NumPy
+        array per column, converted straight from the JSON of each page
+        without creating a :class:`tmvault.models.Transaction` per row. This
+        is much faster and smaller than building a DataFrame from
+        :meth:`iter_transactions`, see
+        :meth:`tmvault.rest_api.columnar.TransactionColumns.to_pandas`.
+
+        Requires NumPy, see `requirements-columnar.txt`.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            columns = client.transactions.export_columns(
+                account_ids=[account_id]
+            )
+            total_pence = columns['amount'].sum()
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param scale: The number of decimal places of the minor units
+                      amounts are converted to, e.g. 2 for pence. An amount
+                      with more decimal places raises a ValueError.
+                      Defaults to 2.
+        :type scale: int
+        :param prefetch_pages: The maximum number of pages downloaded ahead
+                               of the conversion. Defaults to 2.
+        :type prefetch_pages: int
+        :param timeout: The deadline for the whole export, in seconds or as
+                        a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: The transactions, with amounts as int64 minor units,
+                 timestamps as datetime64 and enums as category codes.
+        :rtype: :class:`tmvault.rest_api.columnar.TransactionColumns`
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        return self._export_columns(pages, scale, prefetch_pages)
+
+    def _export_columns(
+        self,
+        pages: Iterator[List[dict]],
+        scale: int,
+        prefetch_pages: int
+    ) -> TransactionColumns:
+        builder = TransactionColumnsBuilder(scale)
+        for rows in prefetch(pages, prefetch_pages):
+            builder.add_page(rows)
+        return builder.build()
+
+    def export_csv(
+        self,
+        file: Union[str, TextIO],
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> int:
+        """
+        Writes every transaction matching the filters to CSV, one page at a
+        time as it is downloaded, so memory use does not grow with the
+        number of transactions. The columns are those of
+        :meth:`export_columns`, with amounts in minor units and timestamps
+        and enums as returned by Vault.
+
+        Requires no optional library.
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param file: The path of the CSV file, or a text file opened with
+                     `newline=''`.
+        :type file: Union[str, TextIO]
+        :param scale: The number of decimal places of the minor units
+                      amounts are converted to, e.g. 2 for pence. An amount
+                      with more decimal places raises a ValueError.
+                      Defaults to 2.
+        :type scale: int
+        :param prefetch_pages: The maximum number of pages downloaded ahead
+                               of the conversion. Defaults to 2.
+        :type prefetch_pages: int
+        :param timeout: The deadline for the whole export, in seconds or as
+                        a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: The number of transactions written.
+        :rtype: int
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        return write_csv(prefetch(pages, prefetch_pages), file, scale)
+
+    def export_parquet(
+        self,
+        file,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> int:
+        """
+        Writes every transaction matching the filters to a Parquet file, one
+        row group per page as it is downloaded, with the column types of
+        :meth:`export_columns` and category columns dictionary encoded.
+
+        Requires pyarrow and NumPy, see `requirements-columnar.txt`.
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param file: The path of the Parquet file, or a binary file.
+        :param scale: The number of decimal places of the minor units
+                      amounts are converted to, e.g. 2 for pence. An amount
+                      with more decimal places raises a ValueError.
+                      Defaults to 2.
+        :type scale: int
+        :param prefetch_pages: The maximum number of pages downloaded ahead
+                               of the conversion. Defaults to 2.
+        :type prefetch_pages: int
+        :param timeout: The deadline for the whole export, in seconds or as
+                        a :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: The number of transactions written.
+        :rtype: int
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        return write_parquet(prefetch(pages, prefetch_pages), file, scale)
+
+    def aggregate(
+        self,
+        group_by: List[str],
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        time_field: str = 'value_timestamp',
+        scale: int = DEFAULT_AMOUNT_SCALE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        timeout: Union[float, Deadline] = None
+    ) -> TransactionAggregates:
+        """
+        Groups every transaction matching the filters and returns the
+        count, sum, min, max and net (credits minus debits) of the amounts
+        of each group, e.g. daily totals per account.
+
+        The transactions are fetched as with :meth:`export_columns`, and
+        totalled with NumPy grouped reductions on int64 minor units, so a
+        million transactions take a fraction of a second once downloaded.
+        Use :func:`tmvault.rest_api.aggregation.aggregate_columns` to total
+        columns already exported, or
+        :meth:`tmvault.store.TransactionStore.aggregate` to total a local
+        store.
+
+        Requires NumPy, see `requirements-columnar.txt`.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            totals = client.transactions.aggregate(
+                group_by=['account_id', 'day'],
+                account_ids=account_ids,
+            )
+            for group in totals.to_dicts():
+                print(group['account_id'], group['day'], group['net'])
+
+        This takes the same filters as :meth:`list_transactions`, and:
+
+        :param group_by: The keys to group by, any of `account_id`,
+                         `payee_id`, `payment_order_id`, `denomination`,
+                         `asset`, `status`, `direction`, `day` and `month`.
+                         Empty to total every transaction together.
+        :type group_by: List[str]
+        :param time_field: The timestamp `day` and `month` are taken from,
+                           in UTC. Defaults to `value_timestamp`.
+        :type time_field: str
+        :param scale: The number of decimal places of the minor units
+                      amounts are totalled in. Defaults to 2.
+        :type scale: int
+        :param prefetch_pages: The maximum number of pages downloaded ahead.
+                               Defaults to 2.
+        :type prefetch_pages: int
+        :param timeout: The deadline for the whole aggregation, in seconds
+                        or as a :class:`tmvault.rest_api.Deadline`.
+                        Optional, defaults to none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: A row per group.
+        :rtype: :class:`tmvault.rest_api.aggregation.TransactionAggregates`
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        pages = self._transaction_pages_json(
+            filters, order_by, as_deadline(timeout)
+        )
+        columns = self._export_columns(pages, scale, prefetch_pages)
+        return aggregate_columns(columns, group_by, time_field)
+
+    def _transaction_pages_json(
+        self,
+        filters: TransactionFilters,
+        order_by: List[TransactionOrderBy] = None,
+        deadline: Deadline = None
+    ) -> Iterator[List[dict]]:
+        # The raw JSON transactions of each page, for conversions that do
+        # not need Transaction objects
+        page_token = None
+        while True:
+            params = _list_transactions_params(filters, order_by, page_token)
+            json_response = self._rest_api_client.get(
+                '/v1/transactions', params, deadline
+            )
+            yield json_response['transactions']
+            page_token = json_response.get('next_page_token')
+            if not page_token:
+                return
+
+    def _list_transactions(
+        self,
+        filters: TransactionFilters,
+        order_by: List[TransactionOrderBy] = None,
+        page_token: str = None,
+        deadline: Deadline = None,
+    ) -> TransactionsList:
+        params = _list_transactions_params(filters, order_by, page_token)
+        json_response = self._rest_api_client.get(
+            '/v1/transactions', params, deadline
+        )
         list_resp = list(
             map(Transaction.from_json, json_response['transactions'])
         )
@@ -556,14 +1432,6 @@ class TransactionsAPI:
             list_resp,
             self,
             json_response.get('next_page_token'),
-            account_ids,
-            payment_order_ids,
-            payee_ids,
-            direction,
-            statuses,
-            value_timestamp_range,
-            booking_timestamp_range,
-            last_update_timestamp_range,
-            charge_amount_value_range,
-            order_by,
+            order_by=order_by,
+            **filters.as_dict()
         )
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from ..codec import CODEC_PREFERENCE, JSONCodec, get_codec
+from ..const import LIST_PAGE_SIZE
+
+log = logging.getLogger(__name__)
+
+
+def _timestamp(when: datetime) -> str:
+    return when.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def transactions_page(page_size: int = LIST_PAGE_SIZE) -> Dict[str, Any]:
+    """A page of /v1/transactions as returned by the Vault XPL API."""
+    now = datetime.now(timezone.utc)
+    transactions = []
+    for i in range(page_size):
+        when = now - timedelta(minutes=i)
+        transactions.append({
+            'id': str(uuid4()),
+            'account_id': str(uuid4()),
+            'charge_amount': {
+                'asset': 'CASH',
+                'value': f'{random.randint(1, 100000) / 100:.2f}',
+                'denomination': 'GBP',
+            },
+            'is_credit': bool(i % 2),
+            'reference': f'P{i}-{when.strftime("%H:%M:%S")}',
+            'status': 'TRANSACTION_STATUS_BOOKED',
+            'rejection_code': 'REJECTION_CODE_UNKNOWN',
+            'value_timestamp': _timestamp(when),
+            'booking_timestamp': _timestamp(when),
+            'last_update_timestamp': _timestamp(when),
+            'payee_id': str(uuid4()),
+            'payment_order_id': str(uuid4()),
+            'posting_instruction_batch_ids': [str(uuid4())],
+        })
+    return {
+        'transactions': transactions,
+        'next_page_token': str(uuid4()),
+    }
+
+
+def accounts_page(page_size: int = LIST_PAGE_SIZE) -> Dict[str, Any]:
+    """A page of /v1/accounts, including live balances, as returned by the
+    Vault Core API.
+    """
+    now = _timestamp(datetime.now(timezone.utc))
+    accounts = []
+    for i in range(page_size):
+        accounts.append({
+            'id': str(uuid4()),
+            'name': f'Account {i}',
+            'product_id': 'current_account',
+            'product_version_id': str(random.randint(1000, 9999)),
+            'permitted_denominations': ['GBP'],
+            'status': 'ACCOUNT_STATUS_OPEN',
+            'opening_timestamp': now,
+            'stakeholder_ids': [str(uuid4())],
+            'instance_param_vals': {'overdraft_limit': '500'},
+            'derived_instance_param_vals': {'interest_rate': '0.01'},
+            'details': {},
+            'accounting': {'tside': 'TSIDE_LIABILITY'},
+            'account_balance': {
+                'as_of_pib_id': str(uuid4()),
+                'live_balances': [
+                    {
+                        'amount': f'{random.randint(0, 100000) / 100:.2f}',
+                        'account_address': address,
+                        'phase': 'POSTING_PHASE_COMMITTED',
+                        'asset': 'COMMERCIAL_BANK_MONEY',
+                        'denomination': 'GBP',
+                        'accounting': {'tside': 'TSIDE_LIABILITY'},
+                    }
+                    for address in ('DEFAULT', 'ACCRUED_INTEREST')
+                ],
+            },
+        })
+    return {
+        'accounts': accounts,
+        'next_page_token': str(uuid4()),
+    }
+
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def benchmark_codec(
+    codec: JSONCodec, payload: Dict[str, Any], iterations: int
+) -> Dict[str, float]:
+    """Times one codec on one payload.
+
+    :return: The payload size in bytes, and the average time in microseconds
+             of :meth:`JSONCodec.loads` and :meth:`JSONCodec.dumps`.
+    :rtype: Dict[str, float]
+    """
+    encoded = codec.dumps(payload)
+    return {
+        'bytes': len(encoded),
+        'loads_us': _time_per_call(
+            lambda: codec.loads(encoded), iterations) * 1e6,
+        'dumps_us': _time_per_call(
+            lambda: codec.dumps(payload), iterations) * 1e6,
+    }
+
+
+def codec_benchmark(iterations: int = 200) -> List[Dict[str, Any]]:
+    """Benchmarks every installed JSON codec on realistic /v1/transactions
+    and /v1/accounts pages and logs the results.
+
+    :param iterations: The number of times each operation is timed.
+    :type iterations: int
+    :return: One result per codec and payload.
+    :rtype: List[Dict[str, Any]]
+    """
+    payloads = {
+        '/v1/transactions': transactions_page(),
+        '/v1/accounts': accounts_page(),
+    }
+    results = []
+    for name in CODEC_PREFERENCE:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            log.info(f'Skipping {name}, which is not installed')
+            continue
+        for endpoint, payload in payloads.items():
+            result = {
+                'codec': name,
+                'endpoint': endpoint,
+                **benchmark_codec(codec, payload, iterations),
+            }
+            log.info(
+                f'{name:>8} {endpoint:<17} {result["bytes"]:>7} bytes  '
+                f'loads {result["loads_us"]:>8.1f}us  '
+                f'dumps {result["dumps_us"]:>8.1f}us'
+            )
+            results.append(result)
+    return results
@@ -0,0 +1,4 @@
+from .sync import SyncResult, TransactionSync
+from .transactions import TransactionStore
+
+__all__ = ['SyncResult', 'TransactionStore', 'TransactionSync']
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import time
+from typing import Iterator, List, Union
+
+from .transactions import HighWaterMark, TransactionStore
+from ..enums import (
+    TransactionDirection, TransactionOrderBy, TransactionStatus
+)
+from ..rest_api.deadline import Deadline, as_deadline
+from ..rest_api.filters import TransactionFilters
+from ..rest_api.prefetch import prefetch
+from ..rest_api.transactions import TransactionsAPI, TransactionsList
+from ..utils import datetime_to_str, get_logger, naive_utc
+
+log = get_logger(__name__)
+
+
+class SyncResult:
+    """The outcome of one :meth:`TransactionSync.run`.
+
+    :ivar fetched: The number of transactions returned by Vault.
+    :vartype fetched: int
+    :ivar upserted: The number of transactions inserted or updated in the
+                    store.
+    :vartype upserted: int
+    :ivar pages: The number of pages requested.
+    :vartype pages: int
+    :ivar high_water_mark: The high-water mark after the run, or None if
+                           nothing has been synced yet.
+    :vartype high_water_mark: Tuple[:class:`datetime.datetime`, str]
+    :ivar seconds: How long the run took.
+    :vartype seconds: float
+    """
+
+    def __init__(
+        self,
+        fetched: int,
+        upserted: int,
+        pages: int,
+        high_water_mark: HighWaterMark,
+        seconds: float
+    ) -> None:
+        self.fetched = fetched
+        self.upserted = upserted
+        self.pages = pages
+        self.high_water_mark = high_water_mark
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        mark = self.high_water_mark
+        return (
+            f'SyncResult['
+            f'fetched: {self.fetched}, '
+            f'upserted: {self.upserted}, '
+            f'pages: {self.pages}, '
+            f'high_water_mark: '
+            f'{(datetime_to_str(mark[0]), mark[1]) if mark else None}, '
+            f'seconds: {self.seconds:.3f}'
+            f']'
+        )
+
+
+class TransactionSync:
+    """Keeps a :class:`tmvault.store.TransactionStore` up to date with the
+    transactions in Vault matching some filters.
+
+    Every run only fetches the transactions updated since the previous one:
+    the highest `last_update_timestamp` stored is kept in the store as the
+    sync's high-water mark. The next run lists from that timestamp, oldest
+    first, and upserts each page together with the new high-water mark, so
+    an interrupted run carries on where it stopped.
+
+    Vault does not order transactions sharing a timestamp, so the
+    transactions at the high-water mark are always listed again rather than
+    skipped by ID: a run stopped between two pages splitting a timestamp
+    would otherwise never store the rest of them. Upserting them again is
+    harmless, as a stored transaction is only replaced by a version at
+    least as recent.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        with TransactionStore('transactions.db') as store:
+            sync = TransactionSync(
+                client.transactions, store, account_ids=[account_id]
+            )
+            result = sync.run()
+
+    :param transactions_api: The API to fetch transactions with, e.g.
+                             `client.transactions`.
+    :type transactions_api: :class:`tmvault.rest_api.TransactionsAPI`
+    :param store: The store to upsert transactions into.
+    :type store: :class:`tmvault.store.TransactionStore`
+    :param name: The name the high-water mark is stored under. Optional,
+                 defaults to one derived from the filters, so syncs of
+                 different filters can share a store.
+    :type name: str
+    :param account_ids: Only sync transactions of these accounts. Optional.
+    :type account_ids: List[str]
+    :param payment_order_ids: Only sync transactions of these payment
+                              orders. Optional.
+    :type payment_order_ids: List[str]
+    :param payee_ids: Only sync transactions of these payees. Optional.
+    :type payee_ids: List[str]
+    :param direction: Only sync transactions in this direction. Optional.
+    :type direction: :class:`tmvault.enums.TransactionDirection`
+    :param statuses: Only sync transactions with these statuses. Optional.
+    :type statuses: List[:class:`tmvault.enums.TransactionStatus`]
+    """
+
+    def __init__(
+        self,
+        transactions_api: TransactionsAPI,
+        store: TransactionStore,
+        name: str = None,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None
+    ) -> None:
+        self._transactions_api = transactions_api
+        self._store = store
+        self._account_ids = account_ids
+        self._payment_order_ids = payment_order_ids
+        self._payee_ids = payee_ids
+        self._direction = direction
+        self._statuses = statuses
+        self.name = name or self._default_name()
+
+    def __repr__(self) -> str:
+        return f'TransactionSync[name: {self.name}, store: {self._store}]'
+
+    def _default_name(self) -> str:
+        filters = {
+            'account_ids': self._account_ids,
+            'payment_order_ids': self._payment_order_ids,
+            'payee_ids': self._payee_ids,
+            'direction': self._direction.value if self._direction else None,
+            'statuses': (
+                [s.value for s in self._statuses] if self._statuses else None
+            ),
+        }
+        used = {
+            key: sorted(value) if isinstance(value, list) else value
+            for key, value in filters.items()
+            if value
+        }
+        if not used:
+            return 'transactions'
+        digest = hashlib.sha1(
+            json.dumps(used, sort_keys=True).encode()
+        ).hexdigest()
+        return f'transactions:{digest}'
+
+    @property
+    def high_water_mark(self) -> HighWaterMark:
+        """
+        :return: The `last_update_timestamp`, as a naive UTC datetime, and ID
+                 of the last transaction synced, or None. The next run lists
+                 from the timestamp; the ID is only for reference.
+        :rtype: Tuple[:class:`datetime.datetime`, str]
+        """
+        return self._store.get_high_water_mark(self.name)
+
+    def run(self, timeout: Union[float, Deadline] = None) -> SyncResult:
+        """Fetches the transactions updated since the last run and upserts
+        them into the store.
+
+        :param timeout: The deadline for the whole run, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Pages stored
+                        before it passes stay stored. Optional, defaults to
+                        none.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: How much was synced.
+        :rtype: :class:`tmvault.store.SyncResult`
+        """
+        deadline = as_deadline(timeout)
+        started = time.monotonic()
+        start_mark = mark = self.high_water_mark
+        fetched = upserted = pages = 0
+        # The next page is downloaded while the current one is stored
+        for page in prefetch(self._pages(start_mark, deadline), 1):
+            pages += 1
+            fetched += len(page)
+            for transaction in page:
+                if transaction.last_update_timestamp is None:
+                    continue
+                position = (
+                    naive_utc(transaction.last_update_timestamp),
+                    transaction.id_
+                )
+                if mark is None or position > mark:
+                    mark = position
+            upserted += self._store.upsert(page, self.name, mark)
+        result = SyncResult(
+            fetched, upserted, pages, mark, time.monotonic() - started
+        )
+        log.debug(f'Synced {self.name}: {result}')
+        return result
+
+    def _pages(
+        self, start_mark: HighWaterMark, deadline: Deadline
+    ) -> Iterator[TransactionsList]:
+        filters = TransactionFilters(
+            account_ids=self._account_ids,
+            payment_order_ids=self._payment_order_ids,
+            payee_ids=self._payee_ids,
+            direction=self._direction,
+            statuses=self._statuses,
+            last_update_timestamp_range=(
+                {'from': start_mark[0]} if start_mark else None
+            )
+        )
+        page = self._transactions_api._list_transactions(
+            filters,
+            order_by=[TransactionOrderBy.ORDER_BY_LAST_UPDATE_TIMESTAMP_ASC],
+            deadline=deadline
+        )
+        yield page
+        while page.is_next_page():
+            page = page.get_next_page(deadline)
+            yield page
@@ -0,0 +1,576 @@
+from contextlib import contextmanager
+from decimal import Decimal, InvalidOperation
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..const import DEFAULT_AMOUNT_SCALE
+from ..enums import (
+    ChargeAmountAsset, TransactionDirection, TransactionOrderBy,
+    TransactionRejectionCode, TransactionStatus
+)
+from ..models import Transaction
+from ..models.subsidiary import ChargeAmount
+from ..rest_api.aggregation import TransactionAggregates, aggregate_columns
+from ..rest_api.columnar import TransactionColumns, TransactionColumnsBuilder
+from ..rest_api.filters import TransactionFilters
+from ..rest_api.ordering import order_by_parts
+
+# A position in the last_update_timestamp order of transactions, as a naive
+# UTC datetime and the ID of the last transaction at that timestamp
+HighWaterMark = Tuple[datetime, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    account_id TEXT,
+    charge_amount_asset TEXT,
+    charge_amount_value TEXT,
+    charge_amount_denomination TEXT,
+    is_credit INTEGER,
+    reference TEXT,
+    status TEXT,
+    rejection_code TEXT,
+    value_timestamp TEXT,
+    booking_timestamp TEXT,
+    last_update_timestamp TEXT,
+    payee_id TEXT,
+    payment_order_id TEXT,
+    posting_instruction_batch_ids TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    last_update_timestamp TEXT NOT NULL,
+    transaction_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_account_id
+    ON transactions (account_id);
+CREATE INDEX IF NOT EXISTS transactions_status
+    ON transactions (status);
+CREATE INDEX IF NOT EXISTS transactions_payment_order_id
+    ON transactions (payment_order_id);
+CREATE INDEX IF NOT EXISTS transactions_payee_id
+    ON transactions (payee_id);
+CREATE INDEX IF NOT EXISTS transactions_value_timestamp
+    ON transactions (value_timestamp);
+CREATE INDEX IF NOT EXISTS transactions_last_update_timestamp
+    ON transactions (last_update_timestamp);
+"""
+
+_COLUMNS = (
+    'id', 'account_id', 'charge_amount_asset', 'charge_amount_value',
+    'charge_amount_denomination', 'is_credit', 'reference', 'status',
+    'rejection_code', 'value_timestamp', 'booking_timestamp',
+    'last_update_timestamp', 'payee_id', 'payment_order_id',
+    'posting_instruction_batch_ids'
+)
+
+# Never replace a stored transaction with an older version of it
+_UPSERT = (
+    f'INSERT INTO transactions ({", ".join(_COLUMNS)}) '
+    f'VALUES ({", ".join("?" for _ in _COLUMNS)}) '
+    f'ON CONFLICT (id) DO UPDATE SET '
+    f'{", ".join(f"{c} = excluded.{c}" for c in _COLUMNS[1:])} '
+    f'WHERE excluded.last_update_timestamp >= '
+    f'transactions.last_update_timestamp '
+    f'OR transactions.last_update_timestamp IS NULL'
+)
+
+# The number of rows converted at a time by export_columns
+_EXPORT_BATCH_SIZE = 10000
+
+# The columns the fields of TransactionOrderBy sort on
+_ORDER_COLUMNS = {
+    'LAST_UPDATE_TIMESTAMP': 'last_update_timestamp',
+    'VALUE_TIMESTAMP': 'value_timestamp',
+    'BOOKING_TIMESTAMP': 'booking_timestamp',
+    'REFERENCE': 'reference',
+    'CHARGE_AMOUNT_DENOMINATION': 'charge_amount_denomination',
+    'CHARGE_AMOUNT_VALUE': 'charge_amount_value COLLATE amount',
+}
+
+_SAVE_HIGH_WATER_MARK = (
+    'INSERT INTO sync_state (name, last_update_timestamp, transaction_id) '
+    'VALUES (?, ?, ?) '
+    'ON CONFLICT (name) DO UPDATE SET '
+    'last_update_timestamp = excluded.last_update_timestamp, '
+    'transaction_id = excluded.transaction_id'
+)
+
+
+def _amount_key(text: str) -> tuple:
+    # Unparseable amounts sort after every number, like missing ones
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return 1, text
+    return (0, value) if value.is_finite() else (1, text)
+
+
+def _compare_amounts(left: str, right: str) -> int:
+    # The `amount` collation: compares amount texts as exact decimals, so
+    # neither filters nor sorts go through a float
+    left, right = _amount_key(left), _amount_key(right)
+    return (left > right) - (left < right)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.create_collation('amount', _compare_amounts)
+    return connection
+
+
+def timestamp_to_column(when: datetime) -> Optional[str]:
+    """Stores timestamps as fixed width naive UTC text, which sorts and
+    compares in time order.
+    """
+    if when is None:
+        return None
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when.strftime('%Y-%m-%dT%H:%M:%S.%f')
+
+
+def timestamp_from_column(text: Optional[str]) -> Optional[datetime]:
+    """Reads a timestamp stored by :func:`timestamp_to_column` back as an
+    aware UTC datetime, like those parsed from the REST API.
+    """
+    if not text:
+        return None
+    # Slicing the fixed width text is far faster than a generic parser,
+    # which matters when reading thousands of rows
+    return datetime(
+        int(text[0:4]), int(text[5:7]), int(text[8:10]),
+        int(text[11:13]), int(text[14:16]), int(text[17:19]),
+        int(text[20:26]), tzinfo=timezone.utc
+    )
+
+
+def _transaction_to_row(transaction: Transaction) -> tuple:
+    charge_amount = transaction.charge_amount
+    return (
+        transaction.id_,
+        transaction.account_id,
+        charge_amount.asset.value if charge_amount else None,
+        charge_amount.value if charge_amount else None,
+        charge_amount.denomination if charge_amount else None,
+        transaction.is_credit,
+        transaction.reference,
+        transaction.status.value if transaction.status else None,
+        (transaction.rejection_code.value
+         if transaction.rejection_code else None),
+        timestamp_to_column(transaction.value_timestamp),
+        timestamp_to_column(transaction.booking_timestamp),
+        timestamp_to_column(transaction.last_update_timestamp),
+        transaction.payee_id,
+        transaction.payment_order_id,
+        json.dumps(transaction.posting_instruction_batch_ids or []),
+    )
+
+
+def _json_from_row(row: tuple) -> dict:
+    # A stored transaction as Vault returns it, for the columnar export
+    def timestamp(text):
+        return text + 'Z' if text else None
+    return {
+        'id': row[0],
+        'account_id': row[1],
+        'charge_amount': {
+            'asset': row[2], 'value': row[3], 'denomination': row[4]
+        },
+        'is_credit': None if row[5] is None else bool(row[5]),
+        'reference': row[6],
+        'status': row[7],
+        'rejection_code': row[8],
+        'value_timestamp': timestamp(row[9]),
+        'booking_timestamp': timestamp(row[10]),
+        'last_update_timestamp': timestamp(row[11]),
+        'payee_id': row[12],
+        'payment_order_id': row[13],
+    }
+
+
+def _enum_or_none(enum, value: Optional[str]):
+    return None if value is None else enum(value)
+
+
+def _transaction_from_row(row: tuple) -> Transaction:
+    return Transaction(
+        id_=row[0],
+        account_id=row[1],
+        charge_amount=ChargeAmount(
+            asset=_enum_or_none(ChargeAmountAsset, row[2]),
+            value=row[3],
+            denomination=row[4]
+        ),
+        is_credit=None if row[5] is None else bool(row[5]),
+        reference=row[6],
+        status=_enum_or_none(TransactionStatus, row[7]),
+        rejection_code=_enum_or_none(TransactionRejectionCode, row[8]),
+        value_timestamp=timestamp_from_column(row[9]),
+        booking_timestamp=timestamp_from_column(row[10]),
+        last_update_timestamp=timestamp_from_column(row[11]),
+        payee_id=row[12],
+        payment_order_id=row[13],
+        posting_instruction_batch_ids=json.loads(row[14]),
+    )
+
+
+def _where_in(
+    clauses: List[str], args: list, column: str, values: List[str]
+) -> None:
+    if values is not None:
+        clauses.append(
+            f'{column} IN ({", ".join("?" for _ in values)})'
+        )
+        args.extend(values)
+
+
+def _where_range(
+    clauses: List[str],
+    args: list,
+    column: str,
+    value_range: Optional[dict],
+    to_column=timestamp_to_column
+) -> None:
+    # Like Vault, `from` is inclusive and `to` exclusive
+    if value_range is None:
+        return
+    if value_range.get('from') is not None:
+        clauses.append(f'{column} >= ?')
+        args.append(to_column(value_range['from']))
+    if value_range.get('to') is not None:
+        clauses.append(f'{column} < ?')
+        args.append(to_column(value_range['to']))
+
+
+def _select(
+    filters: TransactionFilters,
+    order_by: List[TransactionOrderBy] = None,
+    limit: int = None
+) -> Tuple[str, list]:
+    # The query for the transactions matching list_transactions filters
+    clauses, args = [], []
+    _where_in(clauses, args, 'account_id', filters.account_ids)
+    _where_in(clauses, args, 'payment_order_id', filters.payment_order_ids)
+    _where_in(clauses, args, 'payee_id', filters.payee_ids)
+    if filters.statuses is not None:
+        _where_in(
+            clauses, args, 'status', [s.value for s in filters.statuses]
+        )
+    direction = filters.direction
+    if direction == TransactionDirection.TRANSACTION_DIRECTION_CREDIT:
+        clauses.append('is_credit = 1')
+    elif direction == TransactionDirection.TRANSACTION_DIRECTION_DEBIT:
+        clauses.append('is_credit = 0')
+    _where_range(
+        clauses, args, 'value_timestamp', filters.value_timestamp_range
+    )
+    _where_range(
+        clauses, args, 'booking_timestamp', filters.booking_timestamp_range
+    )
+    _where_range(
+        clauses, args, 'last_update_timestamp',
+        filters.last_update_timestamp_range
+    )
+    _where_range(
+        clauses, args, 'charge_amount_value COLLATE amount',
+        filters.charge_amount_value_range, str
+    )
+    # Missing values sort last, as in tmvault.rest_api.ordering
+    order = []
+    for field, descending in order_by_parts(order_by):
+        column = _ORDER_COLUMNS[field]
+        order.append(f'{column} IS NULL')
+        order.append(f'{column} {"DESC" if descending else "ASC"}')
+    query = (
+        f'SELECT {", ".join(_COLUMNS)} FROM transactions '
+        f'{"WHERE " + " AND ".join(clauses) if clauses else ""} '
+        f'ORDER BY {", ".join(order)}, id'
+    )
+    if limit is not None:
+        query += ' LIMIT ?'
+        args.append(limit)
+    return query, args
+
+
+class TransactionStore:
+    """Transactions kept in a local SQLite file, e.g. by
+    :class:`tmvault.store.TransactionSync`, and queried without calling
+    Vault.
+
+    The file is in WAL mode and indexed on account, status, payment order,
+    payee, value timestamp and last update timestamp, so reads are not
+    blocked by a sync writing to it and are answered from the indexes.
+
+    A store can be shared by threads, each of which reads on its own SQLite
+    connection. Use it as a context manager, or call :meth:`close` when done
+    with it.
+
+    :param path: The path to the SQLite file, created if it does not exist.
+                 `:memory:` keeps the store in memory only.
+    :type path: str
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = _connect(path)
+        self._in_memory = path == ':memory:'
+        self._readers = threading.local()
+        self._reader_connections = []
+        with self._lock, self._connection:
+            if not self._in_memory:
+                self._connection.execute('PRAGMA journal_mode=WAL')
+                # Safe in WAL mode: a crash can only lose the last commits
+                self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        if self._in_memory:
+            # An in-memory database only exists on its own connection
+            with self._lock:
+                yield self._connection
+            return
+        connection = getattr(self._readers, 'connection', None)
+        if connection is None:
+            connection = _connect(self.path)
+            self._readers.connection = connection
+            with self._lock:
+                self._reader_connections.append(connection)
+        yield connection
+
+    def __enter__(self) -> 'TransactionStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._read() as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM transactions'
+            ).fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f'TransactionStore[path: {self.path}]'
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections = []
+            self._readers = threading.local()
+            self._connection.close()
+
+    def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
+        """
+        :return: The stored transaction with this ID, or None.
+        :rtype: :class:`tmvault.models.Transaction`
+        """
+        with self._read() as connection:
+            row = connection.execute(
+                f'SELECT {", ".join(_COLUMNS)} FROM transactions '
+                f'WHERE id = ?',
+                (transaction_id,)
+            ).fetchone()
+        return _transaction_from_row(row) if row else None
+
+    def list_transactions(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        limit: int = None
+    ) -> List[Transaction]:
+        """Returns the stored transactions matching the filters, which work
+        the same way as those of
+        :meth:`tmvault.rest_api.TransactionsAPI.list_transactions`, in the
+        same order. Unlike it, every matching transaction is returned at
+        once and no filter is required.
+
+        The results are only as recent as the last sync of the store.
+
+        :param limit: The maximum number of transactions to return.
+                      Optional, defaults to all of them.
+        :type limit: int
+        :return: The matching transactions.
+        :rtype: List[:class:`tmvault.models.Transaction`]
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        query, args = _select(filters, order_by, limit)
+        with self._read() as connection:
+            rows = connection.execute(query, args).fetchall()
+        return [_transaction_from_row(row) for row in rows]
+
+    def export_columns(
+        self,
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        scale: int = DEFAULT_AMOUNT_SCALE
+    ) -> TransactionColumns:
+        """Returns the stored transactions matching the filters of
+        :meth:`list_transactions` as typed NumPy arrays, like
+        :meth:`tmvault.rest_api.TransactionsAPI.export_columns`. Requires
+        NumPy.
+
+        :param scale: The number of decimal places of the minor units
+                      amounts are converted to. Defaults to 2.
+        :type scale: int
+        :rtype: :class:`tmvault.rest_api.columnar.TransactionColumns`
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        return self._export_columns(filters, order_by, scale)
+
+    def _export_columns(
+        self,
+        filters: TransactionFilters,
+        order_by: List[TransactionOrderBy],
+        scale: int
+    ) -> TransactionColumns:
+        query, args = _select(filters, order_by)
+        builder = TransactionColumnsBuilder(scale)
+        with self._read() as connection:
+            cursor = connection.execute(query, args)
+            while True:
+                rows = cursor.fetchmany(_EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                builder.add_page([_json_from_row(row) for row in rows])
+        return builder.build()
+
+    def aggregate(
+        self,
+        group_by: List[str],
+        account_ids: List[str] = None,
+        payment_order_ids: List[str] = None,
+        payee_ids: List[str] = None,
+        direction: TransactionDirection = None,
+        statuses: List[TransactionStatus] = None,
+        value_timestamp_range: Dict[str, datetime] = None,
+        booking_timestamp_range: Dict[str, datetime] = None,
+        last_update_timestamp_range: Dict[str, datetime] = None,
+        charge_amount_value_range: Dict[str, str] = None,
+        order_by: List[TransactionOrderBy] = None,
+        time_field: str = 'value_timestamp',
+        scale: int = DEFAULT_AMOUNT_SCALE
+    ) -> TransactionAggregates:
+        """Totals the stored transactions matching the filters of
+        :meth:`list_transactions` by group, like
+        :meth:`tmvault.rest_api.TransactionsAPI.aggregate`. Requires NumPy.
+
+        :rtype: :class:`tmvault.rest_api.aggregation.TransactionAggregates`
+        """
+        filters = TransactionFilters(
+            account_ids=account_ids,
+            payment_order_ids=payment_order_ids,
+            payee_ids=payee_ids,
+            direction=direction,
+            statuses=statuses,
+            value_timestamp_range=value_timestamp_range,
+            booking_timestamp_range=booking_timestamp_range,
+            last_update_timestamp_range=last_update_timestamp_range,
+            charge_amount_value_range=charge_amount_value_range
+        )
+        columns = self._export_columns(filters, order_by, scale)
+        return aggregate_columns(columns, group_by, time_field)
+
+    def upsert(
+        self,
+        transactions: Iterable[Transaction],
+        sync_name: str = None,
+        high_water_mark: HighWaterMark = None
+    ) -> int:
+        """Inserts transactions, or updates the stored ones with the same ID
+        unless they have a later `last_update_timestamp`, in one SQLite
+        transaction.
+
+        :param transactions: The transactions to store.
+        :type transactions: Iterable[:class:`tmvault.models.Transaction`]
+        :param sync_name: The sync whose high-water mark is moved to
+                          `high_water_mark` in the same SQLite transaction,
+                          so it never runs ahead of the stored transactions.
+                          Optional.
+        :type sync_name: str
+        :param high_water_mark: The new high-water mark of `sync_name`.
+        :type high_water_mark: Tuple[:class:`datetime.datetime`, str]
+        :return: The number of transactions inserted or updated.
+        :rtype: int
+        """
+        rows = [_transaction_to_row(t) for t in transactions]
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(_UPSERT, rows)
+            upserted = self._connection.total_changes - before
+            if sync_name is not None and high_water_mark is not None:
+                when, transaction_id = high_water_mark
+                self._connection.execute(_SAVE_HIGH_WATER_MARK, (
+                    sync_name, timestamp_to_column(when), transaction_id
+                ))
+        return upserted
+
+    def get_high_water_mark(self, sync_name: str) -> Optional[HighWaterMark]:
+        """
+        :return: The `last_update_timestamp`, as a naive UTC datetime, and ID
+                 of the last transaction stored by the sync `sync_name`, or
+                 None if it has never stored any.
+        :rtype: Tuple[:class:`datetime.datetime`, str]
+        """
+        with self._read() as connection:
+            row = connection.execute(
+                'SELECT last_update_timestamp, transaction_id '
+                'FROM sync_state WHERE name = ?',
+                (sync_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return (
+            timestamp_from_column(row[0]).replace(tzinfo=None), row[1]
+        )
+
+    def reset_high_water_mark(self, sync_name: str) -> None:
+        """Makes the next run of the sync `sync_name` fetch every
+        transaction again.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM sync_state WHERE name = ?', (sync_name,)
+            )
@@ -1,3 +1,4 @@
 from .transactions import TransactionsStreamAPI
+from .watcher import TransactionWait, TransactionWatcher
 
-__all__ = ['TransactionsStreamAPI', ]
+__all__ = ['TransactionsStreamAPI', 'TransactionWait', 'TransactionWatcher']
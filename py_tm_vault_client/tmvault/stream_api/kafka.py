@@ -1,10 +1,13 @@
+import logging
 import socket
+from typing import Callable, Optional
 
 from confluent_kafka import (
     Consumer as ConfluentConsumer, Producer as ConfluentProducer
 )
 from confluent_kafka import KafkaError, KafkaException
 
+from ..rest_api.deadline import Deadline
 from ..utils import get_logger
 
 MEBIBYTE = 1024 * 1024
@@ -14,7 +17,13 @@ log = get_logger(__name__)
 
 class Consumer:
     def __init__(
-        self, bootstrap_servers: str, topic: str, group_id: str
+        self,
+        bootstrap_servers: str,
+        topic: str,
+        group_id: str,
+        on_assign: Callable[[], None] = None,
+        on_revoke: Callable[[], None] = None,
+        on_error: Callable[[KafkaError], None] = None
     ) -> None:
         config = {
             'bootstrap.servers': bootstrap_servers,
@@ -36,18 +45,37 @@ class Consumer:
             'statistics.interval.ms': 15000,
             'queued.max.messages.kbytes': 1024 * 64,
         }
+        if on_error is not None:
+            # Called with client wide errors, e.g. every broker being down
+            config['error_cb'] = on_error
         self._consumer = ConfluentConsumer(config)
-        self._consumer.subscribe([topic])
+        callbacks = {}
+        if on_assign is not None:
+            callbacks['on_assign'] = lambda consumer, partitions: on_assign()
+        if on_revoke is not None:
+            callbacks['on_revoke'] = lambda consumer, partitions: on_revoke()
+        self._consumer.subscribe([topic], **callbacks)
 
-    def consume(self) -> str:
+    def consume(self, deadline: Deadline = None) -> Optional[str]:
+        msg = self.consume_bytes(deadline)
+        return msg.decode('utf-8') if msg is not None else None
+
+    def consume_bytes(self, deadline: Deadline = None) -> Optional[bytes]:
+        deadline = deadline if deadline is not None else Deadline()
         while True:
-            msg = self._consumer.poll(1.0)
+            if deadline.expired():
+                return None
+            msg = self._consumer.poll(deadline.cap(1.0))
 
             if msg is None:
                 continue
             if msg.error() is None:
-                log.debug(f'Received message: {msg.value().decode("utf-8")}')
-                return msg.value().decode('utf-8')
+                # Only decode the message for the log when it will be logged
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        f'Received message: {msg.value().decode("utf-8")}'
+                    )
+                return msg.value()
             elif msg.error().code() != KafkaError._PARTITION_EOF:
                 log.error(
                     f'Failed to consume from topic, continuing... '
@@ -1,30 +1,45 @@
-import json
+from typing import Union
 
+from ..codec import JSONCodec, get_codec
 from ..models import TransactionEvent
+from ..rest_api.deadline import Deadline, as_deadline
 
 _STREAM_API_TOPIC = 'vault.xpl_api.v1.transactions.transaction.events'
 
 
 class TransactionsStreamAPI:
-    def __init__(self, bootstrap_servers: str, group_id: str) -> None:
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        group_id: str,
+        json_codec: Union[str, JSONCodec] = None
+    ) -> None:
         from .kafka import Consumer
+        self._json_codec = get_codec(json_codec)
         self.consumer = Consumer(
             bootstrap_servers, _STREAM_API_TOPIC, group_id)
 
     def __del__(self) -> None:
         self.consumer.close()
 
-    def consume(self) -> TransactionEvent:
+    def consume(
+        self, timeout: Union[float, Deadline] = None
+    ) -> TransactionEvent:
         """Consumes from the transaction event topic and converts the JSON
         message into a TransactionEvent object.
-        Blocks until a message is consumed.
-
-        :return: The consumed transaction event
+        Blocks until a message is consumed, or the timeout passes.
+
+        :param timeout: How long to wait for a message, in seconds or as a
+                        :class:`tmvault.rest_api.Deadline`. Optional,
+                        defaults to waiting forever.
+        :type timeout: Union[float, :class:`tmvault.rest_api.Deadline`]
+        :return: The consumed transaction event, or None if the timeout
+                 passed first
         :rtype: :class:`tmvault.models.TransactionEvent`
         """
-        msg = self.consumer.consume()
+        msg = self.consumer.consume_bytes(as_deadline(timeout))
         if msg:
-            return TransactionEvent.from_json(json.loads(msg))
+            return TransactionEvent.from_json(self._json_codec.loads(msg))
         return None
 
     def commit(self) -> None:
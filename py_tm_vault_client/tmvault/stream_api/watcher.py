@@ -0,0 +1,179 @@
+import threading
+from typing import Callable, Optional, Union
+from uuid import uuid4
+
+from .transactions import _STREAM_API_TOPIC
+from ..codec import JSONCodec, get_codec
+from ..models import Transaction, TransactionEvent
+from ..rest_api.deadline import Deadline
+from ..utils import get_logger
+
+log = get_logger(__name__)
+
+# How long the watcher thread blocks on Kafka before checking if it is closed
+_POLL_SECONDS = 0.5
+
+
+class TransactionWait:
+    """A caller waiting for a transaction event matching `matches`, as
+    returned by :meth:`TransactionWatcher.wait_for`.
+    """
+
+    def __init__(self, matches: Callable[[Transaction], bool]) -> None:
+        self._matches = matches
+        self._event = threading.Event()
+        self._transaction = None
+
+    def _notify(self, transaction: Transaction) -> None:
+        if self._matches(transaction):
+            self._transaction = transaction
+            self._event.set()
+
+    def wait(self, timeout: float = None) -> Optional[Transaction]:
+        """Blocks until a matching event arrives, or the timeout passes.
+
+        :return: The transaction of the event, or None if the timeout
+                 passed first.
+        :rtype: :class:`tmvault.models.Transaction`
+        """
+        if not self._event.wait(timeout):
+            return None
+        self._event.clear()
+        return self._transaction
+
+
+class TransactionWatcher:
+    """Consumes the transaction event topic on a background thread and
+    wakes the callers waiting for a matching transaction, e.g. in
+    :meth:`tmvault.rest_api.TransactionsAPI.list_transactions_when_exists`.
+
+    The watcher has its own consumer group, so it never takes events from
+    :attr:`tmvault.TMVaultClient.transactions_stream`.
+
+    :param bootstrap_servers: The Kafka bootstrap servers.
+    :type bootstrap_servers: str
+    :param json_codec: The codec used to decode events. Optional.
+    :type json_codec: Union[str, :class:`tmvault.codec.JSONCodec`]
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        json_codec: Union[str, JSONCodec] = None
+    ) -> None:
+        from .kafka import Consumer
+        self._json_codec = get_codec(json_codec)
+        self._assigned = threading.Event()
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._waits = set()
+        self._listeners = []
+        self._consumer = Consumer(
+            bootstrap_servers,
+            _STREAM_API_TOPIC,
+            f'tmvault-watcher-{uuid4()}',
+            on_assign=self._assigned.set,
+            on_revoke=self._lost,
+            on_error=self._on_error
+        )
+        self._thread = threading.Thread(
+            target=self._run, name='tmvault-transaction-watcher', daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def ready(self) -> bool:
+        """True once the watcher is receiving events, and as long as Kafka
+        is reachable. Events are missed while it is not ready.
+        """
+        return self._assigned.is_set() and not self._closed.is_set()
+
+    def wait_for(
+        self, matches: Callable[[Transaction], bool]
+    ) -> TransactionWait:
+        """Starts watching for events whose transaction `matches`. Call it
+        before checking whether the transaction already exists, so an event
+        arriving in between is not missed, and call :meth:`cancel` when done.
+
+        :rtype: :class:`tmvault.stream_api.TransactionWait`
+        """
+        wait = TransactionWait(matches)
+        with self._lock:
+            self._waits.add(wait)
+        return wait
+
+    def cancel(self, wait: TransactionWait) -> None:
+        with self._lock:
+            self._waits.discard(wait)
+
+    def add_listener(
+        self,
+        on_transaction: Callable[[Transaction], None],
+        on_gap: Callable[[], None] = None
+    ) -> None:
+        """Calls `on_transaction` with the transaction of every event, on the
+        watcher thread, e.g. to invalidate a cache. `on_gap` is called when
+        the watcher stops being :attr:`ready`, as events may then be missed.
+        """
+        with self._lock:
+            self._listeners.append((on_transaction, on_gap))
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join()
+        self._consumer.close()
+
+    def __repr__(self) -> str:
+        return (
+            f'TransactionWatcher['
+            f'ready: {self.ready}, '
+            f'waits: {len(self._waits)}'
+            f']'
+        )
+
+    def _lost(self) -> None:
+        if not self._assigned.is_set():
+            return
+        self._assigned.clear()
+        with self._lock:
+            listeners = list(self._listeners)
+        for _, on_gap in listeners:
+            if on_gap is not None:
+                on_gap()
+
+    def _on_error(self, error) -> None:
+        log.warning(f'Transaction watcher Kafka error: {error}')
+        if error.fatal() or 'ALL_BROKERS_DOWN' in error.name():
+            self._lost()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            try:
+                msg = self._consumer.consume_bytes(Deadline(_POLL_SECONDS))
+            except Exception as e:
+                log.warning(f'Transaction watcher failed to consume: {e}')
+                self._lost()
+                self._closed.wait(_POLL_SECONDS)
+                continue
+            if msg is None:
+                continue
+            # A message means Kafka is reachable again after an error, and
+            # the consumer carries on from where it was, so nothing was lost
+            self._assigned.set()
+            try:
+                event = TransactionEvent.from_json(
+                    self._json_codec.loads(msg)
+                )
+            except Exception as e:
+                log.warning(f'Transaction watcher skipped an event: {e}')
+                continue
+            with self._lock:
+                waits = list(self._waits)
+                listeners = list(self._listeners)
+            for on_transaction, _ in listeners:
+                try:
+                    on_transaction(event.transaction)
+                except Exception as e:
+                    log.warning(f'Transaction watcher listener failed: {e}')
+            for wait in waits:
+                wait._notify(event.transaction)
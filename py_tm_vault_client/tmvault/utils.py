@@ -1,5 +1,5 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from dateutil import parser
 
 
@@ -20,3 +20,27 @@ def datetime_from_timestamp_iso_string(iso_string: str) -> datetime:
     return (parser.parse(iso_string)
             if iso_string
             else None)
+
+
+def naive_utc(when: datetime) -> datetime:
+    """Converts an aware datetime, as parsed from the REST API, to the naive
+    UTC datetimes range filters take. Naive datetimes are returned as is.
+    """
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when
+
+
+def endpoint_template(endpoint_path: str) -> str:
+    """Replaces the resource IDs in a Vault REST API path with `{id}`, e.g.
+    `/v1/accounts/1234` becomes `/v1/accounts/{id}` and
+    `/v1/customers/56:updateAdditionalDetails` becomes
+    `/v1/customers/{id}:updateAdditionalDetails`.
+    """
+    segments = endpoint_path.split('/')
+    # Vault paths alternate between collection names and resource IDs after
+    # the version, i.e. ['', 'v1', collection, id, collection, id, ...]
+    for i in range(3, len(segments), 2):
+        _, colon, verb = segments[i].partition(':')
+        segments[i] = '{id}' + colon + verb
+    return '/'.join(segments)